@@ -14,27 +14,57 @@ import shutil
 from pathlib import Path
 from io import StringIO
 import contextlib
-from importlib.machinery import SourceFileLoader
 import tempfile
 from collections import OrderedDict
 import json
 
 from lopper.fmt import LopperFmt
 from lopper.fdt import LopperFDT
+from lopper.base import lopper_base
 
 from lopper.tree import LopperNode, LopperTree, LopperTreePrinter, LopperProp
 import lopper.tree
+from lopper.lop_program import LopProgram, LopOp, program_key
 
 import lopper.log
+import lopper.timings
+import lopper.assist_registry
 
 lopper_directory = os.path.dirname(os.path.realpath(__file__))
 
-try:
-    from lopper.yaml import *
-    yaml_support = True
-except Exception as e:
-    lopper.log._warning( f"cant load yaml, disabling support: {e}" )
-    yaml_support = False
+# yaml/json support (ruamel, anytree, packaging) is only loaded when a yaml
+# or json file is processed. None means that it hasn't been probed yet, see
+# _yaml_support()
+yaml_support = None
+
+def _yaml_support():
+    """Load yaml and json support on first use
+
+    Imports lopper.yaml and makes LopperYAML and LopperJSON available as
+    module globals. The result is cached in yaml_support.
+
+    Returns:
+        bool: True if yaml and json support is available
+    """
+    global yaml_support, LopperYAML, LopperJSON
+
+    if yaml_support is None:
+        try:
+            from lopper.yaml import LopperYAML, LopperJSON
+            yaml_support = True
+        except Exception as e:
+            lopper.log._warning( f"cant load yaml, disabling support: {e}" )
+            yaml_support = False
+
+    return yaml_support
+
+def __getattr__( name ):
+    # lopper.LopperYAML and "from lopper import LopperJSON" still work, but
+    # only trigger the yaml import when they are used.
+    if name in ( "LopperYAML", "LopperJSON" ) and _yaml_support():
+        return globals()[name]
+
+    raise AttributeError( f"module {__name__!r} has no attribute {name!r}" )
 
 # Default processing type
 Lopper = LopperFDT
@@ -843,13 +873,13 @@ class LopperSDT:
 
             # cpp or pcpp is required for both libfdt and non-libfdt modes
             preprocessor = (os.environ.get('LOPPER_CPP') or
-                                           shutil.which("cpp") or
-                                           shutil.which("pcpp") or
-                                           shutil.which("pcpp-python") or "").split()
+                                           lopper_base.which("cpp") or
+                                           lopper_base.which("pcpp") or
+                                           lopper_base.which("pcpp-python") or "").split()
             support_bins.extend( preprocessor )
             for s in support_bins:
                 lopper.log._info( f"checking for support binary: {s}" )
-                if not shutil.which(s):
+                if not lopper_base.which(s):
                     lopper.log._error( f"support application '{s}' not found, exiting" )
                     sys.exit(2)
 
@@ -945,7 +975,7 @@ class LopperSDT:
             elif re.search( r".dtb$", ifile ):
                 lop_files.append( ifile )
             elif re.search( r".yaml$", ifile ) or re.search( f".json$", ifile):
-                if yaml_support:
+                if _yaml_support():
                     with open(ifile) as f:
                         datafile = f.readlines()
                         found = False
@@ -1200,7 +1230,7 @@ class LopperSDT:
 
 
         elif self.dts and re.search( r".yaml$", self.dts ):
-            if not yaml_support:
+            if not _yaml_support():
                 lopper.log._error( f"no yaml support detected, but input is yaml" )
                 sys.exit(1)
 
@@ -1243,7 +1273,7 @@ class LopperSDT:
             self.tmpfiles.append( fpp.name )
 
         elif self.dts and re.search( r".json$", self.dts ):
-            if not yaml_support:
+            if not _yaml_support():
                 lopper.log._error( f"no json detected, but system device tree is json" )
                 sys.exit(1)
 
@@ -1357,23 +1387,9 @@ class LopperSDT:
         for ifile in lop_files:
             if re.search( r".dts$", ifile ) or re.search( r".lop$", ifile ):
                 lop = LopperFile( ifile )
-                # TODO: this may need an output directory option, right now it drops
-                #       it where lopper is called from (which may not be writeable.
-                #       hence why our output_dir is set to "./"
-                compiled_file, _  = Lopper.dt_compile( lop.dts, "", include_paths, force, self.tmpdir,
-                                                       self.save_temps, self.verbose )
-                if not compiled_file:
-                    lopper.log._error( f"could not compile file {ifile}" )
-                    sys.exit(1)
-
-                if self.use_libfdt:
-                    lop.dtb = compiled_file
-                else:
-                    lop.dtb = ""
-                    lop.fdt = None
-                    dct = Lopper.export( compiled_file )
-                    lop.tree = LopperTree()
-                    lop.tree.load( dct )
+                lop.dtb = ""
+                lop.fdt = None
+                lop.tree = self.lop_program( ifile, include_paths, force ).tree()
 
                 self.lops.append( lop )
             elif re.search( r".yaml$", ifile ):
@@ -1402,6 +1418,55 @@ class LopperSDT:
                 lop.dtb = ifile
                 self.lops.append( lop )
 
+    def lop_program( self, lop_file, include_paths = "", force = False ):
+        """Return the compiled program for a lop file
+
+        A lop file only needs to be compiled (dtc + export) the first time
+        it is seen. The resulting program, including the compiled form of
+        its code blocks, is stored in the lop program cache and reused by
+        later runs for as long as the lop file (and anything it includes)
+        is unchanged.
+
+        Args:
+           lop_file (string): path to the lop (.dts or .lop) file
+           include_paths (string): space separated include paths for compilation
+           force (bool,optional): overwrite existing intermediate files
+
+        Returns:
+           LopProgram: the compiled lop program
+        """
+        key = program_key( lop_file, include_paths, self.use_libfdt )
+        program = LopProgram.load( key )
+        if program:
+            lopper.log._debug( f"lop program cache hit for {lop_file}" )
+            lopper.timings.count( "lop program cache hit" )
+            return program
+
+        lopper.timings.count( "lop program cache miss" )
+
+        # TODO: this may need an output directory option, right now it drops
+        #       it where lopper is called from (which may not be writeable.
+        #       hence why our output_dir is set to "./"
+        compiled_file, _  = Lopper.dt_compile( lop_file, "", include_paths, force, self.tmpdir,
+                                               self.save_temps, self.verbose )
+        if not compiled_file:
+            lopper.log._error( f"could not compile file {lop_file}" )
+            sys.exit(1)
+
+        if self.use_libfdt:
+            try:
+                dct = Lopper.export( Lopper.dt_to_fdt( compiled_file ), strict=True )
+            except Exception as e:
+                lopper.log._error( f"({lop_file}) {e}", True )
+        else:
+            dct = Lopper.export( compiled_file )
+
+        program = LopProgram( key, dct )
+        program.compile_code()
+        program.store()
+
+        return program
+
     def assists_setup( self, assists = []):
         """
                    assists (list,optional): list of python assist modules to load. Default is []
@@ -1503,6 +1568,7 @@ class LopperSDT:
         #       not cleaning up the concatenated compiled. pp file, since
         #       it is created with mktmp()
 
+    @lopper.timings.timed( "write", "phase" )
     def write( self, tree = None, output_filename = None, overwrite = True, enhanced = False ):
         """Write a system device tree to a file
 
@@ -1584,6 +1650,10 @@ class LopperSDT:
                 lopper.log._error( f"output file {output_filename} exists and force overwrite is not enabled"  )
                 sys.exit(1)
 
+            if not _yaml_support():
+                lopper.log._error( f"no yaml support detected, but output is yaml" )
+                sys.exit(1)
+
             yaml = LopperYAML( None, tree_to_write, config=self.config )
             yaml.to_yaml( output_filename )
         elif re.search( r"\.json$", output_filename ):
@@ -1595,6 +1665,10 @@ class LopperSDT:
                 lopper.log._error( f"output file {output_filename} exists and force overwrite is not enabled" )
                 sys.exit(1)
 
+            if not _yaml_support():
+                lopper.log._error( f"no json support detected, but output is json" )
+                sys.exit(1)
+
             json = LopperYAML( None, self.tree, config=self.config )
             json.to_json( output_filename )
         else:
@@ -1610,7 +1684,10 @@ class LopperSDT:
                         out_tree = LopperTreePrinter( True, output_filename, self.verbose )
                         out_tree.load( tree_to_write.export() )
                         out_tree.strict = not self.permissive
-                        if not cb_func( 0, out_tree, { 'outfile': output_filename, 'verbose' : self.verbose } ):
+                        with lopper.timings.span( lopper.timings.callable_name( cb_func ), "assist",
+                                                  outfile=output_filename ):
+                            cb_ret = cb_func( 0, out_tree, { 'outfile': output_filename, 'verbose' : self.verbose } )
+                        if not cb_ret:
                             lopper.log._warning( f"output assist returned false, check for errors ..." )
                     except Exception as e:
                         lopper.log._warning( f"output assist {cb_func} failed: {e}" )
@@ -1656,13 +1733,7 @@ class LopperSDT:
         )
 
         # Gather all assist files (.lop or .dts)
-        assists = []
-        for apath in search_paths:
-            if not os.path.isdir(apath):
-                continue
-            for fname in os.listdir(apath):
-                if fname.endswith('.dts') or fname.endswith('.lop'):
-                    assists.append(os.path.join(apath, fname))
+        assists = lopper.assist_registry.registry().files( search_paths, ('.dts', '.lop') )
 
         found = set()
         for file_path in input_files:
@@ -1743,35 +1814,20 @@ class LopperSDT:
             input_file_abs = ""
             search_paths =  self.load_paths + [ lopper_directory ] + [ lopper_directory + "/assists/" ] + \
                             [ lopper_directory + "/lops/" ] + local_search_paths
-            for s in search_paths:
-                # the first found file is the one we return
-                if input_file_abs:
-                    continue
 
-                lopper.log._debug( f"input_find: checking directory: {s} for: {input_file}")
-                input_file_test = Path( s + "/" + input_file.as_posix() )
+            # the first found file is the one we return. The directory listings
+            # are cached by the assist registry, so repeated lookups don't go
+            # back to the file system for every search path.
+            lopper.log._debug( f"input_find: checking directories: {search_paths} for: {input_file}")
+            found = lopper.assist_registry.registry().find( input_file.as_posix(), search_paths,
+                                                            auto_extensions )
+            if found:
                 try:
-                    input_file_abs = resolve_path_with_drive_preservation(input_file_test)
-
-                    if not input_file_abs:
-                        raise FileNotFoundError( f"Unable to find file: {input_file}" )
-                    else:
-                        lopper.log._debug( f"input_find: found {input_file_abs}" )
+                    input_file_abs = resolve_path_with_drive_preservation( Path( found ) )
+                    lopper.log._debug( f"input_find: found {input_file_abs}" )
                 except (FileNotFoundError,NotADirectoryError):
                     input_file_abs = ""
 
-                if not input_file_abs:
-                    # try our extensions
-                    for extension in auto_extensions:
-                        # try it with a the extension
-                        input_file_with_ext = Path( s + "/" + input_file.as_posix() + extension )
-                        try:
-                            input_file_abs = resolve_path_with_drive_preservation(input_file_with_ext)
-                            if not input_file_abs:
-                                raise FileNotFoundError( f"Unable to find input file: {input_file_with_ext}" )
-                        except (FileNotFoundError,NotADirectoryError):
-                            input_file_abs = ""
-
             if not input_file_abs:
                 lopper.log._error( f"input file {input_file_name} not found" )
                 if self.werror:
@@ -1992,17 +2048,21 @@ class LopperSDT:
 
         """
 
-        # TODO: stop using this and go to the searching in the lops processing loop.
+        # the handler, options and code of a lop are worked out once (see
+        # lopper.lop_program), not every time the lop is executed
+        if lops_tree is not None:
+            lop_op = LopProgram.for_tree( lops_tree ).op( lop_node )
+        else:
+            lop_op = LopOp( lop_node )
+
         lop_type = lop_node['compatible'].value[0]
         # TODO: lop_args is really a "subtype"
-        try:
-            lop_args = lop_node['compatible'].value[1]
-        except:
-            lop_args = ""
+        lop_args = lop_op.lop_args
+        lop_kind = lop_op.kind
 
         lopper.log._debug( f"executing lop: {lop_type}" )
 
-        if re.search( r".*,exec.*$", lop_type ):
+        if lop_kind == "exec":
             lopper.log._debug( f"code exec jump" )
             try:
                 try:
@@ -2016,16 +2076,9 @@ class LopperSDT:
                 if not options:
                     options = {}
 
-                try:
-                    options_spec = lop_node['options'].value
-                except:
-                    options_spec = ""
-
-                if options_spec:
-                    for o in options_spec:
-                        opt_key,opt_val = o.split(":")
-                        if opt_key:
-                            options[opt_key] = opt_val
+                for opt_key,opt_val in lop_op.options:
+                    if opt_key:
+                        options[opt_key] = opt_val
 
                 exec_tgt = lop_node['exec'].value[0]
                 target_node = lops_tree.pnode( exec_tgt )
@@ -2050,7 +2103,7 @@ class LopperSDT:
                 lopper.log._warning( f"exec lop exception: {e}" )
                 return False
 
-        if re.search( r".*,print.*$", lop_type ):
+        if lop_kind == "print":
             print_props = lop_node.props('print.*')
             for print_prop in print_props:
                 for line in print_prop.value:
@@ -2067,8 +2120,7 @@ class LopperSDT:
 
             return True
 
-        if re.search( r".*,select.*$", lop_type ):
-            select_props = lop_node.props( 'select.*' )
+        if lop_kind == "select":
 
             try:
                 tree_name = lop_node['tree'].value[0]
@@ -2091,21 +2143,15 @@ class LopperSDT:
             #
             selected_nodes = []
             selected_nodes_possible = []
-            for sel in select_props:
+            for sel, sel_specs in lop_op.selects:
                 if sel.value == ['']:
                     lopper.log._debug( f"clearing selected nodes" )
                     tree.__selected__ = []
                 else:
                     # if different node regex + properties are listed in the same
                     # select = "foo","bar","blah", they are always AND conditions.
-                    for s in sel.value:
-                        lopper.log._debug( f"running node selection: {s} ({selected_nodes_possible})" )
-                        try:
-                            node_regex, prop, prop_val = s.split(":")
-                        except:
-                            node_regex = s
-                            prop = ""
-                            prop_val = ""
+                    for node_regex, prop, prop_val in sel_specs:
+                        lopper.log._debug( f"running node selection: {node_regex}:{prop}:{prop_val} ({selected_nodes_possible})" )
 
                         if node_regex:
                             if node_regex.startswith( "/" ):
@@ -2245,7 +2291,7 @@ class LopperSDT:
 
             return False
 
-        if re.search( r".*,meta.*$", lop_type ):
+        if lop_kind == "meta":
             if re.search( r"phandle-desc", lop_args ):
                 lopper.log._debug( f"processing phandle meta data {type(Lopper)}")
 
@@ -2279,7 +2325,7 @@ class LopperSDT:
 
             return True
 
-        if re.search( r".*,output$", lop_type ):
+        if lop_kind == "output":
             try:
                 output_file_name = lop_node['outfile'].value[0]
             except:
@@ -2409,7 +2455,7 @@ class LopperSDT:
                 lopper.log._info( f"dryrun detected, not writing output file {output_file_name}" )
 
             return True
-        if re.search( r".*,tree$", lop_type ):
+        if lop_kind == "tree":
             # TODO: consolidate this with the output lop
             try:
                 tree_name = lop_node['tree'].value[0]
@@ -2515,7 +2561,7 @@ class LopperSDT:
 
             return True
 
-        if re.search( r".*,assist-v1$", lop_type ):
+        if lop_kind == "assist":
             # also note: this assist may change from being called as
             # part of the lop loop, to something that is instead
             # called by walking the entire device tree, looking for
@@ -2568,7 +2614,10 @@ class LopperSDT:
             if cb_funcs:
                 for cb_func in cb_funcs:
                     try:
-                        if not cb_func( cb_node, self, { 'verbose' : self.verbose, 'outdir' : cb_outdir, 'args': cb_opts } ):
+                        with lopper.timings.span( lopper.timings.callable_name( cb_func ), "assist",
+                                                  node=cb_tgt_node_name, id=cb_id ):
+                            cb_ret = cb_func( cb_node, self, { 'verbose' : self.verbose, 'outdir' : cb_outdir, 'args': cb_opts } )
+                        if not cb_ret:
                             lopper.log._warning( f"the assist returned false, check for errors ..." )
                     except Exception as e:
                         lopper.log._warning( f"assist %{cb_func} failed: {e}" )
@@ -2586,7 +2635,7 @@ class LopperSDT:
 
             return True
 
-        if re.search( r".*,lop,load$", lop_type ):
+        if lop_kind == "load":
             prop_id = ""
             prop_extension = ""
 
@@ -2597,9 +2646,7 @@ class LopperSDT:
 
             if load_prop:
                 # for submodule loading
-                for p in self.load_paths:
-                    if p not in sys.path:
-                        sys.path.append( p )
+                lopper.assist_registry.sys_path_add( *self.load_paths )
 
                 lopper.log._info( f"loading module {load_prop}" )
 
@@ -2613,11 +2660,12 @@ class LopperSDT:
                 # append the directory of the located module onto the search
                 # path. This is needed if that module imports something from
                 # its own directory
-                sys.path.append( lopper_directory )
-                sys.path.append( lopper_directory + "/assists" )
-                sys.path.append( str(mod_file_abs.parent) )
+                lopper.assist_registry.sys_path_add( lopper_directory, lopper_directory + "/assists",
+                                                     mod_file_abs.parent )
                 try:
-                    imported_module = SourceFileLoader( mod_file.name, str(mod_file_abs) ).load_module()
+                    # modules are imported once per process, a module that is
+                    # loaded by several lop files (or trees) is reused
+                    imported_module = lopper.assist_registry.registry().load( mod_file_abs, mod_file.name )
                 except Exception as e:
                     lopper.log._error( f"could not load assist: {mod_file_abs}: {e}" )
                     sys.exit(1)
@@ -2662,7 +2710,7 @@ class LopperSDT:
                 if self.assists:
                     for a in self.assists:
                         try:
-                            if Path(a.file).resolve() == mod_file.resolve():
+                            if a.module is imported_module or Path(a.file).resolve() == mod_file_abs:
                                 already_loaded = True
                                 a.module = imported_module
                                 a.properties = assist_properties
@@ -2674,7 +2722,7 @@ class LopperSDT:
 
             return True
 
-        if re.search( r".*,lop,add$", lop_type ):
+        if lop_kind == "add":
             lopper.log._info( f"node add lop" )
 
             try:
@@ -2720,7 +2768,7 @@ class LopperSDT:
 
             return True
 
-        if re.search( r".*,lop,conditional.*$", lop_type ):
+        if lop_kind == "conditional":
             lopper.log._info( f"conditional lop found" )
 
             try:
@@ -2872,18 +2920,13 @@ class LopperSDT:
 
             return ret
 
-        if re.search( r".*,lop,code.*$", lop_type ) or re.search( r".*,lop,xlate.*$", lop_type ):
+        if lop_kind == "code" or lop_kind == "xlate":
             # execute a block of python code against a specified start_node
             code = lop_node['code'].value[0]
 
             if not options:
                 options = {}
 
-            try:
-                options_spec = lop_node['options'].value
-            except:
-                options_spec = ""
-
             try:
                 tree_name = lop_node['tree'].value[0]
                 try:
@@ -2893,11 +2936,9 @@ class LopperSDT:
             except:
                 tree = self.tree
 
-            if options_spec:
-                for o in options_spec:
-                    opt_key,opt_val = o.split(":")
-                    if opt_key:
-                        options[opt_key] = opt_val
+            for opt_key,opt_val in lop_op.options:
+                if opt_key:
+                    options[opt_key] = opt_val
 
             # arrange for the system device tree's output directory to
             # be visible in the executed code environment
@@ -2927,7 +2968,7 @@ class LopperSDT:
 
             lopper.log._debug( f"code lop found, node context: {start_node}" )
 
-            if re.search( r".*,lop,xlate.*$", lop_type ):
+            if lop_kind == "xlate":
                 inherit_list.append( "lopper_lib" )
 
                 if tree.__selected__:
@@ -2935,10 +2976,9 @@ class LopperSDT:
                 else:
                     node_list = [ "/" ]
 
-                for n in node_list:
-                    ret = tree.exec_cmd( n, code, options, inherit_list, self.load_paths )
-                    # who knows what the command did, better sync!
-                    tree.sync()
+                # the code and imports are prepared once for the whole
+                # list, and the tree is sync'd once when it is complete
+                ret = tree.exec_cmd_batch( node_list, code, options, inherit_list, self.load_paths )
             else:
                 ret = tree.exec_cmd( start_node, code, options, inherit_list, self.load_paths )
                 # who knows what the command did, better sync!
@@ -2946,7 +2986,7 @@ class LopperSDT:
 
             return ret
 
-        if re.search( r".*,lop,modify$", lop_type ):
+        if lop_kind == "modify":
             node_name = lop_node.name
             lopper.log._info( f"node {node_name} is a compatible modify lop" )
             try:
@@ -3322,7 +3362,13 @@ class LopperSDT:
                     if self.target_domain:
                         lop_options = {'target_domain': self.target_domain}
 
-                    result = self.exec_lop( f, fdt_tree, lop_options )
+                    # the lop's type is only looked up for a recorded span
+                    lop_type = None
+                    if lopper.timings.recorder() is not None:
+                        lop_type = LopProgram.for_tree( fdt_tree ).op( f ).kind
+
+                    with lopper.timings.span( f.abs_path, "lop", type=lop_type, file=x.dts ):
+                        result = self.exec_lop( f, fdt_tree, lop_options )
                     lop_results[f.name] = result
 
                     lopper.log._info( f"------> logged result {result} for lop {f.name}" )
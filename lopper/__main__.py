@@ -14,13 +14,21 @@ import atexit
 from pathlib import Path
 import configparser
 import re
+import time
+
+# for --profile-startup: everything before this point is interpreter
+# startup, the lopper import is timed separately
+startup_begin = time.perf_counter()
 
 from lopper import LopperSDT
 
 from lopper.log import _warning, _info, _error, _debug
+import lopper.timings
 import logging
 from lopper import lopper_directory
 
+startup_imported = time.perf_counter()
+
 global device_tree
 device_tree = None
 
@@ -57,6 +65,67 @@ def parse_schema_argument(schema_arg):
         # Assume it's a path to an existing schema
         return ("load", schema_arg)
 
+# optional subsystems that are loaded on demand, reported by --profile-startup
+# so that an accidental eager import shows up
+startup_optional_modules = [ "lopper.yaml", "ruamel.yaml", "anytree", "yaml",
+                             "lopper.rest", "flask", "pandas", "lopper.assists" ]
+
+def startup_report( marks, out=sys.stderr ):
+    """Print the --profile-startup report
+
+    Args:
+        marks (list): (phase name, perf_counter() at the end of the phase)
+                      tuples, in order. The first entry is the start time.
+        out (file,optional): where to write the report
+
+    Returns:
+        Nothing
+    """
+    print( "startup profile:", file=out )
+    last = marks[0][1]
+    for phase, t in marks[1:]:
+        print( f"  {phase:<24} {(t - last) * 1000:9.2f} ms", file=out )
+        last = t
+    print( f"  {'total':<24} {(last - marks[0][1]) * 1000:9.2f} ms", file=out )
+
+    lopper_modules = [ m for m in sys.modules if m == "lopper" or m.startswith( "lopper." ) ]
+    print( f"  modules loaded: {len(sys.modules)} ({len(lopper_modules)} lopper)", file=out )
+    for m in startup_optional_modules:
+        print( f"  {m:<24} {'loaded' if m in sys.modules else 'not loaded'}", file=out )
+
+    import lopper.audit.schema
+    constraints = "loaded" if lopper.audit.schema._node_property_constraints is not None else "not loaded"
+    print( f"  {'schema constraints':<24} {constraints}", file=out )
+    print( "  (use python -X importtime -m lopper ... for a per-module breakdown)", file=out )
+
+def timings_finish( print_summary, profile_file ):
+    """Report the --timings / --profile=<file> results
+
+    Registered with atexit, so the timings are reported for runs that exit
+    early as well.
+
+    Args:
+        print_summary (bool): print the summary table to stderr
+        profile_file (string): path for the JSON report (the Chrome trace
+                               is written alongside it), or None
+
+    Returns:
+        Nothing
+    """
+    recorder = lopper.timings.disable()
+    if not recorder:
+        return
+
+    if print_summary:
+        recorder.print_summary()
+
+    if profile_file:
+        try:
+            trace_file = recorder.write( profile_file )
+            _info(f"timing report written to {profile_file} (chrome trace: {trace_file})")
+        except Exception as e:
+            _warning(f"could not write timing report {profile_file}: {e}")
+
 def usage():
     prog = "lopper"
     print(f'Usage: {prog} [OPTION] <system device tree> [<output file>]...')
@@ -93,6 +162,7 @@ def usage():
     print('    , --memmap        output file for memory map visualization (use - for stdout)' )
     print('    , --drc           load DRC rules from a .yaml file or directory (repeatable).' )
     print('                      Rules still only run when enabled with -W drc (or drc:<id>)' )
+    print('    , --audit-jobs=<n> run the checks of each audit phase in <n> worker processes' )
     print('    , --cpumap        output file for CPU access map visualization (use - for stdout)' )
     print('    , --cpumap-expand expand bus nodes to show child devices in cpumap' )
     print('    , --symbols       generate (and maintain) the __symbols__ node during processing' )
@@ -113,6 +183,9 @@ def usage():
     print('  -O, --outdir        directory to use for output files')
     print('    , --server        after processing, start a server for ReST API calls')
     print('    , --version       output the version and exit')
+    print('    , --timings       report wall/cpu time and allocations for each phase, lop and assist (to stderr)')
+    print('    , --profile=<file> write the timings as a JSON report to <file>, and a Chrome trace to <file stem>.trace.json')
+    print('    , --profile-startup report the time spent in imports, option parsing and setup (to stderr)')
     print('')
 
 def main():
@@ -146,9 +219,13 @@ def main():
     schema = None
     memmap_file = None
     drc_paths = []
+    audit_jobs = 1
     cpumap_file = None
     cpumap_expand = False
     overlay_emit = set()
+    profile_startup = False
+    timings = False
+    profile_file = None
 
     try:
         opts, args = getopt.getopt(sys.argv[1:], "I:W:A:t:dfvdhi:o:a:SO:D:x:",
@@ -157,9 +234,10 @@ def main():
                                      "force","verbose","help","input=","output=","dryrun",
                                      "assist=","server", "auto", "permissive", 'symbols', "xlate=",
                                      "no-libfdt", "overlay", "cfgfile=", "cfgval=", "input-dirs",
-                                     "memmap=", "cpumap=", "cpumap-expand", "drc=",
+                                     "memmap=", "cpumap=", "cpumap-expand", "drc=", "audit-jobs=",
                                      "emit-overlay-sidecar", "emit-overlay-dtso",
-                                     "emit-embedded-overlays"] )
+                                     "emit-embedded-overlays", "profile-startup", "timings",
+                                     "profile="] )
     except getopt.GetoptError as err:
         _error(f"{err}")
         usage()
@@ -230,6 +308,11 @@ def main():
             memmap_file = a
         elif o in ('--drc'):
             drc_paths.append(a)
+        elif o in ('--audit-jobs',):
+            try:
+                audit_jobs = int(a)
+            except ValueError:
+                _error( f"invalid --audit-jobs value: {a}", also_exit=1 )
         elif o in ('--cpumap'):
             cpumap_file = a
         elif o in ('--cpumap-expand'):
@@ -240,6 +323,12 @@ def main():
             overlay_emit.add('dtso')
         elif o in ('--emit-embedded-overlays'):
             overlay_emit.add('embedded')
+        elif o in ('--profile-startup',):
+            profile_startup = True
+        elif o in ('--timings',):
+            timings = True
+        elif o in ('--profile',):
+            profile_file = a
         elif o in ('--version'):
             print( f"{LOPPER_VERSION}" )
             sys.exit(0)
@@ -343,6 +432,10 @@ def main():
             usage()
             sys.exit(1)
 
+    if timings or profile_file:
+        lopper.timings.enable()
+        atexit.register( timings_finish, timings, profile_file )
+
     if not libfdt:
         import lopper.dt
         lopper.lopper_type(lopper.dt.LopperDT)
@@ -448,6 +541,8 @@ def main():
         lopper.Lopper.dtb_dts_export( sdt, verbose )
         sys.exit(0)
 
+    startup_options = time.perf_counter()
+
     device_tree = LopperSDT( sdt )
 
     atexit.register(at_exit_cleanup)
@@ -502,9 +597,19 @@ def main():
                                                                xlate_fallback=xlate_fallback )
         inputfiles.extend( auto_assists )
 
+    startup_setup_begin = time.perf_counter()
     device_tree.setup( sdt, inputfiles, "", force, libfdt, config )
+    startup_setup = time.perf_counter()
     device_tree.assists_setup( cmdline_assists )
 
+    if profile_startup:
+        startup_report( [ ( "begin", startup_begin ),
+                          ( "import lopper", startup_imported ),
+                          ( "option processing", startup_options ),
+                          ( "sdt init", startup_setup_begin ),
+                          ( "setup (inputs, tools)", startup_setup ),
+                          ( "assists setup", time.perf_counter() ) ] )
+
     if auto_run:
         for a in cmdline_assists:
             try:
@@ -580,7 +685,8 @@ def main():
 
     # Run audit validation phases if any warnings are enabled
     if warnings:
-        from lopper.audit.base import run_audit_phase, ValidationPhase
+        from lopper.audit.base import ValidationPhase
+        from lopper.audit.scheduler import AuditScheduler
         # Run EARLY and POST_YAML phases (POST_PROCESSING runs after domain processing)
         # named trees a DRC rule can target with `tree:`; sync first so
         # extracted trees and overlays are reachable by name
@@ -590,10 +696,11 @@ def main():
             _debug(f"subtrees_sync: {_e}")
         _audit_kw = {"subtrees": getattr(device_tree, "subtrees", {})}
 
-        error_count = run_audit_phase(ValidationPhase.EARLY, device_tree.tree, warnings, werror, **_audit_kw)
-        error_count += run_audit_phase(ValidationPhase.POST_YAML, device_tree.tree, warnings, werror, **_audit_kw)
+        audit = AuditScheduler(warnings, werror, jobs=audit_jobs)
+        error_count = audit.run_phase(ValidationPhase.EARLY, device_tree.tree, **_audit_kw)
+        error_count += audit.run_phase(ValidationPhase.POST_YAML, device_tree.tree, **_audit_kw)
         # Run POST_PROCESSING phase (final consistency checks)
-        error_count += run_audit_phase(ValidationPhase.POST_PROCESSING, device_tree.tree, warnings, werror, **_audit_kw)
+        error_count += audit.run_phase(ValidationPhase.POST_PROCESSING, device_tree.tree, **_audit_kw)
         if error_count > 0 and werror:
             _error(f"audit validation failed with {error_count} error(s)", also_exit=1)
 
@@ -0,0 +1,199 @@
+#/*
+# * Copyright (C) 2026 Advanced Micro Devices, Inc. All Rights Reserved.
+# *
+# * SPDX-License-Identifier: BSD-3-Clause
+# */
+
+"""
+Lopper assist registry
+
+A process wide index of the directories that assists, lops and input files
+are searched for in, and of the assist modules that have been loaded.
+
+ - directory listings are read once, and re-read only when the directory's
+   modification time changes (a file was added, removed or renamed)
+ - an assist module is imported once per process, and only re-imported
+   when its source changes (size or modification time)
+ - sys.path additions go through sys_path_add(), which never adds the same
+   directory twice
+
+This makes repeated lookups (input_find(), find_any_matching_assists()) and
+repeated assist loads (lop,load, once per lop file or tree) cheap when many
+trees are processed by the same process.
+"""
+
+import os
+import sys
+from importlib.machinery import SourceFileLoader
+
+import lopper.log
+
+lopper.log._init(__name__)
+
+
+class AssistRegistry:
+    """Index of search directories and loaded assist modules
+
+    Attributes:
+       - _dirs: directory -> ( mtime_ns, { entry name: path } )
+       - _modules: resolved module path -> ( ( mtime_ns, size ), module )
+
+    """
+    def __init__( self ):
+        self._dirs = {}
+        self._modules = {}
+
+    def listing( self, directory ):
+        """Return the entries of a directory
+
+        Args:
+           directory (string): directory to list
+
+        Returns:
+           dict: entry name -> path (directory + name). Empty if the
+                 directory doesn't exist or can't be read.
+        """
+        try:
+            mtime = os.stat( directory ).st_mtime_ns
+        except OSError:
+            self._dirs.pop( directory, None )
+            return {}
+
+        try:
+            cached_mtime, entries = self._dirs[directory]
+            if cached_mtime == mtime:
+                return entries
+        except KeyError:
+            pass
+
+        try:
+            names = os.listdir( directory )
+        except OSError:
+            names = []
+
+        entries = { n: os.path.join( directory, n ) for n in names }
+        self._dirs[directory] = ( mtime, entries )
+
+        return entries
+
+    def find( self, name, search_paths, extensions = [] ):
+        """Locate a file in a list of search directories
+
+        The directories are checked in order. In each directory the name is
+        tried as passed, and then with each of the extensions appended. The
+        first match is returned.
+
+        Names with a directory component can't be answered from the
+        listings, they are checked against the file system directly.
+
+        Args:
+           name (string): file name to locate
+           search_paths (list): directories to search
+           extensions (list,optional): extensions to try appending to the name
+
+        Returns:
+           string: path (search directory + name) of the first match, or None
+        """
+        candidates = [ name ] + [ name + e for e in extensions ]
+        simple = os.sep not in name and ( not os.altsep or os.altsep not in name )
+
+        for s in search_paths:
+            if simple:
+                entries = self.listing( s )
+                for c in candidates:
+                    if c in entries:
+                        return entries[c]
+            else:
+                for c in candidates:
+                    p = os.path.join( s, c )
+                    if os.path.exists( p ):
+                        return p
+
+        return None
+
+    def files( self, search_paths, extensions ):
+        """Return the files in search directories that have one of the extensions
+
+        Args:
+           search_paths (list): directories to search
+           extensions (tuple): file extensions to return
+
+        Returns:
+           list: paths, in search path and then directory listing order
+        """
+        found = []
+        for s in search_paths:
+            for n, p in self.listing( s ).items():
+                if n.endswith( extensions ):
+                    found.append( p )
+
+        return found
+
+    def load( self, module_file, module_name = None ):
+        """Import an assist module, once per process
+
+        The module is imported (with SourceFileLoader, as lopper always has)
+        the first time it is requested. Later requests for the same file
+        return the already imported module, unless the file has changed
+        since it was imported.
+
+        Args:
+           module_file (string or Path): the module's python source
+           module_name (string,optional): name to register the module as,
+                                          default is the file name
+
+        Returns:
+           module: the imported module. Exceptions from the import are
+                   passed to the caller.
+        """
+        path = os.path.realpath( module_file )
+        st = os.stat( path )
+        stamp = ( st.st_mtime_ns, st.st_size )
+
+        try:
+            cached_stamp, module = self._modules[path]
+            if cached_stamp == stamp:
+                return module
+            lopper.log._debug( f"assist registry: {path} changed, reloading" )
+        except KeyError:
+            pass
+
+        if not module_name:
+            module_name = os.path.basename( path )
+
+        module = SourceFileLoader( module_name, path ).load_module()
+        self._modules[path] = ( stamp, module )
+
+        return module
+
+    def loaded( self, module_file ):
+        """Return True if the module file has been loaded by the registry"""
+        return os.path.realpath( module_file ) in self._modules
+
+    def clear( self ):
+        """Drop the directory index and the loaded module cache"""
+        self._dirs = {}
+        self._modules = {}
+
+
+_registry = AssistRegistry()
+
+
+def registry():
+    """Return the process wide AssistRegistry"""
+    return _registry
+
+
+def sys_path_add( *paths ):
+    """Append directories to sys.path, skipping any that are already there
+
+    Args:
+       paths (strings): directories to add
+
+    Returns:
+       Nothing
+    """
+    for p in paths:
+        p = str( p )
+        if p not in sys.path:
+            sys.path.append( p )
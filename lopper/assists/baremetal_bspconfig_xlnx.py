@@ -33,8 +33,6 @@ def is_compat( node, compat_string_to_test ):
 # options: baremetal application source path
 def xlnx_generate_bm_bspconfig(tgt_node, sdt, options):
     _level(log_setup(options), __name__)
-    root_node = sdt.tree[tgt_node]
-    root_sub_nodes = root_node.subnodes()
     if options.get('outdir', {}):
         sdt.outdir = options['outdir']
     options["args"].append("xparam")
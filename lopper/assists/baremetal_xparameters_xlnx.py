@@ -50,29 +50,14 @@ def add_multi_buf(plat,match_cpunode,data_dict,else_ignore_data=[]):
 
 def xlnx_generate_xparams(tgt_node, sdt, options):
     _level(utils.log_setup(options), __name__)
-    root_node = sdt.tree[tgt_node]
-    root_sub_nodes = root_node.subnodes()
+    view = bm_config.processor_view(sdt, options, new=True)
     if options.get('outdir', {}):
         sdt.outdir = options['outdir']
 
-    node_dict = {}
-    node_list = []
-    # Traverse the tree and find the nodes having status=ok property
-    symbol_node = ""
-    chosen_node = ""
-    for node in root_sub_nodes:
-        try:
-            if node.name == "chosen":
-                chosen_node = node
-            if node.name == "__symbols__":
-                symbol_node = node
-            status = node["status"].value
-            if "okay" in status:
-                node_list.append(node)
-                compat = node.propval('compatible')
-                node_dict.update({node.abs_path:compat})
-        except:
-           pass
+    # The nodes having status=ok property
+    node_list = view.okay_nodes(tgt_node)
+    symbol_node = view.symbol_node(tgt_node)
+    chosen_node = view.chosen_node(tgt_node)
 
     repo_path_data = options['args'][1]
     is_fpd_coherent = None
@@ -100,7 +85,8 @@ def xlnx_generate_xparams(tgt_node, sdt, options):
     plat = bm_config.DtbtoCStruct(xparams)
     plat.buf('#ifndef XPARAMETERS_H   /* prevent circular inclusions */\n')
     plat.buf('#define XPARAMETERS_H   /* by using protection macros */\n')
-    total_nodes = node_list
+    # nodes matched by a driver, the rest get generic defines
+    claimed = set()
     for drv in drvlist:
         if utils.is_file(repo_path_data):
             repo_schema = utils.load_yaml(repo_path_data)
@@ -131,17 +117,12 @@ def xlnx_generate_xparams(tgt_node, sdt, options):
                     driver_proplist.extend(schema.get('additionalProperties',{}))
                 else:
                     driver_proplist = schema.get('additionalProperties',{})
-            match_nodes = []
-            for node,compatible_list in node_dict.items():
-                for comp in driver_compatlist:
-                   match = [x for x in compatible_list if comp == x]
-                   if match:
-                       node1 = [x for x in node_list if (x.abs_path == node)]
-                       node_list = [x for x in node_list if not(x.abs_path == node)]
-                       if node1:
-                           match_nodes.append(node1[0])
+            # each node is matched by the first driver that supports it
+            match_nodes = [node for node in view.driver_nodes(tgt_node, driver_compatlist, exact=True)
+                           if node not in claimed]
+            claimed.update(match_nodes)
             if sdt.tree[tgt_node].propval('pruned-sdt') == ['']:
-                match_nodes = bm_config.get_mapped_nodes(sdt, match_nodes, options)
+                match_nodes = view.mapped_nodes(match_nodes)
             canonical_name = f"X{drv.upper()}"
             if schema.get('xparam_prefix',""):
                 canonical_name = schema["xparam_prefix"].upper()
@@ -392,10 +373,12 @@ def xlnx_generate_xparams(tgt_node, sdt, options):
                 plat.buf('\n')
                                     
     # Generate Defines for Generic Nodes
+    node_list = [node for node in node_list if node not in claimed]
     if sdt.tree[tgt_node].propval('pruned-sdt') == ['']:
-        node_list = bm_config.get_mapped_nodes(sdt, node_list, options)
+        node_list = view.mapped_nodes(node_list)
 
     node_ip_count_dict = {}
+    label_names_in_list = None
     for node in node_list:
         try:
             label_name = bm_config.get_label(sdt, symbol_node, node)
@@ -415,11 +398,12 @@ def xlnx_generate_xparams(tgt_node, sdt, options):
             canonical_name = node_ip_name.upper().replace("-", "_")
 
             # Check if canonical_name matches any label_name in node_list
-            label_names_in_list = [
-                bm_config.get_label(sdt, symbol_node, n).upper()
-                for n in node_list
-                if bm_config.get_label(sdt, symbol_node, n) is not None
-            ]
+            if label_names_in_list is None:
+                label_names_in_list = [
+                    bm_config.get_label(sdt, symbol_node, n).upper()
+                    for n in node_list
+                    if bm_config.get_label(sdt, symbol_node, n) is not None
+                ]
 
             canonical_def_name = f'{canonical_name}_{node_ip_count_dict[node_ip_name]}'
             if canonical_def_name not in label_names_in_list:
@@ -460,7 +444,7 @@ def xlnx_generate_xparams(tgt_node, sdt, options):
         plat.buf(f"\n#define XPAR_{key.upper()}_HIGH{suffix} {hex(start + size - 1)}")
 
     #CPU parameters related defines
-    match_cpunode = bm_config.get_cpu_node(sdt, options)
+    match_cpunode = view.cpu_node
     if utils.is_file(repo_path_data):
         repo_schema = utils.load_yaml(repo_path_data)
         lib_data = repo_schema['os']
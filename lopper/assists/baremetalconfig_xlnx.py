@@ -20,8 +20,12 @@ sys.path.append(os.path.dirname(__file__))
 _init(__name__)
 
 def get_label(sdt, symbol_node, node):
-    prop_dict = symbol_node.__props__
-    match = [label for label,node_abs in prop_dict.items() if re.match(node_abs[0], node.abs_path) and len(node_abs[0]) == len(node.abs_path)]
+    if symbol_node.abs_path == "/__symbols__" and symbol_node.tree is not None and symbol_node.tree is node.tree:
+        # the tree's reverse index of __symbols__, rather than a scan
+        match = node.symbols
+    else:
+        prop_dict = symbol_node.__props__
+        match = [label for label,node_abs in prop_dict.items() if re.match(node_abs[0], node.abs_path) and len(node_abs[0]) == len(node.abs_path)]
     if match:
         return match[0]
     elif node.propval('xlnx,name') != ['']:
@@ -30,20 +34,188 @@ def get_label(sdt, symbol_node, node):
         return None
 
 def get_cpu_node(sdt, options):
+    return processor_view(sdt, options).cpu_node
+
+def processor_view(sdt, options, new=False):
+    """Get the view of the tree from the processor the assist runs for
+
+    The view is kept on the tree, for the sdt it was built for, and is
+    shared by the baremetal assists' helpers until the tree changes (see
+    LopperTree.generation()). Changes made in place to a property's value
+    aren't seen by generation(), so each assist's entry point passes new,
+    to start from a view of the tree as it is when the assist runs.
+
+    Args:
+        sdt(obj) : system device tree
+        options(dict) : assist options, args[0] is the processor name
+        new(bool) : build a new view, rather than reusing the kept one
+    Returns:
+        ProcessorView
+    """
     cpu_name = options['args'][0]
-    symbol_node = sdt.tree['/__symbols__']
-    nodes = sdt.tree.nodes('/cpu.*')
-    cpu_labels = []
-    matched_label = None
-    for node in nodes:
-        matched_label = get_label(sdt, symbol_node, node)
-        if matched_label is not None:
-            if matched_label == cpu_name:
-                return node
-            elif node.propval('reg') != ['']:
-                cpu_labels.append(matched_label)
-    _error(f"In valid CPU Name valid Processors for a given SDT are {cpu_labels}\n")
-    sys.exit(1)
+    tree = sdt.tree
+    gen = tree.generation("*")
+    views = tree.__dict__.setdefault("__processor_views__", {})
+    if not new:
+        try:
+            view_sdt, view_gen, view = views[cpu_name]
+            if view_sdt is sdt and view_gen == gen:
+                return view
+        except KeyError:
+            pass
+
+    view = ProcessorView(sdt, cpu_name)
+    views[cpu_name] = (sdt, gen, view)
+    return view
+
+class ProcessorView:
+    """The tree, as the baremetal assists see it from one processor
+
+    Holds what the baremetal assists would otherwise each find for
+    themselves (once per driver): the processor's CPU node, the nodes its
+    cluster's address-map makes accessible, the okay, memory, chosen and
+    __symbols__ nodes under a target node, the okay nodes by compatible,
+    the nodes matched by each driver's compatible list and the memory
+    ranges (see baremetallinker_xlnx.get_memranges()). Each is found on
+    first use.
+    """
+
+    def __init__(self, sdt, cpu_name):
+        self.sdt = sdt
+        self.cpu_name = cpu_name
+        # ( target node path, zynqmp_fsbl, xparam ) -> ( mem_ranges, label names )
+        self.mem_ranges = {}
+        self._cpu_node = None
+        self._mapped = None
+        self._targets = {}
+        self._driver_nodes = {}
+
+    @property
+    def cpu_node(self):
+        if self._cpu_node is None:
+            self._cpu_node = self._find_cpu_node()
+        return self._cpu_node
+
+    def _find_cpu_node(self):
+        symbol_node = self.sdt.tree['/__symbols__']
+        nodes = self.sdt.tree.nodes('/cpu.*')
+        cpu_labels = []
+        matched_label = None
+        for node in nodes:
+            matched_label = get_label(self.sdt, symbol_node, node)
+            if matched_label is not None:
+                if matched_label == self.cpu_name:
+                    return node
+                elif node.propval('reg') != ['']:
+                    cpu_labels.append(matched_label)
+        _error(f"In valid CPU Name valid Processors for a given SDT are {cpu_labels}\n")
+        sys.exit(1)
+
+    def mapped_nodes(self, node_list):
+        """Filter nodes by the processor cluster's address-map
+
+        Args:
+            node_list(list) : nodes
+        Returns:
+            list: the nodes referenced by the address-map, once for each
+                  entry that references them
+        """
+        if self._mapped is None:
+            cluster = self.cpu_node.parent
+            address_map = cluster["address-map"].value
+            na = cluster["#ranges-address-cells"].value[0]
+            ns = cluster["#ranges-size-cells"].value[0]
+            cells = na + ns
+            mapped = {}
+            tmp = na
+            while tmp < len(address_map):
+                mapped[address_map[tmp]] = mapped.get(address_map[tmp], 0) + 1
+                tmp = tmp + cells + na + 1
+            self._mapped = mapped
+
+        mapped = self._mapped
+        return [node for node in node_list for _ in range(mapped.get(node.phandle, 0))]
+
+    def _target(self, tgt_node):
+        root_node = self.sdt.tree[tgt_node]
+        try:
+            return self._targets[root_node.abs_path]
+        except KeyError:
+            pass
+
+        # one walk for what the assists look for under the target node
+        target = {"okay": [], "memory": [], "chosen": "", "symbols": "", "compatibles": {}}
+        for node in root_node.subnodes():
+            if node.name == "chosen":
+                target["chosen"] = node
+            elif node.name == "__symbols__":
+                target["symbols"] = node
+            props = node.__props__
+            try:
+                if "memory" in props["device_type"].value:
+                    target["memory"].append(node)
+            except KeyError:
+                pass
+            try:
+                if "okay" not in props["status"].value:
+                    continue
+            except KeyError:
+                continue
+            target["okay"].append(node)
+            for compat in dict.fromkeys(node.propval('compatible')):
+                target["compatibles"].setdefault(compat, []).append(node)
+
+        self._targets[root_node.abs_path] = target
+        return target
+
+    def okay_nodes(self, tgt_node):
+        """The nodes under tgt_node with status okay (a new list)"""
+        return list(self._target(tgt_node)["okay"])
+
+    def memory_nodes(self, tgt_node):
+        """The nodes under tgt_node with device_type memory (a new list)"""
+        return list(self._target(tgt_node)["memory"])
+
+    def chosen_node(self, tgt_node):
+        """The chosen node under tgt_node ("" if there is none)"""
+        return self._target(tgt_node)["chosen"]
+
+    def symbol_node(self, tgt_node):
+        """The __symbols__ node under tgt_node ("" if there is none)"""
+        return self._target(tgt_node)["symbols"]
+
+    def driver_nodes(self, tgt_node, compatlist, exact=False):
+        """Find the okay nodes a driver supports
+
+        Args:
+            tgt_node(obj) : target node
+            compatlist(list) : the driver's compatible strings
+            exact(bool) : match compatible strings exactly, rather than
+                          as substrings of the nodes' compatibles
+        Returns:
+            list: the okay nodes with a matching compatible, in tree order
+                  (a new list)
+        """
+        root_path = self.sdt.tree[tgt_node].abs_path
+        key = (root_path, tuple(compatlist), exact)
+        try:
+            return list(self._driver_nodes[key])
+        except KeyError:
+            pass
+
+        target = self._target(tgt_node)
+        compatibles = target["compatibles"]
+        if exact:
+            matched = [c for c in dict.fromkeys(compatlist) if c in compatibles]
+        else:
+            matched = [c for c in compatibles if any(compat in c for compat in compatlist)]
+        found = set()
+        for c in matched:
+            found.update(compatibles[c])
+        nodes = [node for node in target["okay"] if node in found]
+
+        self._driver_nodes[key] = tuple(nodes)
+        return nodes
 
 def item_generator(json_input, lookup_key):
     if isinstance(json_input, dict):
@@ -133,9 +305,7 @@ def scan_reg_size(node, value, idx):
 
 def get_interrupt_prop(sdt, node, value):
     intr = []
-    inp =  node['interrupt-parent'].value[0]
-    intr_parent = [node for node in sdt.tree['/'].subnodes() if node.phandle == inp]
-    inc = intr_parent[0]["#interrupt-cells"].value[0]
+    _, inc, _ = sdt.tree.interrupt_parents(node)[0]
     """
     Baremetal Interrupt Property format:
         bits[11:0]  interrupt-id
@@ -163,9 +333,7 @@ def get_interrupt_prop(sdt, node, value):
 
 def get_interrupt_id(sdt, node, value):
     intr = []
-    inp =  node['interrupt-parent'].value[0]
-    intr_parent = [node for node in sdt.tree['/'].subnodes() if node.phandle == inp]
-    inc = intr_parent[0]["#interrupt-cells"].value[0]
+    _, inc, _ = sdt.tree.interrupt_parents(node)[0]
     nintr = len(value)/inc
     tmp = inc % 2
     for val in range(0, int(nintr)):
@@ -195,14 +363,14 @@ def get_phandle_regprop(sdt, prop, value):
 
 #Return the base address of the interrupt parent.
 def get_intrerrupt_parent(sdt, value):
-    intr_node = [node for node in sdt.tree['/'].subnodes() if node.phandle == value[0]]
-    reg, size = scan_reg_size(intr_node[0], intr_node[0]['reg'].value, 0)
+    intr_node = sdt.tree.pnode(value[0])
+    reg, size = scan_reg_size(intr_node, intr_node['reg'].value, 0)
     """
     Baremetal Interrupt Parent Property Format:
         bits[0]    Interrupt parent type (0: GIC, 1: AXI INTC)
         bits[31:1] Base Address of the interrupt parent
     """
-    compat = intr_node[0].propval('compatible')
+    compat = intr_node.propval('compatible')
     axi_intc = [item for item in compat if "xlnx,xps-intc-1.00.a" in item]
     if axi_intc:
         reg += 1
@@ -367,20 +535,7 @@ def get_stdin(sdt, chosen_node, node_list):
 
 def get_mapped_nodes(sdt, node_list, options):
     # Yocto Machine to CPU compat mapping
-    match_cpunode = get_cpu_node(sdt, options)
-
-    all_phandles = []
-    address_map = match_cpunode.parent["address-map"].value
-    na = match_cpunode.parent["#ranges-address-cells"].value[0]
-    ns = match_cpunode.parent["#ranges-size-cells"].value[0]
-    cells = na + ns
-    tmp = na
-    while tmp < len(address_map):
-        all_phandles.append(address_map[tmp])
-        tmp = tmp + cells + na + 1
-
-    valid_nodes = [node for node in node_list for handle in all_phandles if handle == node.phandle]
-    return valid_nodes
+    return processor_view(sdt, options).mapped_nodes(node_list)
 
 def xlnx_generate_config_struct(sdt, node, drvprop_list, plat, driver_proplist, is_subnode, options):
     for i, prop in enumerate(driver_proplist):
@@ -681,22 +836,12 @@ def xlnx_generate_prop(sdt, node, prop, drvprop_list, plat, pad, phandle_prop, o
 # options: baremetal driver meta-data file path
 def xlnx_generate_bm_config(tgt_node, sdt, options):
     _level(utils.log_setup(options), __name__)
-    root_node = sdt.tree[tgt_node]
-    root_sub_nodes = root_node.subnodes()
-    node_list = []
-    chosen_node = ""
+    view = processor_view(sdt, options, new=True)
     if options.get('outdir', {}):
         sdt.outdir = options['outdir']
-    # Traverse the tree and find the nodes having status=ok property
-    for node in root_sub_nodes:
-        try:
-            if node.name == "chosen":
-                chosen_node = node
-            status = node["status"].value
-            if "okay" in status:
-                node_list.append(node)
-        except:
-           pass
+    # The nodes having status=ok property
+    node_list = view.okay_nodes(tgt_node)
+    chosen_node = view.chosen_node(tgt_node)
     src_dir = options['args'][1]
     stdin = ""
     try:
@@ -725,21 +870,13 @@ def xlnx_generate_bm_config(tgt_node, sdt, options):
 
     if driver_proplist == []:
         return True
-    driver_nodes = []
     for node in node_list:
-        for compat in driver_compatlist:
-            try:
-                compat_string = node['compatible'].value
-                for compa in compat_string:
-                    if compat in compa:
-                        if not node in driver_nodes:
-                            driver_nodes.append(node)
-            except KeyError:
-                _warning(f"Node {node.name} does not have 'compatible' property")
-                pass
+        if 'compatible' not in node.__props__:
+            _warning(f"Node {node.name} does not have 'compatible' property")
+    driver_nodes = view.driver_nodes(tgt_node, driver_compatlist)
 
     if sdt.tree[tgt_node].propval('pruned-sdt') == ['']:
-        driver_nodes = get_mapped_nodes(sdt, driver_nodes, options)
+        driver_nodes = view.mapped_nodes(driver_nodes)
     if not config_struct:
         config_struct = str("X") + drvname.capitalize() + str("_Config")
     else:
@@ -13,7 +13,7 @@ import yaml
 import glob
 import common_utils as utils
 
-from baremetalconfig_xlnx import compat_list, get_mapped_nodes
+from baremetalconfig_xlnx import compat_list, processor_view
 from lopper.log import _init, _warning, _info, _error, _debug, _level
 
 sys.path.append(os.path.dirname(__file__))
@@ -31,27 +31,19 @@ def xlnx_generate_bm_drvlist(tgt_node, sdt, options):
     _level(utils.log_setup(options), __name__)
     if options.get('outdir', {}):
         sdt.outdir = options['outdir']
-    root_node = sdt.tree[tgt_node]
-    root_sub_nodes = root_node.subnodes()
+    view = processor_view(sdt, options, new=True)
     compatible_dict = {}
     ip_dict = {}
 
     driver_list = ["common"]
-    node_list = []
-    # Traverse the tree and find the nodes having status=ok property
-    # and create a compatible_list from these nodes.
-    for node in root_sub_nodes:
-        try:
-            status = node["status"].value
-            if "okay" in status:
-                node_list.append(node)
-        except:
-           pass
+    # The nodes having status=ok property, and a compatible_list
+    # from these nodes.
+    node_list = view.okay_nodes(tgt_node)
 
     driver_ip_dict = {}
     mapped_ip_dict = {}
     if sdt.tree[tgt_node].propval('pruned-sdt') == ['']:
-        mapped_nodelist = get_mapped_nodes(sdt, node_list, options)
+        mapped_nodelist = view.mapped_nodes(node_list)
     else:
         mapped_nodelist = node_list
     for node in mapped_nodelist:
@@ -93,9 +85,8 @@ def xlnx_generate_bm_drvlist(tgt_node, sdt, options):
         schema = utils.load_yaml(yaml_file)
         driver_compatlist = compat_list(schema)
         for comp in driver_compatlist:
-            for node,c in compatible_dict.items():
-                match = [x for x in c if comp == x]
-                if match:
+            for node in view.driver_nodes(tgt_node, [comp], exact=True):
+                if node in compatible_dict:
                     drv_name = utils.get_base_name(yaml_file).replace('.yaml','')
                     driver_list += [drv_name]
                     if schema.get('depends',{}):
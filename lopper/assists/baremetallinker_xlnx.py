@@ -13,7 +13,7 @@ import re
 import lopper_lib
 import common_utils as utils
 
-from baremetalconfig_xlnx import scan_reg_size, get_cpu_node, get_label
+from baremetalconfig_xlnx import scan_reg_size, get_cpu_node, get_label, processor_view
 from common_utils import to_cmakelist
 from openamp_xlnx import xlnx_openamp_get_ddr_elf_load
 from lopper.log import _init, _warning, _info, _error, _debug, _level
@@ -33,9 +33,7 @@ def is_compat( node, compat_string_to_test ):
 # options: baremetal application source path
 def get_memranges(tgt_node, sdt, options):
     _level(utils.log_setup(options), __name__)
-    root_node = sdt.tree[tgt_node]
-    root_sub_nodes = root_node.subnodes()
-    mem_nodes = []
+    view = processor_view(sdt, options)
 
     #Maintain a static memory IP list this is needed inorder to capture proper ip name in the linker script
     xlnx_memipname = {
@@ -47,16 +45,8 @@ def get_memranges(tgt_node, sdt, options):
         "axi_emc": 0, "psu_qspi_linear": 0, "ps7_qspi_linear": 0, "pmc_ram": 0,
         "ddr3": 0, "lpddrmc" : 0, "lpddr": 0, "axi_xspi": 0, "psv_xram": 0
     }
-    symbol_node = ""
-    for node in root_sub_nodes:
-        try:
-            if node.name == "__symbols__":
-                symbol_node = node
-            device_type = node["device_type"].value
-            if "memory" in device_type:
-                mem_nodes.append(node)
-        except:
-           pass
+    symbol_node = view.symbol_node(tgt_node)
+    mem_nodes = view.memory_nodes(tgt_node)
 
     zynqmp_fsbl = None
     try:
@@ -72,6 +62,15 @@ def get_memranges(tgt_node, sdt, options):
     except:
         pass
 
+    # the ranges are kept in the processor view, for each assist that
+    # asks for them
+    key = (sdt.tree[tgt_node].abs_path, zynqmp_fsbl, xparam)
+    try:
+        mem_ranges, lable_names = view.mem_ranges[key]
+        return dict(mem_ranges), dict(lable_names)
+    except KeyError:
+        pass
+
     # Ensure that the region addresses are always in descending order of addresses
     # This order is necessary to employ the comparison while mapping the available regions.
     versal_noc_region_ranges =  {
@@ -108,7 +107,7 @@ def get_memranges(tgt_node, sdt, options):
     noc_regions = versal_noc_region_ranges
 
     # Yocto Machine to CPU compat mapping
-    match_cpunode = get_cpu_node(sdt, options)
+    match_cpunode = view.cpu_node
     if not match_cpunode:
         return
     address_map = match_cpunode.parent["address-map"].value
@@ -207,7 +206,8 @@ def get_memranges(tgt_node, sdt, options):
                         mem_ranges.update({linker_secname: [valid_range[0], size]})
         except KeyError:
             pass
-    return mem_ranges, lable_names
+    view.mem_ranges[key] = (mem_ranges, lable_names)
+    return dict(mem_ranges), dict(lable_names)
 
 
 def get_unique_memip_list(mem_ranges):
@@ -224,6 +224,7 @@ def get_unique_memip_list(mem_ranges):
 # options: baremetal application source path
 def xlnx_generate_bm_linker(tgt_node, sdt, options):
     _level(utils.log_setup(options), __name__)
+    processor_view(sdt, options, new=True)
     mem_ranges,lable_names = get_memranges(tgt_node, sdt, options)
     openamp_config = None
     memtest_config = None
@@ -252,7 +253,7 @@ def xlnx_generate_bm_linker(tgt_node, sdt, options):
     cmake_file = os.path.join(sdt.outdir, f"{appname.capitalize()}Example.cmake")
     cfd = open(cmake_file, 'a')
     traverse  = False if memtest_config else True
-    default_ddr,memtest_config, mb_reset_addr = get_ddr_address(sdt,tgt_node,mem_ranges,match_cpunode,cpu_ip_name,memtest_config,traverse)
+    default_ddr,memtest_config, mb_reset_addr = get_ddr_address(sdt,tgt_node,mem_ranges,match_cpunode,cpu_ip_name,memtest_config,traverse,options)
 
     openamp_elfload_start = False
     openamp_elfload_sz = False
@@ -432,7 +433,7 @@ def generate_linker_script(mem_ranges,yaml_file,appname,cfd,cpu_ip_name,machine,
 
 
 
-def get_ddr_address(sdt,tgt_node,mem_ranges,match_cpunode,cpu_ip_name,memtest_config,traverse):
+def get_ddr_address(sdt,tgt_node,mem_ranges,match_cpunode,cpu_ip_name,memtest_config,traverse,options):
     """
     To get the ddr address
     Parameters:
@@ -443,28 +444,18 @@ def get_ddr_address(sdt,tgt_node,mem_ranges,match_cpunode,cpu_ip_name,memtest_co
         cpu_ip_name(str)        : Cpu ip name
         memtest_config(bool)    : True or False
         traverse(bool)          : True or False
+        options(dict)           : Assist options
     Return:
         default_ddr(str)
         memtest_config(bool)
         mb_reset_addr(str)
     """
 
-    root_node = sdt.tree[tgt_node]
-    root_sub_nodes = root_node.subnodes()
-    mem_nodes = []
-    symbol_node = ""
+    view = processor_view(sdt, options)
+    mem_nodes = view.memory_nodes(tgt_node)
+    symbol_node = view.symbol_node(tgt_node)
     default_ddr = None
 
-    for node in root_sub_nodes:
-        try:
-            if node.name == "__symbols__":
-                symbol_node = node
-            device_type = node["device_type"].value
-            if "memory" in device_type:
-                mem_nodes.append(node)
-        except:
-           pass
-
     unique_mem_ip_list = get_unique_memip_list(mem_ranges)
     valid_mem_ips = []
     if (cpu_ip_name == "microblaze" or cpu_ip_name == "microblaze_riscv") and match_cpunode.propval('xlnx,memory-ip-list') != ['']:
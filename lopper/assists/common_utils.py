@@ -12,10 +12,15 @@ import sys
 import re
 import glob
 import yaml
+import hashlib
+import pickle
+import stat
+import tempfile
 from typing import Any, List, Optional, Dict, Union
 import shutil
 import logging
 from lopper.log import _init, _warning
+from lopper.lop_program import cache_dir, prune_cache, touch_cache_entry
 
 _init(__name__)
 
@@ -94,26 +99,114 @@ def get_abs_path(fpath):
     """
     return os.path.abspath(fpath)
 
+# bump when the layout of a cached yaml entry changes
+_YAML_CACHE_FORMAT = 1
+
+# real path -> ((mtime_ns, size), pickled data), the files loaded by this process
+_yaml_memo = {}
+
+def _yaml_cache_key(content: bytes) -> str:
+    """Return the on-disk cache key for the content of a yaml file."""
+    h = hashlib.sha256()
+    h.update(f"{_YAML_CACHE_FORMAT}:{yaml.__version__}:{pickle.HIGHEST_PROTOCOL}\0".encode())
+    h.update(content)
+    return h.hexdigest()
+
+def _yaml_cache_load(key: str) -> Optional[bytes]:
+    """Return a pickled entry from the on-disk yaml cache, or None."""
+    cdir = cache_dir("yaml")
+    if not cdir:
+        return None
+    try:
+        with open(cdir / f"{key}.pickle", 'rb') as f:
+            blob = f.read()
+    except OSError:
+        return None
+    touch_cache_entry(cdir / f"{key}.pickle")
+    return blob
+
+def _yaml_cache_store(key: str, blob: bytes) -> None:
+    """Write a pickled entry to the on-disk yaml cache, failures are ignored."""
+    cdir = cache_dir("yaml")
+    if not cdir:
+        return
+    tmp_name = None
+    try:
+        cdir.mkdir(parents=True, exist_ok=True)
+        # write and rename, so a concurrent lopper never reads a partial entry
+        fd, tmp_name = tempfile.mkstemp(dir=cdir, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_name, cdir / f"{key}.pickle")
+        prune_cache(cdir)
+    except OSError:
+        if tmp_name:
+            try:
+                os.remove(tmp_name)
+            except OSError:
+                pass
+
 def load_yaml(filepath: str) -> Optional[dict]:
     """Read yaml file data and returns data in a dict format.
-    
+
+    The parsed data is cached, so the driver yaml files that every
+    baremetal assist reads are only parsed once. A file loaded again by
+    this process is reused until its mtime or size changes, otherwise the
+    data is looked up by the file's content in the on-disk cache (see
+    lop_program.cache_dir()). Each call returns its own copy of the data,
+    which the caller can modify. Old entries are evicted from the on-disk
+    cache as lop programs are (see lop_program.prune_cache()).
+
     Args:
         filepath: Path of the yaml file.
     Returns:
         dict: Return Python dict if the file reading is successful.
     """
 
-    if is_file(filepath):
-        try:
-            with open(filepath) as f:
-                data = yaml.safe_load(f)
-            return data
-        except Exception as e:
-            _warning(f"{filepath} file reading failed: {e}")
-            return {}
-    else:
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return {}
+    if not stat.S_ISREG(st.st_mode):
         return {}
 
+    path = os.path.realpath(filepath)
+    version = (st.st_mtime_ns, st.st_size)
+    try:
+        cached_version, blob = _yaml_memo[path]
+        if cached_version == version:
+            return pickle.loads(blob)
+    except KeyError:
+        pass
+
+    try:
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        key = _yaml_cache_key(content)
+        blob = _yaml_cache_load(key)
+        if blob is not None:
+            try:
+                data = pickle.loads(blob)
+                _yaml_memo[path] = (version, blob)
+                return data
+            except Exception:
+                # an unreadable entry, parsed and stored again below
+                pass
+
+        with open(filepath) as f:
+            data = yaml.safe_load(f)
+    except Exception as e:
+        _warning(f"{filepath} file reading failed: {e}")
+        return {}
+
+    try:
+        blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return data
+    _yaml_memo[path] = (version, blob)
+    _yaml_cache_store(key, blob)
+    return data
+
 def copy_file(src: str, dest: str, follow_symlinks: bool = False, silent_discard: bool = True) -> None:
     """
     copies the file from source to destination.
@@ -728,17 +728,13 @@ def xlnx_generate_domain_dts(tgt_node, sdt, options):
                 if len(intr_val) < 3:
                     continue
 
-                # Use property_find() to walk parent chain for interrupt-parent
-                prop, _ = node.property_find('interrupt-parent')
-                if not prop:
+                # The tree's interrupt topology has the (inherited)
+                # interrupt-parent of each node resolved to its controller
+                intr_parents = sdt.tree.interrupt_parents(node)
+                if not intr_parents:
                     continue
 
-                # Use deref() to resolve the phandle to a node
-                intr_parent = sdt.tree.deref(prop.value[0])
-                if not intr_parent:
-                    continue
-
-                inc = intr_parent.propval('#interrupt-cells', list)[0]
+                _, inc, _ = intr_parents[0]
                 if inc != 3:
                     continue
 
@@ -748,13 +744,8 @@ def xlnx_generate_domain_dts(tgt_node, sdt, options):
                     # Determine the AXI INTC input by finding the next input
                     # after all PL peripherals already connected to the INTC
                     used_inputs = set()
-                    for n in sdt.tree['/'].subnodes():
-                        if n.propval('interrupts') == ['']:
-                            continue
-                        n_prop, _ = n.property_find('interrupt-parent')
-                        if not n_prop:
-                            continue
-                        if n_prop.value[0] == intc_phandle and n != node:
+                    for n in sdt.tree.interrupt_consumers(axi_intc_node):
+                        if n != node:
                             n_intr = n.propval('interrupts')
                             if len(n_intr) >= 2:
                                 used_inputs.add(n_intr[0])
@@ -445,13 +445,51 @@ class isospec(object):
             self.setup()
 
 
+    # iso_memory_device_map compiled, the map it was compiled from, and
+    # the entry matched by each name looked up. Rebuilt if a different map
+    # is assigned. Changes made to the map in place are not seen: assign a
+    # new map (isospec.iso_memory_device_map = dict( ... )) to change it.
+    _memory_map_compiled = []
+    _memory_map_source = None
+    _memory_entries = {}
+
     @classmethod
-    def memory_type( cls, name ):
+    def memory_entry( cls, name ):
+        """Return the memory device map entry for a memory name
+
+        The patterns are compiled once, and the result is memoized per
+        name, since the same names are looked up for every subsystem and
+        domain. When several patterns match, the last one in the map wins.
+
+        Args:
+           name (string): the memory name (from the spec)
+
+        Returns:
+           list: [ memory type, destination node regex ], or None if no
+                 pattern matches
+        """
+        if isospec._memory_map_source is not isospec.iso_memory_device_map:
+            isospec._memory_map_compiled = [ ( re.compile( n ), v ) for n,v in isospec.iso_memory_device_map.items() ]
+            isospec._memory_map_source = isospec.iso_memory_device_map
+            isospec._memory_entries = {}
+
+        try:
+            return isospec._memory_entries[name]
+        except KeyError:
+            pass
+
         mem_found = None
-        for n,v in isospec.iso_memory_device_map.items():
-            if re.search( n, name ):
+        for n,v in isospec._memory_map_compiled:
+            if n.search( name ):
                 mem_found = v
 
+        isospec._memory_entries[name] = mem_found
+
+        return mem_found
+
+    @classmethod
+    def memory_type( cls, name ):
+        mem_found = isospec.memory_entry( name )
         if mem_found:
             return mem_found[0]
 
@@ -459,11 +497,7 @@ class isospec(object):
 
     @classmethod
     def memory_dest( cls, name ):
-        mem_found = None
-        for n,v in isospec.iso_memory_device_map.items():
-            if re.search( n, name ):
-                mem_found = v
-
+        mem_found = isospec.memory_entry( name )
         if mem_found:
             return mem_found[1]
 
@@ -27,6 +27,7 @@ from lopper import Lopper
 from lopper import LopperFmt
 import lopper
 from lopper.tree import *
+from lopper.intervals import IntervalSet
 from re import *
 from string import Template
 from lopper.log import _init, _warning, _info, _error
@@ -925,7 +926,8 @@ def xlnx_validate_carveouts(tree, carveouts):
 
     Algorithm:
         Ensures the ``/reserved-memory`` node exists, gathers ``reg`` tuples from
-        carveouts, and checks for pairwise overlap among relevant regions.
+        carveouts, and checks each carveout for overlap with the reserved-memory
+        regions after it, using an interval index of the regions.
     """
     print(" -> xlnx_validate_carveouts")
     expect_ddr = any(["/reserved-memory/" in n.abs_path for n in carveouts])
@@ -948,40 +950,38 @@ def xlnx_validate_carveouts(tree, carveouts):
     size_cells = res_mem_node.propval('#size-cells')[0]
 
 
-    carveout_pairs = [ [ carveout.propval("reg")[1], carveout.propval("reg")[3] ] for carveout in carveouts ]
+    carveout_pairs = { ( carveout.propval("reg")[1], carveout.propval("reg")[3] ) for carveout in carveouts }
 
-    # validate no overlaps or conflicts by generating 2d array of reg values from each reserved memory
-    # this array contains reg values for such validation
+    # validate no overlaps or conflicts by decoding the reg values of each reserved
+    # memory once, into an interval index of (base, size) -> position
     res_mem_regs = [ n.propval("reg") for n in res_mem_node.subnodes(children_only=True) if n.propval("reg") != [''] ]
 
-    for i in range(len(res_mem_regs)):
-        reg1 = res_mem_regs[i]
-
+    regions = []
+    for i, reg in enumerate(res_mem_regs):
         # Defensive check
-        if len(reg1) < addr_cells + size_cells:
+        if len(reg) < addr_cells + size_cells:
             continue
 
-        base1 = cells_to_int(reg1[:addr_cells])
-        size1 = cells_to_int(reg1[addr_cells:addr_cells + size_cells])
-
-        for j in range(i + 1, len(res_mem_regs)):
-            reg2 = res_mem_regs[j]
-
-            if len(reg2) < addr_cells + size_cells:
-                continue
+        base = cells_to_int(reg[:addr_cells])
+        size = cells_to_int(reg[addr_cells:addr_cells + size_cells])
+        regions.append((base, size, i))
 
+    index = IntervalSet(regions)
+    for base1, size1, i in regions:
+        # Only validate relevant carveouts
+        if (base1, size1) not in carveout_pairs:
+            continue
+        # Overlap check, against the regions after this one
+        conflicts = [ j for j in index.overlaps(base1, size1) if j > i ]
+        if conflicts:
+            reg2 = res_mem_regs[min(conflicts)]
             base2 = cells_to_int(reg2[:addr_cells])
             size2 = cells_to_int(reg2[addr_cells:addr_cells + size_cells])
-            # Only validate relevant carveouts
-            if [base1, size1] not in carveout_pairs:
-                continue
-            # Overlap check
-            if base1 < base2 + size2 and base2 < base1 + size1:
-                print(
-                    "ERROR: conflict between reserved memory nodes reg values:",
-                    [hex(x) for x in (base1, size1, base2, size2)]
-                )
-                return False
+            print(
+                "ERROR: conflict between reserved memory nodes reg values:",
+                [hex(x) for x in (base1, size1, base2, size2)]
+            )
+            return False
 
     return True
 
@@ -7,6 +7,8 @@
 # * SPDX-License-Identifier: BSD-3-Clause
 # */
 
+import bisect
+
 from lopper import Lopper
 import lopper
 from lopper.tree import *
@@ -361,8 +363,13 @@ class FirewallToModuleMap:
         self.ppu_to_mid_map = {}
         self.pm_label_to_mod_map = {}
         self.memory_nodes = []
+        # lookup indexes, built on first use (see modules_at() and
+        # get_parent_xmpus()) and dropped when a firewall or module is added
+        self.reg_to_mod_map = None  # { (addr, size): [ModuleNode, ...] }
+        self.xmpu_regions = None  # ([start, ...], [max end, ...], [region, ...])
 
     def add_firewall(self, name, node, compat):
+        self.xmpu_regions = None
         if name not in self.ppus:
             self.ppus[name] = FirewallNode(name, node, compat)
             self.ppu_to_mid_map[name] = []
@@ -372,6 +379,8 @@ class FirewallToModuleMap:
 
     def add_module(self, name, node, parent_name):
         parent = parent_name
+        self.reg_to_mod_map = None
+        self.xmpu_regions = None
         if name not in self.modules:
             self.modules[name] = ModuleNode(name, node)
             self.ppu_to_mod_map[parent].append(name)
@@ -590,8 +599,29 @@ class FirewallToModuleMap:
                     print("[DBG++] Skipped: Aper Config for {} -> {}".format(
                         module, x_inst_name))
 
-    def get_parent_xmpus(self, addr, size):
-        parents = []
+    def modules_at(self, addr, size):
+        """modules with a (base, size) region matching addr and size exactly,
+        in module order
+        """
+        if self.reg_to_mod_map is None:
+            self.reg_to_mod_map = {}
+            for inst in self.modules.values():
+                for region in inst.get_base_and_size():
+                    self.reg_to_mod_map.setdefault(region, []).append(inst)
+
+        return self.reg_to_mod_map.get((addr, size), [])
+
+    def get_xmpu_regions(self):
+        """memory regions protected by enabled xmpus, sorted by start address
+
+        Returns a tuple of ([start, ...], [max end, ...], [region, ...]), where
+        a region is (start, end, order, xmpu name) and max end is the largest
+        end address of the regions up to and including that one.
+        """
+        if self.xmpu_regions is not None:
+            return self.xmpu_regions
+
+        regions = []
         xmpus = (name for name, node in self.ppus.items()
                  if is_xmpu(node) and "okay" in node.node.propval("status"))
 
@@ -611,12 +641,37 @@ class FirewallToModuleMap:
                     continue
 
                 for m_addr, m_size in module.get_base_and_size(prop=prop):
-                    m_end = m_addr + m_size
-                    if addr >= m_addr and (addr + size) <= m_end:
-                        # print(module.name, hex(m_addr), hex(m_size), hex(addr), hex(addr + size))
-                        parents.append(mpu)
+                    regions.append((m_addr, m_addr + m_size, len(regions), mpu))
 
-        return parents
+        regions.sort()
+
+        max_ends = []
+        max_end = None
+        for region in regions:
+            max_end = region[1] if max_end is None else max(max_end, region[1])
+            max_ends.append(max_end)
+
+        self.xmpu_regions = ([r[0] for r in regions], max_ends, regions)
+        return self.xmpu_regions
+
+    def get_parent_xmpus(self, addr, size):
+        starts, max_ends, regions = self.get_xmpu_regions()
+        end = addr + size
+
+        # regions starting at or below addr, walked down until none of the
+        # remaining ones reach the end of the range
+        parents = []
+        i = bisect.bisect_right(starts, addr)
+        while i > 0:
+            i -= 1
+            if max_ends[i] < end:
+                break
+            m_addr, m_end, order, mpu = regions[i]
+            if end <= m_end:
+                parents.append((order, mpu))
+
+        # in xmpu / module order
+        return [mpu for order, mpu in sorted(parents)]
 
     def add_to_mem_map(self, addr, size, fw_conf):
         # add memory node in the prot map
@@ -1020,11 +1075,7 @@ def ftb_setup_modules():
 
         mod_inst = None
 
-        match = [
-            inst for mod, inst in prot_map.modules.items()
-            for addr, sz in inst.get_base_and_size()
-            if addr == baddr and sz == size
-        ]
+        match = prot_map.modules_at(baddr, size)
 
         if len(match) >= 1:
             # print("[ERROR] More than one instance found for", tline, ":",
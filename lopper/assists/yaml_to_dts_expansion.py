@@ -197,6 +197,48 @@ def glob_to_regex(glob_pattern):
     # Anchor pattern to match the whole string
     return '^' + regex_pattern + '$'
 
+def glob_matcher(glob_patterns):
+    """Compile glob patterns into a single regular expression.
+
+    Each pattern becomes a named alternative (``g0``, ``g1``, ...) of the
+    combined expression. A match's ``lastgroup`` is the first pattern, in
+    the order passed, that matches the whole string.
+
+    Args:
+        glob_patterns (list[str]): Glob expressions, see glob_to_regex().
+
+    Returns:
+        re.Pattern: Compiled combined expression.
+    """
+    return re.compile('|'.join(f'(?P<g{i}>{glob_to_regex(g)})'
+                               for i, g in enumerate(glob_patterns)))
+
+def match_globs(devices, glob_patterns):
+    """Split a device pool between glob patterns in one pass.
+
+    A device goes to the first pattern that matches it, which is the
+    pattern that would claim it if the patterns were applied one at a time
+    to the pool, each removing what it matched.
+
+    Args:
+        devices (list[dict]): Device pool (access entries) to match.
+        glob_patterns (list[str]): Glob expressions, in priority order.
+
+    Returns:
+        tuple: (list of matched devices for each pattern, unmatched devices)
+    """
+    matcher = glob_matcher(glob_patterns)
+    matched = [[] for _ in glob_patterns]
+    remaining = []
+    for device in devices:
+        m = matcher.match(device['dev'])
+        if m:
+            matched[int(m.lastgroup[1:])].append(device)
+        else:
+            remaining.append(device)
+
+    return matched, remaining
+
 def domain_parent( domain ):
     """Return the parent reference recorded by a domain node.
 
@@ -340,7 +382,7 @@ def domain_devices(devices, device_name_or_regex, action: Action):
     elif action == Action.REMOVE:
         try:
             if isinstance(device_name_or_regex, list):
-                to_remove = [device['dev'] for device in device_name_or_regex]
+                to_remove = {device['dev'] for device in device_name_or_regex}
                 devices = [device for device in devices if device['dev'] not in to_remove]
             else:
                 devices = [device for device in devices if not re.match(device_name_or_regex, device['dev'])]
@@ -412,46 +454,46 @@ def wildcard_devices( tree, domains_node ):
 
     # Peer exclusion: for any parent domain with children using globs,
     # remove explicit device refs from peer children before glob expansion
-    # Group domains by their parent
+    # Group domains by their parent. Each domain's parent is resolved once
+    # (resolving may search the tree), and the explicit refs are collected
+    # in the same pass.
+    parents = {}
+    explicit_refs = {}
     parent_to_children = {}
     for domain in domains_node.subnodes():
-        # Skip the devices_domain itself if it exists
-        if devices_domain and domain == devices_domain:
-            continue
+        parents[domain] = resolve_parent( domain )
         try:
             access_chunks = domain_access( domain )
-            if not access_chunks:
-                continue
-            # Check if this domain has any globs
-            has_glob = any( is_glob_pattern( a.get("dev", "") ) for a in access_chunks )
-            if has_glob:
-                parent = resolve_parent( domain )
-                if parent:
-                    if parent not in parent_to_children:
-                        parent_to_children[parent] = []
-                    parent_to_children[parent].append( domain )
+        except:
+            access_chunks = []
+
+        explicit = set()
+        has_glob = False
+        try:
+            for a in access_chunks:
+                dev = a.get("dev", "")
+                if is_glob_pattern( dev ):
+                    has_glob = True
+                elif dev:
+                    explicit.add( dev )
         except:
             pass
+        explicit_refs[domain] = explicit
+
+        # Skip the devices_domain itself if it exists
+        if devices_domain and domain == devices_domain:
+            continue
+        # Check if this domain has any globs
+        if has_glob and parents[domain]:
+            parent_to_children.setdefault( parents[domain], [] ).append( domain )
 
     # For each parent with glob children, apply peer exclusion
     for parent, glob_children in parent_to_children.items():
         # Collect explicit device refs from ALL children of this parent (not just glob children)
         explicit_devices = set()
-        for domain in domains_node.subnodes():
-            if domain == parent:
-                continue
-            # Check if this domain has this parent
-            domain_parent_node = resolve_parent( domain )
-            if domain_parent_node != parent:
-                continue
-            try:
-                access_chunks = domain_access( domain )
-                for a in access_chunks:
-                    dev = a.get("dev", "")
-                    if dev and not is_glob_pattern( dev ):
-                        explicit_devices.add( dev )
-            except:
-                pass
+        for domain, domain_parent_node in parents.items():
+            if domain != parent and domain_parent_node == parent:
+                explicit_devices |= explicit_refs[domain]
 
         # Remove explicit devices from the parent's pool
         if explicit_devices:
@@ -471,6 +513,36 @@ def wildcard_devices( tree, domains_node ):
             access_chunks = domain_access( domain )
             remove_list = []
             access_list_new = []
+
+            # All of the domain's globs are matched against the parent's
+            # device pool in one pass, rather than one pass (and one decode
+            # and encode of the pool) per glob.
+            globs = []
+            for a in access_chunks:
+                try:
+                    if is_glob_pattern( a["dev"] ):
+                        globs.append( a["dev"] )
+                except Exception:
+                    pass
+
+            parent_domain = None
+            parent_access = None
+            glob_devs = []
+            pool_left = 0
+            pool_updated = False
+            if globs:
+                # is there a parent domain ? (it is required for wildcards)
+                # The yaml input validation should have found any misses, but
+                # dts inputs are also possible, so we double check here
+                parent_domain = resolve_parent( domain )
+                parent_access = domain_access( parent_domain ) if parent_domain else None
+                if parent_access:
+                    # the spec says globs, but if we convert to regexes, the
+                    # access search is easy
+                    glob_devs, remaining_devs = match_globs( parent_access, globs )
+                    pool_left = len( parent_access )
+
+            glob_index = 0
             for a in access_chunks:
                 # display the access element
                 _debug( f"wildcard: processing: {a}" )
@@ -478,11 +550,8 @@ def wildcard_devices( tree, domains_node ):
                 try:
                     dev = a["dev"]
                     if is_glob_pattern( dev ):
-                        # is there a parent domain ? (it is required for wildcards)
-                        # The yaml input validation should have found any misses, but
-                        # dts inputs are also possible, so we double check here
-                        parent_domain = resolve_parent( domain )
-                        parent_access = domain_access( parent_domain ) if parent_domain else None
+                        devs = glob_devs[glob_index] if glob_devs else []
+                        glob_index += 1
 
                         # An unscoped "*" (no parent device pool to match against)
                         # means "everything": mark the domain keep-all so that
@@ -492,7 +561,7 @@ def wildcard_devices( tree, domains_node ):
                         # works in multi-step pipelines; core_domain_access always
                         # deletes it, which is what keeps it out of the final
                         # output.  Not authored spec data.
-                        if dev == "*" and not parent_access:
+                        if dev == "*" and not pool_left:
                             _info( f"glob '*' in {domain.abs_path}: no parent device pool; marking keep-all (device pruning skipped)" )
                             domain + LopperProp( name="lopper,access-keep-all", value=[1] )
                             remove_list.append( a )
@@ -501,21 +570,13 @@ def wildcard_devices( tree, domains_node ):
                         if not parent_domain:
                             _error( f"glob in {domain.abs_path}: no parent domain found (use parent: property or add domain with compatible containing ',devices')", True )
 
-                        # Get parent's access list and verify it has devices
-                        if not parent_access:
+                        # Verify the parent's access list (what is left of it
+                        # after the earlier globs) has devices
+                        if not pool_left:
                             _error( f"glob in {domain.abs_path}: parent domain ({parent_domain.abs_path}) has no devices to match", True )
 
-                        # the spec says globs, but if we convert to a regex, the access
-                        # search is easy
-                        regex = glob_to_regex( dev )
-                        devs = domain_devices( parent_access, regex, Action.GET )
-                        remaining_devs = domain_devices( parent_access, devs, Action.REMOVE )
-
-                        # update the parent, since we aren't iterating it, we are ok doing this
-                        # immediately.
-                        _debug( f"after access: remaining devs: {remaining_devs}" )
-
-                        domain_access( parent_domain, remaining_devs )
+                        pool_left -= len( devs )
+                        pool_updated = True
 
                         _info( f"parent domain ({parent_domain.abs_path}) matched devices: {devs}" )
 
@@ -536,6 +597,13 @@ def wildcard_devices( tree, domains_node ):
                     # We just move onto the next item in this case
                     pass
 
+            if pool_updated:
+                # update the parent, since we aren't iterating it, we are ok doing this
+                # here.
+                _debug( f"after access: remaining devs: {remaining_devs}" )
+
+                domain_access( parent_domain, remaining_devs )
+
             if remove_list:
                 # remove the collected devices from the access json dictionary, these
                 # are currently only the wildcard dev: that was found
@@ -996,8 +1064,14 @@ def reserved_memory_expand( tree, reserved_memory_node ):
     # will set to list of phandles instead
     new_res_mem_pval = []
 
+    # name -> reserved memory nodes, so each reference is a lookup rather
+    # than a scan of the reserved memory nodes
+    res_mem_by_name = {}
+    for n in pre_existing_res_mem_nodes:
+        res_mem_by_name.setdefault( n.name, [] ).append( n )
+
     for dev in resmem_prop_string:
-        dev_node = [ n for n in pre_existing_res_mem_nodes if dev == n.name ]
+        dev_node = res_mem_by_name.get( dev, [] )
         dev_node = dev_node[0] if len(dev_node) == 1 else None
         if dev_node == None:
             print( f"[DBG]: WARNING: could not find node {dev}" )
@@ -1684,6 +1758,11 @@ def resolve_carveouts( tree, subnode, carveout_prop_name, verbose = 0 ):
     domain_node = None
 
     subnodes_to_check = subnode.tree["/reserved-memory"].subnodes(children_only=True) + subnode.tree["/axi"].subnodes(children_only=True)
+    # name or label -> the first node that has it
+    nodes_by_ref = {}
+    for n in subnodes_to_check:
+        nodes_by_ref.setdefault( n.name, n )
+        nodes_by_ref.setdefault( n.label, n )
     for relation in subnode.subnodes(children_only=True):
         if relation.props(carveout_prop_name) == []:
             print("WARNING: resolve_carveouts: ", subnode, relation, "missing property", carveout_prop_name)
@@ -1692,7 +1771,7 @@ def resolve_carveouts( tree, subnode, carveout_prop_name, verbose = 0 ):
         new_prop_val = []
 
         for carveout_str in carveoutlist:
-            current_node = [ n for n in subnodes_to_check if carveout_str == n.name or carveout_str == n.label ]
+            current_node = [ nodes_by_ref[carveout_str] ] if carveout_str in nodes_by_ref else []
 
             # there can be tcm in / and not /axi
             if "tcm" in carveout_str and current_node == []:
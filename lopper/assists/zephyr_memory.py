@@ -13,6 +13,8 @@ import os
 import re
 import sys
 
+from lopper.intervals import IntervalSet
+
 sys.path.append(os.path.dirname(__file__))
 
 try:
@@ -779,6 +781,37 @@ def _normalized_memories(nodes, processor):
     )
 
 
+def _memory_range_index(tree):
+    """Index the memory ranges of the SRAM and reserved-memory candidates.
+
+    Description:
+        Decodes the first range of every node below /axi and
+        /reserved-memory once, so SRAM tuples are resolved with a lookup
+        rather than by decoding every candidate for each tuple.
+
+    Args:
+        tree (LopperTree): Input device tree.
+
+    Returns:
+        IntervalSet: Candidate ranges, each with its node.
+    """
+    ranges = []
+    for path in ("/axi", "/reserved-memory"):
+        try:
+            parent = tree[path]
+        except KeyError:
+            continue
+        for node in parent.subnodes():
+            if (node.props("reg") or
+                    (node.props("start") and node.props("size"))):
+                try:
+                    origin, length = _memory_range(node)
+                except LayoutError:
+                    continue
+                ranges.append((origin, length, node))
+    return IntervalSet(ranges)
+
+
 def _domain_memory_nodes(tree, domain):
     """Resolve the union of domain SRAM and reserved-memory references.
 
@@ -809,6 +842,7 @@ def _domain_memory_nodes(tree, domain):
         if match:
             core_index = int(match.group(1))
     sram = domain.propval("sram", list)
+    candidates = None
     if sram and sram != [""]:
         phandle_nodes = [tree.pnode(value) for value in sram
                          if isinstance(value, int)]
@@ -830,22 +864,9 @@ def _domain_memory_nodes(tree, domain):
                               int(sram[index + 3]))
                 else:
                     length = int(sram[index + 2])
-                candidates = []
-                for path in ("/axi", "/reserved-memory"):
-                    try:
-                        parent = tree[path]
-                    except KeyError:
-                        continue
-                    candidates.extend(parent.subnodes())
-                matches = []
-                for node in candidates:
-                    if (node.props("reg") or
-                            (node.props("start") and node.props("size"))):
-                        try:
-                            if _memory_range(node) == (origin, length):
-                                matches.append(node)
-                        except LayoutError:
-                            continue
+                if candidates is None:
+                    candidates = _memory_range_index(tree)
+                matches = candidates.matching(origin, length)
                 tcm_matches = [node for node in matches
                                if node.abs_path.startswith("/axi/") and
                                _memory_kind(node) in ("ATCM", "BTCM", "CTCM")]
@@ -30,6 +30,9 @@ from .base import (
     run_audit_phase,
 )
 
+# Parallel / incremental phase runner
+from .scheduler import AuditScheduler
+
 # Re-export all core functions for backwards compatibility
 from .core import (
     _cell_value_get,
@@ -77,8 +80,9 @@ from .schema import (
     ConstraintType,
     PropertyConstraint,  # Alias for lopper.schema.core.Constraint
     NodeConstraints,
-    # Constraint definitions
-    NODE_PROPERTY_CONSTRAINTS,
+    # Constraint definitions (NODE_PROPERTY_CONSTRAINTS is loaded on first
+    # access, see __getattr__ below)
+    get_node_property_constraints,
     # Validation functions (dt-schema based)
     check_forbidden_properties,
     check_required_properties,
@@ -120,6 +124,7 @@ __all__ = [
     'BaseValidator',
     'ValidatorRegistry',
     'run_audit_phase',
+    'AuditScheduler',
     # Core functions
     '_cell_value_get',
     'check_invalid_phandles',
@@ -157,6 +162,7 @@ __all__ = [
     'NodeConstraints',
     # Schema constraints
     'NODE_PROPERTY_CONSTRAINTS',
+    'get_node_property_constraints',
     # Schema validation functions (dt-schema based)
     'check_forbidden_properties',
     'check_required_properties',
@@ -179,3 +185,11 @@ __all__ = [
     'get_drc_registry',
     'reset_drc_registry',
 ]
+
+
+def __getattr__(name):
+    # The schema constraints are parsed on first use, rather than when
+    # lopper (and hence lopper.audit) is imported.
+    if name == 'NODE_PROPERTY_CONSTRAINTS':
+        return get_node_property_constraints()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -58,14 +58,11 @@ from .base import (
     BaseValidator,
     ValidatorRegistry,
 )
-from .checks import CheckHandlerRegistry, get_collector
+from .checks import CheckHandlerRegistry, get_collector, collector_is_local
 
-try:
-    from ruamel.yaml import YAML
-    _yaml_loader = YAML(typ="safe")
-except ImportError:
-    import yaml as _pyyaml
-    _yaml_loader = None
+# created on first use by _load_yaml(), rules files are only read when
+# --drc is passed
+_yaml_loader = None
 
 
 # Map the language's phase strings to the framework's ValidationPhase enum.
@@ -181,10 +178,18 @@ class Rule:
 
 
 def _load_yaml(path: str):
+    global _yaml_loader
+
+    if _yaml_loader is None:
+        try:
+            from ruamel.yaml import YAML
+            _yaml_loader = YAML(typ="safe").load
+        except ImportError:
+            import yaml as _pyyaml
+            _yaml_loader = _pyyaml.safe_load
+
     with open(path, "r") as f:
-        if _yaml_loader:
-            return _yaml_loader.load(f)
-        return _pyyaml.safe_load(f)
+        return _yaml_loader(f)
 
 
 class AssertionRegistry:
@@ -593,6 +598,94 @@ def _eval_selector(tree, selector: str, nodes=None) -> List:
     return filtered
 
 
+def _local_terms(rule: Rule, regexes: List[str]) -> bool:
+    """Gather the node regexes of a rule (and its children) into ``regexes``.
+
+    Returns False when the rule's findings can depend on nodes its selectors
+    do not name: a label or relative selector, a handler or collector that
+    follows references, or a rule targeting a named tree.
+    """
+    if rule.tree:
+        return False
+
+    if not rule.is_context:
+        handler = CheckHandlerRegistry.get(rule.check)
+        if handler is not None:
+            if not handler.NODE_LOCAL:
+                return False
+            if handler.RELATIONAL:
+                spec = rule.collect
+                per_group = (isinstance(spec, dict)
+                             and not ({"property", "kind"} & set(spec)))
+                specs = spec.values() if per_group else [spec]
+                if not all(collector_is_local(s) for s in specs):
+                    return False
+
+    terms = list(rule.select)
+    group_by = rule.group_by
+    if isinstance(group_by, dict):
+        for t in group_by.values():
+            terms.extend(t if isinstance(t, list) else [t])
+    elif isinstance(group_by, list):
+        terms.extend(group_by)
+    elif group_by:
+        terms.append(group_by)
+    if rule.guard:
+        guard_terms = rule.guard.get("select", []) or []
+        terms.extend(guard_terms if isinstance(guard_terms, list) else [guard_terms])
+
+    for term in terms:
+        if isinstance(term, dict):
+            if "relative" in term:
+                return False
+            handler = CheckHandlerRegistry.get(term.get("check"))
+            if handler is not None and not handler.NODE_LOCAL:
+                return False
+            continue
+        node_regex = str(term).split(":")[0]
+        if not node_regex:
+            continue
+        if not node_regex.startswith("/"):
+            # a label selector
+            return False
+        regexes.append(node_regex)
+
+    return all(_local_terms(child, regexes) for child in rule.rules)
+
+
+def rule_selector(rule: Rule):
+    """Build a path predicate for the nodes a rule's findings depend on.
+
+    A rule only selects (and so only reports on) nodes whose paths match its
+    selectors, the way ``tree.nodes()`` matches them. A change to any other
+    node can't change its findings, unless the rule follows references out
+    of its selection (see ``_local_terms()``).
+
+    Returns:
+        callable ``fn(path) -> bool``, or None if the rule can depend on any
+        node.
+    """
+    regexes: List[str] = []
+    if not _local_terms(rule, regexes):
+        return None
+
+    compiled = []
+    for regex in dict.fromkeys(regexes):
+        try:
+            compiled.append((regex, re.compile(regex)))
+        except re.error:
+            # tree.nodes() falls back to an exact path match
+            compiled.append((regex, None))
+
+    def _selects(path: str) -> bool:
+        for regex, c in compiled:
+            if regex == path or (c is not None and c.search(path)):
+                return True
+        return False
+
+    return _selects
+
+
 # Module-global registry: shipped catalog + anything callers add.
 _drc_registry: Optional[AssertionRegistry] = None
 
@@ -662,6 +755,19 @@ class DRCValidator(BaseValidator):
         self.results.extend(phase_results)
         return phase_results
 
+    def phase_units(self, phase, tree, **kwargs):
+        """One unit per top-level rule for the phase, with its selector."""
+        return [(rule, rule_selector(rule))
+                for rule in get_drc_registry().rules_for_phase(phase)]
+
+    def run_unit(self, phase, tree, unit, **kwargs):
+        """Run one top-level rule (a unit from phase_units())."""
+        self._subtrees = kwargs.get("subtrees") or {}
+        results = self._run_rule(tree, unit, phase, get_drc_registry(),
+                                 this=None, chain=())
+        self.results.extend(results)
+        return results
+
     def _run_rule(self, tree, rule, phase, registry, this=None, chain=()):
         """Evaluate one rule, recursing into contexts.
 
@@ -126,6 +126,57 @@ class BaseValidator:
         """
         return []
 
+    def phase_units(self, phase: ValidationPhase, tree, **kwargs) -> List[tuple]:
+        """Split a phase into independent units of work.
+
+        Used by the audit scheduler (scheduler.py) to run the checks of a
+        phase in parallel, and to re-run only the ones affected by a change.
+        The default is one unit per enabled CHECK_REGISTRY check for the
+        phase, or a single unit (the whole phase) for validators without a
+        CHECK_REGISTRY.
+
+        Args:
+            phase: The validation phase to split
+            tree: LopperTree to validate
+            **kwargs: Additional arguments (as passed to run_phase())
+
+        Returns:
+            List of (unit, selector) tuples, in the order run_phase() runs
+            them. unit is passed back to run_unit(). selector is a callable
+            that takes a node path and returns True if the unit's findings
+            can depend on that node, or None if they can depend on any node.
+        """
+        check_registry = getattr(self, 'CHECK_REGISTRY', None)
+        if check_registry is None:
+            return [(None, None)]
+
+        return [(check_name, None)
+                for check_name, (check_phase, _) in check_registry.items()
+                if check_phase == phase and self.is_check_enabled(check_name)]
+
+    def run_unit(self, phase: ValidationPhase, tree, unit, **kwargs) -> List[ValidationResult]:
+        """Run one unit of work returned by phase_units().
+
+        Args:
+            phase: The validation phase to run
+            tree: LopperTree to validate
+            unit: The unit, as returned by phase_units()
+            **kwargs: Additional arguments (as passed to run_phase())
+
+        Returns:
+            List of ValidationResult objects from the unit
+        """
+        if unit is None:
+            return self.run_phase(phase, tree, **kwargs)
+
+        # run_phase() with only this check enabled
+        enabled = self.warnings
+        self.warnings = {unit}
+        try:
+            return self.run_phase(phase, tree, **kwargs)
+        finally:
+            self.warnings = enabled
+
     def report(self) -> int:
         """Report all validation results and return error count.
 
@@ -89,6 +89,24 @@ def get_collector(spec) -> Callable:
     return _COLLECTORS[spec]
 
 
+def collector_is_local(spec) -> bool:
+    """Does a ``collect:`` spec read only the node it is given?
+
+    Property collectors do. The named collectors resolve phandles to other
+    nodes, and a range collector without pinned cell widths reads them from
+    the node's parent, so they do not.
+    """
+    if spec is None:
+        return True
+    if isinstance(spec, dict):
+        kind = spec.get("kind", "identity")
+        if kind == "range":
+            return (spec.get("address-cells") is not None
+                    and spec.get("size-cells") is not None)
+        return kind == "identity"
+    return str(spec).startswith("property:")
+
+
 def _collect_ranges(node, prop: str, tree=None,
                     address_cells=None, size_cells=None) -> Set:
     """Decode a ``<addr size addr size ...>`` property into (start, size) pairs.
@@ -239,6 +257,11 @@ class CheckHandler:
 
     CHECK_TYPE: str = "base"
     RELATIONAL: bool = False
+    # True when a finding about a node depends only on the selected nodes
+    # (and, for relational handlers, their collected elements). Handlers
+    # that follow references or relations to other nodes set this to False,
+    # so an incremental audit re-runs them on any change.
+    NODE_LOCAL: bool = True
 
     def execute(self, tree, rule, selection, context=None) -> List[ValidationResult]:
         """Run the check.
@@ -501,6 +524,7 @@ class SubsetOfCheck(CheckHandler):
     violation.
     """
     CHECK_TYPE = "subset-of"
+    NODE_LOCAL = False
 
     def execute(self, tree, rule, selection, context=None):
         from .assertions import _eval_relative
@@ -574,6 +598,7 @@ class PhandleTypeCheck(CheckHandler):
     tuples (``cpus`` is (cluster, cpumask, exec-level), so index 0, stride 3).
     """
     CHECK_TYPE = "phandle-type"
+    NODE_LOCAL = False
 
     def execute(self, tree, rule, selection, context=None):
         prop = rule.params.get("property")
@@ -620,6 +645,7 @@ class AcyclicCheck(CheckHandler):
     DAG rather than a loop.
     """
     CHECK_TYPE = "acyclic"
+    NODE_LOCAL = False
 
     def execute(self, tree, rule, selection, context=None):
         edge = rule.params.get("edge", "parent")
@@ -666,6 +692,7 @@ class RefExistsCheck(CheckHandler):
     path (domain-parent-exists).
     """
     CHECK_TYPE = "ref-exists"
+    NODE_LOCAL = False
 
     def execute(self, tree, rule, selection, context=None):
         results = []
@@ -697,6 +724,7 @@ class RefValidCheck(CheckHandler):
     findings down to the selected nodes + named properties.
     """
     CHECK_TYPE = "ref-valid"
+    NODE_LOCAL = False
 
     def execute(self, tree, rule, selection, context=None):
         from .core import check_invalid_phandles
@@ -156,6 +156,33 @@ class OverlapResult:
 # ValidationResult is imported from base module
 
 
+def _overlapping_pairs(regions: List[MemoryRegion]) -> List[Tuple[int, int]]:
+    """Find the pairs of regions that overlap.
+
+    The regions are swept in address order, so only regions that are
+    still open at a region's start are compared with it, rather than
+    every pair.
+
+    Args:
+        regions: List of MemoryRegion objects
+
+    Returns:
+        List of (i, j) index pairs, i < j, in ascending order
+    """
+    order = sorted(range(len(regions)), key=lambda k: regions[k].start)
+    pairs = []
+    active = []
+    for k in order:
+        region = regions[k]
+        active = [a for a in active if regions[a].end > region.start]
+        for a in active:
+            if regions[a].overlaps(region):
+                pairs.append((a, k) if a < k else (k, a))
+        active.append(k)
+    pairs.sort()
+    return pairs
+
+
 class MemoryMap:
     """Collection of memory regions with analysis capabilities.
 
@@ -239,47 +266,49 @@ class MemoryMap:
         if within_domain:
             regions = [r for r in regions if r.domain == within_domain]
 
-        # Check all pairs
-        for i, r1 in enumerate(regions):
-            for r2 in regions[i + 1:]:
-                # Skip if checking cross-domain and regions are in same domain
-                if cross_domain and r1.domain == r2.domain:
+        # Check the pairs that can overlap, in the order of a check of
+        # all pairs
+        for i, j in _overlapping_pairs(regions):
+            r1 = regions[i]
+            r2 = regions[j]
+            # Skip if checking cross-domain and regions are in same domain
+            if cross_domain and r1.domain == r2.domain:
+                continue
+            # Skip if not checking cross-domain and regions are in different domains
+            if not cross_domain and within_domain is None:
+                if r1.domain != r2.domain and r1.domain is not None and r2.domain is not None:
                     continue
-                # Skip if not checking cross-domain and regions are in different domains
-                if not cross_domain and within_domain is None:
-                    if r1.domain != r2.domain and r1.domain is not None and r2.domain is not None:
-                        continue
 
-                # Skip if same_type_only and regions are different types
-                if same_type_only and r1.region_type != r2.region_type:
+            # Skip if same_type_only and regions are different types
+            if same_type_only and r1.region_type != r2.region_type:
+                continue
+
+            if r1.overlaps(r2):
+                is_intentional = r1.is_shared_memory() or r2.is_shared_memory()
+
+                # Also consider reserved memory inside physical memory as intentional
+                if not is_intentional:
+                    types = {r1.region_type, r2.region_type}
+                    if types == {MemoryRegionType.PHYSICAL_MEMORY, MemoryRegionType.RESERVED_MEMORY}:
+                        is_intentional = True
+                    elif types == {MemoryRegionType.PHYSICAL_MEMORY, MemoryRegionType.DOMAIN_MEMORY}:
+                        is_intentional = True
+                    elif types == {MemoryRegionType.DOMAIN_MEMORY, MemoryRegionType.RESERVED_MEMORY}:
+                        is_intentional = True
+
+                if not include_intentional and is_intentional:
                     continue
 
-                if r1.overlaps(r2):
-                    is_intentional = r1.is_shared_memory() or r2.is_shared_memory()
-
-                    # Also consider reserved memory inside physical memory as intentional
-                    if not is_intentional:
-                        types = {r1.region_type, r2.region_type}
-                        if types == {MemoryRegionType.PHYSICAL_MEMORY, MemoryRegionType.RESERVED_MEMORY}:
-                            is_intentional = True
-                        elif types == {MemoryRegionType.PHYSICAL_MEMORY, MemoryRegionType.DOMAIN_MEMORY}:
-                            is_intentional = True
-                        elif types == {MemoryRegionType.DOMAIN_MEMORY, MemoryRegionType.RESERVED_MEMORY}:
-                            is_intentional = True
-
-                    if not include_intentional and is_intentional:
-                        continue
-
-                    overlap_start = max(r1.start, r2.start)
-                    overlap_size = r1.overlap_size(r2)
-
-                    overlaps.append(OverlapResult(
-                        region1=r1,
-                        region2=r2,
-                        overlap_start=overlap_start,
-                        overlap_size=overlap_size,
-                        is_intentional=is_intentional
-                    ))
+                overlap_start = max(r1.start, r2.start)
+                overlap_size = r1.overlap_size(r2)
+
+                overlaps.append(OverlapResult(
+                    region1=r1,
+                    region2=r2,
+                    overlap_start=overlap_start,
+                    overlap_size=overlap_size,
+                    is_intentional=is_intentional
+                ))
 
         return overlaps
 
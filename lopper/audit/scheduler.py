@@ -0,0 +1,239 @@
+#/*
+# * Copyright (C) 2026 Advanced Micro Devices, Inc. All Rights Reserved.
+# *
+# * SPDX-License-Identifier: BSD-3-Clause
+# */
+
+"""
+Lopper audit scheduler
+
+Runs the validators of an audit phase the way ValidatorRegistry.run_phase()
+does, with two additions:
+
+- parallel: the phase is split into independent units of work (one per
+  check or top-level DRC rule, see BaseValidator.phase_units()) and the
+  units are run in a process pool. The workers are forked when the phase
+  starts, so they each see a frozen snapshot of the tree as it was at that
+  point, nothing is copied or pickled on the way in.
+
+- incremental: the findings of each unit are kept, along with a
+  fingerprint of every node. When the phase is run again, only the units
+  whose selectors match a node that changed (or an ancestor of one) are
+  re-run, the kept findings are used for the rest. Units without a
+  selector are always re-run.
+
+Findings are merged back in unit order and reported by each validator, so
+the output is the same as a serial, full audit.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Dict
+
+import lopper.log
+from .base import ValidationPhase, ValidationResult, ValidatorRegistry
+
+lopper.log._init(__name__)
+
+# the tree and arguments of the phase being run, inherited by the forked
+# pool workers
+_snapshot = None
+
+
+def _run_unit_in_worker(category, phase, unit):
+    """Pool worker: run one unit against the forked snapshot."""
+    tree, kwargs, warnings, werror = _snapshot
+    validator = ValidatorRegistry.get_validator(category)(warnings=warnings, werror=werror)
+    return validator.run_unit(phase, tree, unit, **kwargs)
+
+
+def tree_fingerprint(tree) -> Dict[str, tuple]:
+    """Fingerprint the nodes of a tree.
+
+    Args:
+        tree: LopperTree to fingerprint
+
+    Returns:
+        dict: node path -> (label, ((property name, value), ...)). Values
+              are copied to tuples, so a later change to a value list is
+              seen as a difference.
+    """
+    prints = {}
+    for path, node in tree.__nodes__.items():
+        props = []
+        for p in node.__props__.values():
+            v = p.value
+            props.append((p.name, tuple(v) if isinstance(v, list) else v))
+        prints[path] = (node.label, tuple(props))
+    return prints
+
+
+def dirty_paths(before: Dict[str, tuple], after: Dict[str, tuple]) -> set:
+    """Return the paths of nodes added, removed or changed between fingerprints."""
+    dirty = {path for path, fp in after.items() if before.get(path) != fp}
+    dirty.update(path for path in before if path not in after)
+    return dirty
+
+
+def _with_ancestors(paths) -> set:
+    """Return the paths plus the paths of all of their ancestors."""
+    out = set()
+    for path in paths:
+        out.add(path)
+        while path not in ("", "/"):
+            path = path.rsplit("/", 1)[0] or "/"
+            out.add(path)
+    return out
+
+
+class AuditScheduler:
+    """Runs audit phases in parallel and/or incrementally.
+
+    Attributes:
+        warnings: the -W flags enabled
+        werror: treat warnings as errors
+        jobs: number of worker processes, 1 runs the units serially
+        incremental: keep findings between runs, and re-run only the units
+                     affected by changed nodes
+        results: the findings of the last run_phase(), validator category ->
+                 list of ValidationResult
+        stats: counts from the last run_phase(): units, run and reused
+    """
+
+    def __init__(self, warnings: List[str], werror: bool = False,
+                 jobs: int = 1, incremental: bool = False):
+        self.warnings = list(warnings or [])
+        self.werror = werror
+        self.jobs = max(1, int(jobs or 1))
+        self.incremental = incremental
+        self.results = {}
+        self.stats = {}
+        # phase -> (tree, kwargs, fingerprint, {unit key: (unit, results)})
+        self._state = {}
+
+    def reset(self):
+        """Drop the findings kept for incremental runs."""
+        self._state = {}
+
+    def _execute(self, phase, tree, kwargs, pending) -> Dict[tuple, List[ValidationResult]]:
+        """Run units, in the pool when there is more than one to run.
+
+        Args:
+            phase: The validation phase
+            tree: LopperTree to validate
+            kwargs: Additional validator arguments
+            pending: list of (key, category, unit)
+
+        Returns:
+            dict: unit key -> results
+        """
+        global _snapshot
+
+        results = {}
+        futures = {}
+        pool = None
+        if self.jobs > 1 and len(pending) > 1:
+            try:
+                context = multiprocessing.get_context("fork")
+            except ValueError:
+                context = None
+                lopper.log._debug("audit: fork is not available, running serially")
+            if context is not None:
+                _snapshot = (tree, kwargs, self.warnings, self.werror)
+                pool = ProcessPoolExecutor(max_workers=min(self.jobs, len(pending)),
+                                           mp_context=context)
+
+        try:
+            if pool is not None:
+                for key, category, unit in pending:
+                    futures[key] = pool.submit(_run_unit_in_worker, category, phase, unit)
+
+            for key, category, unit in pending:
+                if key in futures:
+                    try:
+                        results[key] = futures[key].result()
+                        continue
+                    except Exception as e:
+                        # typically findings that can't be pickled back,
+                        # the unit is simply run here instead
+                        lopper.log._debug(f"audit: unit {key} failed in the pool ({e}), running serially")
+
+                validator_class = ValidatorRegistry.get_validator(category)
+                validator = validator_class(warnings=self.warnings, werror=self.werror)
+                results[key] = validator.run_unit(phase, tree, unit, **kwargs)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            _snapshot = None
+
+        return results
+
+    def run_phase(self, phase: ValidationPhase, tree, dirty=None, **kwargs) -> int:
+        """Run all enabled validators for a phase.
+
+        Args:
+            phase: The validation phase to run
+            tree: LopperTree to validate
+            dirty (optional): paths of the nodes changed since the last run
+                              of this phase. When not passed (and running
+                              incrementally) they are found by comparing
+                              node fingerprints.
+            **kwargs: Additional arguments passed to validators
+
+        Returns:
+            Total number of errors found across all validators
+        """
+        validators = []
+        for category, validator_class in ValidatorRegistry.get_all_validators().items():
+            validator = validator_class(warnings=self.warnings, werror=self.werror)
+            if validator.is_enabled():
+                validators.append((category, validator))
+
+        fingerprint = None
+        affected = None
+        kept = {}
+        if self.incremental:
+            fingerprint = tree_fingerprint(tree)
+            state = self._state.get(phase)
+            if state is not None and state[0] is tree and state[1] == kwargs:
+                if dirty is None:
+                    dirty = dirty_paths(state[2], fingerprint)
+                affected = _with_ancestors(dirty)
+                kept = state[3]
+
+        units = []
+        pending = []
+        for category, validator in validators:
+            for index, (unit, selector) in enumerate(validator.phase_units(phase, tree, **kwargs)):
+                key = (category, index, getattr(unit, "id", unit))
+                units.append((category, validator, key, unit))
+
+                cached = kept.get(key)
+                if (affected is not None and cached is not None and selector is not None
+                        and cached[0] == unit and not any(selector(p) for p in affected)):
+                    continue
+                pending.append((key, category, unit))
+
+        results = self._execute(phase, tree, kwargs, pending)
+
+        total_errors = 0
+        unit_results = {}
+        for category, validator, key, unit in units:
+            if key in results:
+                found = results[key]
+            else:
+                found = kept[key][1]
+            unit_results[key] = (unit, found)
+            validator.results.extend(found)
+
+        self.results = {}
+        for category, validator in validators:
+            self.results[category] = validator.results
+            total_errors += validator.report()
+
+        self.stats = {"units": len(units), "run": len(pending),
+                      "reused": len(units) - len(pending)}
+        if self.incremental:
+            self._state[phase] = (tree, kwargs, fingerprint, unit_results)
+
+        return total_errors
@@ -19,11 +19,16 @@ Key components:
 - PropertyConstraint: Alias for Constraint (backwards compatibility)
 - NodeConstraints: Dataclass for node-level constraint groupings
 - load_constraints_from_schema(): Loads constraints from dt-schema YAML
+- ConstraintIndex: Constraints indexed by node path pattern and compatible,
+  compiled ahead of time with compile_constraint_index()
 - Standalone check functions: check_forbidden_properties, etc.
 - SchemaValidator: Orchestrator for running schema validation checks
 
 The constraints are loaded dynamically from YAML schema files in
-lopper/dt-schema/schemas/, making validation fully data-driven.
+lopper/dt-schema/schemas/, making validation fully data-driven. A larger
+binding corpus (e.g. the upstream Linux bindings) is compiled once into an
+index file (scripts/compile-dt-schema-index.py), which is then used instead
+when LOPPER_DT_SCHEMA_INDEX points at it.
 
 Note: This module uses unified types from lopper.schema.core. The
 PropertyConstraint name is preserved for backwards compatibility.
@@ -33,16 +38,13 @@ from dataclasses import dataclass, field
 from fnmatch import fnmatch
 import glob
 import os
+import pickle
+import re
 import lopper.log
 
-try:
-    import ruamel.yaml as yaml
-    from ruamel.yaml import YAML
-    _yaml_loader = YAML()
-    _yaml_loader.preserve_quotes = True
-except ImportError:
-    import yaml
-    _yaml_loader = None
+# created on first use by _yaml_load(), the yaml engine isn't needed until
+# the schemas are parsed
+_yaml_loader = None
 
 from .base import (
     ValidationPhase,
@@ -67,10 +69,14 @@ class NodeConstraints:
     """Constraints for a class of nodes.
 
     Attributes:
-        node_pattern: Glob pattern matching node paths (e.g., "/memory@*")
+        node_pattern: Glob pattern matching node paths (e.g., "/memory@*"),
+                      None for bindings selected by compatible
         constraints: List of Constraint objects
         description: Optional description of this constraint set
         schema_file: Source schema file path
+        compatibles: Compatible strings the binding applies to
+        compatible_patterns: Regexes for compatible strings the binding
+                             applies to
 
     Note: This is similar to lopper.schema.core.NodeSpec but includes
     schema_file for audit diagnostics. Keeping locally for now.
@@ -79,6 +85,8 @@ class NodeConstraints:
     constraints: list
     description: str = None
     schema_file: str = None
+    compatibles: list = None
+    compatible_patterns: list = None
 
 
 # =============================================================================
@@ -90,6 +98,23 @@ def _get_schema_dir():
     return os.path.join(os.path.dirname(__file__), '..', 'schema', 'dt-schema', 'schemas')
 
 
+def _yaml_load(f):
+    """Load yaml from an open file, preferring ruamel over PyYAML."""
+    global _yaml_loader
+
+    if _yaml_loader is None:
+        try:
+            from ruamel.yaml import YAML
+            ruamel_yaml = YAML()
+            ruamel_yaml.preserve_quotes = True
+            _yaml_loader = ruamel_yaml.load
+        except ImportError:
+            import yaml
+            _yaml_loader = yaml.safe_load
+
+    return _yaml_loader(f)
+
+
 def _parse_schema_file(schema_path):
     """Parse a single dt-schema YAML file and extract constraints.
 
@@ -101,22 +126,24 @@ def _parse_schema_file(schema_path):
     """
     try:
         with open(schema_path, 'r') as f:
-            if _yaml_loader:
-                schema = _yaml_loader.load(f)
-            else:
-                schema = yaml.safe_load(f)
+            schema = _yaml_load(f)
     except Exception as e:
         lopper.log._debug(f"schema: failed to load {schema_path}: {e}")
         return None
 
-    if not schema:
+    if not schema or not isinstance(schema, dict):
         return None
 
-    # Determine node pattern from $id or file path
+    # Determine node pattern from $id or file path, bindings without one
+    # apply to nodes by compatible
     schema_id = schema.get('$id', '')
     node_pattern = _schema_id_to_pattern(schema_id, schema_path)
+    compatibles = []
+    compatible_patterns = []
     if not node_pattern:
-        return None
+        compatibles, compatible_patterns = _binding_compatibles(schema)
+        if not compatibles and not compatible_patterns:
+            return None
 
     constraints = []
     description = schema.get('description', schema.get('title', ''))
@@ -144,6 +171,9 @@ def _parse_schema_file(schema_path):
     # Parse 'properties' for const/enum
     properties = schema.get('properties', {})
     for prop_name, prop_schema in properties.items():
+        if prop_name == 'compatible' and not node_pattern:
+            # what selected the binding, not a value constraint
+            continue
         if isinstance(prop_schema, dict):
             # const constraint
             if 'const' in prop_schema:
@@ -179,10 +209,75 @@ def _parse_schema_file(schema_path):
         node_pattern=node_pattern,
         constraints=constraints,
         description=description,
-        schema_file=schema_path
+        schema_file=schema_path,
+        compatibles=compatibles or None,
+        compatible_patterns=compatible_patterns or None,
     )
 
 
+# Fallback compatibles that bindings list after their specific ones. As in
+# dt-schema's generated selects, they don't select a binding on their own.
+_GENERIC_COMPATIBLES = {'syscon', 'simple-mfd', 'simple-bus', 'mmio-sram'}
+
+
+def _compatible_values(spec, compatibles, patterns):
+    """Collect the compatible strings and patterns of a compatible schema.
+
+    Handles const, enum, pattern, contains and items, and the oneOf/anyOf/
+    allOf combinations of them.
+    """
+    if isinstance(spec, list):
+        for s in spec:
+            _compatible_values(s, compatibles, patterns)
+        return
+    if not isinstance(spec, dict):
+        return
+
+    if 'const' in spec and isinstance(spec['const'], str):
+        compatibles.append(str(spec['const']))
+    for v in spec.get('enum', None) or []:
+        if isinstance(v, str):
+            compatibles.append(str(v))
+    if isinstance(spec.get('pattern'), str):
+        patterns.append(str(spec['pattern']))
+
+    for key in ('contains', 'items', 'oneOf', 'anyOf', 'allOf'):
+        if key in spec:
+            _compatible_values(spec[key], compatibles, patterns)
+
+
+def _binding_compatibles(schema):
+    """Return the compatibles a binding applies to.
+
+    A binding's custom 'select' is used when it has one (select: false
+    bindings are only referenced by other schemas, and apply to nothing),
+    otherwise its compatible property.
+
+    Args:
+        schema: The parsed binding
+
+    Returns:
+        tuple: (compatible strings, compatible regexes), without duplicates
+               or generic fallback compatibles
+    """
+    select = schema.get('select', None)
+    if select is False:
+        return [], []
+
+    compatible_spec = None
+    if isinstance(select, dict):
+        compatible_spec = (select.get('properties') or {}).get('compatible')
+    if compatible_spec is None:
+        compatible_spec = (schema.get('properties') or {}).get('compatible')
+
+    compatibles = []
+    patterns = []
+    _compatible_values(compatible_spec, compatibles, patterns)
+
+    compatibles = [c for c in dict.fromkeys(compatibles) if c not in _GENERIC_COMPATIBLES]
+    return compatibles, list(dict.fromkeys(patterns))
+
+
 def _schema_id_to_pattern(schema_id, schema_path):
     """Convert schema $id to node pattern.
 
@@ -247,6 +342,12 @@ def _extract_mutex_from_dependent(dependent):
     return mutex_pairs
 
 
+def _schema_files(schema_dir):
+    """Return the YAML files under a schema directory, in a stable order."""
+    pattern = os.path.join(schema_dir, '**', '*.yaml')
+    return sorted(glob.glob(pattern, recursive=True))
+
+
 def load_constraints_from_schemas(schema_dir=None):
     """Load all constraints from dt-schema YAML files.
 
@@ -264,8 +365,7 @@ def load_constraints_from_schemas(schema_dir=None):
         return constraints
 
     # Find all YAML files recursively
-    pattern = os.path.join(schema_dir, '**', '*.yaml')
-    for schema_path in glob.glob(pattern, recursive=True):
+    for schema_path in _schema_files(schema_dir):
         node_constraints = _parse_schema_file(schema_path)
         if node_constraints:
             # Use basename without extension as key
@@ -274,14 +374,315 @@ def load_constraints_from_schemas(schema_dir=None):
             if name in constraints:
                 parent = os.path.basename(os.path.dirname(schema_path))
                 name = f"{parent}-{name}"
+            if name in constraints:
+                name = os.path.splitext(os.path.relpath(schema_path, schema_dir))[0]
             constraints[name] = node_constraints
-            lopper.log._debug(f"schema: loaded {name} -> {node_constraints.node_pattern}")
+            lopper.log._debug(f"schema: loaded {name} -> "
+                              f"{node_constraints.node_pattern or node_constraints.compatibles}")
 
     return constraints
 
 
-# Load constraints at module import time
-NODE_PROPERTY_CONSTRAINTS = load_constraints_from_schemas()
+# =============================================================================
+# Constraint Index
+# =============================================================================
+
+INDEX_FORMAT = 1
+
+# regex syntax that ends the literal prefix of a compatible pattern
+_REGEX_SPECIAL = set('.^$*+?{}[]\\|()')
+
+
+def _has_top_level_alternation(pattern):
+    """Return True if a regex has a '|' outside of any group or class."""
+    depth = 0
+    in_class = False
+    escaped = False
+    for c in pattern:
+        if escaped:
+            escaped = False
+        elif c == '\\':
+            escaped = True
+        elif in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            return True
+    return False
+
+
+def _literal_prefix(pattern):
+    """Return the literal text a compatible regex must start with."""
+    if not pattern.startswith('^') or _has_top_level_alternation(pattern):
+        # could match anywhere in the string
+        return ''
+    pattern = pattern[1:]
+
+    prefix = []
+    for c in pattern:
+        if c in _REGEX_SPECIAL:
+            # a quantifier makes the previous character optional
+            if c in '*?{' and prefix:
+                prefix.pop()
+            break
+        prefix.append(c)
+    return ''.join(prefix)
+
+
+class ConstraintIndex:
+    """Constraints indexed for dispatch by node path and compatible.
+
+    Constraint sets with a node path pattern are matched by path, those
+    from bindings are looked up by the node's compatible strings: exact
+    compatibles in a dictionary, and compatible regexes in a trie of their
+    literal prefixes (so only the regexes that share a prefix with the
+    compatible are tried). The cost of matching a node does not grow with
+    the number of bindings.
+
+    The index is built once from any number of binding directories with
+    compile_constraint_index(), and saved (pickled) for later runs.
+
+    Attributes:
+        constraints: schema name -> NodeConstraints, in load order
+        sources: schema file -> modification time (ns), the files the index
+                 was built from
+    """
+
+    def __init__(self, constraints=None, sources=None):
+        self.constraints = dict(constraints or {})
+        self.sources = dict(sources or {})
+
+        # (ordinal, NodeConstraints), the ordinal keeps the matches of a
+        # node in load order
+        self._paths = []
+        self._by_compatible = {}
+        # literal prefix trie: char -> subtrie, None -> [(regex, ordinal, nc)]
+        self._pattern_trie = {}
+        self._compatible_cache = {}
+
+        for ordinal, nc in enumerate(self.constraints.values()):
+            if nc.node_pattern:
+                self._paths.append((ordinal, nc))
+            for compat in nc.compatibles or []:
+                self._by_compatible.setdefault(compat, []).append((ordinal, nc))
+            for pattern in nc.compatible_patterns or []:
+                try:
+                    regex = re.compile(pattern)
+                except re.error as e:
+                    lopper.log._warning(f"schema: {nc.schema_file}: bad compatible pattern '{pattern}': {e}")
+                    continue
+                trie = self._pattern_trie
+                for c in _literal_prefix(pattern):
+                    trie = trie.setdefault(c, {})
+                trie.setdefault(None, []).append((regex, ordinal, nc))
+
+        self.has_compatibles = bool(self._by_compatible or self._pattern_trie)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_compatible_cache'] = {}
+        return state
+
+    def __len__(self):
+        return len(self.constraints)
+
+    def _for_compatible(self, compatible):
+        """Return the (ordinal, NodeConstraints) bound to one compatible."""
+        try:
+            return self._compatible_cache[compatible]
+        except KeyError:
+            pass
+
+        found = list(self._by_compatible.get(compatible, ()))
+        trie = self._pattern_trie
+        for c in [''] + list(compatible):
+            if c:
+                trie = trie.get(c)
+                if trie is None:
+                    break
+            for regex, ordinal, nc in trie.get(None, ()):
+                if regex.search(compatible):
+                    found.append((ordinal, nc))
+
+        self._compatible_cache[compatible] = found
+        return found
+
+    def match(self, node_path, compatibles=()):
+        """Return the constraint sets that apply to a node.
+
+        Args:
+            node_path: Absolute path of the node
+            compatibles: The node's compatible strings
+
+        Returns:
+            List of NodeConstraints, in load order and without duplicates
+        """
+        found = [(ordinal, nc) for ordinal, nc in self._paths
+                 if _node_matches_pattern(node_path, nc.node_pattern)]
+        for compat in compatibles:
+            found.extend(self._for_compatible(compat))
+
+        if len(found) < 2:
+            return [nc for _, nc in found]
+        return [nc for _, nc in sorted(dict(found).items())]
+
+    def match_node(self, node):
+        """Return the constraint sets that apply to a tree node."""
+        compatibles = _node_compatibles(node) if self.has_compatibles else ()
+        return self.match(node.abs_path, compatibles)
+
+    def path_patterns(self):
+        """Return the node path patterns of the path matched constraints."""
+        return [nc.node_pattern for _, nc in self._paths]
+
+    def stale(self):
+        """Return True if a source schema changed since the index was built."""
+        for path, mtime in self.sources.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def save(self, path):
+        """Write the index to a file."""
+        with open(path, 'wb') as f:
+            pickle.dump((INDEX_FORMAT, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _node_compatibles(node):
+    """Return the compatible strings of a node (empty if it has none)."""
+    try:
+        value = node['compatible'].value
+    except (KeyError, TypeError, AttributeError):
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    if isinstance(value, (list, tuple)):
+        return tuple(v for v in value if isinstance(v, str))
+    return ()
+
+
+def compile_constraint_index(schema_dirs, output=None):
+    """Compile binding schemas into a ConstraintIndex.
+
+    Args:
+        schema_dirs: Directories of dt-schema YAML files, later directories
+                     don't replace the schemas of earlier ones with the
+                     same name
+        output (optional): File to save the index to
+
+    Returns:
+        The ConstraintIndex
+    """
+    constraints = {}
+    sources = {}
+    for schema_dir in schema_dirs:
+        for name, nc in load_constraints_from_schemas(schema_dir).items():
+            if name in constraints:
+                name = nc.schema_file
+            constraints[name] = nc
+        for path in _schema_files(schema_dir):
+            sources[path] = os.stat(path).st_mtime_ns
+
+    index = ConstraintIndex(constraints, sources)
+    if output:
+        index.save(output)
+        lopper.log._info(f"schema: compiled {len(index)} constraint sets from "
+                         f"{len(sources)} schemas to {output}")
+    return index
+
+
+def load_constraint_index(path):
+    """Load an index written by compile_constraint_index().
+
+    Args:
+        path: The index file
+
+    Returns:
+        The ConstraintIndex
+
+    Raises:
+        ValueError: The file isn't an index of this format
+    """
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    if (not isinstance(data, tuple) or len(data) != 2 or data[0] != INDEX_FORMAT
+            or not isinstance(data[1], ConstraintIndex)):
+        raise ValueError(f"{path} is not a constraint index (format {INDEX_FORMAT})")
+    index = data[1]
+    if index.stale():
+        lopper.log._warning(f"schema: {path} is older than its schemas, rebuild it "
+                            f"with scripts/compile-dt-schema-index.py")
+    return index
+
+
+# The constraints are loaded the first time they are needed (parsing the
+# schemas is the bulk of this module's import cost). They come from the
+# compiled index named by LOPPER_DT_SCHEMA_INDEX when it is set, otherwise
+# from the vendored schemas. NODE_PROPERTY_CONSTRAINTS is provided by the
+# module __getattr__ below.
+_node_property_constraints = None
+_constraint_index = None
+
+
+def get_constraint_index():
+    """Return the ConstraintIndex used when a check isn't passed constraints.
+
+    The index is loaded on the first call, and the result is cached.
+
+    Returns:
+        ConstraintIndex
+    """
+    global _node_property_constraints, _constraint_index
+    if _constraint_index is None:
+        index = None
+        index_file = os.environ.get('LOPPER_DT_SCHEMA_INDEX')
+        if index_file:
+            try:
+                index = load_constraint_index(index_file)
+            except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+                lopper.log._warning(f"schema: can't load constraint index {index_file}: {e}, "
+                                    f"using the vendored schemas")
+        if index is None:
+            if _node_property_constraints is None:
+                _node_property_constraints = load_constraints_from_schemas()
+            index = ConstraintIndex(_node_property_constraints)
+        _constraint_index = index
+        _node_property_constraints = index.constraints
+    return _constraint_index
+
+
+def get_node_property_constraints():
+    """Return the constraints loaded from the dt-schema files.
+
+    The schemas are parsed on the first call, and the result is cached.
+
+    Returns:
+        dict: schema name -> NodeConstraints
+    """
+    return get_constraint_index().constraints
+
+
+def _index_for(constraints):
+    """Return the index for a check's constraints argument."""
+    if not constraints:
+        return get_constraint_index()
+    if isinstance(constraints, ConstraintIndex):
+        return constraints
+    return ConstraintIndex(constraints)
+
+
+def __getattr__(name):
+    if name == 'NODE_PROPERTY_CONSTRAINTS':
+        return get_node_property_constraints()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # =============================================================================
@@ -326,24 +727,19 @@ def _node_matches_pattern(node_path, pattern):
     return fnmatch(node_path, pattern)
 
 
-def _get_matching_constraints(node_path, constraints=None):
-    """Get all constraint sets that match a node path.
+def _get_matching_constraints(node_path, constraints=None, compatibles=()):
+    """Get all constraint sets that match a node.
 
     Args:
         node_path: Absolute path of the node
-        constraints: Constraint dictionary to search (default: NODE_PROPERTY_CONSTRAINTS)
+        constraints: Constraint dictionary or ConstraintIndex to search
+                     (default: NODE_PROPERTY_CONSTRAINTS)
+        compatibles: The node's compatible strings
 
     Returns:
         List of NodeConstraints objects that match this node
     """
-    constraints = constraints or NODE_PROPERTY_CONSTRAINTS
-    matches = []
-
-    for name, node_constraints in constraints.items():
-        if _node_matches_pattern(node_path, node_constraints.node_pattern):
-            matches.append(node_constraints)
-
-    return matches
+    return _index_for(constraints).match(node_path, compatibles)
 
 
 # =============================================================================
@@ -361,16 +757,17 @@ def check_forbidden_properties(tree, constraints=None):
 
     Args:
         tree: LopperTree to validate
-        constraints: Optional constraint dictionary (default: NODE_PROPERTY_CONSTRAINTS)
+        constraints: Optional constraint dictionary or ConstraintIndex
+                     (default: NODE_PROPERTY_CONSTRAINTS)
 
     Returns:
         List of ValidationResult objects
     """
     results = []
-    constraints = constraints or NODE_PROPERTY_CONSTRAINTS
+    index = _index_for(constraints)
 
     for node in tree:
-        matching = _get_matching_constraints(node.abs_path, constraints)
+        matching = index.match_node(node)
 
         for node_constraints in matching:
             for prop_constraint in node_constraints.constraints:
@@ -420,16 +817,17 @@ def check_required_properties(tree, constraints=None):
 
     Args:
         tree: LopperTree to validate
-        constraints: Optional constraint dictionary (default: NODE_PROPERTY_CONSTRAINTS)
+        constraints: Optional constraint dictionary or ConstraintIndex
+                     (default: NODE_PROPERTY_CONSTRAINTS)
 
     Returns:
         List of ValidationResult objects
     """
     results = []
-    constraints = constraints or NODE_PROPERTY_CONSTRAINTS
+    index = _index_for(constraints)
 
     for node in tree:
-        matching = _get_matching_constraints(node.abs_path, constraints)
+        matching = index.match_node(node)
 
         for node_constraints in matching:
             for prop_constraint in node_constraints.constraints:
@@ -477,16 +875,17 @@ def check_property_values(tree, constraints=None):
 
     Args:
         tree: LopperTree to validate
-        constraints: Optional constraint dictionary (default: NODE_PROPERTY_CONSTRAINTS)
+        constraints: Optional constraint dictionary or ConstraintIndex
+                     (default: NODE_PROPERTY_CONSTRAINTS)
 
     Returns:
         List of ValidationResult objects
     """
     results = []
-    constraints = constraints or NODE_PROPERTY_CONSTRAINTS
+    index = _index_for(constraints)
 
     for node in tree:
-        matching = _get_matching_constraints(node.abs_path, constraints)
+        matching = index.match_node(node)
 
         for node_constraints in matching:
             for prop_constraint in node_constraints.constraints:
@@ -568,16 +967,17 @@ def check_mutex_properties(tree, constraints=None):
 
     Args:
         tree: LopperTree to validate
-        constraints: Optional constraint dictionary (default: NODE_PROPERTY_CONSTRAINTS)
+        constraints: Optional constraint dictionary or ConstraintIndex
+                     (default: NODE_PROPERTY_CONSTRAINTS)
 
     Returns:
         List of ValidationResult objects
     """
     results = []
-    constraints = constraints or NODE_PROPERTY_CONSTRAINTS
+    index = _index_for(constraints)
 
     for node in tree:
-        matching = _get_matching_constraints(node.abs_path, constraints)
+        matching = index.match_node(node)
 
         for node_constraints in matching:
             for prop_constraint in node_constraints.constraints:
@@ -1042,6 +1442,46 @@ class SchemaValidator(BaseValidator):
         'schema_type_frequency': (ValidationPhase.POST_YAML, check_type_frequency_anomalies),
     }
 
+    # Checks whose findings for a node depend only on the node itself and
+    # the constraints matching its path
+    PATTERN_CHECKS = (
+        'schema_forbidden_props',
+        'schema_required_props',
+        'schema_prop_values',
+        'schema_mutex_props',
+    )
+
+    def phase_units(self, phase, tree, **kwargs):
+        """Split a phase into independent units of work (one per check).
+
+        The constraint based checks can only report on nodes that match one
+        of the constraint patterns, so they are given a selector for those
+        paths. Constraints selected by compatible can apply anywhere, as do
+        the learned schema checks, these units have no selector.
+
+        Args:
+            phase: The validation phase to split
+            tree: LopperTree to validate
+            **kwargs: Additional arguments (ignored)
+
+        Returns:
+            List of (unit, selector) tuples (see BaseValidator.phase_units())
+        """
+        units = super().phase_units(phase, tree, **kwargs)
+        if not any(unit in self.PATTERN_CHECKS for unit, _ in units):
+            return units
+
+        index = get_constraint_index()
+        if index.has_compatibles:
+            return [(unit, None) for unit, _ in units]
+        patterns = index.path_patterns()
+
+        def _selects(path):
+            return any(_node_matches_pattern(path, p) for p in patterns)
+
+        return [(unit, _selects if unit in self.PATTERN_CHECKS else None)
+                for unit, _ in units]
+
     def run_phase(self, phase, tree, **kwargs):
         """Run all enabled checks for a specific phase.
 
@@ -21,6 +21,7 @@ from string import printable
 
 from lopper.fmt import LopperFmt
 import lopper.log
+import lopper.timings
 
 lopper.log._init(__name__)
 
@@ -32,6 +33,30 @@ lopper_known_types = {
 
 lopper_discovered_types = {}
 
+# support applications located by lopper_base.which(), indexed by
+# (tool, PATH)
+lopper_tool_paths = {}
+
+# the lexical elements of a DTS file that dts_scan() has to recognize:
+# quoted strings (kept, they can contain any of the other elements),
+# comments, /include/ and cpp directives/line markers (dropped) and the
+# statement delimiters
+dts_lexical_re = re.compile(
+    r'"(?:\\.|[^\\"])*"'
+    r"|'(?:\\.|[^\\'])*'"
+    r'|//[^\n]*'
+    r'|/\*.*?\*/'
+    r'|/include/\s*"(?:\\.|[^\\"])*"'
+    r'|^[ \t]*#[ \t]*(?:\d+|line|include|define|undef|ifdef|ifndef|if|else|elif|endif|pragma|error|warning)\b(?!-)[^\n]*'
+    r'|[{};]',
+    re.DOTALL | re.MULTILINE
+)
+dts_label_re = re.compile( r'\s*([A-Za-z_]\w*)\s*:' )
+dts_continuation_re = re.compile( r'\s*\n\s*' )
+
+# the most recent dts_scan(): ( dts content, scan )
+dts_scan_memo = ( None, None )
+
 class lopper_base:
     """Class representing the common device tree front / backend interface
 
@@ -40,6 +65,7 @@ class lopper_base:
     files.
 
     This class implements:
+       - which
        - dt_preprocess:
        - property_value_decode:
        - property_type_guess:
@@ -54,6 +80,8 @@ class lopper_base:
        - _comment_translate
        - _label_replacer
        - _label_translate
+       - dts_scan
+       - dts_property_table
 
     This class has the base function for (and subclasses must implement):
        - export
@@ -71,6 +99,29 @@ class lopper_base:
     phandle_possible_prop_dict = {}
 
     ### --- base methods
+    @staticmethod
+    def which( tool ):
+        """Locate a support application
+
+        Wraps shutil.which(). Support applications are looked up when they
+        are first needed, and the result is cached, so repeated checks for
+        the same tool (setup, preprocessing, compiling) don't walk PATH
+        each time.
+
+        Args:
+           tool (string): the application to find
+
+        Returns:
+           string: the path to the application, or None if it wasn't found
+        """
+        key = ( tool, os.environ.get( "PATH" ) )
+        try:
+            return lopper_tool_paths[key]
+        except KeyError:
+            path = shutil.which( tool )
+            lopper_tool_paths[key] = path
+            return path
+
     def dt_preprocess( dts_file, includes, outdir="./", verbose=0 ):
         """Compile a dts file to a dtb
 
@@ -127,11 +178,11 @@ class lopper_base:
         includes += os.getcwd()
 
         # try pcpp first
-        ppargs = (os.environ.get('LOPPER_CPP') or shutil.which("pcpp") or shutil.which("pcpp-python") or "").split()
+        ppargs = (os.environ.get('LOPPER_CPP') or lopper_base.which("pcpp") or lopper_base.which("pcpp-python") or "").split()
         if ppargs and (os.path.basename(ppargs[0]) == "pcpp" or os.path.basename(ppargs[0]) == "pcpp-python"):
             ppargs += "--passthru-comments".split()
         else:
-            ppargs = (os.environ.get('LOPPER_CPP') or shutil.which("cpp") or "").split()
+            ppargs = (os.environ.get('LOPPER_CPP') or lopper_base.which("cpp") or "").split()
             # Note: might drop the -I include later
             ppargs += "-nostdinc -I include -undef -x assembler-with-cpp ".split()
 
@@ -141,7 +192,8 @@ class lopper_base:
         ppargs += ["-o", preprocessed_name, dts_file]
         lopper.log._info( f"preprocessing dts_file: {ppargs}" )
 
-        result = subprocess.run( ppargs, check = True )
+        with lopper.timings.span( "preprocess", "phase", file=dts_file ):
+            result = subprocess.run( ppargs, check = True )
         if result.returncode != 0:
             lopper.log._error( f"unable to preprocess dts file: {ppargs}" )
             lopper.log._error( f"\n{textwrap.indent(result.stderr.decode(), '         ')}" )
@@ -1007,102 +1059,169 @@ class lopper_base:
         return re.sub(pattern, lopper_base._label_replacer, text)
 
     @staticmethod
-    def parse_dts_phandles(dts_content):
+    def _dts_labels(statement):
+        """private function to split the labels from a DTS statement
+
+        Returns:
+           tuple: (list of labels, rest of the statement)
         """
-        Parse device tree source content and extract phandle references.
+        labels = []
+        pos = 0
+        m = dts_label_re.match( statement )
+        while m:
+            labels.append( m.group(1) )
+            pos = m.end()
+            m = dts_label_re.match( statement, pos )
+
+        return labels, statement[pos:].strip()
+
+    @staticmethod
+    def dts_scan(dts_content):
+        """
+        Tokenize device tree source in a single pass.
+
+        The source is walked once, comments and preprocessor directives are
+        dropped and the node structure is tracked, producing the nodes and
+        properties in source order. Reference blocks (&label { }) are resolved
+        to the path of the label (or /label if the label isn't known), multi
+        line property values are joined onto a single line.
+
+        The result of the last scan is remembered, so the phandle learning
+        routines (parse_dts_phandles(), analyze_phandle_patterns(),
+        DTSSchemaGenerator.scan_dts_file()) share one pass over the source.
 
         Args:
             dts_content: The device tree source content as a string
 
         Returns:
-            Dictionary structure:
+            Dictionary:
             {
-                "/path/to/node": {
-                    "property_name": [(index_in_property, "&phandle_name", -1), ...]
-                }
+                "events": [ ("node", path, name, labels),
+                            ("prop", path, name, value),
+                            ("end", path, None, None), ... ],
+                "properties": { (path, property name): value, ... },
+                "labels": { label: path, ... }
             }
+            A property value is the raw source text (without the trailing
+            semicolon), or None for an empty (boolean) property.
         """
-        # Remove comments and clean up whitespace
-        cleaned_content = re.sub(r'//.*$', '', dts_content, flags=re.MULTILINE)
-        cleaned_content = re.sub(r'/\*.*?\*/', '', cleaned_content, flags=re.DOTALL)
-
-        result = {}
-        node_stack = []  # Stack to track current node path
-        current_path = ""
-
-        lines = cleaned_content.split('\n')
-        i = 0
-
-        while i < len(lines):
-            line = lines[i].strip()
+        global dts_scan_memo
+        content, scan = dts_scan_memo
+        if content is dts_content or content == dts_content:
+            return scan
+
+        events = []
+        properties = {}
+        labels = {}
+        stack = []
+        segment = []
+        pos = 0
+
+        for m in dts_lexical_re.finditer( dts_content ):
+            token = m.group(0)
+            c = token[0]
+            if c in '"\'':
+                segment.append( dts_content[pos:m.end()] )
+                pos = m.end()
+                continue
 
-            if not line:
-                i += 1
+            segment.append( dts_content[pos:m.start()] )
+            pos = m.end()
+            if c not in '{};':
+                # comment or directive
+                segment.append( " " )
                 continue
 
-            # Check for node definition (name { or label: name { or name@address {)
-            # Handle both labeled and unlabeled nodes
-            node_match = re.match(r'^(?:([a-zA-Z0-9_]+):\s*)?([a-zA-Z0-9_@.-]+)\s*\{', line)
-            if node_match:
-                label = node_match.group(1)  # Optional label (e.g., "amba")
-                node_name = node_match.group(2)  # Node name (e.g., "axi@f1000000")
-
-                # Build the full path
-                if current_path == "" or current_path == "/":
-                    if node_name == "/":
-                        current_path = "/"
+            statement = "".join( segment ).strip()
+            segment = []
+
+            if c == '{':
+                statement_labels, name = lopper_base._dts_labels( statement )
+                if name == '/':
+                    path = '/'
+                elif name.startswith( '&' ):
+                    ref = name[1:]
+                    if ref.startswith( '{' ):
+                        path = ref[1:-1]
                     else:
-                        current_path = "/" + node_name
+                        path = labels.get( ref, '/' + ref )
                 else:
-                    current_path = current_path + "/" + node_name
+                    parent = stack[-1] if stack else '/'
+                    path = parent + name if parent == '/' else parent + '/' + name
+                    events.append( ( "node", path, name, statement_labels ) )
 
-                node_stack.append(current_path)
-                i += 1
-                continue
+                for l in statement_labels:
+                    labels[l] = path
+                stack.append( path )
 
-            # Check for closing brace
-            if line == '}' or line.endswith('};'):
-                if node_stack:
-                    node_stack.pop()
-                    if node_stack:
-                        current_path = node_stack[-1]
-                    else:
-                        current_path = ""
-                i += 1
-                continue
+            elif c == '}':
+                if stack:
+                    events.append( ( "end", stack.pop(), None, None ) )
 
-            # Check for property definitions with phandles
-            # Handle both single-line and multi-line properties
-            prop_match = re.match(r'^([a-zA-Z0-9_,-]+)\s*=\s*(.*)', line)
-            if prop_match and current_path:
-                prop_name = prop_match.group(1)
-                prop_value = prop_match.group(2)
-
-                # Handle multi-line properties
-                if not prop_value.rstrip().endswith(';'):
-                    # Continue reading until we find the semicolon
-                    j = i + 1
-                    while j < len(lines) and not prop_value.rstrip().endswith(';'):
-                        next_line = lines[j].strip()
-                        if next_line:
-                            prop_value += " " + next_line
-                        j += 1
-                    i = j
+            else:
+                # the ; after a node's }, or a top level directive such as
+                # /dts-v1/; or a /delete-node/ within a node
+                if not statement or not stack or statement.startswith( '/' ):
+                    continue
+
+                statement_labels, statement = lopper_base._dts_labels( statement )
+                name, eq, value = statement.partition( '=' )
+                name = name.strip()
+                if eq:
+                    value = dts_continuation_re.sub( ' ', value.strip() )
                 else:
-                    i += 1
+                    value = None
 
-                # Remove the trailing semicolon
-                prop_value = prop_value.rstrip(';').strip()
+                path = stack[-1]
+                properties[(path, name)] = value
+                events.append( ( "prop", path, name, value ) )
 
-                # Find all phandle references in the property value
-                phandle_refs = lopper_base.find_phandles_in_property(prop_value)
+        scan = { "events": events, "properties": properties, "labels": labels }
+        dts_scan_memo = ( dts_content, scan )
 
-                if phandle_refs:
-                    if current_path not in result:
-                        result[current_path] = {}
-                    result[current_path][prop_name] = phandle_refs
-            else:
-                i += 1
+        return scan
+
+    @staticmethod
+    def dts_property_table(dts_content):
+        """
+        Get the properties of device tree source, indexed by node and name.
+
+        Args:
+            dts_content: The device tree source content as a string
+
+        Returns:
+            Dictionary: { (node path, property name): raw value, ... } (see
+            dts_scan() for the value format)
+        """
+        return lopper_base.dts_scan( dts_content )["properties"]
+
+    @staticmethod
+    def parse_dts_phandles(dts_content):
+        """
+        Parse device tree source content and extract phandle references.
+
+        Args:
+            dts_content: The device tree source content as a string
+
+        Returns:
+            Dictionary structure:
+            {
+                "/path/to/node": {
+                    "property_name": [(index_in_property, "&phandle_name", -1), ...]
+                }
+            }
+        """
+        result = {}
+        for (node_path, prop_name), prop_value in lopper_base.dts_property_table( dts_content ).items():
+            if not prop_value or '&' not in prop_value:
+                continue
+
+            # Find all phandle references in the property value
+            phandle_refs = lopper_base.find_phandles_in_property(prop_value)
+            if phandle_refs:
+                if node_path not in result:
+                    result[node_path] = {}
+                result[node_path][prop_name] = phandle_refs
 
         return result
 
@@ -1368,69 +1487,7 @@ class lopper_base:
         Returns:
             String containing the property value or None if not found
         """
-        # Remove comments first
-        cleaned_content = re.sub(r'//.*$', '', dts_content, flags=re.MULTILINE)
-        cleaned_content = re.sub(r'/\*.*?\*/', '', cleaned_content, flags=re.DOTALL)
-
-        lines = cleaned_content.split('\n')
-        in_target_node = False
-        brace_count = 0
-
-        # Extract node name from path for matching
-        node_name = node_path.split('/')[-1] if '/' in node_path else node_path
-        if node_name == '':
-            node_name = '/'
-
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-
-            # Track if we're in the right node
-            if node_name in line and '{' in line:
-                in_target_node = True
-                brace_count = line.count('{') - line.count('}')
-                i += 1
-                continue
-
-            if in_target_node:
-                # Track braces to know when we exit the node
-                brace_count += line.count('{') - line.count('}')
-                if brace_count <= 0:
-                    break
-
-                # Look for the property - handle both single line and start of multi-line
-                prop_pattern = rf'\b{re.escape(prop_name)}\s*='
-                if re.search(prop_pattern, line):
-                    # Found the property, extract its value
-                    value_parts = []
-
-                    # Get the part after the = sign
-                    equals_pos = line.find('=')
-                    if equals_pos != -1:
-                        value_part = line[equals_pos + 1:].strip()
-                        value_parts.append(value_part)
-
-                        # If it doesn't end with semicolon, it's multi-line
-                        if not value_part.rstrip().endswith(';'):
-                            # Continue reading until semicolon
-                            i += 1
-                            while i < len(lines):
-                                next_line = lines[i].strip()
-                                value_parts.append(next_line)
-                                if next_line.rstrip().endswith(';'):
-                                    break
-                                i += 1
-
-                    # Join all parts and clean up
-                    full_value = ' '.join(value_parts)
-                    if full_value.endswith(';'):
-                        full_value = full_value[:-1].strip()
-
-                    return full_value
-
-            i += 1
-
-        return None
+        return lopper_base.dts_property_table( dts_content ).get( (node_path, prop_name) )
 
     @staticmethod
     def _analyze_property_pattern(prop_value, phandle_refs):
@@ -1608,6 +1665,7 @@ class lopper_base:
         """
         # Parse the DTS to get phandle references
         phandle_map = lopper_base.parse_dts_phandles(dts_content)
+        property_values = lopper_base.dts_property_table(dts_content)
 
         # Dictionary to collect patterns for each property
         property_patterns = {}
@@ -1619,7 +1677,7 @@ class lopper_base:
                     property_patterns[prop_name] = []
 
                 # Get the full property value to analyze the pattern
-                prop_value = lopper_base._extract_property_value(dts_content, node_path, prop_name)
+                prop_value = property_values.get((node_path, prop_name))
                 if prop_value:
                     pattern = lopper_base._analyze_property_pattern(prop_value, phandle_refs)
                     if pattern:
@@ -10,7 +10,6 @@
 import struct
 import sys
 import types
-import unittest
 import os
 import getopt
 import re
@@ -37,6 +36,7 @@ from lopper.fmt import LopperFmt
 
 import lopper.base
 import lopper.log
+import lopper.timings
 
 lopper.log._init( __name__ )
 lopper.log._init( "dt.py" )
@@ -177,6 +177,7 @@ class LopperDT(lopper.base.lopper_base):
         return matching_node, matching_nodes
 
     @staticmethod
+    @lopper.timings.timed( "dt export", "tree" )
     def export( dt, start_node_path = "/", verbose = False, strict = False ):
         """export a FDT to a description / nested dictionary
 
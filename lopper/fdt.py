@@ -10,7 +10,6 @@
 import struct
 import sys
 import types
-import unittest
 import os
 import getopt
 import re
@@ -32,6 +31,8 @@ from collections import OrderedDict
 from lopper.fmt import LopperFmt
 import lopper.base
 import lopper.log
+import lopper.timings
+import lopper.treesource
 from lopper.base import lopper_base
 from lopper.tree import LopperTreePrinter
 
@@ -831,6 +832,7 @@ class LopperFDT(lopper.base.lopper_base):
             LopperFDT.node_sync( fdt, node_in, node_in_parent, verbose )
 
     @staticmethod
+    @lopper.timings.timed( "fdt export", "tree" )
     def export( fdt, start_node = "/", verbose = False, strict = False, schema = None ):
         """export a FDT to a description / nested dictionary
 
@@ -867,34 +869,12 @@ class LopperFDT(lopper.base.lopper_base):
         Returns:
             OrderedDict describing the tree
         """
-        # export a FDT as a dictionary
-        dct = OrderedDict()
-
-        nodes = LopperFDT.node_subnodes( fdt, start_node )
-
-        if strict:
-            if len(nodes) != len(set(nodes)):
-                raise Exception( f"lopper.fdt: duplicate node detected ({nodes})" )
-
-        dct["__path__"] = start_node
-
-        np = LopperFDT.node_properties_as_dict( fdt, start_node, schema=schema )
-        if np:
-            dct.update(np)
-
+        # the start node is the only one looked up by path. Path (and
+        # parent) lookups scan the flattened tree from the beginning, so
+        # the subnodes are walked by offset, with their paths built as we
+        # descend.
         nn = LopperFDT.node_number( fdt, start_node )
-        dct["__fdt_number__"] = nn
-        dct["__fdt_name__"] = LopperFDT.node_getname( fdt, start_node )
-        dct["__fdt_phandle__"] = LopperFDT.node_getphandle( fdt, nn )
-
-        lopper.log._debug( "export: start" )
-        lopper.log._debug( f"export: startnode {start_node} subnodes {nodes}" )
-        lopper.log._debug( f"export: properties {np}" )
-
-        for i,n in enumerate(nodes):
-            # Children are indexed by their path (/foo/bar), since properties
-            # cannot start with '/'
-            dct[n] = LopperFDT.export( fdt, n, verbose, strict, schema=schema )
+        dct = LopperFDT._export_node( fdt, nn, start_node, strict, schema )
 
         # only when processing the root node, we look to see if there
         # was a peer /memreserve node. if found, we add it to the exported
@@ -925,6 +905,59 @@ class LopperFDT(lopper.base.lopper_base):
 
         return dct
 
+    @staticmethod
+    def _export_node( fdt, node_number, node_path, strict = False, schema = None ):
+        """export a FDT node (and its subnodes) to a nested dictionary
+
+        Args:
+            fdt (fdt): flattened device tree object
+            node_number (int): offset of the node
+            node_path (string): absolute path of the node
+            strict (bool,optional): toggle validity checking
+            schema (optional): see export()
+
+        Returns:
+            OrderedDict describing the node, see export()
+        """
+        dct = OrderedDict()
+
+        subnodes = []
+        offset = fdt.first_subnode( node_number, QUIET_NOTFOUND ) if node_number >= 0 else -1
+        while offset > 0:
+            subnodes.append( offset )
+            offset = fdt.next_subnode( offset, QUIET_NOTFOUND )
+
+        prefix = node_path if node_path != "/" else ""
+        nodes = [ f"{prefix}/{fdt.get_name( o )}" for o in subnodes ]
+
+        if strict:
+            if len(nodes) != len(set(nodes)):
+                raise Exception( f"lopper.fdt: duplicate node detected ({nodes})" )
+
+        dct["__path__"] = node_path
+
+        np = LopperFDT._node_properties_dict( fdt, node_number, node_path, schema=schema )
+        if np:
+            dct.update(np)
+
+        dct["__fdt_number__"] = node_number
+        try:
+            dct["__fdt_name__"] = fdt.get_name( node_number )
+        except:
+            dct["__fdt_name__"] = ""
+        dct["__fdt_phandle__"] = LopperFDT.node_getphandle( fdt, node_number )
+
+        lopper.log._debug( "export: start" )
+        lopper.log._debug( f"export: startnode {node_path} subnodes {nodes}" )
+        lopper.log._debug( f"export: properties {np}" )
+
+        for o, n in zip( subnodes, nodes ):
+            # Children are indexed by their path (/foo/bar), since properties
+            # cannot start with '/'
+            dct[n] = LopperFDT._export_node( fdt, o, n, strict, schema )
+
+        return dct
+
     @staticmethod
     def node_properties_as_dict( fdt, node, type_hints=True, verbose=0, schema=None ):
         """Create a dictionary populated with the nodes properties.
@@ -943,8 +976,6 @@ class LopperFDT(lopper.base.lopper_base):
         Returns:
             dict: dictionary of the properties, if successfull, otherwise and empty dict
         """
-        prop_dict = {}
-
         # is the node a number ? or do we need to look it up ?
         node_number = -1
         node_path = ""
@@ -955,6 +986,24 @@ class LopperFDT(lopper.base.lopper_base):
             node_number = LopperFDT.node_find( fdt, node )
             node_path = node
 
+        return LopperFDT._node_properties_dict( fdt, node_number, node_path, type_hints, schema )
+
+    @staticmethod
+    def _node_properties_dict( fdt, node_number, node_path, type_hints=True, schema=None ):
+        """node_properties_as_dict() for a node that has been looked up
+
+        Args:
+            fdt (fdt): flattened device tree object
+            node_number (int): node offset, -1 if it wasn't found
+            node_path (string): absolute path of the node
+            type_hints  (bool,optional): flag indicating if type hints should be returned
+            schema (optional): see node_properties_as_dict()
+
+        Returns:
+            dict: dictionary of the properties, if successfull, otherwise and empty dict
+        """
+        prop_dict = {}
+
         if node_number == -1:
             lopper.log._warning( f"could not find node {node_path}" )
             return prop_dict
@@ -963,7 +1012,7 @@ class LopperFDT(lopper.base.lopper_base):
         if schema:
             resolver = lopper.schema.get_schema_manager().get_resolver()
 
-        prop_list = LopperFDT.node_properties( fdt, node_path )
+        prop_list = LopperFDT.node_properties( fdt, node_number )
         for p in prop_list:
             if resolver:
                 fmt_type = resolver.get_property_type(p.name, node_path)
@@ -983,10 +1032,13 @@ class LopperFDT(lopper.base.lopper_base):
                 fmt_type = LopperFmt.UNKNOWN
                 dtype = LopperFDT.property_type_guess( p )
 
-            property_val = LopperFDT.property_get( fdt, node_number, p.name,
-                                                   LopperFmt.COMPOUND,
-                                                   encode=fmt_type,
-                                                   schema=schema )
+            # decoded from the property we already have, as property_get()
+            # would after looking it up again by name (which scans the
+            # node's properties, and is quadratic on nodes like __symbols__)
+            try:
+                property_val = LopperFDT.property_value_decode( p, 0, LopperFmt.COMPOUND, fmt_type )
+            except Exception as e:
+                property_val = ""
 
             lopper.log._debug( f"node_properties_as_dict: fetched property with hint was: {property_val}")
 
@@ -1275,6 +1327,11 @@ class LopperFDT(lopper.base.lopper_base):
         modules are queried for compatibility. If there is a compatible assist,
         it is called to write the file, otherwise, a warning or error is raised.
 
+        Unless enhanced printing is requested, a .dts is written in process
+        by lopper.treesource, with the same output as dtc. Set the
+        LOPPER_DTS_EXPORT environment variable to "dtc" to run dtc (with
+        the LOPPER_DTC* flags) instead.
+
         Args:
             fdt_to_write (fdt): source flattened device tree to write
             output_filename (string): name of the output file to create
@@ -1316,17 +1373,28 @@ class LopperFDT(lopper.base.lopper_base):
                 printer = LopperTreePrinter( True, output_filename, verbose )
                 printer.load( LopperFDT.export( fdt_to_write ) )
                 printer.exec()
-            else:
-                # write the device tree to a temporary dtb
-                fp = tempfile.NamedTemporaryFile()
-                byte_array = fdt_to_write.as_bytearray()
-                with open(fp.name, 'wb') as w:
-                    w.write(byte_array)
+                return
 
-                LopperFDT.dtb_dts_export( fp.name, output_filename )
+            if os.environ.get( "LOPPER_DTS_EXPORT" ) != "dtc":
+                try:
+                    source = lopper.treesource.source( fdt_to_write.as_bytearray() )
+                except ValueError as e:
+                    lopper.log._warning( f"write_fdt: cannot write dts in process, using dtc: {e}" )
+                else:
+                    with open( output_filename, 'w' ) as w:
+                        w.write( source )
+                    return
+
+            # write the device tree to a temporary dtb, and dump it with dtc
+            fp = tempfile.NamedTemporaryFile()
+            byte_array = fdt_to_write.as_bytearray()
+            with open(fp.name, 'wb') as w:
+                w.write(byte_array)
 
-                # close the temp file so it is removed
-                fp.close()
+            LopperFDT.dtb_dts_export( fp.name, output_filename )
+
+            # close the temp file so it is removed
+            fp.close()
         else:
             lopper.log._info( f"write_fdt: unknown file type ({output_filename}); skipping" )
 
@@ -1342,7 +1410,7 @@ class LopperFDT(lopper.base.lopper_base):
         Returns:
            The return value of executing dtc to dump the dtb to dts
         """
-        dtcargs = (os.environ.get('LOPPER_DTC') or shutil.which("dtc")).split()
+        dtcargs = (os.environ.get('LOPPER_DTC') or lopper_base.which("dtc")).split()
         dtcargs += (os.environ.get("LOPPER_DTC_FLAGS") or "").split()
         dtcargs += (os.environ.get("LOPPER_DTC_BFLAGS") or "").split()
         if outfilename:
@@ -1351,7 +1419,8 @@ class LopperFDT(lopper.base.lopper_base):
 
         lopper.log._info( f"dtb_dts_export: dumping dtb with args {dtcargs}" )
 
-        result = subprocess.run(dtcargs, check = False, stderr=subprocess.PIPE )
+        with lopper.timings.span( "dtc", "phase", file=dtb ):
+            result = subprocess.run(dtcargs, check = False, stderr=subprocess.PIPE )
         if result.returncode != 0:
             lopper.log._error( "dtb_dts_export: unable to export dts" )
             lopper.log._error( f"\n{textwrap.indent(result.stderr.decode(), '         ')}" )
@@ -1896,7 +1965,7 @@ class LopperFDT(lopper.base.lopper_base):
                 sys.exit(1)
             os.remove( output_dtb )
 
-        dtcargs = (os.environ.get('LOPPER_DTC') or shutil.which("dtc")).split()
+        dtcargs = (os.environ.get('LOPPER_DTC') or lopper_base.which("dtc")).split()
         dtcargs += (os.environ.get( 'LOPPER_DTC_FLAGS') or "").split()
         if isoverlay:
             dtcargs += (os.environ.get("LOPPER_DTC_OFLAGS") or "").split()
@@ -1911,13 +1980,15 @@ class LopperFDT(lopper.base.lopper_base):
         dtcargs += ["-I", "dts", "-O", "dtb", preprocessed_name ]
         lopper.log._info( f"dt_compile: compiling dtb with args {dtcargs}" )
 
-        result = subprocess.run(dtcargs, check = False, stderr=subprocess.PIPE )
+        with lopper.timings.span( "dtc", "phase", file=dts_file ):
+            result = subprocess.run(dtcargs, check = False, stderr=subprocess.PIPE )
         if result.returncode != 0:
             # force the dtb, we need to do processing
             dtcargs += [ "-f" ]
             lopper.log._info( f"dt_compile: forcing dtb generation with args {dtcargs}" )
 
-            result = subprocess.run(dtcargs, check = False, stderr=subprocess.PIPE )
+            with lopper.timings.span( "dtc", "phase", file=dts_file, forced=True ):
+                result = subprocess.run(dtcargs, check = False, stderr=subprocess.PIPE )
             if result.returncode != 0:
                 lopper.log._error( f"dt_compile: unable to compile with args {dtcargs}" )
                 lopper.log._error( f"\n{textwrap.indent(result.stderr.decode(), '         ')}" )
@@ -0,0 +1,200 @@
+#/*
+# * Copyright (C) 2026 Advanced Micro Devices, Inc. All Rights Reserved.
+# *
+# * SPDX-License-Identifier: BSD-3-Clause
+# */
+
+"""
+Lopper intervals
+
+A sorted set of half-open address intervals, [ start, start + size ), for
+memory range checks (carveouts, reserved-memory, SRAM and linker regions)
+that would otherwise compare every range with every other one.
+
+ - overlaps(), containing() and matching() find the intervals that overlap
+   a range, contain an address or exactly match a range with bisects,
+   rather than a scan of every interval
+ - allocate() is a first fit or best fit search for a free, aligned range
+   between the intervals, which it then adds to the set
+
+Overlap uses the same arithmetic as the pairwise checks it replaces
+( start1 < end2 and start2 < end1 ), so a zero sized interval overlaps an
+interval that it lies strictly inside.
+"""
+
+import bisect
+
+
+class IntervalSet:
+    """Sorted set of half-open intervals
+
+    Each interval carries an item (anything the caller wants back from a
+    query, for example a node or an index). Queries return items in address
+    order, intervals with the same start in the order they were added.
+
+    Attributes:
+       - _keys: ( start, sequence ), ascending. sequence is the order the
+                interval was added in.
+       - _starts: interval starts, in _keys order
+       - _entries: ( start, end, item ), in _keys order
+       - _max_end: running maximum of the interval ends, in _keys order. It
+                   never decreases, so the first interval that can reach an
+                   address is found with a bisect.
+
+    """
+    def __init__( self, intervals = () ):
+        """Build a set of intervals
+
+        Args:
+           intervals (iterable,optional): ( start, size ) or ( start, size, item )
+                                          tuples. The set is sorted once.
+        """
+        entries = []
+        for seq, i in enumerate( intervals ):
+            start, size = i[0], i[1]
+            item = i[2] if len( i ) > 2 else None
+            entries.append( ( ( start, seq ), ( start, start + size, item ) ) )
+        entries.sort( key = lambda e: e[0] )
+
+        self._keys = [ k for k, _ in entries ]
+        self._entries = [ e for _, e in entries ]
+        self._starts = [ k[0] for k in self._keys ]
+        self._seq = len( entries )
+        self._max_end = []
+        self._update_max_end( 0 )
+
+    def _update_max_end( self, index ):
+        del self._max_end[index:]
+        m = self._max_end[-1] if self._max_end else None
+        for _, end, _ in self._entries[index:]:
+            m = end if m is None or end > m else m
+            self._max_end.append( m )
+
+    def add( self, start, size, item = None ):
+        """Add an interval
+
+        Args:
+           start (int): first address of the interval
+           size (int): size of the interval
+           item (optional): returned by queries that find the interval
+
+        Returns:
+           Nothing
+        """
+        key = ( start, self._seq )
+        self._seq += 1
+        i = bisect.bisect_right( self._keys, key )
+        self._keys.insert( i, key )
+        self._starts.insert( i, start )
+        self._entries.insert( i, ( start, start + size, item ) )
+        self._update_max_end( i )
+
+    def _reaching( self, address ):
+        """Index of the first interval whose end may be past address"""
+        return bisect.bisect_right( self._max_end, address )
+
+    def overlaps( self, start, size ):
+        """Return the items of the intervals that overlap a range
+
+        Args:
+           start (int): first address of the range
+           size (int): size of the range
+
+        Returns:
+           list: items, in address order
+        """
+        end = start + size
+        hi = bisect.bisect_left( self._starts, end )
+        return [ e[2] for e in self._entries[self._reaching( start ):hi] if e[1] > start ]
+
+    def containing( self, address ):
+        """Return the items of the intervals that contain an address
+
+        Args:
+           address (int): address to look up
+
+        Returns:
+           list: items, in address order
+        """
+        hi = bisect.bisect_right( self._starts, address )
+        return [ e[2] for e in self._entries[self._reaching( address ):hi] if e[1] > address ]
+
+    def matching( self, start, size ):
+        """Return the items of the intervals that are exactly a range
+
+        Args:
+           start (int): first address of the range
+           size (int): size of the range
+
+        Returns:
+           list: items, in the order the intervals were added
+        """
+        lo = bisect.bisect_left( self._starts, start )
+        hi = bisect.bisect_right( self._starts, start )
+        return [ e[2] for e in self._entries[lo:hi] if e[1] == start + size ]
+
+    def allocate( self, size, align = 1, start = 0, end = None, fit = "first", item = None ):
+        """Find a free range between the intervals, and add it
+
+        Args:
+           size (int): size of the range to allocate
+           align (int,optional): alignment of the range's start
+           start (int,optional): lowest address the range can start at
+           end (int,optional): address the range must end by, default is
+                               no limit
+           fit (string,optional): "first": the lowest free range that fits
+                                  "best": a range in the smallest free gap
+                                  that fits (the lowest, if several do)
+           item (optional): item of the interval that is added
+
+        Returns:
+           int: start of the allocated range, or None if there is no free
+                range that fits
+        """
+        if fit not in ( "first", "best" ):
+            raise ValueError( f"unknown allocation fit: {fit}" )
+
+        def aligned( address ):
+            return -( -address // align ) * align
+
+        best = None
+        cursor = start
+        for s, e, _ in self._entries[self._reaching( start ):]:
+            if e <= s:
+                # zero sized intervals don't occupy anything
+                continue
+            if end is not None and s >= end:
+                break
+            if s > cursor:
+                gap_end = s if end is None else min( s, end )
+                a = aligned( cursor )
+                if a + size <= gap_end:
+                    if fit == "first":
+                        best = ( a, 0 )
+                        break
+                    gap = gap_end - cursor
+                    if best is None or gap < best[1]:
+                        best = ( a, gap )
+            cursor = max( cursor, e )
+
+        if best is None or fit == "best":
+            # the free space after the last interval
+            a = aligned( cursor )
+            if end is None or a + size <= end:
+                gap = None if end is None else end - cursor
+                if best is None or ( gap is not None and gap < best[1] ):
+                    best = ( a, gap )
+
+        if best is None:
+            return None
+
+        self.add( best[0], size, item )
+        return best[0]
+
+    def __len__( self ):
+        return len( self._entries )
+
+    def __iter__( self ):
+        """Iterate ( start, size, item ), in address order"""
+        for s, e, item in self._entries:
+            yield ( s, e - s, item )
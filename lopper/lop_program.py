@@ -0,0 +1,644 @@
+#/*
+# * Copyright (C) 2026 Advanced Micro Devices, Inc. All Rights Reserved.
+# *
+# * SPDX-License-Identifier: BSD-3-Clause
+# */
+
+"""Compiled lopper operation (lop) programs.
+
+A lop file is compiled once into a :class:`LopProgram`: the exported lop
+tree, plus the python code objects of every ``lop,code`` / ``lop,xlate``
+block it contains. Programs are stored in an on-disk cache keyed by the
+content of the lop file (and everything it includes, at any depth), so a
+repeated run skips dtc and the dtb export of its lop files entirely.
+
+At execution time each lop node is turned into a :class:`LopOp` once: the
+handler it dispatches to, its parsed ``options`` and ``select`` specs and
+its code object. ``LopperSDT.exec_lop()`` consults the op rather than
+re-matching the compatible string and re-parsing the node, which matters
+for lops that are run many times (exec chains, conditional true/false
+blocks and per-node xlate loops).
+
+Environment:
+
+   LOPPER_CACHE_DIR: directory for cached programs, and the assists'
+                     parsed yaml. Defaults to $XDG_CACHE_HOME/lopper (or
+                     ~/.cache/lopper). Set it to "none" to disable the
+                     on-disk cache.
+
+The cache looks after itself: entries that have not been used for
+CACHE_MAX_AGE are removed, as are the least recently used entries once a
+cache directory grows past CACHE_MAX_SIZE (see prune_cache()). Removing
+the directory by hand is always safe, anything missing is rebuilt.
+"""
+
+import importlib.util
+import marshal
+import os
+import pickle
+import re
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+import lopper.log
+
+lopper.log._init(__name__)
+
+# bump when the layout of a stored program changes
+_PROGRAM_FORMAT = 1
+
+# exec_lop() handlers, in the order they have always been tested. The
+# first pattern that matches a lop's compatible string selects the handler.
+_LOP_DISPATCH = [
+    ( "exec", re.compile( r".*,exec.*$" ) ),
+    ( "print", re.compile( r".*,print.*$" ) ),
+    ( "select", re.compile( r".*,select.*$" ) ),
+    ( "meta", re.compile( r".*,meta.*$" ) ),
+    ( "output", re.compile( r".*,output$" ) ),
+    ( "tree", re.compile( r".*,tree$" ) ),
+    ( "assist", re.compile( r".*,assist-v1$" ) ),
+    ( "load", re.compile( r".*,lop,load$" ) ),
+    ( "add", re.compile( r".*,lop,add$" ) ),
+    ( "conditional", re.compile( r".*,lop,conditional.*$" ) ),
+    ( "code", re.compile( r".*,lop,code.*$" ) ),
+    ( "xlate", re.compile( r".*,lop,xlate.*$" ) ),
+    ( "modify", re.compile( r".*,lop,modify$" ) ),
+]
+
+# cpp "#include" and dtc "/include/" directives. name is None for an
+# include that is not a quoted or <> name (e.g. a macro)
+_include_regex = re.compile( r'(?:^[ \t]*#[ \t]*include\b|/include/)[ \t]*(?:[<"](?P<name>[^>"\n]*)[>"])?',
+                             re.MULTILINE )
+
+# compatible string -> handler name
+_dispatch_memo = {}
+# code block text -> compiled code object
+_code_memo = {}
+# (module list, load paths) -> compiled import prologue
+_prologue_memo = {}
+
+
+def lop_kind( lop_type ):
+    """Return the exec_lop() handler name for a lop compatible string
+
+    Args:
+        lop_type (string): the first entry of a lop's compatible property
+
+    Returns:
+        string: handler name (i.e. "select", "code"), or "" if no handler
+                matches the compatible string
+    """
+    try:
+        return _dispatch_memo[lop_type]
+    except KeyError:
+        pass
+
+    kind = ""
+    for name, regex in _LOP_DISPATCH:
+        if regex.search( lop_type ):
+            kind = name
+            break
+
+    _dispatch_memo[lop_type] = kind
+    return kind
+
+
+def code_block( cmd ):
+    """Return the compiled form of a lop code block
+
+    The block is wrapped in a function (so it can "return" a value) and
+    compiled. Results are memoized on the block text, so a code block is
+    compiled at most once per process, no matter how many nodes it is
+    run against.
+
+    Args:
+        cmd (string): the python code block
+
+    Returns:
+        code: code object that defines and calls the block, leaving the
+              return value in '__nret'
+    """
+    try:
+        return _code_memo[cmd]
+    except KeyError:
+        pass
+
+    code = compile( code_block_text( cmd ), '<string>', 'exec' )
+    _code_memo[cmd] = code
+
+    return code
+
+
+def code_block_text( cmd ):
+    """Return the wrapped source that code_block() compiles
+
+    Args:
+        cmd (string): the python code block
+
+    Returns:
+        string: the block, indented into a function and called
+    """
+    # indent everything, its going in a function. define the function, add
+    # the body, call the function and grab the return value
+    return "def __node_test_block():\n" + textwrap.indent( cmd, '    ' ) + "\n__nret = __node_test_block()"
+
+
+def prologue_text( module_list, module_load_paths ):
+    """Return the module import prologue for a code block
+
+    Args:
+        module_list (list): assists to import into the block's namespace
+        module_load_paths (list): extra paths to put on sys.path
+
+    Returns:
+        string: python source of the prologue, "" if there is nothing to import
+    """
+    if not module_list:
+        return ""
+
+    mod_load = "assist_dir = os.path.dirname(os.path.realpath(__file__)) + '/assists/'\n"
+    mod_load += "if assist_dir not in sys.path: sys.path.append(assist_dir)\n"
+    for m in module_load_paths:
+        mod_load += f"if '{m}' not in sys.path: sys.path.append('{m}')\n"
+    mod_load += "import importlib\n"
+
+    for m in module_list:
+        mod_load += f"{m} = importlib.import_module( '.{m}', package='lopper.assists' )\n"
+
+    return mod_load
+
+
+def prologue_block( module_list, module_load_paths ):
+    """Return the compiled module import prologue for a code block
+
+    Args:
+        module_list (list): assists to import into the block's namespace
+        module_load_paths (list): extra paths to put on sys.path
+
+    Returns:
+        code: compiled prologue, or None if there is nothing to import
+    """
+    key = ( tuple(module_list), tuple(module_load_paths) )
+    try:
+        return _prologue_memo[key]
+    except KeyError:
+        pass
+
+    text = prologue_text( module_list, module_load_paths )
+    code = compile( text, '<string>', 'exec' ) if text else None
+    _prologue_memo[key] = code
+
+    return code
+
+
+def cache_dir( name = "lops" ):
+    """Return the directory that compiled lop programs are stored in
+
+    Other on-disk caches (see common_utils.load_yaml()) are kept in their
+    own directory alongside it.
+
+    Args:
+        name (string): the cache's directory name
+
+    Returns:
+        Path: the cache directory, or None if caching is disabled
+    """
+    base = os.environ.get( 'LOPPER_CACHE_DIR' )
+    if base is not None:
+        if base.lower() in ( "", "none", "0" ):
+            return None
+        return Path( base ) / name
+
+    xdg = os.environ.get( 'XDG_CACHE_HOME' ) or os.path.join( os.path.expanduser( "~" ), ".cache" )
+    return Path( xdg ) / "lopper" / name
+
+
+# cache entries unused for this long (seconds) are removed
+CACHE_MAX_AGE = 30 * 24 * 60 * 60
+# a cache directory is trimmed back below this many bytes
+CACHE_MAX_SIZE = 256 * 1024 * 1024
+
+# cache directories already pruned by this process
+_pruned = set()
+
+def touch_cache_entry( path ):
+    """Mark a cache entry as used, so prune_cache() keeps it
+
+    Args:
+        path (Path): the cache entry
+
+    Returns:
+        Nothing
+    """
+    try:
+        os.utime( path )
+    except OSError:
+        pass
+
+
+def prune_cache( cdir, max_age = None, max_size = None ):
+    """Evict old entries from a cache directory
+
+    Entries (and abandoned temporary files) that have not been used for
+    max_age seconds are removed, then the least recently used entries are
+    removed until the directory holds no more than max_size bytes. A
+    directory is only pruned once per process, failures are ignored.
+
+    Args:
+        cdir (Path): cache directory (see cache_dir())
+        max_age (int,optional): seconds, defaults to CACHE_MAX_AGE
+        max_size (int,optional): bytes, defaults to CACHE_MAX_SIZE
+
+    Returns:
+        int: the number of entries removed
+    """
+    if not cdir or cdir in _pruned:
+        return 0
+    _pruned.add( cdir )
+
+    if max_age is None:
+        max_age = CACHE_MAX_AGE
+    if max_size is None:
+        max_size = CACHE_MAX_SIZE
+
+    import time
+
+    entries = []
+    try:
+        with os.scandir( cdir ) as it:
+            for e in it:
+                if e.name.endswith( ( ".pickle", ".tmp" ) ) and e.is_file():
+                    st = e.stat()
+                    entries.append( ( st.st_mtime, st.st_size, e.path ) )
+    except OSError:
+        return 0
+
+    # most recently used first
+    entries.sort( reverse = True )
+    cutoff = time.time() - max_age
+    removed = 0
+    total = 0
+    for mtime, size, path in entries:
+        total += size
+        if mtime >= cutoff and total <= max_size:
+            continue
+        try:
+            os.remove( path )
+            removed += 1
+        except OSError:
+            pass
+
+    return removed
+
+
+def _include_search( lop_file, include_paths ):
+    """Return the directories a lop file's includes can be found in
+
+    This is every directory cpp (or pcpp) and dtc search when the lop file
+    is compiled (see dt_preprocess() and dt_compile()): the include paths
+    and any -I in LOPPER_PPFLAGS, cpp's "include", the current directory
+    and the lop file's own directory. The including file's directory is
+    searched as well, see _include_closure().
+    """
+    search = include_paths.split()
+    search += [ f[2:] for f in ( os.environ.get( 'LOPPER_PPFLAGS' ) or "" ).split()
+                if f.startswith( "-I" ) and len( f ) > 2 ]
+    search += [ "include", os.getcwd(), str(Path( lop_file ).parent) ]
+
+    return list( dict.fromkeys( search ) )
+
+
+def _include_closure( lop_file, include_paths, h ):
+    """Hash the files a lop file includes, and the files they include
+
+    Both cpp "#include" and dtc "/include/" directives are followed, at
+    any depth. Rather than resolve each include the way cpp or dtc would
+    (their search orders differ, and depend on the preprocessor in use),
+    every file that an include could resolve to is hashed, along with its
+    path. So editing, adding or removing any candidate changes the hash.
+    Conditionals are not evaluated, an include that is skipped by #if is
+    still hashed.
+
+    Args:
+        lop_file (string): path to the lop source
+        include_paths (string): space separated include search paths
+        h (hashlib hash): hash to update
+
+    Returns:
+        bool: False if an include can't be followed (one whose name comes
+              from a macro), so the program can't be cached
+    """
+    search = _include_search( lop_file, include_paths )
+    seen = set()
+    pending = [ lop_file ]
+    while pending:
+        f = pending.pop()
+        try:
+            with open( f, 'rb' ) as fp:
+                data = fp.read()
+        except OSError:
+            continue
+
+        text = data.decode( 'utf-8', errors = 'replace' )
+        for m in _include_regex.finditer( text ):
+            inc = m.group( 'name' )
+            if inc is None:
+                return False
+
+            h.update( f"include {inc}\0".encode() )
+            for d in [ os.path.dirname( f ) ] + search:
+                candidate = os.path.normpath( os.path.join( d, inc ) )
+                if not os.path.isfile( candidate ):
+                    continue
+                h.update( f"{candidate}\0".encode() )
+                real = os.path.realpath( candidate )
+                if real not in seen:
+                    seen.add( real )
+                    try:
+                        with open( candidate, 'rb' ) as fp:
+                            h.update( fp.read() )
+                    except OSError:
+                        pass
+                    h.update( b"\0" )
+                    pending.append( candidate )
+
+    return True
+
+
+def program_key( lop_file, include_paths = "", libfdt = True ):
+    """Return the cache key for a lop file
+
+    The key covers the lop file's content, the content of every file it
+    (or an included file) could include, the dtc environment and the
+    lopper and python versions, so any change that could alter the
+    compiled program misses the cache.
+
+    Args:
+        lop_file (string): path to the lop source
+        include_paths (string): space separated include search paths
+        libfdt (bool): whether the program is compiled with libfdt/dtc
+
+    Returns:
+        string: hex digest, or "" if the lop file cannot be read or
+                its includes can't be followed
+    """
+    import hashlib
+
+    h = hashlib.sha256()
+    h.update( f"{_PROGRAM_FORMAT}:{sys.version}:{importlib.util.MAGIC_NUMBER.hex()}:{libfdt}".encode() )
+    try:
+        with open( Path( __file__ ).parent / 'VERSION', 'rb' ) as f:
+            h.update( f.read() )
+    except Exception:
+        pass
+
+    for env in ( 'LOPPER_CPP', 'LOPPER_PPFLAGS', 'LOPPER_DTC', 'LOPPER_DTC_FLAGS', 'LOPPER_DTC_BFLAGS' ):
+        h.update( f"{env}={os.environ.get( env, '' )}\0".encode() )
+
+    try:
+        with open( lop_file, 'rb' ) as fp:
+            h.update( fp.read() )
+        h.update( b"\0" )
+    except Exception:
+        return ""
+
+    if not _include_closure( lop_file, include_paths, h ):
+        return ""
+
+    return h.hexdigest()
+
+
+class LopOp:
+    """The pre-dispatched form of a single lop node
+
+    Attributes:
+       - node (LopperNode): the lop node
+       - lop_type (string): first compatible string of the node
+       - lop_args (string): second compatible string (the lop "subtype")
+       - kind (string): the exec_lop() handler for the node
+    """
+    def __init__( self, node ):
+        self.node = node
+        try:
+            self.lop_type = node['compatible'].value[0]
+        except Exception:
+            self.lop_type = ""
+        try:
+            self.lop_args = node['compatible'].value[1]
+        except Exception:
+            self.lop_args = ""
+
+        self.kind = lop_kind( self.lop_type )
+
+        self._options = None
+        self._selects = None
+
+    @property
+    def options( self ):
+        """The 'options' property of the lop, split into (key,value) pairs
+
+        The options are split on first use and kept. Raises ValueError for
+        a malformed option, exactly as the inline parsing in exec_lop()
+        always has.
+        """
+        if self._options is None:
+            try:
+                options_spec = self.node['options'].value
+            except Exception:
+                options_spec = ""
+
+            pairs = []
+            if options_spec:
+                for o in options_spec:
+                    opt_key,opt_val = o.split(":")
+                    pairs.append( (opt_key, opt_val) )
+            self._options = pairs
+
+        return self._options
+
+    @property
+    def selects( self ):
+        """The select.* properties of a select lop, pre-split
+
+        Returns:
+            list of (LopperProp, list of (node_regex, prop, prop_val)) tuples
+        """
+        if self._selects is None:
+            self._selects = []
+            for sel in self.node.props( 'select.*' ):
+                specs = []
+                for s in sel.value:
+                    try:
+                        node_regex, prop, prop_val = s.split(":")
+                    except Exception:
+                        node_regex = s
+                        prop = ""
+                        prop_val = ""
+                    specs.append( (node_regex, prop, prop_val) )
+                self._selects.append( (sel, specs) )
+
+        return self._selects
+
+
+class LopProgram:
+    """A compiled lop file (or generated lop tree)
+
+    Holds the exported description of a lop tree, and the compiled code
+    blocks it contains. A program can be stored to, and loaded from, the
+    on-disk cache.
+
+    Attributes:
+       - key (string): the cache key of the program ("" if not cacheable)
+       - dct (dict): exported lop tree description
+       - code (dict): code block text -> code object
+    """
+    def __init__( self, key = "", dct = None ):
+        self.key = key
+        self.dct = dct
+        self.code = {}
+        self.__ops__ = {}
+
+    @staticmethod
+    def for_tree( lops_tree ):
+        """Return the program attached to a lops tree, creating it if needed
+
+        Args:
+            lops_tree (LopperTree): tree containing lop nodes
+
+        Returns:
+            LopProgram
+        """
+        try:
+            return lops_tree._metadata['lop_program']
+        except KeyError:
+            program = LopProgram()
+            lops_tree._metadata['lop_program'] = program
+            return program
+
+    def op( self, lop_node ):
+        """Return the LopOp for a lop node, building it on first use
+
+        Args:
+            lop_node (LopperNode): the lop node
+
+        Returns:
+            LopOp
+        """
+        op = self.__ops__.get( lop_node.abs_path )
+        if op is None or op.node is not lop_node:
+            op = LopOp( lop_node )
+            self.__ops__[lop_node.abs_path] = op
+
+        return op
+
+    def compile_code( self ):
+        """Compile every code block in the program's lop tree
+
+        Walks the exported description and compiles the 'code' property of
+        all code/xlate lops, so the stored program carries them.
+        """
+        def _walk( d ):
+            compat = d.get( 'compatible' ) or []
+            if compat and lop_kind( compat[0] ) in ( "code", "xlate" ):
+                code = d.get( 'code' )
+                if code:
+                    try:
+                        self.code[code[0]] = code_block( code[0] )
+                    except SyntaxError as e:
+                        # reported (and fatal) when the lop runs
+                        lopper.log._debug( f"lop program: code block does not compile: {e}" )
+            for k, v in d.items():
+                if k.startswith( "/" ) and isinstance( v, dict ):
+                    _walk( v )
+
+        if self.dct:
+            _walk( self.dct )
+
+    def tree( self ):
+        """Build a LopperTree for the program
+
+        A fresh tree is built on each call, since lop execution can modify
+        the nodes of its lop tree.
+
+        Returns:
+            LopperTree
+        """
+        from lopper.tree import LopperTree
+
+        lops_tree = LopperTree()
+        lops_tree.load( self.dct )
+        lops_tree._metadata['lop_program'] = self
+
+        return lops_tree
+
+    @staticmethod
+    def load( key ):
+        """Load a program from the on-disk cache
+
+        Args:
+            key (string): program cache key (see program_key())
+
+        Returns:
+            LopProgram, or None on a cache miss
+        """
+        cdir = cache_dir()
+        if not key or not cdir:
+            return None
+
+        try:
+            with open( cdir / f"{key}.pickle", 'rb' ) as f:
+                data = pickle.load( f )
+            if data.get( 'format' ) != _PROGRAM_FORMAT:
+                return None
+            touch_cache_entry( cdir / f"{key}.pickle" )
+
+            program = LopProgram( key, data['dct'] )
+            for text, code in data['code'].items():
+                program.code[text] = marshal.loads( code )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            lopper.log._debug( f"lop program: discarding unreadable cache entry {key}: {e}" )
+            return None
+
+        # seed the process wide memo, so exec_cmd() never compiles these
+        _code_memo.update( program.code )
+
+        return program
+
+    def store( self ):
+        """Write the program to the on-disk cache
+
+        Failures are not fatal, the program is simply rebuilt next time.
+
+        Returns:
+            bool: True if the program was stored
+        """
+        cdir = cache_dir()
+        if not self.key or not cdir:
+            return False
+
+        data = { 'format': _PROGRAM_FORMAT,
+                 'dct': self.dct,
+                 'code': { text: marshal.dumps( code ) for text, code in self.code.items() } }
+        tmp_name = None
+        try:
+            cdir.mkdir( parents = True, exist_ok = True )
+            # write and rename, so a concurrent lopper never reads a partial entry
+            fd, tmp_name = tempfile.mkstemp( dir = cdir, suffix = ".tmp" )
+            with os.fdopen( fd, 'wb' ) as f:
+                pickle.dump( data, f, protocol = pickle.HIGHEST_PROTOCOL )
+            os.replace( tmp_name, cdir / f"{self.key}.pickle" )
+            prune_cache( cdir )
+        except Exception as e:
+            lopper.log._debug( f"lop program: could not store {self.key}: {e}" )
+            if tmp_name:
+                try:
+                    os.remove( tmp_name )
+                except Exception:
+                    pass
+            return False
+
+        return True
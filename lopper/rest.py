@@ -8,13 +8,15 @@
 # */
 
 from flask import Flask
-from flask import jsonify
-from flask import send_file
+from flask import Response
+from flask import request
+from flask import stream_with_context
 from flask_restful import Resource, Api, reqparse
-import pandas as pd
-import ast
 import tempfile
+import threading
+import hashlib
 import json
+from urllib.parse import urlencode
 
 from collections import OrderedDict
 import lopper
@@ -24,49 +26,185 @@ api = Api(app)
 
 sdt = None
 
+# nodes returned by one /nodes request, unless "limit" is passed
+NODES_PAGE_SIZE = 1000
+
+# size of the chunks a /tree dump is streamed in
+TREE_CHUNK_SIZE = 64 * 1024
+
+# regex -> ( tree generation, matching nodes, path -> index ), so paging
+# through a large match doesn't search the tree for every page
+_matches = {}
+_MATCHES_MAX = 32
+
+# ( etag, rendered tree file ), the last /tree dump
+_tree_dump = None
+_tree_dump_lock = threading.Lock()
+
+def _tree_digest( tree ):
+    """Return a digest of the paths, labels and property values of a tree
+
+    Changes made in place to a property's value list aren't seen by the
+    tree's generation count, so the values themselves are hashed. This is
+    a walk of the tree's properties, much cheaper than printing the tree.
+
+    Args:
+       tree (LopperTree): the tree
+
+    Returns:
+       string: hex digest
+    """
+    h = hashlib.blake2b( digest_size = 8 )
+    for path, node in tree.__nodes__.items():
+        h.update( f"{path}\0{node.label}\0".encode() )
+        for name, p in node.__props__.items():
+            h.update( repr( ( name, p.__dict__.get( "value" ) ) ).encode() )
+
+    return h.hexdigest()
+
+def _etag():
+    """Return the entity tag of the current tree
+
+    Derived from the tree's generation count (see LopperTree.generation())
+    and a digest of its values (see _tree_digest()), so it changes when
+    nodes or properties change, including a value changed in place.
+
+    Args:
+       None
+
+    Returns:
+       string: entity tag (unquoted), or None if there is no tree
+    """
+    if not sdt or sdt.tree is None:
+        return None
+
+    gen = "-".join( str( g ) for g in sdt.tree.generation( "*" ) )
+    return f"{id( sdt.tree ):x}-{gen}-{_tree_digest( sdt.tree )}"
+
+def _not_modified( etag ):
+    """Return a 304 response if the client has the current tree, else None"""
+    if etag and request.if_none_match.contains( etag ):
+        response = Response( status = 304 )
+        response.set_etag( etag )
+        return response
+
+    return None
+
+def _node_matches( regex ):
+    """Return the nodes that match a path or regex, and their indexes
+
+    The match is kept until the tree's nodes change.
+
+    Args:
+       regex (string): node path or regex, as passed to LopperTree.nodes()
+
+    Returns:
+       tuple: ( list of matching nodes, dict of abs_path -> list index )
+    """
+    gen = sdt.tree.generation()
+    try:
+        cached_gen, nodes, index = _matches[regex]
+        if cached_gen == gen:
+            return nodes, index
+    except KeyError:
+        pass
+
+    nodes = sdt.tree.nodes( regex )
+    index = { n.abs_path: i for i, n in enumerate( nodes ) }
+    if len( _matches ) >= _MATCHES_MAX:
+        _matches.clear()
+    _matches[regex] = ( gen, nodes, index )
+
+    return nodes, index
+
+def _tree_file( etag ):
+    """Return a file holding the current tree as DTS
+
+    The tree is only printed again when it has changed since the last dump.
+    The returned file is opened for the caller, so it stays readable when
+    a later dump replaces this one (and removes its file).
+
+    Args:
+       etag (string): entity tag of the current tree
+
+    Returns:
+       file: the DTS, opened for reading. The caller closes it.
+    """
+    global _tree_dump
+
+    with _tree_dump_lock:
+        if not _tree_dump or _tree_dump[0] != etag:
+            fpp = tempfile.NamedTemporaryFile( mode = "w+", delete = True )
+            sdt.tree["/"].print( fpp )
+            fpp.flush()
+
+            if _tree_dump:
+                _tree_dump[1].close()
+            _tree_dump = ( etag, fpp )
+
+        return open( _tree_dump[1].name, 'r' )
+
 class Domains(Resource):
 
     def get(self):
+        etag = _etag()
+        not_modified = _not_modified( etag )
+        if not_modified:
+            return not_modified
+
         try:
             domains = sdt.tree.nodes( "/domains/[^/]*$" )
         except:
             domains = []
 
-        domain_names = ""
-        if domains:
-            # this just dumps the domain names comma separated. We loop
-            # up to the last element, adding the ",". We then add the
-            # last element after the loop, no "," .. we could also just
-            # remove the trailing "," after the loop, but the list slicing
-            # seems a bit faster.
-            for d in domains[:-1]:
-                domain_names += d.abs_path + ","
-            domain_names = domain_names + domains[-1].abs_path
+        # the domain names, comma separated
+        domain_names = ",".join( d.abs_path for d in domains )
 
-        return domain_names, 200
+        headers = { "ETag": f'"{etag}"' } if etag else {}
+        return domain_names, 200, headers
 
 class Tree(Resource):
     def get(self):
-        fpp = tempfile.NamedTemporaryFile( delete=True )
+        etag = _etag()
+        if not etag:
+            return "", 204
 
-        if sdt:
-            lp = lopper.LopperTreePrinter( sdt.tree.fdt, False, fpp.name )
-            lp.exec()
+        not_modified = _not_modified( etag )
+        if not_modified:
+            return not_modified
 
-            with open(fpp.name, 'r') as f:
-                filecontents = f.read()
+        dump = _tree_file( etag )
 
-            # json = json.dumps(filecontents, ensure_ascii=False)
-            return filecontents, 200
-        else:
-            return "", 204
+        # the dump is a JSON string, as it was when returned whole. It is
+        # read from the rendered file and encoded a chunk at a time, so
+        # a large tree is never held in memory.
+        def generate():
+            yield '"'
+            with dump as f:
+                while True:
+                    chunk = f.read( TREE_CHUNK_SIZE )
+                    if not chunk:
+                        break
+                    yield json.dumps( chunk )[1:-1]
+            yield '"\n'
+
+        response = Response( stream_with_context( generate() ),
+                             mimetype = "application/json" )
+        # if the dump is never streamed
+        response.call_on_close( dump.close )
+        response.set_etag( etag )
+        return response
 
 class Nodes(Resource):
     def get(self):
         parser = reqparse.RequestParser()
 
-        parser.add_argument('path', required=True)
-        parser.add_argument('details', required=False)
+        # query arguments only, a GET has no JSON body to parse
+        parser.add_argument('path', required=True, location='args')
+        parser.add_argument('details', required=False, location='args')
+        parser.add_argument('limit', type=int, required=False, location='args',
+                            default=NODES_PAGE_SIZE)
+        parser.add_argument('cursor', required=False, location='args')
         args = parser.parse_args()
 
         try:
@@ -78,22 +216,46 @@ class Nodes(Resource):
         except:
             details = False
 
-        node_data = OrderedDict()
+        limit = args['limit']
+        if limit < 1:
+            return { "message": "limit must be at least 1" }, 400
 
-        node_list = sdt.tree.nodes( args['path'] )
+        etag = _etag()
+        not_modified = _not_modified( etag )
+        if not_modified:
+            return not_modified
 
+        node_list, node_index = _node_matches( args['path'] )
+
+        # the cursor is the path of the last node of the previous page
+        start = 0
+        if args['cursor']:
+            try:
+                start = node_index[args['cursor']] + 1
+            except KeyError:
+                return { "message": f"unknown cursor: {args['cursor']}" }, 400
+
+        page = node_list[start:start + limit]
+
+        node_data = OrderedDict()
         if not details:
-            for n in node_list:
+            for n in page:
                 node_data[n.abs_path] = None
         else:
-            for n in node_list:
+            for n in page:
                 prop_dict = OrderedDict()
                 for p in n.__props__:
                     prop_dict[p] = n.__props__[p].string_val
 
                 node_data[n.abs_path] = prop_dict
 
-        return node_data, 200
+        headers = { "ETag": f'"{etag}"' }
+        if start + limit < len( node_list ):
+            query = request.args.to_dict()
+            query['cursor'] = page[-1].abs_path
+            headers["Link"] = f'<{request.base_url}?{urlencode( query )}>; rel="next"'
+
+        return node_data, 200, headers
 
 api.add_resource(Domains, '/domains')  # '/domains' is an entry point
 api.add_resource(Tree, '/tree')  # '/tree' is an entry point
@@ -7,7 +7,6 @@
 # * SPDX-License-Identifier: BSD-3-Clause
 # */
 
-import yaml
 import re
 from collections import defaultdict
 from typing import Dict, Any, List, Set, Optional, Union, Tuple
@@ -433,237 +432,102 @@ class DTSSchemaGenerator:
                 if prop in PROPERTY_DEBUG_SET:
                     _warning(f"Learned phandle pattern for {prop}: {pattern}")
 
-        # Simple state machine for parsing
-        current_path = []
         current_compatible = None
-        in_reference_block = False  # Track if we're in a &label { } block
 
+        # the source has already been tokenized (and the result cached) by
+        # the phandle pattern analysis above, walk its nodes and properties
+        scan = lopper_base.dts_scan(dts_content)
         self.label_to_path = {}  # Map labels to their paths
 
-        lines = dts_content.split('\n')
-        i = 0
-        debug = False
+        for event, path, name, value in scan["events"]:
+            if event == "node":
+                node_path = path.lstrip('/')
+                node_name, _, node_addr = name.partition('@')
 
-        while i < len(lines):
-            line = lines[i].strip()
+                # Store label mapping if present
+                for label in value:
+                    self.label_to_path[label] = node_path
 
-            # Remove comments
-            line = self.strip_dts_comments(line)
+                # Track node patterns
+                if node_addr:
+                    pattern = re.sub(r'@[\w,.-]+', '@*', name)
+                    self.node_patterns[pattern].add(node_path)
 
-            # Skip comments and empty lines
-            if not line or line.startswith('//') or line.startswith('/*'):
-                i += 1
+                self.nodes.append({
+                    'path': node_path,
+                    'name': node_name,
+                    'properties': {},
+                    'compatible': None
+                })
                 continue
 
-            # Skip preprocessor directives
-            if line.startswith('#line') or line.startswith('#include') or line.startswith('#'):
-                if debug:
-                    _warning(f"DEBUG: Skipping preprocessor directive at line {i}: {line}")
-                i += 1
+            if event == "end":
+                current_compatible = None
                 continue
 
-            # Handle root node specially
-            if re.match(r'^/\s*{', line):
-                # This is a root node, reset path
-                current_path = []
-                if debug:
-                    _warning(f"DEBUG: Found root node declaration at line {i}")
-                i += 1
-                continue
+            prop_name = name
+            if value is None:
+                # Boolean property
+                prop_value = ''
+            else:
+                prop_value = value
 
-            # Check for node reference syntax: &label {
-            ref_match = re.match(r'&(\w+)\s*{', line)
-            if ref_match:
-                in_reference_block = True
-                label = ref_match.group(1)
-
-                if label in self.label_to_path:
-                    # Set current_path to the referenced node's path
-                    ref_path = self.label_to_path[label]
-                    current_path = ref_path.split('/') if ref_path else []
-                    if debug:
-                        _warning(f"DEBUG: Node reference &{label} -> path {ref_path}")
-                        _warning(f"  current_path set to: {current_path}")
-                else:
-                    if debug:
-                        _warning(f"WARNING: Unknown label reference: &{label}")
-                    # Try to find it by searching existing nodes
-                    found = False
-                    for node in self.nodes:
-                        # Check if the label might match the node name
-                        node_name = node['name']
-                        if label in node_name or node_name in label:
-                            current_path = node['path'].split('/')
-                            if debug:
-                                _warning(f"  Found by name search: {node['path']}")
-                            found = True
-                            break
-
-                    if not found:
-                        # If still not found, assume it's a new node at root
-                        current_path = [label]
-                        if debug:
-                            _warning(f"  Creating new path for unknown label: /{label}")
+                # Check for /bits/ directive
+                bits_match = re.match(r'/bits/\s*(\d+)\s+(<[^>]+>)', prop_value)
+                if bits_match:
+                    bit_width = int(bits_match.group(1))
+                    prop_value = bits_match.group(2).strip()
 
-                i += 1
-                continue
+                    # Store bit width hint for this property
+                    self.bit_width_hints[prop_name] = bit_width
 
-            # Node opening (with optional label)
-            node_match = re.match(r'(?:(\w+):\s+)?([\w-]+)(@[\w,.-]+)?\s*{', line)
-            if node_match:
-                label = node_match.group(1)
-                node_name = node_match.group(2)
-                node_addr = node_match.group(3) or ''
+                    if prop_name in PROPERTY_DEBUG_SET:
+                        _warning(f"Found /bits/ {bit_width} directive for {prop_name}")
+                        _warning(f"     prop value: {prop_value}")
+                elif prop_name in self.bit_width_hints:
+                    _debug( f"NOTE: possibly invalid dts {prop_name} had a bit hint, but was now found without")
 
-                current_path.append(node_name + node_addr)
+                    # force 32 bit when we have a mismatch like this
+                    self.bit_width_hints[prop_name] = 32
 
-                # Store label mapping if present
-                if label:
-                    full_path = '/'.join(current_path)
-                    self.label_to_path[label] = full_path
-                    if debug:
-                        _warning(f"DEBUG: Stored label '{label}' -> path '{full_path}'")
+                if prop_name in PROPERTY_DEBUG_SET:
+                    _warning(f"prop_value: {prop_value}")
 
-                # Track node patterns
-                if '@' in node_name + node_addr:
-                    pattern = re.sub(r'@[\w,.-]+', '@*', node_name + node_addr)
-                    self.node_patterns[pattern].add('/'.join(current_path))
+            # Determine property type
+            prop_type = self._determine_property_type(prop_name, prop_value)
 
-                self.nodes.append({
-                    'path': '/'.join(current_path),
-                    'name': node_name,
-                    'properties': {},
-                    'compatible': None
-                })
-                i += 1
-                continue
+            # Store property info
+            full_path = path
 
-            # Node closing
-            # if line.startswith('}'):
-            if line == '};':
-                if in_reference_block:
-                    # End of reference block, return to root
-                    current_path = []
-                    in_reference_block = False
-                    if debug:
-                        _warning(f"DEBUG: End of reference block, returning to root")
-                else:
-                    # Normal node closing
-                    if current_path:
-                        current_path.pop()
-                        if debug:
-                            _warning(f"DEBUG: Popped node, current_path now: {current_path}")
-                    else:
-                        if debug:
-                            _warning(f"WARNING: Found }} but current_path is already empty!")
+            self.properties[prop_name].append({
+                'type': prop_type,
+                'value': prop_value,
+                'original_value': prop_value,  # Keep original for safety
+                'path': full_path,
+                'compatible': current_compatible,
+            })
 
-                current_compatible = None
-                i += 1
-                continue
+            # Track compatible string
+            if prop_name == 'compatible':
+                current_compatible = self._extract_compatible(prop_value)
+                if self.nodes:
+                    self.nodes[-1]['compatible'] = current_compatible
 
-            # Property parsing - handle multi-line properties
-            prop_match = re.match(r'([#\w,.-]+)\s*=?\s*(.*?)$', line)
-            if prop_match:
-                prop_name = prop_match.group(1)
-                prop_value = prop_match.group(2).strip()
+            # Track phandle references
+            if '&' in prop_value:
+                self.phandle_refs.update(re.findall(r'&(\w+)', prop_value))
 
-                # Check if this is a boolean property (no = sign and value is just semicolon)
-                if '=' not in line and prop_value == ';':
-                    # Boolean property
-                    prop_value = ''  # Empty value for boolean
-                else:
-                    # Check for /bits/ directive
-                    bits_match = re.match(r'/bits/\s*(\d+)\s+(<[^>]+>)\s*(.*)', prop_value)
-                    if bits_match:
-                        bit_width = int(bits_match.group(1))
-                        value_part = bits_match.group(2).strip()
-                        semicolon_part = bits_match.group(3)
-
-                        # Store bit width hint for this property
-                        self.bit_width_hints[prop_name] = bit_width
-
-                        # Ensure we have a semicolon
-                        if ';' in semicolon_part:
-                            prop_value = value_part + ';'
-                        else:
-                            prop_value = value_part
-
-                        if prop_name in PROPERTY_DEBUG_SET:
-                            _warning(f"Found /bits/ {bit_width} directive for {prop_name}")
-                            _warning(f"     prop value: {prop_value}")
-                    else:
-                        if hasattr(self, 'bit_width_hints') and prop_name in self.bit_width_hints:
-                            _debug( f"NOTE: possibly invalid dts {prop_name} had a bit hint, but was now found without")
-
-                            # force 32 bit when we have a mismatch like this
-                            self.bit_width_hints[prop_name] = 32
-
-                    # Check if the property is complete (ends with semicolon)
-                    is_complete = prop_value.endswith(';')
-
-                    # Remove trailing semicolon if present
-                    if is_complete:
-                        prop_value = prop_value[:-1].strip()
+            # Update node properties
+            if self.nodes and full_path != '/':
+                self.nodes[-1]['properties'][prop_name] = prop_type
 
-                    if prop_name in PROPERTY_DEBUG_SET:
-                        _warning(f"DEBUG is_complete value: {is_complete}")
-                        _warning(f"prop_value: {prop_value}")
-
-                    # Only check for multi-line if the property didn't end with semicolon
-                    if not is_complete and '=' in line:
-                        # Multi-line property - collect all lines until we find the semicolon
-                        value_lines = [prop_value]
-                        j = i + 1
-                        while j < len(lines):
-                            next_line = lines[j].strip()
-                            next_line = self.strip_dts_comments(next_line)
-                            if next_line:
-                                value_lines.append(next_line)
-                                if next_line.endswith(';'):
-                                    # Remove semicolon from last line
-                                    value_lines[-1] = value_lines[-1][:-1].strip()
-                                    break
-                            j += 1
-                        prop_value = ' '.join(value_lines)
-                        i = j  # Skip the lines we just processed
-
-                # Check if this is a property assignment
-                if '=' in line or prop_value == '':  # Empty value indicates boolean
-                    # Determine property type
-                    prop_type = self._determine_property_type(prop_name, prop_value)
-
-                    # Store property info
-                    full_path = '/' + '/'.join(current_path) if current_path else '/'
-
-                    self.properties[prop_name].append({
-                        'type': prop_type,
-                        'value': prop_value,
-                        'original_value': prop_value,  # Keep original for safety
-                        'path': full_path,
-                        'compatible': current_compatible,
-                    })
-
-                    # Track compatible string
-                    if prop_name == 'compatible':
-                        current_compatible = self._extract_compatible(prop_value)
-                        if self.nodes:
-                            self.nodes[-1]['compatible'] = current_compatible
-
-                    # Track phandle references
-                    if '&' in prop_value:
-                        self.phandle_refs.update(re.findall(r'&(\w+)', prop_value))
-
-                    # Update node properties
-                    if self.nodes and current_path:
-                        self.nodes[-1]['properties'][prop_name] = prop_type
-
-                    # Track path-specific properties
-                    self.path_properties[full_path].add((prop_name, prop_type))
+            # Track path-specific properties
+            self.path_properties[full_path].add((prop_name, prop_type))
 
-                    if prop_name in PROPERTY_DEBUG_SET:
-                        _warning(f"adding path: {full_path} for {(prop_name, prop_type)}")
+            if prop_name in PROPERTY_DEBUG_SET:
+                _warning(f"adding path: {full_path} for {(prop_name, prop_type)}")
 
-            i += 1
+        debug = False
 
         # Optimize path_properties - only keep entries for properties with multiple types
         if debug:
@@ -1823,6 +1687,7 @@ def create_all_from_schema(schema_file=None, schema_dict=None):
         tuple: (property_resolver, type_checker, validator)
     """
     if schema_file:
+        import yaml
         with open(schema_file, 'r') as f:
             schema = yaml.safe_load(f)
     elif schema_dict:
@@ -2510,6 +2375,7 @@ def create_property_resolver(schema_file=None, schema_dict=None):
         DTSPropertyTypeResolver instance
     """
     if schema_file:
+        import yaml
         with open(schema_file, 'r') as f:
             schema = yaml.safe_load(f)
     elif schema_dict:
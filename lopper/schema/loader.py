@@ -25,15 +25,9 @@ from typing import Dict, List, Optional
 
 import lopper.log
 
-try:
-    from ruamel.yaml import YAML
-    _yaml = YAML()
-    _yaml.preserve_quotes = True
-    _use_ruamel = True
-except ImportError:
-    import yaml as pyyaml
-    _yaml = None
-    _use_ruamel = False
+# The yaml engine is created on first use by _load_yaml_file(), so that
+# importing the schema package doesn't pull in ruamel (or PyYAML).
+_yaml = None
 
 from .types import PropertyType, TypeDefinition, DT_SCHEMA_TYPES
 from .core import (
@@ -158,12 +152,21 @@ def _load_yaml_file(path: str) -> Optional[dict]:
     Returns:
         Parsed YAML as dict, or None on error
     """
+    global _yaml
+
+    if _yaml is None:
+        try:
+            from ruamel.yaml import YAML
+            ruamel_yaml = YAML()
+            ruamel_yaml.preserve_quotes = True
+            _yaml = ruamel_yaml.load
+        except ImportError:
+            import yaml as pyyaml
+            _yaml = pyyaml.safe_load
+
     try:
         with open(path, 'r') as f:
-            if _use_ruamel and _yaml:
-                return _yaml.load(f)
-            else:
-                return pyyaml.safe_load(f)
+            return _yaml(f)
     except Exception as e:
         lopper.log._debug(f"schema: failed to load {path}: {e}")
         return None
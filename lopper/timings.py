@@ -0,0 +1,323 @@
+#/*
+# * Copyright (C) 2026 Advanced Micro Devices, Inc. All Rights Reserved.
+# *
+# * SPDX-License-Identifier: BSD-3-Clause
+# */
+
+"""
+Lopper timing instrumentation
+
+Records the wall time, CPU time and allocation count (the net change in
+allocated memory blocks) of the phases of a lopper run: preprocessing, dtc,
+FDT export, tree load/sync, each lop (by path and type), each assist
+callback and output writing. Event counters (syncs, resolves) are kept
+alongside the timed spans.
+
+Instrumentation is off unless enable() is called (lopper --timings or
+--profile=<file>). When it is off, span() hands back a shared no-op context
+manager, count() returns immediately and timed() functions make a single
+extra check, so the instrumentation points can stay in the code.
+
+Usage:
+
+    with lopper.timings.span( "dtc", "phase", file=dts ):
+        ...
+
+    @lopper.timings.timed( "load", "tree" )
+    def load( ... ):
+        ...
+
+    lopper.timings.count( "sync" )
+
+The results are available as a JSON report (report()) and as a Chrome trace
+(chrome_trace()), which can be opened in chrome://tracing or Perfetto.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+import lopper.log
+
+lopper.log._init(__name__)
+
+# the active TimingRecorder, None when instrumentation is disabled
+_recorder = None
+
+_null_span = nullcontext()
+
+REPORT_FORMAT = 1
+
+
+class _Span:
+    """A timed region, created by TimingRecorder.span()"""
+
+    __slots__ = ( "recorder", "name", "cat", "args", "wall", "cpu", "blocks" )
+
+    def __init__( self, recorder, name, cat, args ):
+        self.recorder = recorder
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__( self ):
+        self.blocks = sys.getallocatedblocks()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__( self, exc_type, exc_value, tb ):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        blocks = sys.getallocatedblocks()
+        self.recorder.events.append( ( self.name, self.cat, self.wall - self.recorder.start,
+                                       wall - self.wall, cpu - self.cpu,
+                                       blocks - self.blocks, self.args ) )
+        return False
+
+
+class TimingRecorder:
+    """Collects timed spans and counters for one lopper run
+
+    Attributes:
+       - events: list of ( name, category, start offset, wall, cpu, allocs,
+                 args ) tuples, in the order the spans completed. Times are
+                 in seconds.
+       - counters: dictionary of counter name -> count
+       - start: perf_counter() value when the recorder was created
+
+    """
+    def __init__( self ):
+        self.events = []
+        self.counters = {}
+        self.start = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self._active = set()
+
+    def span( self, name, cat = "phase", **args ):
+        return _Span( self, name, cat, args )
+
+    def count( self, name, n = 1 ):
+        self.counters[name] = self.counters.get( name, 0 ) + n
+
+    def summary( self ):
+        """Aggregate the recorded spans
+
+        Spans are grouped by category and name.
+
+        Returns:
+           list: dictionaries with category, name, count, wall, cpu and
+                 allocs (totals), ordered by wall time, largest first
+        """
+        totals = {}
+        for name, cat, start, wall, cpu, allocs, args in self.events:
+            try:
+                t = totals[(cat, name)]
+            except KeyError:
+                t = { "category": cat, "name": name, "count": 0,
+                      "wall": 0.0, "cpu": 0.0, "allocs": 0 }
+                totals[(cat, name)] = t
+            t["count"] += 1
+            t["wall"] += wall
+            t["cpu"] += cpu
+            t["allocs"] += allocs
+
+        return sorted( totals.values(), key = lambda t: t["wall"], reverse = True )
+
+    def report( self ):
+        """Build the JSON report
+
+        Returns:
+           dict: the report. "phases" holds the aggregated summary(),
+                 "events" every span in completion order.
+        """
+        return {
+            "format": REPORT_FORMAT,
+            "wall": time.perf_counter() - self.start,
+            "cpu": time.process_time() - self.start_cpu,
+            "phases": self.summary(),
+            "counters": dict( self.counters ),
+            "events": [ { "name": name, "category": cat, "start": start, "wall": wall,
+                          "cpu": cpu, "allocs": allocs, "args": args }
+                        for name, cat, start, wall, cpu, allocs, args in self.events ],
+        }
+
+    def chrome_trace( self ):
+        """Build a Chrome trace (Trace Event Format) of the run
+
+        Each span is a complete ("X") event. The counters are added as a
+        single counter ("C") event at the end of the run.
+
+        Returns:
+           dict: the trace, ready to be written with json.dump()
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        trace = []
+        for name, cat, start, wall, cpu, allocs, args in self.events:
+            event_args = { k: str( v ) for k, v in args.items() }
+            event_args["cpu_ms"] = round( cpu * 1000, 3 )
+            event_args["allocs"] = allocs
+            trace.append( { "name": str( name ), "cat": cat, "ph": "X",
+                            "ts": round( start * 1e6, 3 ), "dur": round( wall * 1e6, 3 ),
+                            "pid": pid, "tid": tid, "args": event_args } )
+
+        if self.counters:
+            trace.append( { "name": "counters", "ph": "C", "pid": pid, "tid": tid,
+                            "ts": round( ( time.perf_counter() - self.start ) * 1e6, 3 ),
+                            "args": dict( self.counters ) } )
+
+        return { "traceEvents": trace, "displayTimeUnit": "ms" }
+
+    def write( self, report_file ):
+        """Write the JSON report and the Chrome trace
+
+        The trace is written next to the report, as <report stem>.trace.json
+
+        Args:
+           report_file (string): path of the JSON report
+
+        Returns:
+           string: the path of the Chrome trace
+        """
+        report_path = Path( report_file )
+        trace_path = report_path.with_name( f"{report_path.stem}.trace.json" )
+
+        with open( report_path, "w" ) as f:
+            json.dump( self.report(), f, indent = 1, default = str )
+        with open( trace_path, "w" ) as f:
+            json.dump( self.chrome_trace(), f )
+
+        return str( trace_path )
+
+    def print_summary( self, out = None, limit = 40 ):
+        """Print the aggregated timings as a table
+
+        Args:
+           out (file,optional): where to print, default stderr
+           limit (int,optional): the number of rows to print
+
+        Returns:
+           Nothing
+        """
+        out = out or sys.stderr
+        summary = self.summary()
+
+        print( f"timings: {(time.perf_counter() - self.start) * 1000:.2f} ms wall, "
+               f"{(time.process_time() - self.start_cpu) * 1000:.2f} ms cpu", file = out )
+        print( f"  {'category':<10} {'name':<48} {'count':>6} {'wall ms':>10} {'cpu ms':>10} {'allocs':>10}",
+               file = out )
+        for t in summary[:limit]:
+            name = str( t["name"] )
+            if len( name ) > 48:
+                name = "..." + name[-45:]
+            print( f"  {t['category']:<10} {name:<48} {t['count']:>6} {t['wall'] * 1000:>10.2f} "
+                   f"{t['cpu'] * 1000:>10.2f} {t['allocs']:>10}", file = out )
+        if len( summary ) > limit:
+            print( f"  ... {len(summary) - limit} more, see --profile=<file> for the full report", file = out )
+
+        if self.counters:
+            counts = ", ".join( f"{k}: {v}" for k, v in sorted( self.counters.items() ) )
+            print( f"  counters: {counts}", file = out )
+
+
+def callable_name( func ):
+    """Return a span name for a callable (module.name where possible)"""
+    name = getattr( func, "__qualname__", None ) or getattr( func, "__name__", None )
+    if not name:
+        return repr( func )
+    module = getattr( func, "__module__", None )
+    return f"{module}.{name}" if module else name
+
+
+def enable():
+    """Enable timing instrumentation
+
+    Creates the recorder if it isn't already active.
+
+    Returns:
+       TimingRecorder: the active recorder
+    """
+    global _recorder
+    if _recorder is None:
+        _recorder = TimingRecorder()
+        lopper.log._debug( "timing instrumentation enabled" )
+    return _recorder
+
+
+def disable():
+    """Disable timing instrumentation
+
+    Returns:
+       TimingRecorder: the recorder that was active (or None)
+    """
+    global _recorder
+    recorder = _recorder
+    _recorder = None
+    return recorder
+
+
+def recorder():
+    """Return the active TimingRecorder, or None if timings are disabled"""
+    return _recorder
+
+
+def span( name, cat = "phase", **args ):
+    """Time a region of code
+
+    Args:
+       name (string): span name (a phase name, lop path, assist name ...)
+       cat (string,optional): span category
+       args: extra details recorded with the span
+
+    Returns:
+       context manager. A shared no-op one if timings are disabled.
+    """
+    if _recorder is None:
+        return _null_span
+    return _Span( _recorder, name, cat, args )
+
+
+def count( name, n = 1 ):
+    """Bump an event counter (when timings are enabled)"""
+    if _recorder is not None:
+        _recorder.count( name, n )
+
+
+def timed( name, cat = "phase" ):
+    """Decorator: record calls to a function as spans
+
+    Recursive calls (a function that calls itself, directly or indirectly)
+    are only recorded at the outermost call.
+
+    Args:
+       name (string): span name
+       cat (string,optional): span category
+
+    Returns:
+       decorator
+    """
+    def decorator( func ):
+        key = ( cat, name )
+
+        @functools.wraps( func )
+        def wrapper( *args, **kwargs ):
+            rec = _recorder
+            if rec is None or key in rec._active:
+                return func( *args, **kwargs )
+
+            rec._active.add( key )
+            try:
+                with rec.span( name, cat ):
+                    return func( *args, **kwargs )
+            finally:
+                rec._active.discard( key )
+
+        return wrapper
+
+    return decorator
@@ -17,7 +17,7 @@ from pathlib import Path
 from pathlib import PurePath
 import tempfile
 from enum import Enum
-import textwrap
+import bisect
 from collections import UserDict
 from collections import OrderedDict
 from collections import Counter
@@ -35,6 +35,8 @@ import logging
 
 import lopper.schema
 import lopper.audit
+import lopper.lop_program
+import lopper.timings
 
 lopper.log._init( __name__ )
 lopper.log._init( "tree.py" )
@@ -363,6 +365,158 @@ class LopperAction(Enum):
     BLACKLIST = 4
     NONE = 5
 
+def _prop_changed( tree, name, node = None ):
+    """Bump a tree's generation count for a property name
+
+    Called when a property of a node in the tree is assigned, added or
+    deleted, so that cached views of that property (see
+    LopperTree.generation()) know to rebuild.
+
+    Changes to any property of the /__symbols__ node also bump the
+    "/__symbols__" count (a name no property can have), and every change
+    bumps the "*" count.
+
+    Args:
+       tree (LopperTree): the tree holding the property's node (can be None)
+       name (string): property name
+       node (LopperNode,optional): the property's node
+
+    Returns:
+       Nothing
+    """
+    if tree is None:
+        return
+    try:
+        pgen = tree.__dict__["__pgen__"]
+    except KeyError:
+        return
+    pgen[name] = pgen.get( name, 0 ) + 1
+    pgen["*"] = pgen.get( "*", 0 ) + 1
+    if node is not None and node.__dict__.get( "abs_path" ) == "/__symbols__":
+        pgen["/__symbols__"] = pgen.get( "/__symbols__", 0 ) + 1
+
+
+def _nodes_changed( tree ):
+    """Bump a tree's node generation count
+
+    Called when nodes are added, deleted or (re)loaded.
+
+    Args:
+       tree (LopperTree): the tree (can be None)
+
+    Returns:
+       Nothing
+    """
+    if tree is None:
+        return
+    tree.__dict__["__ngen__"] = tree.__dict__.get( "__ngen__", 0 ) + 1
+
+
+class _PathRefTrie():
+    """A node of the path reference index (see LopperTree._path_ref_index())
+
+    The trie is keyed by path components, so each trie node stands for one
+    path: of a tree node holding path-ref properties, of a path they
+    reference, or of a component on the way to one. A trie node's path is
+    found through its parents, so moving a subtree of the trie moves every
+    path in it.
+
+    Attributes:
+       - name: path component
+       - parent: parent trie node (None for "/")
+       - children: component -> trie node
+       - refs: set of ( owner trie node, property name ), the properties
+               that reference this path
+       - owns: property name -> trie node, the path-ref properties of the
+               tree node at this path, and the paths they reference
+    """
+    __slots__ = ( "name", "parent", "children", "refs", "owns" )
+
+    def __init__( self, name = "", parent = None ):
+        self.name = name
+        self.parent = parent
+        self.children = {}
+        self.refs = set()
+        self.owns = {}
+
+    @staticmethod
+    def _components( path ):
+        if path == "/":
+            return []
+        return path.split( "/" )[1:]
+
+    def find( self, path, create = False ):
+        """Return the trie node of an absolute path (None if it isn't indexed)"""
+        t = self
+        for c in self._components( path ):
+            try:
+                t = t.children[c]
+            except KeyError:
+                if not create:
+                    return None
+                t.children[c] = t = _PathRefTrie( c, t )
+        return t
+
+    def path( self ):
+        """Return the absolute path of a trie node"""
+        names = []
+        t = self
+        while t.parent is not None:
+            names.append( t.name )
+            t = t.parent
+        return "/" + "/".join( reversed( names ) )
+
+    def add_ref( self, prop_name, target ):
+        """Record that this path's property prop_name references target"""
+        self.owns[prop_name] = target
+        target.refs.add( ( self, prop_name ) )
+
+    def walk( self ):
+        """Generate this trie node and all of its descendants"""
+        stack = [ self ]
+        while stack:
+            t = stack.pop()
+            yield t
+            stack.extend( t.children.values() )
+
+    def move( self, path ):
+        """Move this trie node (and its subtree) to a new path
+
+        If path is already in the trie, this node is merged into it.
+        """
+        root = self.parent
+        while root.parent is not None:
+            root = root.parent
+
+        del self.parent.children[self.name]
+        parent_path, name = path.rsplit( "/", 1 )
+        parent = root.find( parent_path or "/", create = True )
+        try:
+            existing = parent.children[name]
+        except KeyError:
+            self.name = name
+            self.parent = parent
+            parent.children[name] = self
+            return
+        existing._merge( self )
+
+    def _merge( self, other ):
+        """Merge the trie node other, and its subtree, into this one"""
+        for owner, prop_name in other.refs:
+            owner.owns[prop_name] = self
+            self.refs.add( ( owner, prop_name ) )
+        for prop_name, target in other.owns.items():
+            target.refs.discard( ( other, prop_name ) )
+            target.refs.add( ( self, prop_name ) )
+            self.owns[prop_name] = target
+        for name, child in other.children.items():
+            try:
+                self.children[name]._merge( child )
+            except KeyError:
+                child.parent = self
+                self.children[name] = child
+
+
 class LopperProp():
     """Class representing a device tree property
 
@@ -387,7 +541,7 @@ class LopperProp():
        - abs_path: The absolute device tree path to this property
 
     """
-    def __init__(self, name, number = -1, node = None, value = None, debug_lvl = 0 ):
+    def __init__(self, name, number = -1, node = None, value = None, debug_lvl = 0, pclass = "" ):
         self.__modified__ = True
         self.__pstate__ = "init"
         self.__dbg__ = debug_lvl
@@ -397,7 +551,9 @@ class LopperProp():
         self.number = number
 
         self.string_val = "**unresolved**"
-        self.pclass = ""
+        # set before the type guess below, a json encoded value is never
+        # searched for phandles
+        self.pclass = pclass
         self.ptype = ""
         self.binary = False
 
@@ -657,6 +813,10 @@ class LopperProp():
             except:
                 self.__modified__ = True
 
+            node = self.__dict__.get( "node" )
+            if node is not None:
+                _prop_changed( node.__dict__.get( "tree" ), self.__dict__.get( "name" ), node )
+
             self.resolve()
         else:
             self.__dict__[name] = value
@@ -2279,6 +2439,14 @@ class LopperNode(object):
                 # phandle_set() fast even with -W duplicate_phandle enabled.
                 self.phandle_set(value)
             else:
+                if name == "name":
+                    # a rename leaves abs_path (and the tree's path index)
+                    # stale until the next sync, let the tree know so batch
+                    # operations can resync before they look up paths.
+                    tree = self.__dict__.get( "tree" )
+                    if tree is not None and self.__dict__.get( "name" ) != value:
+                        tree.__dict__["__renames__"] = tree.__dict__.get( "__renames__", 0 ) + 1
+
                 # we do it this way, otherwise the property "ref" breaks
                 super().__setattr__(name, value)
 
@@ -2445,8 +2613,18 @@ class LopperNode(object):
         # indexing it. The __props__ is an ordered dictionary, so we could just
         # iterate the values() of it as well, but for now, we keep the control
         # of the indexing.
+        #
+        # The list is made when the iteration starts, and only remade if the
+        # properties change underneath it (remaking it on every step is
+        # quadratic on nodes with many properties, like __symbols__).
         self.__current_property__ = self.__current_property__ + 1
-        prop_list = list(self.__props__)
+        prop_list = self.__dict__.get( "__prop_list__" )
+        if self.__current_property__ == 0 or prop_list is None or \
+           len( prop_list ) != len( self.__props__ ) or \
+           ( self.__current_property__ < len( prop_list ) and
+             prop_list[self.__current_property__] not in self.__props__ ):
+            prop_list = list(self.__props__)
+            self.__dict__["__prop_list__"] = prop_list
 
         if self.__current_property__ >= len( prop_list ):
             self.__current_property__ = -1
@@ -2536,10 +2714,29 @@ class LopperNode(object):
             np._node = self
             self.__props__[key].resolve()
 
+        _prop_changed( self.__dict__.get( "tree" ), key, self )
+
             # throw an exception, since this is not a valid
             # thing to assign.
             # raise TypeError( "LopperProp was not passed as value" )
 
+    @property
+    def symbols(self):
+        """Symbols of the node
+
+        The names of the /__symbols__ entries that reference the node's
+        path, looked up in the tree's reverse index of /__symbols__.
+
+        Returns:
+           list: symbol names (labels), in /__symbols__ order. Empty if the
+                 node isn't in a tree, or has no symbols.
+        """
+        tree = self.__dict__.get( "tree" )
+        if tree is None:
+            return []
+
+        return list( tree._symbol_index().get( self.abs_path, [] ) )
+
     @property
     def ref(self):
         """Node reference count getter
@@ -2600,6 +2797,9 @@ class LopperNode(object):
         # Get old phandle, defaulting to 0 if not yet set (during __init__)
         old_phandle = self.__dict__.get('phandle', 0)
 
+        if old_phandle != value:
+            _prop_changed( self.__dict__.get( "tree" ), "phandle" )
+
         # Update the tree's phandle index if we are assigned to a tree
         if self.tree and value > 0:
             # Remove old phandle from index if it existed and is different
@@ -2840,15 +3040,63 @@ class LopperNode(object):
 
             >>> # Check only this node (no inheritance)
             >>> prop, _ = node.property_find('status', inherit=False)
+
+        Inherited lookups (of a property the node doesn't have itself) in a
+        tree are memoized per tree (see LopperTree._inherited_cache()). The
+        walk stops at the first node on the way up that already has an
+        answer, and records it for every node it passed.
         """
+        d = self.__dict__
+        props = d["__props__"]
+        if prop_name in props:
+            return props[prop_name], self
+
+        tree = d.get( "tree" )
+        td = tree.__dict__ if tree is not None else None
+        if not inherit or td is None or td["__nodes__"].get( d.get( "abs_path" ) ) is not self:
+            search = self
+            while search:
+                if prop_name in search.__props__:
+                    return search[prop_name], search
+                if not inherit:
+                    break
+                search = search.parent
+            return None, None
+
+        # tree.generation( prop_name ) and _inherited_cache(), inlined for
+        # the common case of a current memo, this is a hot path
+        try:
+            gen, cache = td["__inherited__"][prop_name]
+            if gen != ( td["__ngen__"], td["__renames__"], td["__pgen__"].get( prop_name, 0 ) ):
+                cache = tree._inherited_cache( prop_name )
+        except KeyError:
+            cache = tree._inherited_cache( prop_name )
+
+        try:
+            return cache[d["abs_path"]]
+        except KeyError:
+            pass
+
+        walked = []
+        found = ( None, None )
         search = self
         while search:
+            path = search.__dict__["abs_path"]
+            try:
+                found = cache[path]
+                break
+            except KeyError:
+                pass
+            walked.append( path )
             if prop_name in search.__props__:
-                return search[prop_name], search
-            if not inherit:
+                found = ( search[prop_name], search )
                 break
             search = search.parent
-        return None, None
+
+        for path in walked:
+            cache[path] = found
+
+        return found
 
     def children( self ):
         """Return the immediate children of this node
@@ -3283,6 +3531,7 @@ class LopperNode(object):
                 lopper.log._warning( f"invalid property passed to delete: {prop}" )
 
             self.__modified__ = True
+            _prop_changed( self.__dict__.get( "tree" ), prop_to_delete.name, self )
             try:
                 prop_to_delete.__pstate__ = "deleted"
                 self.__props_pending_delete__[prop_to_delete.name] = prop_to_delete
@@ -3525,6 +3774,7 @@ class LopperNode(object):
             if prop_to_add:
                 self.__props__[prop.name] = prop
                 prop.node = self
+                _prop_changed( self.__dict__.get( "tree" ), prop.name, self )
 
                 # indicates that we should be sync'd
                 self.__modified__ = True
@@ -3680,6 +3930,7 @@ class LopperNode(object):
         # self.number must be set before calling this routine.
 
         self.dct = dct
+        _nodes_changed( self.__dict__.get( "tree" ) )
 
         #
         # tree add currently takes care of this, but it might be better if
@@ -4208,6 +4459,13 @@ class LopperTree:
        - __pnodes__: The nodes of the tree, ordered by phandle
        - __dbg__: treewide debug level
        - __must_sync__: flag, true when the tree must be syncd to the FDT
+       - __renames__: count of node renames, bumped when a node in the tree
+                      has its name changed (the path is fixed up on sync)
+       - __ngen__: node generation, bumped when nodes are added, deleted or
+                   loaded
+       - __pgen__: property generations, property name -> count, bumped when
+                   a property of that name is assigned, added or deleted ("*"
+                   counts changes to any property)
        - __current_node__: The current node in an iteration
        - __start_node__: The starting node for an iteration
        - __new_iteration__: Flag set to start a new iteration
@@ -4252,6 +4510,9 @@ class LopperTree:
         # state
         self.__dbg__ = 0
         self.__must_sync__ = False
+        self.__renames__ = 0
+        self.__ngen__ = 0
+        self.__pgen__ = {}
         self.__current_node__ = "/"
         self.__start_node__ = "/"
         self.__new_iteration__ = True
@@ -5408,6 +5669,7 @@ class LopperTree:
         Returns:
            Nothing
         """
+        lopper.timings.count( "resolve" )
 
         if self.__symbols__:
             try:
@@ -5417,6 +5679,7 @@ class LopperTree:
                 # this allows us to track renames, deletes and
                 # adds without doing anything fancy
                 symbol_node.__props__ = OrderedDict()
+                _prop_changed( self, "/__symbols__" )
             except:
                 pass
 
@@ -5471,6 +5734,8 @@ class LopperTree:
                                              path-ref values to the new path.
                                              Default False preserves prior
                                              behavior. Moves are never followed.
+                                             A dict of old path -> new path
+                                             follows only those renames.
 
         Returns:
            Nothing
@@ -5484,6 +5749,7 @@ class LopperTree:
 
 
         lopper.log._debug( f"[{fdt}]: tree sync start: {self}" )
+        lopper.timings.count( "sync" )
 
         #
         # This triggers the "load" operation on the entire tree. That block
@@ -5493,7 +5759,15 @@ class LopperTree:
         # Note: this no longer writes to the FDT, that should be done by the
         #       Lopper.sync() call.
         #
-        new_dct = self.export()
+        # the path-ref index of the tree as it is before the sync, so the
+        # renames can be followed by moving them within it
+        path_refs = None
+        if follow_renames:
+            path_refs = self._path_ref_index()
+            node_count = len( self.__nodes__ )
+
+        with lopper.timings.span( "tree export", "tree" ):
+            new_dct = self.export()
 
         # If asked, capture in-place renames so we can follow path references to
         # the renamed nodes after the reload. At this point __nodes__ is still
@@ -5503,21 +5777,28 @@ class LopperTree:
         # of a move), whose references deliberately do not follow.
         rename_map = None
         if follow_renames:
-            rename_map = {
+            moved_paths = {
                 old_p: node.abs_path
                 for old_p, node in self.__nodes__.items()
                 if old_p != node.abs_path
-                and os.path.dirname( old_p ) == os.path.dirname( node.abs_path )
             }
+            if isinstance( follow_renames, dict ):
+                rename_map = follow_renames
+            else:
+                rename_map = {
+                    old_p: new_p
+                    for old_p, new_p in moved_paths.items()
+                    if os.path.dirname( old_p ) == os.path.dirname( new_p )
+                }
 
         self.load( new_dct )
 
         # Apply the rewrites AFTER load() so they land on the reloaded tree
-        # (load() would otherwise overwrite edits made before it). Longest old
-        # path first so nested renames rewrite correctly.
+        # (load() would otherwise overwrite edits made before it).
         if rename_map:
-            for old_p in sorted( rename_map, key=len, reverse=True ):
-                self.update_path_refs( old_p, rename_map[old_p] )
+            if len( self.__nodes__ ) != node_count:
+                path_refs = None
+            self._follow_renames( path_refs, rename_map, moved_paths )
 
         lopper.log._debug( f"[{fdt}]: tree sync end: {self}" )
 
@@ -5570,6 +5851,8 @@ class LopperTree:
             # let any exceptions bubble back up
             n = self.__nnodes__[node]
 
+        _nodes_changed( self )
+
         if force:
             n.__nstate__ = "resolved"
 
@@ -5727,30 +6010,185 @@ class LopperTree:
         This intentionally follows renames only. Callers use it after an
         in-place rename; it is not a move (path-refs do not follow a reparent).
 
+        The properties to rewrite are found through the path-ref index (see
+        _path_ref_index()), rather than by scanning every property.
+
         Args:
            old_path (str): the node's path before the rename
            new_path (str): the node's path after the rename
         """
         if not old_path or not new_path or old_path == new_path:
             return
+        self._rewrite_path_refs( self._path_ref_index(), old_path, new_path )
+
+    def _path_ref_index( self, build = True ):
+        """Return the index of path-ref properties, by the paths they reference
+
+        The index is a trie of path components (see _PathRefTrie), holding
+        both the paths referenced by path-ref properties (as classified by
+        _prop_path_ref_value()) and the paths of the nodes holding them. So
+        the references to a node, or to any of its descendants, are the
+        refs of its trie subtree.
+
+        The /__symbols__ node is not indexed, it is rebuilt on resolve().
+
+        The index is kept until the tree's nodes or any property change.
+        Renames followed by sync( follow_renames ) and rename() move the
+        renamed subtree within the index, and keep it. A value changed in
+        place (which generation() doesn't see) is caught by checking every
+        indexed property against the path it was indexed with, when the
+        index is reused. A property that is changed in place to become a
+        path-ref is not seen until the index is next rebuilt.
+
+        Args:
+           build (boolean,optional): build the index if it isn't current.
+                                     If False, None is returned instead.
+
+        Returns:
+           _PathRefTrie: the root of the index (or None)
+        """
+        d = self.__dict__
+        gen = ( d["__ngen__"], d["__pgen__"].get( "*", 0 ) )
         non_path_ref_names = self._non_path_ref_names()
-        prefix = old_path + "/"
-        for n in self:
-            if n.abs_path == "/__symbols__":
+        try:
+            cached_gen, cached_names, index = d["__path_refs__"]
+            if cached_gen == gen and cached_names == non_path_ref_names and \
+               self._path_ref_index_valid( index, non_path_ref_names ):
+                return index
+        except KeyError:
+            pass
+
+        if not build:
+            return None
+
+        index = _PathRefTrie()
+        for path, n in self.__nodes__.items():
+            if path == "/__symbols__":
                 continue
-            for p in n:
-                raw = self._prop_path_ref_value( p.name, p.value, non_path_ref_names )
+            owner = None
+            for name, p in n.__props__.items():
+                raw = self._prop_path_ref_value( name, p.__dict__.get( "value" ),
+                                                 non_path_ref_names )
                 if raw is None:
                     continue
-                if raw == old_path:
-                    new_raw = new_path
-                elif raw.startswith( prefix ):
-                    new_raw = new_path + raw[len(old_path):]
-                else:
-                    continue
-                # Preserve any surrounding quotes/whitespace in the stored value.
-                p.value = [ p.value[0].replace( raw, new_raw, 1 ) ]
-                p.resolve()
+                if owner is None:
+                    owner = index.find( path, create = True )
+                owner.add_ref( name, index.find( raw, create = True ) )
+
+        d["__path_refs__"] = ( gen, non_path_ref_names, index )
+
+        return index
+
+    def _path_ref_index_valid( self, index, non_path_ref_names ):
+        """Check that the indexed path-refs still hold the paths they were
+        indexed with
+
+        Args:
+           index (_PathRefTrie): the path-ref index
+           non_path_ref_names (set): see _non_path_ref_names()
+
+        Returns:
+           boolean: True if every indexed property is unchanged
+        """
+        for t in index.walk():
+            if not t.owns:
+                continue
+            try:
+                props = self.__nodes__[t.path()].__props__
+            except KeyError:
+                return False
+            for name, target in t.owns.items():
+                try:
+                    value = props[name].__dict__.get( "value" )
+                except KeyError:
+                    return False
+                if self._prop_path_ref_value( name, value, non_path_ref_names ) != target.path():
+                    return False
+
+        return True
+
+    def _rewrite_path_refs( self, index, old_path, new_path, moved = False ):
+        """Rewrite the path-refs to old_path, or under it, to new_path
+
+        Args:
+           index (_PathRefTrie): the path-ref index
+           old_path (str): the path before the rename
+           new_path (str): the path after the rename
+           moved (boolean,optional): the tree's nodes are already at their
+                                     new paths, and the index is not. The
+                                     renamed subtree is moved within the
+                                     index, so the nodes holding the refs
+                                     are found at their new paths.
+
+        Returns:
+           Nothing
+        """
+        subtree = index.find( old_path )
+        if subtree is None:
+            return
+
+        if moved:
+            subtree.move( new_path )
+
+        refs = [ ( owner.path(), name ) for t in subtree.walk()
+                 for owner, name in t.refs ]
+
+        non_path_ref_names = self._non_path_ref_names()
+        prefix = old_path + "/"
+        for owner_path, name in refs:
+            try:
+                p = self.__nodes__[owner_path].__props__[name]
+            except KeyError:
+                continue
+            raw = self._prop_path_ref_value( name, p.value, non_path_ref_names )
+            if raw is None:
+                continue
+            if raw == old_path:
+                new_raw = new_path
+            elif raw.startswith( prefix ):
+                new_raw = new_path + raw[len(old_path):]
+            else:
+                continue
+            # Preserve any surrounding quotes/whitespace in the stored value.
+            # (assigning the value resolves the property)
+            p.value = [ p.value[0].replace( raw, new_raw, 1 ) ]
+
+    def _follow_renames( self, index, rename_map, moved_paths ):
+        """Follow path references through the renames of a sync
+
+        Args:
+           index (_PathRefTrie): the path-ref index, as it was before the
+                                 sync (None if there wasn't one)
+           rename_map (dict): old path -> new path, of the renames to follow
+           moved_paths (dict): old path -> new path, of every node whose
+                               path changed in the sync
+
+        Returns:
+           Nothing
+        """
+        # the index can be moved along with the renames when each node that
+        # changed path did so as part of one of them. Anything else (a move,
+        # a rename not being followed) and it is rebuilt.
+        covered = index is not None
+        for old_p, new_p in moved_paths.items() if covered else ():
+            ancestor = old_p
+            while ancestor and ancestor not in rename_map:
+                ancestor = ancestor[:ancestor.rfind( "/" )]
+            if not ancestor or rename_map[ancestor] + old_p[len(ancestor):] != new_p:
+                covered = False
+                break
+
+        # Longest old path first so nested renames rewrite correctly.
+        for old_p in sorted( rename_map, key=len, reverse=True ):
+            if covered:
+                self._rewrite_path_refs( index, old_p, rename_map[old_p], moved = True )
+            else:
+                self.update_path_refs( old_p, rename_map[old_p] )
+
+        if covered:
+            d = self.__dict__
+            gen = ( d["__ngen__"], d["__pgen__"].get( "*", 0 ) )
+            d["__path_refs__"] = ( gen, self._non_path_ref_names(), index )
 
     def rename( self, node, new_name ):
         """Rename a node in place and follow path references to it.
@@ -5780,8 +6218,7 @@ class LopperTree:
         if old_path == new_path:
             return node
         node.name = new_name
-        self.sync()
-        self.update_path_refs( old_path, new_path )
+        self.sync( follow_renames = { old_path: new_path } )
         return node
 
     def _register_node(self, node):
@@ -5832,6 +6269,8 @@ class LopperTree:
 
         """
 
+        _nodes_changed( self )
+
         # do we already have a node at this path ?
         try:
             existing_node = self.__nodes__[node.abs_path]
@@ -6710,12 +7149,347 @@ class LopperTree:
 
         return target_node
 
+    def generation( self, *props ):
+        """Return a token that changes when the tree or named properties change
+
+        Cached views of the tree compare the token they were built with
+        against the current one, and rebuild when they differ. The token
+        changes when nodes are added, deleted, loaded or renamed, and when
+        any property with one of the passed names is assigned, added or
+        deleted (in any node).
+
+        Changes made in place to a property's value list are not seen,
+        assign the value to the property to have them tracked.
+
+        "/__symbols__" can be passed as a property name, it changes when
+        any property of the /__symbols__ node changes. "*" changes when any
+        property of any node changes.
+
+        Args:
+           props (strings): property names the caller depends on
+
+        Returns:
+           tuple: the generation token
+        """
+        d = self.__dict__
+        pgen = d["__pgen__"]
+        return ( d["__ngen__"], d["__renames__"], *[ pgen.get( p, 0 ) for p in props ] )
+
+    def _inherited_cache( self, prop_name ):
+        """Return the memo of inherited lookups of a property
+
+        Used by LopperNode.property_find(). The memo is dropped when the
+        tree's nodes change, or when the property is added, deleted or
+        assigned on any node of the tree.
+
+        Args:
+           prop_name (string): property name
+
+        Returns:
+           dict: node path -> ( property, defining node ), as returned by
+                 property_find(). Callers add to it.
+        """
+        gen = self.generation( prop_name )
+        caches = self.__dict__.setdefault( "__inherited__", {} )
+        try:
+            cached_gen, cache = caches[prop_name]
+            if cached_gen == gen:
+                return cache
+        except KeyError:
+            pass
+
+        cache = {}
+        caches[prop_name] = ( gen, cache )
+
+        return cache
+
+    def _symbol_index( self ):
+        """Return the reverse index of the /__symbols__ node
+
+        Each symbol is resolved to the node at its path when it is first
+        indexed. The index is rebuilt when the tree's nodes, or the
+        properties of /__symbols__, change, and a symbol whose value hasn't
+        changed keeps the node it was resolved to (found by phandle, or by a
+        label matching the symbol). So symbols follow their nodes through
+        renames and moves, which /__symbols__ itself only reflects once the
+        tree is resolved, and are dropped when their node is deleted.
+
+        Returns:
+           dict: node path -> list of the symbol names (labels) that
+                 reference it, in /__symbols__ order
+        """
+        gen = self.generation( "/__symbols__" )
+        try:
+            cached_gen, index, resolved = self.__dict__["__symbol_index__"]
+            if cached_gen == gen:
+                return index
+        except KeyError:
+            resolved = {}
+
+        nodes = self.__nodes__
+        index = {}
+        new_resolved = {}
+        symbol_node = nodes.get( "/__symbols__" )
+        if symbol_node is not None:
+            for name, p in symbol_node.__props__.items():
+                path = p.value
+                if isinstance( path, list ):
+                    path = path[0] if path else ""
+                if not isinstance( path, str ) or not path:
+                    continue
+
+                node = None
+                old_path, old_phandle = resolved.get( name, ( None, 0 ) )
+                if old_path == path and old_phandle > 0:
+                    node = self.__pnodes__.get( old_phandle )
+                if node is None:
+                    node = nodes.get( path )
+                if node is None and old_path == path:
+                    node = self.__lnodes__.get( name )
+
+                if node is not None:
+                    new_resolved[name] = ( path, node.phandle )
+                    index.setdefault( node.abs_path, [] ).append( name )
+                else:
+                    new_resolved[name] = ( path, 0 )
+
+        self.__dict__["__symbol_index__"] = ( gen, index, new_resolved )
+
+        return index
+
+    def _address_map_index( self ):
+        """Return the parsed address-maps of the tree's CPU clusters
+
+        The index is built on first use and kept until the tree's nodes, or
+        an address-map, #ranges-address-cells, #ranges-size-cells or phandle
+        property, change.
+
+        Returns:
+           tuple: ( targets, clusters )
+                  targets: node path -> list of clusters whose address-map
+                           references the node (in tree order)
+                  clusters: list of ( cluster node, starts, max_ends ) in
+                            tree order. starts are the sorted child
+                            addresses of the address-map entries and
+                            max_ends[i] the highest end address of the
+                            entries up to and including i. starts is None
+                            when the address-map can't be parsed.
+        """
+        # Lazy import to avoid circular dependency
+        from lopper.assists import lopper_lib
+
+        gen = self.generation( 'address-map', '#ranges-address-cells',
+                               '#ranges-size-cells', 'phandle' )
+        try:
+            cached_gen, index = self.__dict__["__amap_index__"]
+            if cached_gen == gen:
+                return index
+        except KeyError:
+            pass
+
+        targets = {}
+        clusters = []
+        for node in self.__nodes__.values():
+            if 'address-map' not in node.__props__:
+                continue
+
+            addr_map_prop = node.__props__['address-map']
+
+            entries = None
+            starts = None
+            max_ends = None
+            try:
+                na = node['#ranges-address-cells'].value[0]
+                ns = node['#ranges-size-cells'].value[0]
+                entries = lopper_lib.parse_address_map( addr_map_prop.value, na, ns )
+                spans = sorted( ( e.child_addr, e.child_addr + e.size ) for e in entries )
+                starts = [ span[0] for span in spans ]
+                max_ends = []
+                max_end = None
+                for span in spans:
+                    if max_end is None or span[1] > max_end:
+                        max_end = span[1]
+                    max_ends.append( max_end )
+            except (KeyError, IndexError, TypeError):
+                starts = None
+
+            # the parsed entries have the phandles, without them, fall back
+            # to resolve_phandles() to get referenced nodes
+            if entries is not None:
+                referenced = [ self.deref( e.phandle ) for e in entries ]
+            else:
+                referenced = addr_map_prop.resolve_phandles()
+
+            for t in referenced:
+                if t is None:
+                    continue
+                try:
+                    node_list = targets[t.abs_path]
+                    if node_list[-1] is not node:
+                        node_list.append( node )
+                except KeyError:
+                    targets[t.abs_path] = [ node ]
+
+            clusters.append( ( node, starts, max_ends ) )
+
+        index = ( targets, clusters )
+        self.__dict__["__amap_index__"] = ( gen, index )
+
+        return index
+
+    def _interrupt_index( self ):
+        """Return the tree's interrupt topology
+
+        The index is built on first use and kept until the tree's nodes, or
+        an interrupt-parent, interrupts, interrupts-extended, interrupt-map,
+        #interrupt-cells, #address-cells or phandle property, change.
+
+        interrupt-parent is inherited (as property_find() finds it), and
+        interrupt-map entries are decoded with the nexus node's
+        #address-cells and #interrupt-cells, and the #address-cells (0 if
+        it has none) and #interrupt-cells of each entry's parent controller.
+
+        Returns:
+           tuple: ( parents, consumers, maps )
+                  parents: node path -> list of ( controller node,
+                           #interrupt-cells, specifiers ), one per
+                           controller the node's interrupts (or
+                           interrupts-extended) are routed to. specifiers
+                           is a list of tuples of #interrupt-cells cells,
+                           and is empty when the controller has no
+                           #interrupt-cells (which is then None).
+                  consumers: controller path -> list of nodes whose
+                             interrupts, interrupts-extended or
+                             interrupt-map reference the controller (in
+                             tree order)
+                  maps: nexus path -> list of ( child unit address,
+                        child specifier, parent controller node, parent
+                        unit address, parent specifier ), the addresses and
+                        specifiers as tuples of cells
+        """
+        gen = self.generation( 'interrupt-parent', 'interrupts', 'interrupts-extended',
+                               'interrupt-map', '#interrupt-cells', '#address-cells',
+                               'phandle' )
+        try:
+            cached_gen, index = self.__dict__["__irq_index__"]
+            if cached_gen == gen:
+                return index
+        except KeyError:
+            pass
+
+        def cells_of( node, name, default = None ):
+            try:
+                v = node.__props__[name].value[0]
+                return v if isinstance( v, int ) else default
+            except (KeyError, IndexError):
+                return default
+
+        def cells_list( node, name ):
+            try:
+                v = node.__props__[name].value
+            except KeyError:
+                return []
+            if not v or not all( isinstance( c, int ) for c in v ):
+                return []
+            return v
+
+        inherited = {}
+        def interrupt_parent( node ):
+            path = node.abs_path
+            try:
+                return inherited[path]
+            except KeyError:
+                pass
+            if "interrupt-parent" in node.__props__:
+                ph = cells_of( node, "interrupt-parent", 0 )
+            elif node.parent is not None:
+                ph = interrupt_parent( node.parent )
+            else:
+                ph = 0
+            inherited[path] = ph
+            return ph
+
+        parents = {}
+        consumers = {}
+        maps = {}
+
+        def route( node, controller, specifier ):
+            routes = parents.setdefault( node.abs_path, [] )
+            for r in routes:
+                if r[0] is controller:
+                    if r[1]:
+                        r[2].append( specifier )
+                    break
+            else:
+                cells = cells_of( controller, "#interrupt-cells" )
+                routes.append( ( controller, cells, [ specifier ] if cells else [] ) )
+
+        def consumed( node, controller ):
+            node_list = consumers.setdefault( controller.abs_path, [] )
+            if not node_list or node_list[-1] is not node:
+                node_list.append( node )
+
+        for node in self.__nodes__.values():
+            props = node.__props__
+
+            if "interrupts-extended" in props:
+                value = cells_list( node, "interrupts-extended" )
+                i = 0
+                while i < len( value ):
+                    controller = self.pnode( value[i] )
+                    cells = cells_of( controller, "#interrupt-cells" ) if controller else None
+                    if not cells:
+                        break
+                    route( node, controller, tuple( value[i + 1:i + 1 + cells] ) )
+                    consumed( node, controller )
+                    i += 1 + cells
+            elif "interrupts" in props:
+                controller = self.pnode( interrupt_parent( node ) )
+                if controller is not None:
+                    value = cells_list( node, "interrupts" )
+                    cells = cells_of( controller, "#interrupt-cells" )
+                    parents[node.abs_path] = [ ( controller, cells, [ tuple( value[i:i + cells] )
+                                                                      for i in range( 0, len( value ) - cells + 1, cells ) ]
+                                                 if cells else [] ) ]
+                    consumed( node, controller )
+
+            if "interrupt-map" in props:
+                value = cells_list( node, "interrupt-map" )
+                na = cells_of( node, "#address-cells", 0 )
+                ni = cells_of( node, "#interrupt-cells", 0 )
+                entries = []
+                i = 0
+                while i + na + ni < len( value ):
+                    controller = self.pnode( value[i + na + ni] )
+                    if controller is None:
+                        break
+                    pna = cells_of( controller, "#address-cells", 0 )
+                    pni = cells_of( controller, "#interrupt-cells", 0 )
+                    start = i + na + ni + 1
+                    if start + pna + pni > len( value ):
+                        break
+                    entries.append( ( tuple( value[i:i + na] ), tuple( value[i + na:i + na + ni] ),
+                                      controller, tuple( value[start:start + pna] ),
+                                      tuple( value[start + pna:start + pna + pni] ) ) )
+                    consumed( node, controller )
+                    i = start + pna + pni
+                maps[node.abs_path] = entries
+
+        index = ( parents, consumers, maps )
+        self.__dict__["__irq_index__"] = ( gen, index )
+
+        return index
+
     def accessible_by(self, target):
         """Find which CPU clusters can access a device or address.
 
         This method searches all CPU cluster nodes (nodes with address-map
         property) and returns those whose address-map includes the target.
 
+        The parsed address-maps are cached (see _address_map_index()), so
+        repeated lookups against an unchanged tree are a dictionary lookup
+        (nodes) or a bisect per cluster (addresses).
+
         Args:
             target: Either:
                     - A LopperNode (checks if node's phandle is in address-map)
@@ -6735,9 +7509,6 @@ class LopperTree:
             >>> clusters = tree.accessible_by('serial0')  # alias
             >>> clusters = tree.accessible_by('uart0')    # label
         """
-        # Lazy import to avoid circular dependency
-        from lopper.assists import lopper_lib
-
         # Resolve target to node if string (path, label, or alias)
         target_node = None
         target_address = None
@@ -6754,37 +7525,70 @@ class LopperTree:
             # Assume it's a node
             target_node = target
 
-        # Find all CPU cluster nodes (nodes with address-map property)
-        matching_clusters = []
+        targets, clusters = self._address_map_index()
 
-        for node in self.__nodes__.values():
-            if 'address-map' not in node.__props__:
+        if target_node is not None:
+            return list( targets.get( getattr( target_node, 'abs_path', None ), [] ) )
+
+        # an entry contains the address when its start is at or below the
+        # address and its end is above it. With the starts sorted, that is
+        # any entry up to the bisect point, so only the highest end up to
+        # there needs to be checked.
+        matching_clusters = []
+        for node, starts, max_ends in clusters:
+            if starts is None:
+                continue
+            try:
+                i = bisect.bisect_right( starts, target_address )
+                if i and max_ends[i - 1] > target_address:
+                    matching_clusters.append( node )
+            except TypeError:
                 continue
 
-            addr_map_prop = node.__props__['address-map']
-            is_accessible = False
-
-            if target_node is not None:
-                # Use resolve_phandles() to get referenced nodes
-                phandle_targets = addr_map_prop.resolve_phandles()
-                if target_node in phandle_targets:
-                    is_accessible = True
-            elif target_address is not None:
-                # For address lookup, we need the parsed entries with address ranges
-                try:
-                    address_map = addr_map_prop.value
-                    na = node['#ranges-address-cells'].value[0]
-                    ns = node['#ranges-size-cells'].value[0]
-                    entries = lopper_lib.parse_address_map(address_map, na, ns)
-                    if lopper_lib.find_address_in_map(entries, target_address) is not None:
-                        is_accessible = True
-                except (KeyError, IndexError, TypeError):
-                    continue
+        return matching_clusters
 
-            if is_accessible:
-                matching_clusters.append(node)
+    def interrupt_parents( self, node ):
+        """Find the interrupt controllers of a node
 
-        return matching_clusters
+        Uses the tree's interrupt topology (see _interrupt_index()), so
+        repeated lookups against an unchanged tree are a dictionary lookup,
+        rather than a walk for interrupt-parent and a deref.
+
+        Args:
+            node (LopperNode): the node to check
+
+        Returns:
+            list: ( controller node, #interrupt-cells, specifiers ) for each
+                  controller the node's interrupts are routed to (see
+                  _interrupt_index()). Empty if the node has no (routable)
+                  interrupts.
+        """
+        parents, _, _ = self._interrupt_index()
+        return list( parents.get( node.abs_path, [] ) )
+
+    def interrupt_consumers( self, intc ):
+        """Find the nodes whose interrupts are routed to a controller
+
+        Consumers are nodes with interrupts and an (inherited)
+        interrupt-parent of the controller, nodes with interrupts-extended
+        entries for it and interrupt nexus nodes with interrupt-map
+        entries for it.
+
+        Args:
+            intc: the controller, a LopperNode, or a string resolved via
+                  deref (path, label or alias)
+
+        Returns:
+            list: LopperNodes, in tree order. Empty if nothing is routed
+                  to the controller.
+        """
+        if isinstance( intc, str ):
+            intc = self.deref( intc )
+            if intc is None:
+                return []
+
+        _, consumers, _ = self._interrupt_index()
+        return list( consumers.get( intc.abs_path, [] ) )
 
     def exec_cmd( self, node, cmd, env = None, module_list=[], module_load_paths=[] ):
         """Execute a (limited) code block against a node
@@ -6873,31 +7677,15 @@ class LopperTree:
             for e in env:
                 safe_dict[e] = env[e]
 
-        if module_list:
-            mod_load = "assist_dir = os.path.dirname(os.path.realpath(__file__)) + '/assists/'\n"
-            mod_load += "sys.path.append(assist_dir)\n"
-            for m in module_load_paths:
-                mod_load += f"sys.path.append('{m}')\n"
-            mod_load += "import importlib\n"
-        else:
-            mod_load = ""
-
-        for m in module_list:
-            mod_load += f"{m} = importlib.import_module( '.{m}', package='lopper.assists' )\n"
+        # the import prologue and the wrapped block are compiled once per
+        # process (see lopper.lop_program), not once per call
+        mod_code = lopper.lop_program.prologue_block( module_list, module_load_paths )
+        b = lopper.lop_program.code_block( cmd )
 
-        tc = cmd
+        lopper.log._debug( f"node exec cmd:\n{cmd}" )
 
         # we wrap the test command to control the ins and outs
         __nret = False
-        # indent everything, its going in a function
-        tc_indented = textwrap.indent( tc, '    ' )
-        # define the function, add the body, call the function and grab the return value
-        tc_full_block = mod_load + "def __node_test_block():\n" + tc_indented + "\n__nret = __node_test_block()"
-
-        lopper.log._debug( f"node exec cmd:\n{tc_full_block}" )
-
-        # compile the block, so we can evaluate it later
-        b = compile( tc_full_block, '<string>', 'exec' )
 
         x = locals()
         y = globals()
@@ -6918,8 +7706,12 @@ class LopperTree:
         #       or
         #          x = eval( b, {"__builtins__" : None }, safe_dict )
         try:
+            if mod_code:
+                eval( mod_code, m, m )
             eval( b, m, m )
         except Exception as e:
+            tc_full_block = lopper.lop_program.prologue_text( module_list, module_load_paths ) + \
+                            lopper.lop_program.code_block_text( cmd )
             lopper.log._warning( f"Exception ({e}) raised by code block:\n{tc_full_block}")
             os._exit(1)
 
@@ -6930,6 +7722,135 @@ class LopperTree:
         else:
             return False
 
+    def exec_cmd_batch( self, nodes, cmd, env = None, module_list=[], module_load_paths=[] ):
+        """Execute a (limited) code block against a list of nodes
+
+        The batch form of exec_cmd(). The code block is run once per node,
+        with the same variables available as exec_cmd() provides (tree, node,
+        node_name, node_number, __selected__ and the passed env).
+
+        The code block and the module import prologue are prepared once for
+        the batch, as is the execution environment. Only the node specific
+        variables are updated before each node is processed, and the tree is
+        sync'd once, when the batch is complete.
+
+        As with exec_cmd(), a variable passed in env takes precedence over
+        the node variables of the same name.
+
+        Nodes may be renamed, moved, added or deleted by the code block
+        while the batch is running:
+
+           - if a node is renamed, the tree is sync'd before the next node is
+             processed, so path lookups (and string entries in nodes) see
+             the new paths. Renames are seen through the node's name being
+             assigned (the tree's __renames__ count), which is the only
+             change that leaves paths stale: move(), add() and delete()
+             update the node paths and the tree's path index as they go.
+             A node's abs_path must not be assigned directly.
+           - nodes deleted by an earlier block are skipped
+           - string entries in nodes are looked up just before they are
+             processed, so they can refer to nodes created (or moved) earlier
+             in the batch
+
+        Args:
+            nodes (list): LopperNodes or node paths to process, in order
+            cmd (string): block of python code to execute
+            env (dictionary,optional): values to make available as
+                                       variables to the code block
+            module_list (list,optional): list of assists to load before
+                                         running the code block
+            module_load_paths (list,optional): additional load paths to use
+                                               when loading modules
+
+        Returns:
+            Return value from the execution of the code block against the
+            last node processed, False if no nodes were processed
+
+        """
+        # only sync if required
+        self.sync( None, True )
+
+        mod_code = lopper.lop_program.prologue_block( module_list, module_load_paths )
+        b = lopper.lop_program.code_block( cmd )
+
+        lopper.log._debug( f"node exec cmd (batch of {len(nodes)}):\n{cmd}" )
+
+        safe_dict = {}
+        safe_dict['len'] = len
+        safe_dict['print'] = print
+        safe_dict['fdt'] = None
+        safe_dict['verbose'] = self.__dbg__
+        safe_dict['tree'] = self
+        if env:
+            for e in env:
+                safe_dict[e] = env[e]
+
+        # the same merged environment that exec_cmd() builds, but built once.
+        # Only the node variables change as we walk the batch.
+        x = locals()
+        y = globals()
+        m = {**x, **y, **safe_dict}
+
+        try:
+            if mod_code:
+                eval( mod_code, m, m )
+        except Exception as e:
+            tc_full_block = lopper.lop_program.prologue_text( module_list, module_load_paths )
+            lopper.log._warning( f"Exception ({e}) raised by code block:\n{tc_full_block}")
+            os._exit(1)
+
+        ret = False
+        renames = self.__renames__
+        for node in nodes:
+            if node == None:
+                continue
+
+            # a node was renamed by the last block, fix up the paths
+            # before we go looking for the next one
+            if self.__renames__ != renames:
+                self.sync()
+                renames = self.__renames__
+
+            n = node
+            if type(node) == str:
+                try:
+                    n = self[node]
+                except:
+                    lopper.log._debug( f"exec batch: node {node} not found, skipping" )
+                    continue
+
+            if n.__nstate__ == "deleted" or n.tree is not self:
+                lopper.log._debug( f"exec batch: node {n.abs_path} is no longer in the tree, skipping" )
+                continue
+
+            m['n'] = n
+            m['node'] = n
+            m['node_number'] = n.number
+            m['node_name'] = n.abs_path
+            m['prop_list'] = n.__props__
+            m['__selected__'] = self.__selected__
+            m['__nret'] = False
+            # env overrides the node variables, as it does in exec_cmd()
+            if env:
+                m.update( env )
+
+            try:
+                eval( b, m, m )
+            except Exception as e:
+                tc_full_block = lopper.lop_program.prologue_text( module_list, module_load_paths ) + \
+                                lopper.lop_program.code_block_text( cmd )
+                lopper.log._warning( f"Exception ({e}) raised by code block:\n{tc_full_block}")
+                os._exit(1)
+
+            lopper.log._debug( f"return code was: {m['__nret']}" )
+
+            ret = m['__nret'] if m['__nret'] else False
+
+        # who knows what the commands did, sync once for the batch
+        self.sync()
+
+        return ret
+
 
     def filter( self, node_prefix, action, test_cmd, fdt=None, verbose=0 ):
         """Filter tree nodes and perform an action
@@ -7132,6 +8053,7 @@ class LopperTree:
         self.__current_node__ = 0
         self.__new_iteration__ = True
 
+    @lopper.timings.timed( "tree load", "tree" )
     def load(self, dct = None ):
         """load a tree
 
@@ -7163,6 +8085,8 @@ class LopperTree:
         else:
             dct = self.dct
 
+        _nodes_changed( self )
+
         # take the dictionary format, which is a series of nested dicts
         # representing nodes and properties. We'd rather not recurse to do our
         # processing below, so we unroll the recursion into an ordered list of
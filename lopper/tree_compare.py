@@ -18,6 +18,18 @@ compare by resolved target, not raw number). Not yet: the output
 renderers (fragment / unified / compact / equivalence file output). See
 ``agent-files/tree-compare-design.md``.
 
+A comparison is a single pass over each tree: excluded nodes are found
+with set lookups, properties with identical raw values are only
+normalized when a phandle number among their cells means different nodes
+in the two trees (see _PhandlePaths), and the renderers are generators,
+so an output file is written as the delta is rendered.
+
+With the default path key, compare() walks the two trees together and
+checks each matched pair's raw property values as it goes, so only the
+pairs that can differ are diffed (see _pruned_match). Phandle cells are
+only normalized for those pairs, and only when the two trees number
+phandles differently.
+
 Relationship to existing core comparison routines:
 
 * ``LopperNode.__eq__`` / ``__hash__`` define node identity by
@@ -30,6 +42,7 @@ Relationship to existing core comparison routines:
 """
 
 import lopper.log
+from lopper.base import lopper_base
 
 lopper.log._init(__name__)
 
@@ -136,16 +149,16 @@ class Delta:
             str: the rendered text, or the output path when ``output`` set.
         """
         if fmt == "equivalence":
-            text = "equivalent" if self.equivalent() else "differ"
+            chunks = ["equivalent" if self.equivalent() else "differ"]
         elif fmt == "unified":
-            text = _render_unified(self)
+            chunks = _render_unified(self)
         elif fmt == "compact":
-            text = _render_compact(self)
+            chunks = _render_compact(self)
         elif fmt == "fragment":
-            text = _render_fragment(self)
+            chunks = _render_fragment(self)
         else:
             raise NotImplementedError(f"unknown compare output format {fmt!r}")
-        return _deliver(text, output, as_string)
+        return _deliver(chunks, output, as_string)
 
     def __repr__(self):
         return (f"Delta(key={self.key!r}: added={len(self.added_nodes)} "
@@ -156,21 +169,29 @@ class Delta:
 SUPPORTED_KEYS = frozenset({"path", "label", "address"})
 
 
+def _excluded(path):
+    """True if a path is an excluded node, or one of its descendants.
+
+    Looks up each ancestor prefix of the path in the exclusion set, rather
+    than comparing the path against every excluded path.
+    """
+    if path in _COMPARE_EXCLUDE_NODES:
+        return True
+    i = path.find("/", 1)
+    while i != -1:
+        if path[:i] in _COMPARE_EXCLUDE_NODES:
+            return True
+        i = path.find("/", i + 1)
+    return False
+
+
 def _user_nodes(tree):
     """List of user-facing nodes of a tree.
 
     Excludes derived/bookkeeping nodes (and their descendants) that would
     otherwise add noise to the diff.
     """
-    nodes = []
-    for node in tree:
-        path = node.abs_path
-        if path in _COMPARE_EXCLUDE_NODES:
-            continue
-        if any(path.startswith(ex + "/") for ex in _COMPARE_EXCLUDE_NODES):
-            continue
-        nodes.append(node)
-    return nodes
+    return [node for node in tree if not _excluded(node.abs_path)]
 
 
 def _node_key(node, key):
@@ -280,12 +301,59 @@ def _normalized_value(prop):
     return normalized
 
 
-def _values_equal(prop_a, prop_b):
-    """Compare two properties, normalizing phandle references by target."""
+class _PhandlePaths:
+    """The phandle -> target path maps of the two trees of a comparison.
+
+    Built once per compare() (rather than resolving phandles for every
+    property), to decide when raw-equal values can skip normalization.
+
+    Attributes:
+        a (dict): phandle -> abs_path, in the source tree.
+        b (dict): phandle -> abs_path, in the target tree.
+        same (bool): every phandle means the same path in both trees.
+    """
+
+    def __init__(self, tree_a, tree_b):
+        self.a = self._paths(tree_a)
+        self.b = self._paths(tree_b)
+        self.same = self.a == self.b
+
+    @staticmethod
+    def _paths(tree):
+        pnodes = getattr(tree, "__pnodes__", None) or {}
+        return {ph: node.abs_path for ph, node in pnodes.items()
+                if node is not None}
+
+    def agree(self, raw):
+        """True if each cell of a raw value that is a phandle in either
+        tree resolves to the same path in both (so equal raw values are
+        equal once normalized)."""
+        if self.same:
+            return True
+        a = self.a
+        b = self.b
+        return all(a.get(v) == b.get(v) for v in raw if isinstance(v, int))
+
+
+def _values_equal(prop_a, prop_b, phandles=None):
+    """Compare two properties, normalizing phandle references by target.
+
+    Args:
+        prop_a, prop_b (LopperProp): the properties to compare.
+        phandles (_PhandlePaths, optional): the phandle maps of the two
+            trees. When given, identical raw values are equal without
+            normalizing, unless one of their cells is a phandle number
+            that resolves differently in the two trees.
+    """
+    if phandles is not None:
+        raw_a = prop_a.value
+        if raw_a == prop_b.value:
+            if not isinstance(raw_a, list) or phandles.agree(raw_a):
+                return True
     return _normalized_value(prop_a) == _normalized_value(prop_b)
 
 
-def _compare_node(node_a, node_b):
+def _compare_node(node_a, node_b, phandles=None):
     """Diff a matched pair of nodes. Returns a NodeDelta, or None if the
     nodes are identical (same path and properties)."""
     delta = NodeDelta(node_b.abs_path, node_a, node_b)
@@ -306,13 +374,116 @@ def _compare_node(node_a, node_b):
         if name not in props_b:
             delta.removed_props.append(prop)
         else:
-            if not _values_equal(prop, props_b[name]):
+            if not _values_equal(prop, props_b[name], phandles):
                 delta.changed_props.append((name, prop.value, props_b[name].value))
 
     return delta if delta else None
 
 
-def compare(tree_a, tree_b, key="path"):
+def _same_props(node_a, node_b, phandles, phandle_props):
+    """True if a matched pair of nodes certainly has no property
+    differences, checked on raw values only.
+
+    ``phandle_props`` is None when every phandle means the same node in
+    both trees, or the names of the properties phandle_map() resolves:
+    only their values can be equal raw and differ once normalized.
+
+    False does not mean the nodes differ: values that are only equal once
+    normalized (phandles numbered differently) are left to _compare_node().
+    """
+    props_a = node_a.__dict__["__props__"]
+    props_b = node_b.__dict__["__props__"]
+    if len(props_a) != len(props_b):
+        return False
+    for name, prop_a in props_a.items():
+        if name in _COMPARE_EXCLUDE_PROPS:
+            continue
+        prop_b = props_b.get(name)
+        if prop_b is None:
+            return False
+        raw = prop_a.__dict__["value"]
+        if raw != prop_b.__dict__["value"]:
+            return False
+        if phandle_props is not None and name in phandle_props \
+                and isinstance(raw, list) and not phandles.agree(raw):
+            return False
+    return True
+
+
+def _children(node):
+    """(name, child) of a node's user-facing children. Only called on nodes
+    that aren't excluded, so a child is excluded only if it is listed."""
+    children = []
+    for c in node.__dict__["child_nodes"].values():
+        d = c.__dict__
+        if d["abs_path"] not in _COMPARE_EXCLUDE_NODES:
+            children.append((d["name"], c))
+    return children
+
+
+def _subtree_nodes(node):
+    """A node and its user-facing descendants."""
+    nodes = []
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        nodes.append(n)
+        stack.extend(c for _, c in _children(n))
+    return nodes
+
+
+def _pruned_match(tree_a, tree_b, phandles):
+    """Path matching that only returns the pairs that can differ.
+
+    Walks the two trees together from the root, matching children by
+    name, and checks each pair's raw property values as it goes (see
+    _same_props()). A pair is only returned (for _compare_node()) when
+    that check can't show the nodes are the same. Children on one side
+    only are returned with all their descendants.
+
+    This is a single pass over each tree, with no per node lists, path
+    dicts or NodeDelta for the nodes that are unchanged. Nothing is kept
+    on the trees, so values edited in place are always seen.
+
+    Returns:
+        (pairs, only_a, only_b), as _match() for the path key, less the
+        pairs that are known to be identical.
+    """
+    if phandles.same:
+        phandle_props = None
+    else:
+        phandle_props = frozenset(lopper_base.phandle_possible_properties())
+
+    pairs, only_a, only_b = [], [], []
+    root_a = tree_a.__nodes__.get("/")
+    root_b = tree_b.__nodes__.get("/")
+    if root_a is None or root_b is None:
+        only_a = _subtree_nodes(root_a) if root_a is not None else []
+        only_b = _subtree_nodes(root_b) if root_b is not None else []
+        return pairs, only_a, only_b
+
+    stack = [(root_a, root_b)]
+    while stack:
+        node_a, node_b = stack.pop()
+        if not _same_props(node_a, node_b, phandles, phandle_props):
+            pairs.append((node_a, node_b))
+
+        children_a = dict(_children(node_a))
+        children_b = dict(_children(node_b))
+        for name, child_a in children_a.items():
+            child_b = children_b.get(name)
+            if child_b is None:
+                only_a.extend(_subtree_nodes(child_a))
+            else:
+                stack.append((child_a, child_b))
+        for name, child_b in children_b.items():
+            if name not in children_a:
+                only_b.extend(_subtree_nodes(child_b))
+
+    return pairs, only_a, only_b
+
+
+def compare(tree_a, tree_b, key="path", prune=True):
     """Compare two LopperTrees and return a :class:`Delta`.
 
     Args:
@@ -321,6 +492,9 @@ def compare(tree_a, tree_b, key="path"):
         key (str): node-matching key, one of SUPPORTED_KEYS ("path",
             "label", "address"). Non-path keys fall back to path matching
             for nodes that lack (or share) that key value.
+        prune (bool): with the path key, only diff the node pairs whose
+            raw property values differ (see _pruned_match). False diffs
+            every node; the delta is the same either way.
 
     Returns:
         Delta: the structural difference (B relative to A).
@@ -334,15 +508,19 @@ def compare(tree_a, tree_b, key="path"):
     delta.tree_a = tree_a
     delta.tree_b = tree_b
 
-    nodes_a = _user_nodes(tree_a)
-    nodes_b = _user_nodes(tree_b)
-    pairs, only_a, only_b = _match(nodes_a, nodes_b, key)
+    phandles = _PhandlePaths(tree_a, tree_b)
+    if key == "path" and prune:
+        pairs, only_a, only_b = _pruned_match(tree_a, tree_b, phandles)
+    else:
+        nodes_a = _user_nodes(tree_a)
+        nodes_b = _user_nodes(tree_b)
+        pairs, only_a, only_b = _match(nodes_a, nodes_b, key)
 
     delta.added_nodes = sorted(only_b, key=lambda n: n.abs_path)
     delta.removed_nodes = sorted(only_a, key=lambda n: n.abs_path)
 
     for node_a, node_b in sorted(pairs, key=lambda pr: pr[1].abs_path):
-        node_delta = _compare_node(node_a, node_b)
+        node_delta = _compare_node(node_a, node_b, phandles)
         if node_delta:
             delta.changed_nodes.append(node_delta)
 
@@ -353,16 +531,28 @@ def compare(tree_a, tree_b, key="path"):
 # Renderers
 # --------------------------------------------------------------------------
 
-def _deliver(text, output, as_string):
+def _deliver(chunks, output, as_string):
     """Return the rendered text, or write it to ``output`` and return the
     path. ``as_string`` is retained for API symmetry; returning the text
-    is the default when no output file is requested."""
-    if not text.endswith("\n"):
-        text += "\n"
+    is the default when no output file is requested.
+
+    ``chunks`` is an iterable of text (a renderer's generator). When
+    writing to ``output`` each chunk is written as it is rendered, so the
+    whole text is never held in memory.
+    """
     if output:
+        last = ""
         with open(output, "w", encoding="utf-8") as f:
-            f.write(text)
+            for chunk in chunks:
+                if chunk:
+                    f.write(chunk)
+                    last = chunk
+            if not last.endswith("\n"):
+                f.write("\n")
         return output
+    text = "".join(chunks)
+    if not text.endswith("\n"):
+        text += "\n"
     return text
 
 
@@ -423,55 +613,58 @@ def _render_unified(delta):
     headers are context lines. A changed property is a '-' (old) then a '+'
     (new); an added/removed property is a single '+'/'-'. Phandle cells
     render as their resolved target. Fully sorted for byte-stable output.
+
+    A generator of lines (each with its newline).
     """
-    lines = ["--- a", "+++ b"]
+    yield "--- a\n"
+    yield "+++ b\n"
 
     for node in delta.removed_nodes:
-        lines.append(f"- {node.abs_path}")
+        yield f"- {node.abs_path}\n"
     for node in delta.added_nodes:
-        lines.append(f"+ {node.abs_path}")
+        yield f"+ {node.abs_path}\n"
 
     for nd in delta.changed_nodes:
-        lines.append(_diff_node_header(nd))
+        yield _diff_node_header(nd) + "\n"
         for prop in sorted(nd.added_props, key=lambda p: p.name):
-            lines.append(f"+     {_diff_prop(prop)}")
+            yield f"+     {_diff_prop(prop)}\n"
         for prop in sorted(nd.removed_props, key=lambda p: p.name):
-            lines.append(f"-     {_diff_prop(prop)}")
+            yield f"-     {_diff_prop(prop)}\n"
         for name, _va, _vb in sorted(nd.changed_props, key=lambda c: c[0]):
             old, new = _changed_pair(nd, name)
             if old is not None:
-                lines.append(f"-     {_diff_prop(old)}")
+                yield f"-     {_diff_prop(old)}\n"
             if new is not None:
-                lines.append(f"+     {_diff_prop(new)}")
-
-    return "\n".join(lines) + "\n"
+                yield f"+     {_diff_prop(new)}\n"
 
 
 def _render_compact(delta):
     """Compact rendering: one line per change. Node adds/removes as '+'/'-';
     within a changed node, added/removed properties as '+ '/'- ' and a
     changed property as a single '~ name: old -> new' line. Phandle cells
-    resolve to their target."""
-    lines = ["--- a", "+++ b"]
+    resolve to their target.
+
+    A generator of lines (each with its newline).
+    """
+    yield "--- a\n"
+    yield "+++ b\n"
 
     for node in delta.removed_nodes:
-        lines.append(f"- {node.abs_path}")
+        yield f"- {node.abs_path}\n"
     for node in delta.added_nodes:
-        lines.append(f"+ {node.abs_path}")
+        yield f"+ {node.abs_path}\n"
 
     for nd in delta.changed_nodes:
-        lines.append(_diff_node_header(nd))
+        yield _diff_node_header(nd) + "\n"
         for prop in sorted(nd.added_props, key=lambda p: p.name):
-            lines.append(f"    + {_diff_prop(prop)}")
+            yield f"    + {_diff_prop(prop)}\n"
         for prop in sorted(nd.removed_props, key=lambda p: p.name):
-            lines.append(f"    - {_diff_prop(prop)}")
+            yield f"    - {_diff_prop(prop)}\n"
         for name, _va, _vb in sorted(nd.changed_props, key=lambda c: c[0]):
             old, new = _changed_pair(nd, name)
             ov = (_diff_value(old) if old is not None else None) or ""
             nv = (_diff_value(new) if new is not None else None) or ""
-            lines.append(f"    ~ {name}: {ov} -> {nv}")
-
-    return "\n".join(lines) + "\n"
+            yield f"    ~ {name}: {ov} -> {nv}\n"
 
 
 # --- fragment renderer -----------------------------------------------------
@@ -523,52 +716,46 @@ def _fragment_value(prop):
 
 
 def _prop_lines(props, indent):
-    lines = []
+    """Generate the fragment lines of properties."""
     for prop in props:
         if prop.name in _COMPARE_EXCLUDE_PROPS:
             continue
         value = _fragment_value(prop)
         if value is None and prop.value in ([], [""], "", None):
-            lines.append(f"{indent}{prop.name};")
+            yield f"{indent}{prop.name};"
         elif value is not None:
-            lines.append(f"{indent}{prop.name} = {value};")
+            yield f"{indent}{prop.name} = {value};"
         else:
             lopper.log._warning(
                 f"compare fragment: cannot render property {prop.name!r} "
                 f"on {prop.node.abs_path if prop.node else '?'}; skipped")
-    return lines
 
 
 def _serialize_subtree(node, indent):
-    """Emit a node's body: its properties then its child node blocks."""
-    lines = _prop_lines(node.__props__.values(), indent)
+    """Generate a node's body: its properties then its child node blocks."""
+    yield from _prop_lines(node.__props__.values(), indent)
     for child in node.child_nodes.values():
         if child.abs_path in _COMPARE_EXCLUDE_NODES:
             continue
         label = (child.label + ": ") if child.label else ""
-        lines.append(f"{indent}{label}{child.name} {{")
-        lines.extend(_serialize_subtree(child, indent + "\t"))
-        lines.append(f"{indent}}};")
-    return lines
-
+        yield f"{indent}{label}{child.name} {{"
+        yield from _serialize_subtree(child, indent + "\t")
+        yield f"{indent}}};"
 
-def _render_fragment(delta):
-    """Render the delta as a concatenated device-tree fragment (source -> target)."""
-    blocks = []
 
+def _fragment_blocks(delta):
+    """Generate the fragment's blocks, each a generator of its lines."""
     # changed nodes: override added/changed props, delete removed props
     for nd in delta.changed_nodes:
-        body = []
         wanted = ([p.name for p in nd.added_props]
                   + [name for (name, _a, _b) in nd.changed_props])
         props = [nd.node_b.__props__[n] for n in wanted
                  if n in nd.node_b.__props__]
-        body.extend(_prop_lines(props, "\t"))
+        body = list(_prop_lines(props, "\t"))
         for prop in nd.removed_props:
             body.append(f"\t/delete-property/ {prop.name};")
         if body:
-            blocks.append(_node_ref(nd.node_b) + " {\n"
-                          + "\n".join(body) + "\n};")
+            yield iter([_node_ref(nd.node_b) + " {"] + body + ["};"])
 
     # added nodes: emit the top of each added subtree, targeting its parent.
     # descendants that are also "added" come via the subtree recursion, so
@@ -578,14 +765,11 @@ def _render_fragment(delta):
         parent = node.parent
         if parent is not None and parent.abs_path in added_paths:
             continue
-        label = (node.label + ": ") if node.label else ""
-        inner = _serialize_subtree(node, "\t\t")
-        child_block = (f"\t{label}{node.name} {{\n"
-                       + "\n".join(inner) + "\n\t};")
         if parent is None or parent.abs_path == "/":
-            blocks.append("/ {\n" + child_block + "\n};")
+            target = "/"
         else:
-            blocks.append(_node_ref(parent) + " {\n" + child_block + "\n};")
+            target = _node_ref(parent)
+        yield _added_block(node, target)
 
     # removed nodes: delete by reference (top of each removed subtree only)
     removed_paths = {n.abs_path for n in delta.removed_nodes}
@@ -593,6 +777,37 @@ def _render_fragment(delta):
         parent = node.parent
         if parent is not None and parent.abs_path in removed_paths:
             continue
-        blocks.append(f"/delete-node/ {_node_ref(node)};")
+        yield iter([f"/delete-node/ {_node_ref(node)};"])
+
+
+def _added_block(node, target):
+    """Generate the lines of the block adding a node (subtree) to target."""
+    label = (node.label + ": ") if node.label else ""
+    yield target + " {"
+    yield f"\t{label}{node.name} {{"
+    empty = True
+    for line in _serialize_subtree(node, "\t\t"):
+        empty = False
+        yield line
+    if empty:
+        yield ""
+    yield "\t};"
+    yield "};"
+
 
-    return "\n\n".join(blocks) + "\n"
+def _render_fragment(delta):
+    """Render the delta as a concatenated device-tree fragment (source -> target).
+
+    A generator of text: blocks are separated by a blank line, and the
+    lines of an added subtree are generated as they are written.
+    """
+    first = True
+    for block in _fragment_blocks(delta):
+        if not first:
+            yield "\n\n"
+        first = False
+        line_sep = ""
+        for line in block:
+            yield line_sep + line
+            line_sep = "\n"
+    yield "\n"
@@ -0,0 +1,173 @@
+#/*
+# * Copyright (C) 2026 Advanced Micro Devices, Inc. All Rights Reserved.
+# *
+# * SPDX-License-Identifier: BSD-3-Clause
+# */
+
+"""
+Lopper tree source
+
+Writes a flattened device tree (dtb) as device tree source, in process,
+with the same output as "dtc -I dtb -O dts" (dtc's treesource.c, 1.5 and
+later), so writing a .dts doesn't spawn dtc and round trip the tree
+through a temporary file.
+
+A dtb carries no type information, so each property's value is shown the
+way dtc guesses it:
+
+ - a string (list), if the value is NUL terminated printable characters
+   and there are no more NULs than other characters
+ - cells, if the length is a multiple of four
+ - bytes, otherwise
+
+Labels and phandle references are not recovered, phandles are written as
+the cell values that they are.
+"""
+
+import struct
+
+FDT_MAGIC = 0xd00dfeed
+
+FDT_BEGIN_NODE = 0x1
+FDT_END_NODE = 0x2
+FDT_PROP = 0x3
+FDT_NOP = 0x4
+FDT_END = 0x9
+
+# isprint() in the C locale, plus NUL and the escapable controls: bytes
+# that can be part of a string value
+_STRING_BYTES = bytes( range( 0x20, 0x7f ) ) + b"\0\a\b\t\n\v\f\r"
+
+# how each character of a string value is written: NUL separates the
+# strings of a list, controls with a C escape use it, and other non
+# printable characters are hex escaped (dtc's write_propval_string())
+_STRING_ESCAPES = { c: f"\\x{c:02x}" for c in range( 0x100 ) if not 0x20 <= c < 0x7f }
+_STRING_ESCAPES.update( { ord( c ): "\\" + e for c, e in zip( "\a\b\t\n\v\f\r", "abtnvfr" ) } )
+_STRING_ESCAPES.update( { 0: '", "', ord( "\\" ): "\\\\", ord( '"' ): '\\"' } )
+
+def _value( val ):
+    """Return the source of a property value, as dtc guesses its type
+
+    Args:
+       val (bytes): property value, not empty
+
+    Returns:
+       string: the value, as it follows "name = "
+    """
+    n = len( val )
+    nnul = val.count( 0 )
+    nnotstring = len( val.translate( None, _STRING_BYTES ) )
+
+    if val[-1] == 0 and nnotstring == 0 and nnul <= n - nnul:
+        return '"' + val[:-1].decode( "latin-1" ).translate( _STRING_ESCAPES ) + '"'
+
+    if n % 4 == 0:
+        cells = struct.unpack( f">{n // 4}I", val )
+        return "<" + " ".join( [ f"0x{c:02x}" for c in cells ] ) + ">"
+
+    return "[" + " ".join( [ f"{b:02x}" for b in val ] ) + "]"
+
+def _cstring( blob, offset ):
+    end = blob.index( b"\0", offset )
+    return blob[offset:end].decode( "latin-1" ), end
+
+def source_lines( dtb ):
+    """Generate the source of a flattened device tree
+
+    Args:
+       dtb (bytes or bytearray): the flattened tree, for example
+                                 Fdt.as_bytearray()
+
+    Returns:
+       generator: lines of the source, each ending in a newline
+
+    Raises:
+       ValueError: if dtb is not a flattened tree this can read (a bad
+                   magic number, or a version before 16)
+    """
+    blob = bytes( dtb )
+    if len( blob ) < 40:
+        raise ValueError( "truncated flattened device tree" )
+
+    magic, _, off_struct, off_strings, off_rsvmap, version = struct.unpack_from( ">6I", blob, 0 )
+    if magic != FDT_MAGIC:
+        raise ValueError( f"bad flattened device tree magic: {magic:#x}" )
+    if version < 16:
+        raise ValueError( f"unsupported flattened device tree version: {version}" )
+
+    yield "/dts-v1/;\n"
+    yield "\n"
+
+    offset = off_rsvmap
+    while True:
+        address, size = struct.unpack_from( ">QQ", blob, offset )
+        offset += 16
+        if address == 0 and size == 0:
+            break
+        yield f"/memreserve/\t0x{address:016x} 0x{size:016x};\n"
+
+    names = {}
+    depth = 0
+    offset = off_struct
+    while True:
+        token, = struct.unpack_from( ">I", blob, offset )
+        offset += 4
+        if token == FDT_BEGIN_NODE:
+            name, end = _cstring( blob, offset )
+            offset = ( end + 4 ) & ~3
+            if depth:
+                # a blank line between a node's properties and each child
+                yield "\n"
+            yield "\t" * depth + ( name or "/" ) + " {\n"
+            depth += 1
+        elif token == FDT_END_NODE:
+            depth -= 1
+            yield "\t" * depth + "};\n"
+        elif token == FDT_PROP:
+            length, nameoff = struct.unpack_from( ">II", blob, offset )
+            offset += 8
+            try:
+                name = names[nameoff]
+            except KeyError:
+                name = names[nameoff] = _cstring( blob, off_strings + nameoff )[0]
+            if length:
+                val = blob[offset:offset + length]
+                yield "\t" * depth + name + " = " + _value( val ) + ";\n"
+            else:
+                yield "\t" * depth + name + ";\n"
+            offset = ( offset + length + 3 ) & ~3
+        elif token == FDT_NOP:
+            continue
+        elif token == FDT_END:
+            break
+        else:
+            raise ValueError( f"bad flattened device tree token {token:#x} at {offset - 4}" )
+
+def write_source( dtb, output ):
+    """Write a flattened device tree as source
+
+    Args:
+       dtb (bytes or bytearray): the flattened tree
+       output (file): text stream to write to
+
+    Returns:
+       Nothing
+
+    Raises:
+       ValueError: see source_lines()
+    """
+    output.writelines( source_lines( dtb ) )
+
+def source( dtb ):
+    """Return the source of a flattened device tree
+
+    Args:
+       dtb (bytes or bytearray): the flattened tree
+
+    Returns:
+       string: the source, as "dtc -I dtb -O dts" writes it
+
+    Raises:
+       ValueError: see source_lines()
+    """
+    return "".join( source_lines( dtb ) )
@@ -10,6 +10,12 @@
 import ruamel
 from ruamel.yaml import YAML
 from ruamel.yaml.scalarint import HexInt
+from ruamel.yaml.events import AliasEvent, ScalarEvent
+from ruamel.yaml.events import StreamStartEvent, StreamEndEvent
+from ruamel.yaml.events import DocumentStartEvent, DocumentEndEvent
+from ruamel.yaml.events import SequenceStartEvent, SequenceEndEvent
+from ruamel.yaml.events import MappingStartEvent, MappingEndEvent
+from ruamel.yaml.nodes import ScalarNode, SequenceNode, MappingNode
 
 import json
 import sys
@@ -25,13 +31,8 @@ from lopper.tree import LopperTreePrinter
 from lopper.tree import LopperNode
 from lopper.tree import LopperProp
 
-from anytree.importer import DictImporter
-from anytree.exporter import DictExporter
-from anytree.importer import JsonImporter
 import pprint  # just for nice printing
 from anytree import RenderTree  # just for nice printing
-from anytree import PreOrderIter
-from anytree import AnyNode
 from anytree import Node
 
 from lopper.log import _warning, _info, _error, _debug, _init, _level
@@ -66,6 +67,16 @@ def _apply_scheme(new_val, existing_val, scheme):
     return nv  # replace or None scheme
 
 
+def _prop_chunks(prop):
+    """Return the chunks of a property's value, [prop[x] for x in range(len(prop))].
+
+    A json encoded value is decoded once, rather than once per index.
+    """
+    if prop.pclass == 'json' and prop.value and isinstance(prop.value, str):
+        return json.loads(prop.value)
+    return [prop[x] for x in range(len(prop))]
+
+
 def _get_or_create_overlay_node(overlay_nodes, cond, base_node):
     """Return the overlay LopperNode for cond/base_node path, creating it if absent."""
     from lopper.tree import LopperNode as _LopperNode
@@ -158,30 +169,388 @@ def preprocess_yaml_data(data):
         return [preprocess_yaml_data(item) for item in data]
     return data
 
-def postprocess_anytree_tree(root):
-    # Traverse each node in the tree using PreOrderIter, which visits each node in a depth-first order
-    for node in PreOrderIter(root):
-        if 'custom_parent' in node.__dict__:
-            # Rename 'custom_parent' back to 'parent'
-            node.__dict__['parent'] = node.__dict__.pop('custom_parent')
+_YAML_STR_TAG = 'tag:yaml.org,2002:str'
+_YAML_MAP_TAG = 'tag:yaml.org,2002:map'
+_YAML_SEQ_TAG = 'tag:yaml.org,2002:seq'
+_YAML_MERGE_TAG = 'tag:yaml.org,2002:merge'
+_YAML_VALUE_TAG = 'tag:yaml.org,2002:value'
+
+class _YamlEventFallback( Exception ):
+    """The input uses yaml that is left to ruamel's own loader"""
+
+class _YamlMapping():
+    """A mapping being built by _load_events()"""
+    __slots__ = ( "data", "pairs", "merge", "key" )
+
+    # no key has been read for the next value
+    NO_KEY = object()
+    # the next value is merged ("<<" key)
+    MERGE = object()
+
+    def __init__( self, data ):
+        self.data = data
+        self.pairs = []
+        self.merge = None
+        self.key = self.NO_KEY
+
+    def add( self, value ):
+        if self.key is self.NO_KEY:
+            if isinstance( value, list ):
+                value = tuple( value )
+            try:
+                hash( value )
+            except TypeError:
+                raise _YamlEventFallback( "unhashable key" )
+            self.key = value
+            return
+
+        if self.key is self.MERGE:
+            if self.merge is not None:
+                raise _YamlEventFallback( "duplicate merge key" )
+            if isinstance( value, dict ):
+                self.merge = list( value.items() )
+            elif isinstance( value, list ) and all( isinstance( v, dict ) for v in value ):
+                # later mappings in the list are overridden by earlier ones
+                self.merge = [ i for v in reversed( value ) for i in v.items() ]
+            else:
+                raise _YamlEventFallback( "merge of a non mapping" )
+        else:
+            self.pairs.append( ( self.key, value ) )
+        self.key = self.NO_KEY
+
+    def end( self ):
+        data = self.data
+        if self.merge is not None:
+            # as ruamel: merged keys first, then the mapping's own keys
+            # override them (and aren't checked for duplicates)
+            data.update( dict( self.merge ) )
+            data.update( dict( self.pairs ) )
+        else:
+            for k, v in self.pairs:
+                if k in data:
+                    raise _YamlEventFallback( "duplicate key" )
+                data[k] = v
+        return data
+
+
+def _event_tag( event ):
+    """Return an event's explicit tag, None if it is to be resolved"""
+    tag = event.ctag if hasattr( event, 'ctag' ) else event.tag
+    if tag is None or str( tag ) == '!':
+        return None
+    return tag
+
+
+def _load_events( yaml_obj, events ):
+    """Build the data of a yaml document from its parser events
+
+    This is the data YAML(typ='safe').load() returns, including anchors
+    (aliases are the same object), "<<" merge keys and tagged scalars. It
+    is built as the events are read, rather than first composing the whole
+    document into a node graph, and so needs a fraction of the memory.
+
+    Args:
+       yaml_obj (YAML): the safe YAML instance the events are parsed by
+       events (iterable): the document's events (YAML.parse())
+
+    Returns:
+       The document's data, None for an empty stream. _YamlEventFallback is
+       raised for input that this doesn't handle (more than one document,
+       tags other than the standard scalar ones, duplicate keys, etc), so
+       that ruamel's own loader can load (or reject) it.
+    """
+    resolver = yaml_obj.resolver
+    constructor = yaml_obj.constructor
+    constructors = constructor.yaml_constructors
+
+    anchors = {}
+    stack = []
+    result = None
+    documents = 0
+
+    for event in events:
+        etype = type( event )
+        if etype is ScalarEvent:
+            top = stack[-1] if stack else None
+            is_key = type( top ) is _YamlMapping and top.key is _YamlMapping.NO_KEY
+            tag = _event_tag( event )
+            if tag is None:
+                tag = resolver.resolve( ScalarNode, event.value, event.implicit )
+            stag = str( tag )
+            if stag == _YAML_STR_TAG or ( is_key and stag == _YAML_VALUE_TAG ):
+                value = event.value
+            elif is_key and stag == _YAML_MERGE_TAG:
+                top.key = _YamlMapping.MERGE
+                continue
+            elif stag in constructors:
+                value = constructor.construct_non_recursive_object(
+                            ScalarNode( tag, event.value, style = event.style ) )
+            else:
+                raise _YamlEventFallback( f"scalar tag {stag}" )
+            if event.anchor is not None:
+                anchors[event.anchor] = value
+        elif etype is AliasEvent:
+            try:
+                value = anchors[event.anchor]
+            except KeyError:
+                raise _YamlEventFallback( f"undefined alias {event.anchor}" )
+        elif etype is MappingStartEvent or etype is SequenceStartEvent:
+            tag = _event_tag( event )
+            if etype is MappingStartEvent:
+                if tag is not None and str( tag ) != _YAML_MAP_TAG:
+                    raise _YamlEventFallback( f"mapping tag {tag}" )
+                data = {}
+                stack.append( _YamlMapping( data ) )
+            else:
+                if tag is not None and str( tag ) != _YAML_SEQ_TAG:
+                    raise _YamlEventFallback( f"sequence tag {tag}" )
+                data = []
+                stack.append( data )
+            if event.anchor is not None:
+                anchors[event.anchor] = data
+            continue
+        elif etype is MappingEndEvent:
+            value = stack.pop().end()
+        elif etype is SequenceEndEvent:
+            value = stack.pop()
+        elif etype is DocumentStartEvent:
+            documents += 1
+            if documents > 1:
+                raise _YamlEventFallback( "more than one document" )
+            continue
+        else:
+            continue
+
+        if not stack:
+            result = value
+        else:
+            top = stack[-1]
+            if type( top ) is list:
+                top.append( value )
+            else:
+                top.add( value )
+
+    return result
+
+
+def yaml_load( filename ):
+    """Load a yaml file, as YAML(typ='safe').load() does
+
+    The data is built directly from the parser's events (see
+    _load_events()). ruamel's loader composes the whole document into a
+    node graph before constructing any of it, and on a large file that
+    graph is several times the size of the data. Input that the events
+    aren't built from is loaded by ruamel.
+
+    Args:
+       filename (string): path to the yaml file
+
+    Returns:
+       The loaded data
+    """
+    if version.parse(ruamel.yaml.__version__) < version.parse("0.18"):
+        with open( filename ) as f:
+            return ruamel.yaml.safe_load( f )
+
+    yaml = YAML( typ = 'safe' )
+    with open( filename ) as f:
+        events = yaml.parse( f )
+        try:
+            return _load_events( yaml, events )
+        except _YamlEventFallback as e:
+            _debug( f"yaml_load: {filename} is loaded by ruamel: {e}" )
+        finally:
+            events.close()
+
+    with open( filename ) as f:
+        return YAML( typ = 'safe' ).load( f )
+
+
+class YamlNode():
+    """A node of the tree that yaml and json input is loaded into
+
+    Input is loaded into a tree of these (and a LopperTree is exported
+    through them when needed), before being converted to LopperNodes or
+    dumped. They hold no more than the conversions need: the node's name,
+    its attributes in input order (the properties of the LopperNode it
+    becomes), its children and its parent.
+
+    Attributes:
+       - name: the node name, "root" for the top of the tree
+       - attrs: dict of attribute name -> value
+       - children: list of child YamlNodes, in input order
+       - parent: the parent YamlNode, None for the root
+
+    """
+    __slots__ = ( "name", "attrs", "children", "parent" )
+
+    def __init__( self, name, attrs = None, parent = None ):
+        self.name = name
+        self.attrs = attrs if attrs is not None else {}
+        self.children = []
+        self.parent = None
+        if parent is not None:
+            self.reparent( parent )
+
+    def __repr__( self ):
+        return f"YamlNode({self.name!r}, {self.attrs!r})"
+
+    def ancestors( self ):
+        """Return the ancestors of the node, nearest first"""
+        ret = []
+        p = self.parent
+        while p is not None:
+            ret.append( p )
+            p = p.parent
+        return ret
+
+    def reparent( self, parent ):
+        """Move the node to the end of a new parent's children
+
+        Args:
+           parent (YamlNode): the new parent
+
+        Returns:
+           Nothing, ValueError is raised if the parent is in the node's subtree
+        """
+        if parent is self.parent:
+            return
+
+        if parent is self or any( a is self for a in parent.ancestors() ):
+            raise ValueError( f"cannot move '{self.name}' below itself" )
+
+        if self.parent is not None:
+            self.parent.children.remove( self )
+        parent.children.append( self )
+        self.parent = parent
+
+    def iter( self ):
+        """Iterate the node's subtree, in pre-order"""
+        stack = [ self ]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend( reversed( node.children ) )
+
+    def to_anytree( self, parent = None ):
+        """Return the node's subtree as anytree nodes, for rendering"""
+        node = Node( self.name, parent = parent )
+        node.__dict__.update( self.attrs )
+        for child in self.children:
+            child.to_anytree( node )
+
+        return node
+
+
+def import_dict( data, lists_as_nodes = False ):
+    """Create a YamlNode tree from dictionary data
+
+    Dictionaries become child nodes (named by their key, and with a
+    "fdt_name" attribute of the same), everything else becomes an attribute
+    of the node. A specially named "children" list (as anytree exports) is
+    also accepted as the children of a node.
 
+    If lists_as_nodes is set, lists of dictionaries are unrolled into a node
+    of the list's name with a <name>@<index> child for each dictionary. For
+    example:
+
+           firewallconf:
+              - block: true
+              - block: never
+                domain: 0x1
+
+    Otherwise they remain attributes (and will be json encoded later).
+
+    The attribute values of each node are copied (the root's are not), so
+    that yaml aliases of the same data don't become shared values between
+    nodes.
+
+    Args:
+       data (dict): the loaded yaml or json
+       lists_as_nodes (bool,optional): unroll lists of dictionaries to nodes
+
+    Returns:
+       YamlNode: the root of the tree
+    """
+    return _import_dict( data, None, lists_as_nodes )
+
+
+def _import_dict( data, parent, lists_as_nodes ):
+    attrs = {}
+    children = []
+    for k, v in data.items():
+        if type(v) == dict:
+            child = dict( v )
+            child['name'] = k
+            child['fdt_name'] = k
+            children.append( child )
+            continue
+
+        if type(v) == list and lists_as_nodes and all( isinstance( x, dict ) for x in v ):
+            # a node that holds the unrolled child dictionaries
+            new_node = { 'name': k,
+                         'fdt_name' : k }
+            for i, kk in enumerate( v ):
+                d_to_process = kk
+                # if there is only one element in the dictionary, and it is
+                # a dictionary, then pop it out. This avoids intermediate
+                # nodes of no value.
+                if len( kk.keys() ) == 1:
+                    if type( list( kk.values() )[0] ) == dict:
+                        d_to_process = list( kk.values() )[0]
+
+                new_node[f"{k}@{i}"] = d_to_process
+
+            children.append( new_node )
+            continue
+
+        attrs[k] = v
+
+    if parent is not None:
+        attrs = copy.deepcopy( attrs )
+
+    # if we didn't find a dictionary, look for a specially named "children"
+    # attribute. This is for compatibility with anytree exported yaml.
+    children_extra = attrs.pop( "children", [] )
+    if not children and children_extra:
+        children = children_extra
+
+    # if there's no name set, either set it to 'root' (if we don't have a
+    # parent) or to the value of the first entry in the dictionary
+    if 'name' in attrs:
+        name = attrs.pop( 'name' )
+    elif parent is None:
+        name = "root"
+    else:
+        name = attrs[list( attrs )[0]]
+
+    _debug( f"      creating node {name} with attrs: {attrs}" )
+
+    node = YamlNode( name, attrs, parent )
+    for child in children:
+        _import_dict( child, node, lists_as_nodes )
+
+    return node
+
+
+def postprocess_yaml_tree( root ):
+    """Rename the preprocessed 'custom_parent' attributes back to 'parent'"""
+    for node in root.iter():
+        if 'custom_parent' in node.attrs:
+            node.attrs['parent'] = node.attrs.pop( 'custom_parent' )
 
-from anytree.search import findall_by_attr
 
 def is_ancestor(child, potential_ancestor):
     """Check if a node is an ancestor of another node.
 
-    Determines whether the specified potential_ancestor is an ancestor
-    of the given child node within the anytree structure.
-
     Args:
-        child (Node): The node whose ancestry is being checked.
-        potential_ancestor (Node): The node that might be an ancestor of the child node.
+        child (YamlNode): The node whose ancestry is being checked.
+        potential_ancestor (YamlNode): The node that might be an ancestor of the child node.
 
     Returns:
         bool: True if potential_ancestor is an ancestor of child; False otherwise.
     """
-    return potential_ancestor in child.ancestors
+    return any( a is potential_ancestor for a in child.ancestors() )
 
 
 def find_node_by_path(root, path):
@@ -191,11 +560,11 @@ def find_node_by_path(root, path):
     in the given path to locate the corresponding node.
 
     Args:
-        root (Node): The root node of the tree structure to start the search.
+        root (YamlNode): The root node of the tree structure to start the search.
         path (str): The path string separated by '/' indicating the node hierarchy.
 
     Returns:
-        Node or None: The node corresponding to the provided path, or None if not found.
+        YamlNode or None: The node corresponding to the provided path, or None if not found.
     """
     # Strip leading slash for consistent traversal
     if path.startswith('/'):
@@ -220,18 +589,18 @@ def find_node_by_path(root, path):
 def reparent_nodes_by_specified_path(root, spec_data):
     """Reparent nodes based on specified paths in the given data.
 
-    Using the provided specification data, reparent nodes within the anytree
-    structure based on 'custom_parent' path indications, handling path-like
-    and direct attribute syntax. Exits on missing paths.
+    Using the provided specification data, reparent nodes within the tree
+    based on 'custom_parent' path indications, handling path-like and
+    direct name syntax. Exits on missing paths.
 
     Args:
-        root (Node): The root node of the anytree structure.
+        root (YamlNode): The root node of the tree.
         spec_data (dict): The data specifying reparenting decisions based on 'custom_parent'.
 
     Returns:
         None: The tree structure is modified in place.
     """
-    node_map = {node.name: node for node in PreOrderIter(root)}
+    node_map = {node.name: node for node in root.iter()}
 
     def traverse_yaml_data(yaml_data):
         for key, value in yaml_data.items():
@@ -249,9 +618,9 @@ def reparent_nodes_by_specified_path(root, spec_data):
                         # Handle path-like syntax
                         new_parent_node = find_node_by_path(root, parent_path)
                     else:
-                        # Handle direct name syntax using findall_by_attr
-                        new_parent_node = findall_by_attr(root, value=parent_path, name="name", maxlevel=None)
-                        new_parent_node = new_parent_node[0] if new_parent_node else None
+                        # Handle direct name syntax, the first node (in
+                        # pre-order) of that name
+                        new_parent_node = next((n for n in root.iter() if n.name == parent_path), None)
 
                     if not new_parent_node:
                         _error(f"Path '{parent_path}' not found for '{key}'. Exiting.", True)
@@ -260,7 +629,7 @@ def reparent_nodes_by_specified_path(root, spec_data):
                         _debug(f"Skipping reparenting '{key}'; '{new_parent_node.name}' is already an ancestor.")
                     else:
                         _debug(f"Reparenting '{key}' under '{new_parent_node.name}'")
-                        child_node.parent = new_parent_node
+                        child_node.reparent(new_parent_node)
 
                 traverse_yaml_data(value)
             elif isinstance(value, list):
@@ -270,358 +639,344 @@ def reparent_nodes_by_specified_path(root, spec_data):
 
     traverse_yaml_data(spec_data)
 
-class LopperTreeImporter(object):
 
-    def __init__(self, nodecls=AnyNode):
-        """
-        Import Tree from LopperTree
+def lopper_node_attrs( node, boolean_as_int = False ):
+    """Return the name and attributes a LopperNode is exported with
+
+    Properties are converted back to the values they would have been loaded
+    from: yaml sourced and json encoded properties are decoded, single
+    element lists are unwrapped and empty (flag) properties become True.
+    The 'parent' property is carried as "custom_parent_value", so it can't
+    be confused with the node's parent.
 
-        Every node is converted to an instance of `nodecls`.
-        The node's children are converted likewise and added as children.
+    Args:
+       node (LopperNode): the node to export
+       boolean_as_int (bool,optional): decode empty properties, rather than
+                                       treating them as True
 
-        Keyword Args:
-            nodecls: class used for nodes.
+    Returns:
+       tuple: (name, dict of attribute name -> value)
+    """
+    attrs = {}
 
-        """
-        self.nodecls = nodecls
-        self.boolean_as_int = False
+    name = node.name
+    if not name:
+        name = "root"
 
-    def import_(self, data):
-        """Import tree from `data`."""
-        return self.__import(data)
+    attrs['name'] = name
 
-    def __import(self, node, parent=None, name=None, verbose=0):
-        assert isinstance(node, LopperNode)
+    if 'parent' in node.__props__:
+        attrs['custom_parent_value'] = node.__props__['parent'].value
 
-        attrs = OrderedDict()
+    for p, prop in node.__props__.items():
+        if p == 'parent':
+            continue
 
-        name = node.name
-        if not name:
-            name = "root"
+        pval = prop.value
+
+        # if the node is from a yaml source, it may have been json encoded,
+        # so try that first and otherwise assign it directly.
+        json_encoded_string = False
+        if node._source != "yaml" and prop.pclass != "json":
+            # if the property isn't tagged as yaml or json, we do a double
+            # check to see if it is a json encoded string. The test is simple.
+            # try and decode it. If no exception is thrown, we consider that it
+            # was valid json.
+            if type(pval) == list and len(pval) == 1:
+                val = pval[0]
+            else:
+                val = pval
 
-        attrs['name'] = name
+            try:
+                val = json.loads(val)
+                json_encoded_string = True
+            except Exception as e:
+                pass
 
-        # Retain the LopperNode's 'parent' value but rename it to avoid conflict
-        parent_value = None
+        if node._source == "yaml" or prop.pclass == "json" or json_encoded_string:
+            # property with no value is an encoded boolean "true" as an
+            # empty list. So check for a value, try json, fallback to
+            # assignment.
+            if boolean_as_int or pval:
+                try:
+                    _debug( f"lopper_node_attrs: json load for prop {p} : {pval}" )
+
+                    val = []
+                    if type(pval) == list and len(pval) == 1:
+                        val = json.loads(pval[0])
+                    elif type(pval) == list:
+                        for item in pval:
+                            val.append( json.loads(item) )
+                    else:
+                        val = json.loads(pval)
+                except Exception as e:
+                    val = pval
 
-        # Check and store the 'parent' value
-        if 'parent' in node.__props__:
-            parent_value = node.__props__['parent'].value # Extract the value for later use
-            # Map it to a different attribute to avoid conflict
-            attrs['custom_parent_value'] = parent_value
+                if type(val) == int:
+                    val = val == 1
+            else:
+                val = True
+        else:
+            # everything is a list in a LopperProp, if the length is one, just grab the
+            # element. We'll have better yaml in the end if this is done.
+            if type(pval) == list and len(pval) == 1:
+                val = pval[0]
+            else:
+                val = pval
 
-        for p in node.__props__:
+        attrs[p] = val
 
-            # Skip the Lopper 'parent' completely during regular property extraction
-            # since this will break anytree's import
-            if p == 'parent':
-                continue
+    name = attrs.pop( 'name' )
 
-            # if the node is from a yaml source, it may have been json encoded,
-            # so try that first and otherwise assign it directly.
-
-            json_encoded_string = False
-            if node._source != "yaml" and node.__props__[p].pclass != "json":
-                # if the property isn't tagged as yaml or json, we do a double
-                # check to see if it is a json encoded string. The test is simple.
-                # try and decode it. If no exception is thrown, we consider that it
-                # was valid json.
-                if type(node.__props__[p].value) == list and len(node.__props__[p].value) == 1:
-                    val = node.__props__[p].value[0]
-                else:
-                    val = node.__props__[p].value
+    return name, attrs
 
-                decode_val = val
-                try:
-                    val = json.loads(decode_val)
-                    json_encoded_string = True
-                except Exception as e:
-                    pass
-
-            if node._source == "yaml" or node.__props__[p].pclass == "json" or json_encoded_string:
-                # property with no value is an encoded boolean "true" as an
-                # empty list. So check for a value, try json, fallback to
-                # assignment.
-                decode = False
-                if self.boolean_as_int:
-                    decode = True
-                else:
-                    if node.__props__[p].value:
-                        decode = True
-                    else:
-                        decode = False
 
-                if decode:
-                    try:
-                        _debug( f"LopperTreeImporter: json load for prop {p} : {node.__props__[p].value}" )
+def lopper_tree_nodes( node, boolean_as_int = False, parent = None ):
+    """Create a YamlNode tree from a LopperNode and its subnodes
 
-                        decode_val = ""
-                        val = []
-                        if type(node.__props__[p].value) == list and len(node.__props__[p].value) == 1:
-                            decode_val = node.__props__[p].value[0]
-                            val = json.loads(decode_val)
-                        else:
-                            if type(node.__props__[p].value) == list:
-                                for item in node.__props__[p].value:
-                                    val.append( json.loads(item) )
-                            else:
-                                decode_val = node.__props__[p].value
-                                val = json.loads(decode_val)
+    Args:
+       node (LopperNode): the top of the tree to convert
+       boolean_as_int (bool,optional): see lopper_node_attrs()
+       parent (YamlNode,optional): parent for the new tree
 
-                    except Exception as e:
-                        val = node.__props__[p].value
+    Returns:
+       YamlNode: the converted node
+    """
+    name, attrs = lopper_node_attrs( node, boolean_as_int )
+    ynode = YamlNode( name, attrs, parent )
+    for child in node.child_nodes.values():
+        lopper_tree_nodes( child, boolean_as_int, ynode )
 
-                    if type(val) == int:
-                        if val == 1:
-                            val = True
-                        else:
-                            val = False
-                else:
-                    val = True
-            else:
-                # everything is a list in a LopperProp, if the length is one, just grab the
-                # element. We'll have better yaml in the end if this is done.
-                if type(node.__props__[p].value) == list and len(node.__props__[p].value) == 1:
-                    val = node.__props__[p].value[0]
-                else:
-                    val = node.__props__[p].value
+    return ynode
 
-            attrs[p] = val
 
-        if type(attrs) == list and len(attrs) == 1:
-            attrs = attrs[0]
+def export_dict( node, entry, parent_attr = False ):
+    """Export a tree as nested dictionaries, for yaml or json output
 
-        nnode = self.nodecls(parent=parent, **attrs)
+    Each node becomes a dictionary of its attributes, merged with the
+    dictionaries of its children, under a key of the node's name. The
+    root node's dictionary is returned directly.
 
-        for child in node.child_nodes:
-            self.__import(node.child_nodes[child], parent=nnode)
+    The tree is walked once, with no intermediate tree built: entry()
+    supplies each node's name, attributes and children, so both YamlNode
+    and LopperNode trees can be exported.
 
-        return nnode
+    Args:
+       node: the node to export
+       entry (function): node -> (name, attrs dict, children)
+       parent_attr (bool,optional): restore "custom_parent_value"
+                                    attributes to "parent"
 
-# Extension of the default anytree DictExporter, since we don't want added
-# nodes like "root" and children to be in the export.
-class LopperDictExporter(DictExporter):
-    def export(self, node):
-        """Export tree starting at `node`."""
-        attriter = self.attriter or (lambda attr_values: attr_values)
-        return self.__export(node, self.dictcls, attriter, self.childiter)
+    Returns:
+       dict
+    """
+    name, attrs, children = entry( node )
 
-    def _lopper_iter_attr_values(self, node):
-        """ Copy of Anytree default iterator generator. Used if the
-            default behaviour is required (tuples), but we need to
-            debug or instrument.
-        """
-        # print( "lopoper itert. dict type %s" % type(node.__dict__))
-        for k, v in node.__dict__.items():
-            if k in ('_NodeMixin__children', '_NodeMixin__parent'):
-                continue
-            # print( "    yeilding: %s %s" % (k,v))
-            yield k, v
-
-    # this is an override of the default anytree iterator (see above
-    # for an exact copy. The issue with the iterator generator used by
-    # anytree is that the resulting tuple gets sorted alphabetically
-    # (even when yielded in the order of properties). This means that
-    # our resulting dictionary has a different order then the nodes
-    # and properties, and hence the yaml.
-    #
-    # To preserve the order, we use more memory (TBD if this is an
-    # issue with a really large tree) and generate a list of all the
-    # elements in the loop, and return the list. The maintains the
-    # order and we don't get unwanted alphabetic sorting.
-    def _lopper_attr_values_list(self, node):
-        ret = []
-        for k, v in node.__dict__.items():
-            if k in ('_NodeMixin__children', '_NodeMixin__parent'):
-                continue
-            ret.append( (k, v) )
+    # containers are copied (HexInt and other scalars are kept as they
+    # are), so that shared values aren't dumped as yaml aliases
+    data = { k: _convert_ordered_dict( v ) for k, v in attrs.items() }
+    if parent_attr and 'custom_parent_value' in data:
+        data['parent'] = data.pop( 'custom_parent_value' )
 
-        return ret
+    for child in children:
+        data.update( export_dict( child, entry, parent_attr ) )
 
-    def __export(self, node, dictcls, attriter, childiter, level=1, verbose = 0):
-        # attr_values = attriter(self._iter_attr_values(node))
-        # attr_values = attriter(self._lopper_iter_attr_values(node))
-        # data = dictcls(attr_values)
-        attr_values = self._lopper_attr_values_list(node)
-        data = dictcls(attr_values)
-        maxlevel = self.maxlevel
+    # if the node is NOT the root node, we index the attributes by the node
+    # name, if root, we return the merged dictionary.
+    if name != "root":
+        return { name : data }
 
-        try:
-            # if there's a name, its a node, but we don't want it in our output,
-            # so we delete it from the attrs. It'll show up in our dictionary as
-            # key instead.
-            name = data['name']
-            del data['name']
-        except:
-            name = None
-
-        if maxlevel is None or level < maxlevel:
-            children = [self.__export(child, dictcls, attriter, childiter, level=level + 1)
-                        for child in childiter(node.children)]
-            if children:
-                # if there are children returned, we merge them into a single dictionary, so
-                # that output can represent them as child nodes of the current one (see how
-                # we return data)
-                _debug( f"node: {name} has children: {children}" )
-
-                new_dict = {}
-                #for c in reversed(children):
-                for c in children:
-                    _debug( f"        merging dict: {c}" )
-                    new_dict.update( c )
-
-                data.update( new_dict )
-
-        # if the node is NOT the root node, we index the attributes by the node
-        # name, if root, we return the merged dictionary.
-        if name != "root":
-            return { name : data }
+    return data
+
+
+def _yaml_node_entry( node ):
+    return node.name, node.attrs, node.children
+
+
+class _ExportChild():
+    """A child in an _export_node() dictionary, exported when it is written"""
+    __slots__ = ( "node", "entry" )
+
+    def __init__( self, node, entry ):
+        self.node = node
+        self.entry = entry
+
+
+def _export_node( node, entry, parent_attr, node_entry = None ):
+    """Export one node of a tree, leaving its children to be exported later
+
+    The dictionary is the one export_dict() builds for the node, except
+    that each child is an _ExportChild rather than the child's exported
+    dictionary. The yaml and json writers export each child as they reach
+    it, so only the nodes on the path being written are held in memory.
+
+    Args:
+       node: the node to export
+       entry (function): node -> (name, attrs dict, children)
+       parent_attr (bool): restore "custom_parent_value" attributes to "parent"
+       node_entry (tuple,optional): entry( node ), if already known
+
+    Returns:
+       dict: the node's attributes and children
+    """
+    name, attrs, children = node_entry or entry( node )
+
+    data = { k: _convert_ordered_dict( v ) for k, v in attrs.items() }
+    if parent_attr and 'custom_parent_value' in data:
+        data['parent'] = data.pop( 'custom_parent_value' )
+
+    for child in children:
+        child_entry = entry( child )
+        if child_entry[0] == "root":
+            data.update( export_dict( child, entry, parent_attr ) )
         else:
-            return data
+            data[child_entry[0]] = _ExportChild( child, child_entry )
 
-class LopperDictImporter(object):
-    def __init__(self, nodecls=AnyNode):
-        """
-        Import Tree from dictionary.
-
-        This is taken from the Anytree codebase, and modified to not
-        require a "children" element in the yaml.
-
-        Every dictionary is converted to an instance of `nodecls`.
-        The dictionaries listed in the children attribute are converted
-        likewise and added as children.
-
-        Keyword Args:
-            nodecls: class used for nodes.
-
-        >>> from anytree.importer import DictImporter
-        >>> from anytree import RenderTree
-        >>> importer = DictImporter()
-        >>> data = {
-        ...     'a': 'root',
-        ...     'children': [{'a': 'sub0',
-        ...                   'children': [{'a': 'sub0A', 'b': 'foo'}, {'a': 'sub0B'}]},
-        ...                  {'a': 'sub1'}]}
-        >>> root = importer.import_(data)
-        >>> print(RenderTree(root))
-        AnyNode(a='root')
-        ├── AnyNode(a='sub0')
-        │   ├── AnyNode(a='sub0A', b='foo')
-        │   └── AnyNode(a='sub0B')
-        └── AnyNode(a='sub1')
-        """
-        self.nodecls = nodecls
-        self.lists_as_nodes = False
+    return data
+
+
+def _yaml_node_events( node, resolver ):
+    """Yield the events ruamel's serializer emits for a represented node
+
+    Args:
+       node (Node): a ScalarNode, SequenceNode or MappingNode
+       resolver (Resolver): the dumper's resolver
+
+    Returns:
+       generator of events
+    """
+    if isinstance( node, ScalarNode ):
+        detected_tag = resolver.resolve( ScalarNode, node.value, ( True, False ) )
+        default_tag = resolver.resolve( ScalarNode, node.value, ( False, True ) )
+        implicit = ( node.ctag == detected_tag, node.ctag == default_tag,
+                     node.tag.startswith( 'tag:yaml.org,2002:' ) )
+        yield ScalarEvent( None, node.ctag, implicit, node.value, style = node.style,
+                           comment = node.comment )
+    elif isinstance( node, SequenceNode ):
+        implicit = node.ctag == resolver.resolve( SequenceNode, node.value, True )
+        yield SequenceStartEvent( None, node.ctag, implicit, flow_style = node.flow_style,
+                                  comment = node.comment )
+        for item in node.value:
+            yield from _yaml_node_events( item, resolver )
+        yield SequenceEndEvent( comment = [ None, None ] )
+    else:
+        implicit = node.ctag == resolver.resolve( MappingNode, node.value, True )
+        yield MappingStartEvent( None, node.ctag, implicit, flow_style = node.flow_style,
+                                 comment = node.comment, nr_items = len( node.value ) )
+        for key, value in node.value:
+            yield from _yaml_node_events( key, resolver )
+            yield from _yaml_node_events( value, resolver )
+        yield MappingEndEvent( comment = [ None, None ] )
+
+
+def _yaml_export_events( yaml_obj, data, expand ):
+    """Yield the events of dumping an exported tree with yaml_obj.dump()
+
+    The events are the ones ruamel's representer and serializer produce
+    for the whole export_dict() dictionary: mappings are sorted (or kept in
+    order if their keys can't be sorted) and each attribute value is
+    represented as yaml_obj would. But each child is only exported, by
+    expand(), when its events are reached, so the document is never held
+    in memory as either a dictionary or a node graph.
+
+    Args:
+       yaml_obj (YAML): the dumper
+       data (dict): the top level dictionary, from _export_node()
+       expand (function): _ExportChild -> the child's dictionary
 
-    def import_(self, data):
-        """Import tree from `data`."""
-        return self.__import(data)
-
-    def __import(self, data, parent=None, name=None):
-        assert isinstance(data, dict)
-        # The below assert breaks the loading of yaml with a "parent:"
-        # key ... We are disabling this for now, otherwise, we may
-        # need to preprocess the yaml and postprocess the tree to
-        # restore "parent"
-        assert "parent" not in data
-        attrs = dict(data)
-        verbose = 0
-
-        _debug( f"===> __import ({name})" )
-        _debug( f"            attrs: {attrs}" )
-
-        if name:
-            attrs['name'] = name
-
-        children = []
-        to_delete = []
-        for k in attrs:
-            if type(attrs[k]) == dict:
-                # This is a child, name it
-                # we need this deepcopy, since if the yaml has an alias and
-                # reference, changing one dictionary changes the other. We
-                # need a safe/full copy so we can assign the name safely.
-                cdict = copy.deepcopy(attrs[k])
-                cdict['name'] = k
-                cdict['fdt_name'] = k
-
-                _debug( f"      queuing child from dict node: name: {k} props: {cdict}" )
-
-                children.append( cdict )
-                # queue it for removal, since we don't want the child attributes to be
-                # stored in the parent node. We don't remove it here, since the iterator
-                # will change and we'll error
-                to_delete.append( k )
-
-            if type(attrs[k]) == list:
-                if not self.lists_as_nodes:
-                    continue
-
-
-                # if the attribute is a list, and all of the subtypes are dictionaries
-                # we had yaml something like:
-                #    firewallconf:
-                #       - block: true
-                #       - block: never
-                #         domain: 0x1
-                #       - ....
-                # We can expand that, and generate node names for the subdictionaries.
-                # If we don't, the list will be json encoded and will have to be expanded
-                # later.
-                #
-                all_dicts = all(isinstance(x, dict) for x in attrs[k])
-                if all_dicts:
-                    # Create a node, that will hold the unrolled child dictionaries
-                    new_node = { 'name': k,
-                                 'fdt_name' : k }
-                    for i, kk in enumerate(attrs[k]):
-                        sub_node_name = f"{k}@{i}"
-
-                        d_to_process = kk
-                        # if there is only one element in the dictionary, then pop it out, this
-                        # avoids intermediate nodes of no value.
-                        if len(kk.keys()) == 1:
-                            # to be an intermediate node, the type of that single entry must
-                            # be a dict, otherwise, we just leave things alone.
-                            if type(list(kk.values())[0]) == dict:
-                                d_to_process = list(kk.keys())[0]
-                                d_to_process = kk[d_to_process]
-
-                        new_node[sub_node_name] = d_to_process
-
-                    children.append( new_node )
-
-                    to_delete.append( k )
-
-        for d in to_delete:
-            del attrs[d]
-
-        # if we didn't find a dictionary, look for a specially named "children"
-        # attribute. This is for compatibility with anytree exported yaml.
-        children_extra = attrs.pop("children", [])
-        if not children and children_extra:
-            children = children_extra
-
-        # check if we had a name set, and if not, either set it
-        # to 'root' (if we don't have a parent) or set it to the value
-        # of the first entry in the dictionary
+    Returns:
+       generator of events
+    """
+    representer = yaml_obj.representer
+    resolver = yaml_obj.resolver
+    map_node = representer.represent_data( {} )
+
+    def represent( value ):
+        node = representer.represent_data( value )
+        representer.represented_objects = {}
+        representer.object_keeper = []
+        representer.alias_key = None
+        return node
+
+    def mapping( data ):
+        items = list( data.items() )
         try:
-            name = attrs['name']
-        except:
-            if not parent:
-                attrs['name'] = "root"
+            items.sort()
+        except TypeError:
+            # no ordering, as the representer
+            items = list( data.items() )
+
+        yield MappingStartEvent( None, map_node.ctag, True, flow_style = map_node.flow_style,
+                                 comment = map_node.comment, nr_items = len( items ) )
+        for key, value in items:
+            yield from _yaml_node_events( representer.represent_key( key ), resolver )
+            if type( value ) is _ExportChild:
+                yield from mapping( expand( value ) )
             else:
-                first_key = list(attrs)[0]
-                first_val = attrs[first_key]
-                attrs['name'] = first_val
+                yield from _yaml_node_events( represent( value ), resolver )
+        yield MappingEndEvent( comment = [ None, None ] )
 
-        _debug( f"      creating node with attrs: {attrs}" )
+    yield StreamStartEvent( encoding = yaml_obj.encoding )
+    yield DocumentStartEvent( explicit = yaml_obj.explicit_start, version = yaml_obj.version,
+                              tags = yaml_obj.tags )
+    yield from mapping( data )
+    yield DocumentEndEvent( explicit = yaml_obj.explicit_end )
+    yield StreamEndEvent()
 
-        node = self.nodecls(parent=parent, **attrs)
-        for child in children:
-            self.__import(child, parent=node)
 
-        return node
+def _json_key( key ):
+    """Return the string json.dumps() writes for a dictionary key"""
+    if isinstance( key, str ):
+        return json.dumps( key )
+    return json.dumps( next( iter( json.loads( json.dumps( { key: None } ) ) ) ) )
+
+
+def _json_export_chunks( data, expand, indent = None, level = 0 ):
+    """Yield the text json.dumps() writes for an exported tree
+
+    As for _yaml_export_events(), children are exported by expand() as
+    they are written. The text is that of json.dumps( dct ), or of
+    json.dumps( dct, indent = indent, separators = (',', ': ') ) when an
+    indent is given.
+
+    Args:
+       data (dict): the top level dictionary, from _export_node()
+       expand (function): _ExportChild -> the child's dictionary
+       indent (int,optional): the indent of each level
+       level (int,optional): the nesting level of data
+
+    Returns:
+       generator of strings
+    """
+    if not data:
+        yield "{}"
+        return
+
+    if indent is None:
+        separator = ", "
+        newline = ""
+        close = "}"
+    else:
+        newline = "\n" + " " * ( indent * ( level + 1 ) )
+        separator = "," + newline
+        close = "\n" + " " * ( indent * level ) + "}"
+
+    yield "{" + newline
+    first = True
+    for key, value in data.items():
+        if not first:
+            yield separator
+        first = False
+        yield _json_key( key ) + ": "
+        if type( value ) is _ExportChild:
+            yield from _json_export_chunks( expand( value ), expand, indent, level + 1 )
+        elif indent is None:
+            yield json.dumps( value )
+        else:
+            value = json.dumps( value, indent = indent, separators = ( ',', ': ' ) )
+            yield value.replace( "\n", newline )
+    yield close
+
 
 class LopperJSON():
     """JSON read/writer for Lopper
@@ -632,10 +987,11 @@ class LopperJSON():
     creating a LopperTree. It is also capabable of taking a
     LopperTree and creating a json description of that tree.
 
-    This is done by internally storing either a json or lopper tree
-    input as a generic tree structure. The generic tree structure can
-    be converted to a LopperTree or json file on demand. Hence we have
-    the capability of converting between the two formats as required.
+    This is done by internally storing json input as a generic tree
+    structure (of YamlNodes). The generic tree structure can be converted
+    to a LopperTree or json file on demand, and a LopperTree can be
+    exported directly. Hence we have the capability of converting between
+    the two formats as required.
 
     """
     def __init__( self, tree = None, json = None, config = None ):
@@ -653,8 +1009,10 @@ class LopperJSON():
         """
         self.dct = None
         self.json_source = json
-        self.anytree = None
+        self.root = None
         self.tree = tree
+        # id of a flattened input value -> its first flattened name
+        self._flat_names = None
 
         self.boolean_as_int = False
         self.lists_as_nodes = False
@@ -705,11 +1063,8 @@ class LopperJSON():
         # flatten the dictionary so we can look up aliases and anchors
         # by identity later .. without needing to recurse
         self.dct_flat = flatten_dict(self.dct,separator="/")
-        importer = LopperDictImporter(Node)
-        importer.lists_as_nodes = self.lists_as_nodes
-        self.anytree = importer.import_(self.dct)
-
-        # print(RenderTree(self.anytree.root))
+        self._flat_names = None
+        self.root = import_dict( self.dct, self.lists_as_nodes )
 
     def to_tree( self ):
         """ Export LopperYAML to a LopperTree
@@ -720,7 +1075,8 @@ class LopperJSON():
         Returns:
           LopperTree object representation of YAML object
         """
-        if not self.anytree:
+        root = self.nodes()
+        if not root:
             _error( f"cannot export tree, nothing is loaded" )
             return None
 
@@ -732,7 +1088,7 @@ class LopperJSON():
         serialize_json = True
         overlay_nodes = {}  # {cond_name: [LopperNode, ...]}
 
-        for node in PreOrderIter(self.anytree):
+        for node in root.iter():
             if node.name == "root":
                 ln = lt["/"]
                 node_overrides = []
@@ -764,8 +1120,10 @@ class LopperJSON():
                 # conditional nodes are staged as overlays, not added to the base tree
                 pass
             else:
-                # add the node to the tree
-                lt = lt + ln
+                # add the node to the tree. The tree wide sync that an add
+                # does is deferred, the tree is synced once all of the
+                # nodes are in
+                lt.add( ln, dont_sync = True )
 
             props = self.props( node )
             for p in props:
@@ -808,11 +1166,13 @@ class LopperJSON():
 
                     if not skip:
                         if not clean_p in excluded_props:
-                            lp = LopperProp( clean_p, -1, ln, x )
-                            if use_json:
-                                lp.pclass = "json"
+                            lp = LopperProp( clean_p, -1, ln, x, pclass = "json" if use_json else "" )
 
-                            lp.resolve()
+                            # properties of nodes in the tree are resolved
+                            # along with the tree (below), once all of the
+                            # nodes they may reference are in place
+                            if node_is_conditional:
+                                lp.resolve()
 
                             if prop_is_conditional and not node_is_conditional:
                                 for cond in prop_overrides:
@@ -914,6 +1274,7 @@ class LopperJSON():
         for cond_name, nodes in overlay_nodes.items():
             lt._metadata.setdefault('overlay_subtrees', {})[cond_name] = nodes
 
+        lt.sync()
         lt.resolve()
 
         # are there any nodes in the tree with properties containing a merge ?
@@ -947,12 +1308,15 @@ class LopperJSON():
                     #         print( "[DBG]: target found, pulling properties" )
 
                 if p.pclass == "json":
-                    _debug( f"json: {p.value} (len: {len(p)})" )
+                    # the chunks of the value, decoded once rather than on
+                    # every p[x]
+                    chunks = _prop_chunks( p )
+                    _debug( f"json: {p.value} (len: {len(chunks)})" )
                     extension_found = False
                     trace_enabled = lopper.log._is_enabled(lopper.log.TRACE)
-                    for x in range(0, len(p)):
+                    for x in range(0, len(chunks)):
                         try:
-                            m_val = p[x][expand_string]
+                            m_val = chunks[x][expand_string]
                             extension_found = True
                             _debug( f"found extension marker: {m_val}" )
                         except:
@@ -963,16 +1327,16 @@ class LopperJSON():
                             extension_found = True
                             _debug( f"found extension name ({expand_string})" )
 
-                    for x in range(0, len(p)):
-                        _debug( f"     [{x}] chunk: {p[x]} ({type(p[x])})" )
+                    for x in range(0, len(chunks)):
+                        _debug( f"     [{x}] chunk: {chunks[x]} ({type(chunks[x])})" )
                         try:
                             # an exception is raised if the chunk doesn't have an index
                             # with <<+, so everything below can assume this is true.
                             if p.name == expand_string:
-                                m_val = p[x]
+                                m_val = chunks[x]
                                 dict_check = 0
                             else:
-                                m_val = p[x][expand_string]
+                                m_val = chunks[x][expand_string]
                                 dict_check = x
                             lopper.log._debug( f"                      mval {m_val} ({dict_check})", level=lopper.log.TRACE )
                             # Whether we allow chunks greater than 1 to go through this loop changes
@@ -1003,18 +1367,12 @@ class LopperJSON():
                                     # expanded alias.
                                     lopper.log._debug( f"[{p.abs_path[1:]}] found {possible_alias}", level=lopper.log.TRACE )
 
-                                    # Searching that same flattened yaml dictionary for the *same*
-                                    # dictionary in another location indicates that this is an expanded
+                                    # Finding the *same* dictionary at another location in that
+                                    # flattened yaml dictionary indicates that this is an expanded
                                     # alias. We can get the name from the target anchor.
-                                    i_name = None
-                                    for flat_thing_name,flat_thing in self.dct_flat.items():
-                                        if possible_alias is flat_thing:
-                                            lopper.log._debug( f"alias/anchor identity match: {flat_thing_name}", level=lopper.log.TRACE )
-                                            # we take the first hit, that's the anchor, other hits will just
-                                            # be more aliases .. which point to the same anchor and of course
-                                            # will also pass
-                                            if not i_name:
-                                                i_name = flat_thing_name
+                                    i_name = self.flat_name( possible_alias )
+                                    if i_name:
+                                        lopper.log._debug( f"alias/anchor identity match: {i_name}", level=lopper.log.TRACE )
 
                                     if i_name:
                                         # TODO: we should look to see if there's already a node with this
@@ -1085,7 +1443,7 @@ class LopperJSON():
                         # catches the check for expand_string ("<<+" or "<<*")
                         except Exception as e:
                             if extension_found:
-                                new_list.append(p[x])
+                                new_list.append(chunks[x])
 
                     # This delete blows up the iteration. We need to save the
                     # list of properties to delete and delete them AFTER we
@@ -1118,36 +1476,127 @@ class LopperJSON():
         Returns:
            Nothing
         """
-        if self.anytree:
-            trace_enabled = verbose > 2 or lopper.log._is_enabled(lopper.log.TRACE)
-            # if there's only one child, we use that, which allows us to skip the Anytree
-            # "root" node, without any tricks.
-            no_root = False
-            start_node = self.anytree
-            if no_root:
-                if len(self.anytree.children) == 1:
-                    start_node = self.anytree.children[0]
-
-            # at high verbosity, use an ordered dict for debug reasons
-            if trace_enabled:
-                dcttype=OrderedDict
-            else:
-                dcttype=dict
-
-            dct = LopperDictExporter(dictcls=dcttype,attriter=sorted).export(start_node)
+        export = self.export_stream()
+        if export is None:
+            return
 
+        trace_enabled = verbose > 2 or lopper.log._is_enabled(lopper.log.TRACE)
+        if trace_enabled:
+            dct = self.export()
             lopper.log._debug("dumping export dictionary", level=lopper.log.TRACE)
             lopper.log._debug(pprint.pformat(dct), level=lopper.log.TRACE)
 
-            if not outfile:
-                print(json.dump(dct))
-            else:
-                pjson = json.dumps(dct, indent=4, separators=(',', ': '))
+        # the json is written as each node is exported, neither the
+        # dictionary nor the document is held whole
+        if not outfile:
+            sys.stdout.writelines( _json_export_chunks( *export ) )
+            sys.stdout.write( "\n" )
+        else:
+            if trace_enabled:
                 lopper.log._debug("dumping generated json to stdout:", level=lopper.log.TRACE)
-                lopper.log._debug(pjson, level=lopper.log.TRACE)
+                lopper.log._debug(json.dumps(dct, indent=4, separators=(',', ': ')), level=lopper.log.TRACE)
 
-                with open( outfile, "w") as file:
-                    file.write(pjson)
+            with open( outfile, "w") as file:
+                file.writelines( _json_export_chunks( *export, indent = 4 ) )
+
+    def export( self, parent_attr = False ):
+        """Export the loaded input or tree as nested dictionaries
+
+        The dictionaries are built directly from the loaded input (or from
+        the LopperTree), in one walk, ready to be dumped as yaml or json.
+        See export_dict() for the format.
+
+        Args:
+           parent_attr (bool,optional): restore "custom_parent_value"
+                                        attributes to "parent"
+
+        Returns:
+           dict: the exported tree, None if nothing is loaded
+        """
+        if self.root:
+            return export_dict( self.root, _yaml_node_entry, parent_attr )
+
+        if self.tree:
+            boolean_as_int = self.boolean_as_int
+            def entry( node ):
+                name, attrs = lopper_node_attrs( node, boolean_as_int )
+                return name, attrs, node.child_nodes.values()
+
+            return export_dict( self.tree["/"], entry, parent_attr )
+
+        return None
+
+    def export_stream( self, parent_attr = False ):
+        """Export the loaded input or tree, a node at a time
+
+        As export(), but only the top level dictionary is exported. Its
+        children (and theirs) are _ExportChild entries that are exported
+        by the returned function, as they are written out.
+
+        Args:
+           parent_attr (bool,optional): restore "custom_parent_value"
+                                        attributes to "parent"
+
+        Returns:
+           tuple: (dict, function to export an _ExportChild), None if
+                  nothing is loaded
+        """
+        if self.root:
+            root = self.root
+            entry = _yaml_node_entry
+        elif self.tree:
+            root = self.tree["/"]
+            boolean_as_int = self.boolean_as_int
+            def entry( node ):
+                name, attrs = lopper_node_attrs( node, boolean_as_int )
+                return name, attrs, node.child_nodes.values()
+        else:
+            return None
+
+        def expand( child ):
+            return _export_node( child.node, entry, parent_attr, child.entry )
+
+        root_entry = entry( root )
+        if root_entry[0] == "root":
+            return _export_node( root, entry, parent_attr, root_entry ), expand
+
+        return { root_entry[0]: _ExportChild( root, root_entry ) }, expand
+
+    def nodes( self ):
+        """Return the YamlNode tree of the loaded input
+
+        If a LopperTree was loaded, it is converted on first use.
+
+        Args:
+           None
+
+        Returns:
+           YamlNode: the root of the tree, None if nothing is loaded
+        """
+        if self.root is None and self.tree:
+            self.root = lopper_tree_nodes( self.tree["/"], self.boolean_as_int )
+
+        return self.root
+
+    def flat_name( self, value ):
+        """Return the flattened input name of a value, by identity
+
+        Used to find the anchor of an expanded yaml alias: the alias and
+        the anchor are the same object, and the anchor is the first place
+        the object appears in the (flattened) input.
+
+        Args:
+           value: a value from the loaded input
+
+        Returns:
+           string: the first flattened name ("a/b/c") of the value, or None
+        """
+        if self._flat_names is None:
+            self._flat_names = {}
+            for flat_thing_name, flat_thing in self.dct_flat.items():
+                self._flat_names.setdefault( id(flat_thing), flat_thing_name )
+
+        return self._flat_names.get( id(value) )
 
     def prop_expand( self, prop ):
         """Expand a property into a format a device tree can represent
@@ -1219,33 +1668,24 @@ class LopperJSON():
         Returns:
             Nothing
         """
-        print( RenderTree( self.anytree ) )
+        root = self.nodes()
+        if root:
+            print( RenderTree( root.to_anytree() ) )
 
     def props( self, node ):
         """Create a dictionary representation of Node attributes
 
         Gather a dictionary representation of the properties of a LopperJSON
-        Node.
-
-        This routine skips internal members of a node, and returns only
-        attributes that are meaningful to the caller.
-
-        It knows how to expand node references and returns them as properties
-        of the node.
+        Node: its attributes, followed by its name.
 
         Args:
-            node (AnyTreeNode): node to export as dictionary
+            node (YamlNode): node to export as dictionary
 
         Returns:
             dict of node names -> properties
         """
-        pdict = {}
-        for a in node.__dict__:
-            if not a.startswith( "_NodeMixin" ):
-                # if we have a list, and the elements are a dictionary, we need
-                # to expand the dict and add them individually. If it is just a
-                # list, we add it by itself.
-                pdict[a] = node.__dict__[a]
+        pdict = dict( node.attrs )
+        pdict["name"] = node.name
 
         return pdict
 
@@ -1256,15 +1696,17 @@ class LopperJSON():
         the Yaml internal tree.
 
         Args:
-            node (AnyTreeNode): node to query for path
+            node (YamlNode): node to query for path
 
         Returns:
             string: absolute path of the node
         """
+        node_path = node.ancestors()[::-1] + [ node ]
+
         path_gen=""
-        for p in node.path:
+        for p in node_path:
             if p.name == "root":
-                if len(node.path) == 1:
+                if len(node_path) == 1:
                     path_gen += "/"
             else:
                 path_gen += "/" + p.name
@@ -1283,23 +1725,17 @@ class LopperJSON():
         Returns:
             None
         """
-        for node in PreOrderIter(self.anytree):
-            print( f"node: {node.name} depth: {node.depth}" )
+        root = self.nodes()
+        if not root:
+            return
+
+        for node in root.iter():
+            print( f"node: {node.name} depth: {len(node.ancestors())}" )
             print( f"   raw: {node}" )
             print( "   attributes:" )
-            for a in node.__dict__:
-                if not a.startswith( "_NodeMixin" ):
-                    print( f"        {a}: {node.__dict__[a]}")
-            print( f"   path: {type(node.path)}" )
-            path_gen=""
-            for p in node.path:
-                print( f"      path node: {p}" )
-                if p.name == "root":
-                    if len(node.path) == 1:
-                        path_gen += "/"
-                else:
-                    path_gen += "/" + p.name
-            print( f"   full path: {path_gen}" )
+            for a in node.attrs:
+                print( f"        {a}: {node.attrs[a]}")
+            print( f"   full path: {self.path( node )}" )
 
     def flatten(self,d):
         out = {}
@@ -1336,9 +1772,10 @@ class LopperJSON():
             print( "[ERROR]: no tree provided" )
             sys.exit(1)
 
-        importer = LopperTreeImporter(Node)
-        importer.boolean_as_int = self.boolean_as_int
-        self.anytree = importer.import_(in_tree["/"])
+        # the tree is exported directly when it is written, and converted
+        # to YamlNodes only if they are needed (see nodes())
+        self.tree = in_tree
+        self.root = None
 
 
 def _convert_ordered_dict(obj):
@@ -1426,94 +1863,75 @@ class LopperYAML(LopperJSON):
         Returns:
            Nothing
         """
-        if self.anytree:
-            trace_enabled = verbose > 2 or lopper.log._is_enabled(lopper.log.TRACE)
-            # if there's only one child, we use that, which allows us to skip the Anytree
-            # "root" node, without any tricks.
-            no_root = False
-            start_node = self.anytree
-            if no_root:
-                if len(self.anytree.children) == 1:
-                    start_node = self.anytree.children[0]
-
-            # at high verbosity, use an ordered dict for debug reasons
-            if trace_enabled:
-                dcttype=OrderedDict
-            else:
-                #dcttype=dict
-                dcttype=OrderedDict
-
-            # Traverse the AnyTree structure and rename 'custom_parent' to 'parent'
-            def update_custom_parent(node):
-                if hasattr(node, 'custom_parent_value'):
-                    node.__dict__['parent'] = node.__dict__.pop('custom_parent_value')
+        # the dictionaries are built directly from the input or tree, with
+        # the 'parent' attributes restored
+        export = self.export_stream( parent_attr = True )
+        if export is None:
+            return
 
-                for child in node.children:
-                    update_custom_parent(child)
+        trace_enabled = verbose > 2 or lopper.log._is_enabled(lopper.log.TRACE)
+        legacy = version.parse(ruamel.yaml.__version__) < version.parse("0.18")
 
-            update_custom_parent(start_node)  # Update the custom attributes first
-
-            dct = LopperDictExporter(dictcls=dcttype,attriter=sorted).export(start_node)
-            # Convert OrderedDicts to regular dicts while preserving HexInt values
-            # for proper hex formatting in YAML output. This replaces the previous
-            # json.loads(json.dumps(dct)) approach which lost HexInt type info.
-            dct = _convert_ordered_dict(dct)
+        dct = None
+        if trace_enabled or legacy:
+            dct = self.export( parent_attr = True )
 
+        if trace_enabled:
             lopper.log._debug("to_yaml: dumping export dictionary", level=lopper.log.TRACE)
             lopper.log._debug(pprint.pformat(dct), level=lopper.log.TRACE)
 
-            if version.parse(ruamel.yaml.__version__) < version.parse("0.18"):
-                yaml = ruamel.yaml
-                yaml_obj = None
-            else:
-                yaml_obj = YAML(typ='safe')
-                yaml_obj.default_flow_style = False
-                yaml_obj.canonical = False
-                yaml_obj.default_style = None
-                # Add representer for HexInt to output hex format (0xff instead of 255)
-                yaml_obj.representer.add_representer(
-                    HexInt,
-                    lambda dumper, data: dumper.represent_scalar('tag:yaml.org,2002:int', hex(data))
-                )
-
-            # This stops tags from being output.
-            # We could make this a configuration option in the future
-
-            # The emitter is only valid for a non ruamel yaml, which is no longer
-            # supported
-            # yaml.emitter.Emitter.process_tag = lambda self, *args, **kw: None
+        if legacy:
             if not outfile:
-                if yaml_obj:
-                    from io import StringIO
-                    buf = StringIO()
-                    yaml_obj.dump(dct, buf)
-                    print(buf.getvalue())
-                else:
-                    print(yaml.dump(dct))
+                print(ruamel.yaml.dump(dct))
             else:
-                lopper.log._debug(str(RenderTree(self.anytree.root)), level=lopper.log.TRACE)
-                lopper.log._debug("dumping generated yaml to stdout:", level=lopper.log.TRACE)
-                if version.parse(ruamel.yaml.__version__) < version.parse("0.18"):
+                if trace_enabled:
+                    lopper.log._debug("dumping generated yaml to stdout:", level=lopper.log.TRACE)
                     lopper.log._debug(ruamel.yaml.dump(dct,
                                                        default_flow_style=False,
                                                        canonical=False,
                                                        default_style=None), level=lopper.log.TRACE)
-                else:
-                    from io import StringIO
-
-                    buf = StringIO()
-                    yaml_obj.dump(dct, buf)
-                    lopper.log._debug(buf.getvalue(), level=lopper.log.TRACE)
-
                 with open( outfile, "w") as file:
-                    if version.parse(ruamel.yaml.__version__) < version.parse("0.18"):
-                        ruamel.yaml.round_trip_dump(dct, file,
-                                                    default_flow_style=False,
-                                                    canonical=False,
-                                                    default_style=None)
-                    else:
-                        yaml_obj.dump(dct, file )
+                    ruamel.yaml.round_trip_dump(dct, file,
+                                                default_flow_style=False,
+                                                canonical=False,
+                                                default_style=None)
+            return
+
+        yaml_obj = YAML(typ='safe')
+        yaml_obj.default_flow_style = False
+        yaml_obj.canonical = False
+        yaml_obj.default_style = None
+        # Add representer for HexInt to output hex format (0xff instead of 255)
+        yaml_obj.representer.add_representer(
+            HexInt,
+            lambda dumper, data: dumper.represent_scalar('tag:yaml.org,2002:int', hex(data))
+        )
+
+        # This stops tags from being output.
+        # We could make this a configuration option in the future
+
+        # The emitter is only valid for a non ruamel yaml, which is no longer
+        # supported
+        # yaml.emitter.Emitter.process_tag = lambda self, *args, **kw: None
+
+        # the yaml is emitted from the events of each node as it is exported
+        # (the same events yaml_obj.dump() would serialize for the whole
+        # dictionary), so the output is written as it is generated
+        if not outfile:
+            yaml_obj.emit( _yaml_export_events( yaml_obj, *export ), sys.stdout )
+            sys.stdout.write( "\n" )
+        else:
+            # the yaml is only generated twice when it is being traced
+            if trace_enabled:
+                from io import StringIO
 
+                lopper.log._debug("dumping generated yaml to stdout:", level=lopper.log.TRACE)
+                buf = StringIO()
+                yaml_obj.dump(dct, buf)
+                lopper.log._debug(buf.getvalue(), level=lopper.log.TRACE)
+
+            with open( outfile, "w") as file:
+                yaml_obj.emit( _yaml_export_events( yaml_obj, *export ), file )
 
 
     def load_yaml( self, filename = None ):
@@ -1536,20 +1954,14 @@ class LopperYAML(LopperJSON):
         if not in_name:
             print( "[ERROR]: no yaml source provided" )
 
-        iny = open( in_name )
-
-        if version.parse(ruamel.yaml.__version__) < version.parse("0.18"):
-            self.dct = ruamel.yaml.safe_load( iny )
-        else:
-            yaml = YAML(typ='safe')
-            self.dct = yaml.load( iny )
+        self.dct = yaml_load( in_name )
 
         if not self.dct:
             print( "[ERROR]: no data available to load" )
             sys.exit(1)
 
-        # this renames "parent" keys to "custom_parent", so that the anytree
-        # loading won't hit an internal assert (where it checks for parent)
+        # this renames "parent" keys to "custom_parent", so they can't be
+        # confused with the parent of a node while the tree is built
         orig_dct = self.dct
         new_dct = preprocess_yaml_data_in_place( self.dct )
         self.dct = new_dct
@@ -1557,15 +1969,14 @@ class LopperYAML(LopperJSON):
         # flatten the dictionary so we can look up aliases and anchors
         # by identity later .. without needing to recurse
         self.dct_flat = flatten_dict(self.dct,separator="/")
-        importer = LopperDictImporter(Node)
-        importer.lists_as_nodes = self.lists_as_nodes
-        self.anytree = importer.import_(self.dct)
+        self._flat_names = None
+        self.root = import_dict( self.dct, self.lists_as_nodes )
 
-        reparent_nodes_by_specified_path( self.anytree, self.dct )
+        reparent_nodes_by_specified_path( self.root, self.dct )
 
         # This walks the tree and fixes the preprocesed "custom_parent"
         # keys to "parent"
-        postprocess_anytree_tree( self.anytree )
+        postprocess_yaml_tree( self.root )
 
     @staticmethod
     def create_merger():
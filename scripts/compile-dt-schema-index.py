@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Copyright (c) 2026 Advanced Micro Devices, Inc. All Rights Reserved.
+# SPDX-License-Identifier: BSD-3-Clause
+"""
+Compile dt-schema binding YAMLs into a constraint index for the lopper
+schema audit (-W schema).
+
+Parsing a full binding corpus (the upstream Linux bindings are ~1500
+files) takes far longer than auditing a tree, so it is done once, here.
+The index maps each compatible to its bindings and is loaded lazily by
+lopper when LOPPER_DT_SCHEMA_INDEX points at it.
+
+Usage:
+    scripts/compile-dt-schema-index.py <schema dir> [<schema dir> ...] -o <index>
+
+Example:
+    scripts/compile-dt-schema-index.py \\
+        /path/to/linux/Documentation/devicetree/bindings -o bindings.idx
+    LOPPER_DT_SCHEMA_INDEX=bindings.idx lopper -W schema system-top.dts out.dts
+
+The vendored lopper schemas are always included first (unless
+--no-vendored is passed). Rebuild the index when the bindings change,
+lopper warns when an index is older than its sources.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from lopper.audit import schema
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile dt-schema bindings into a lopper constraint index")
+    parser.add_argument("schema_dirs", nargs="+", help="directories of binding YAML files")
+    parser.add_argument("-o", "--output", required=True, help="index file to write")
+    parser.add_argument("--no-vendored", action="store_true",
+                        help="don't include the schemas vendored with lopper")
+    args = parser.parse_args()
+
+    dirs = list(args.schema_dirs)
+    if not args.no_vendored:
+        dirs.insert(0, schema._get_schema_dir())
+
+    for d in dirs:
+        if not os.path.isdir(d):
+            print(f"[ERROR]: {d} is not a directory", file=sys.stderr)
+            return 1
+
+    index = schema.compile_constraint_index(dirs, args.output)
+    by_compatible = sum(1 for c in index.constraints.values() if c.node_pattern is None)
+    print(f"{args.output}: {len(index)} constraint sets, {by_compatible} selected by compatible, "
+          f"from {len(index.sources)} schemas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -36,7 +36,7 @@ setuptools.setup(
     python_requires='>=3.8',
     include_package_data=True,
     install_requires=[ "humanfriendly","configparser" ],
-    extras_require={ "server": ["flask>=1.1.2","flask_restful>=0.3.8","pandas"],
+    extras_require={ "server": ["flask>=1.1.2","flask_restful>=0.3.8"],
                      "yaml": ["pyaml","ruamel.yaml","anytree","packaging"],
                      "dt" : ["devicetree"],
                      "pcpp" : ["pcpp"],
@@ -2,6 +2,7 @@
 Pytest configuration and shared fixtures for Lopper tests.
 """
 
+import os
 import sys
 import pytest
 import tempfile
@@ -31,6 +32,23 @@ class Capturing(list):
         sys.stdout = self._stdout
 
 
+@pytest.fixture(scope="session", autouse=True)
+def lopper_cache_dir(tmp_path_factory):
+    """
+    Keep the on-disk caches (compiled lops, parsed yaml) out of ~/.cache.
+
+    Tests that need a cache of their own set LOPPER_CACHE_DIR themselves.
+    """
+    cache = tmp_path_factory.mktemp("lopper_cache")
+    saved = os.environ.get("LOPPER_CACHE_DIR")
+    os.environ["LOPPER_CACHE_DIR"] = str(cache)
+    yield cache
+    if saved is None:
+        os.environ.pop("LOPPER_CACHE_DIR", None)
+    else:
+        os.environ["LOPPER_CACHE_DIR"] = saved
+
+
 @pytest.fixture(scope="session")
 def test_outdir(tmp_path_factory):
     """
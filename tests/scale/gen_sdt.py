@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Synthetic system device tree generator for the scale benchmarks.
+
+Generates SDTs of any size (1k to 100k+ nodes) with the structure lopper
+processes in real trees: CPU clusters, memory, reserved-memory regions,
+buses of devices with interrupts and clocks, and openamp domains whose
+access lists reference devices by phandle. The same seed and spec always
+produce the same tree.
+
+The tree is emitted as DTS (to compile with dtc, or to feed to lopper) or
+directly as a flattened tree built with libfdt, so the benchmarks don't
+depend on dtc being installed.
+
+Usage:
+    tests/scale/gen_sdt.py --nodes 10000 -o big.dts
+    tests/scale/gen_sdt.py --buses 8 --devices 4000 --domains 16 -o big.dtb
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import argparse
+import random
+import struct
+import sys
+from dataclasses import dataclass
+
+# kinds of device on the buses: (node name, compatible)
+DEVICE_KINDS = [
+    ("serial", "arm,pl011"),
+    ("ethernet", "cdns,gem"),
+    ("i2c", "cdns,i2c-r1p14"),
+    ("spi", "cdns,spi-r1p6"),
+    ("gpio", "xlnx,versal-gpio-1.0"),
+    ("dma", "xlnx,zynqmp-dma-1.0"),
+    ("mmc", "arasan,sdhci-8.9a"),
+    ("timer", "cdns,ttc"),
+]
+
+DEVICE_BASE = 0xa0000000
+DEVICE_STRIDE = 0x10000
+RESERVED_BASE = 0x70000000
+RESERVED_SIZE = 0x100000
+
+
+@dataclass
+class SdtSpec:
+    """Shape of a generated tree.
+
+    Attributes:
+        buses: number of simple-bus nodes the devices are spread over
+        devices: total number of devices
+        clusters: number of CPU clusters
+        cpus_per_cluster: CPUs in each cluster
+        domains: number of openamp domains
+        reserved: number of reserved-memory regions
+        phandle_refs: total number of device references in domain access lists
+        seed: random seed, for the access list choices
+    """
+    buses: int = 4
+    devices: int = 64
+    clusters: int = 2
+    cpus_per_cluster: int = 2
+    domains: int = 2
+    reserved: int = 4
+    phandle_refs: int = 32
+    seed: int = 1
+
+    @classmethod
+    def for_nodes(cls, nodes, seed=1):
+        """Return a spec for a tree of about the given number of nodes.
+
+        Everything grows with the tree: ~80% of the nodes are devices, the
+        rest are buses, clusters, domains and reserved-memory regions.
+        """
+        nodes = max(nodes, 32)
+        return cls(buses=max(1, nodes // 500),
+                   devices=nodes * 8 // 10,
+                   clusters=max(1, nodes // 1000),
+                   cpus_per_cluster=4,
+                   domains=max(1, nodes // 250),
+                   reserved=max(1, nodes // 20),
+                   phandle_refs=nodes,
+                   seed=seed)
+
+
+class _Node:
+    __slots__ = ("name", "label", "props", "children")
+
+    def __init__(self, name, label=None):
+        self.name = name
+        self.label = label
+        # (name, value): value is a str or list of str (strings), a list
+        # of ints and label references (cells), or None (empty)
+        self.props = []
+        self.children = []
+
+    def add(self, child):
+        self.children.append(child)
+        return child
+
+    def walk(self, path=""):
+        path = f"{path}/{self.name}" if path not in ("", "/") else f"/{self.name}"
+        if not self.name:
+            path = "/"
+        yield path, self
+        for c in self.children:
+            yield from c.walk(path)
+
+
+class Ref(str):
+    """A phandle reference (by label) in a cell list."""
+
+
+def build(spec):
+    """Build the tree for a spec.
+
+    Args:
+        spec: SdtSpec
+
+    Returns:
+        _Node: the root node
+    """
+    rng = random.Random(spec.seed)
+
+    root = _Node("")
+    root.props += [("#address-cells", [2]), ("#size-cells", [2]),
+                   ("model", "lopper scale test"),
+                   ("compatible", ["lopper,scale-test", "system-device-tree-v1"])]
+
+    chosen = root.add(_Node("chosen"))
+    chosen.props.append(("stdout-path", "serial0:115200n8"))
+
+    for c in range(spec.clusters):
+        cluster = root.add(_Node(f"cpus-cluster@{c:x}", f"cluster{c}"))
+        cluster.props += [("compatible", "cpus,cluster"), ("#address-cells", [1]),
+                          ("#size-cells", [0]), ("#ranges-address-cells", [2]),
+                          ("#ranges-size-cells", [2])]
+        for i in range(spec.cpus_per_cluster):
+            cpu = cluster.add(_Node(f"cpu@{i:x}", f"cpu{c}_{i}"))
+            cpu.props += [("compatible", ["arm,cortex-a72", "arm,armv8"]),
+                          ("device_type", "cpu"), ("reg", [i]),
+                          ("enable-method", "psci")]
+
+    memory = root.add(_Node("memory@0", "memory"))
+    memory.props += [("device_type", "memory"), ("reg", [0, 0, 0, 0x80000000])]
+
+    resmem = root.add(_Node("reserved-memory"))
+    resmem.props += [("#address-cells", [2]), ("#size-cells", [2]), ("ranges", None)]
+    for r in range(spec.reserved):
+        base = RESERVED_BASE + r * RESERVED_SIZE
+        region = resmem.add(_Node(f"region@{base:x}", f"rsv{r}"))
+        region.props += [("reg", [base >> 32, base & 0xffffffff, 0, RESERVED_SIZE // 2]),
+                         ("no-map", None)]
+
+    clocks = []
+    for k in range(max(1, spec.devices // 64)):
+        clk = root.add(_Node(f"clk{k}", f"clk{k}"))
+        clk.props += [("compatible", "fixed-clock"), ("#clock-cells", [0]),
+                      ("clock-frequency", [100000000 + k])]
+        clocks.append(clk.label)
+
+    gic = root.add(_Node("interrupt-controller@f9000000", "gic"))
+    gic.props += [("compatible", "arm,gic-v3"), ("#interrupt-cells", [3]),
+                  ("interrupt-controller", None), ("reg", [0, 0xf9000000, 0, 0x80000])]
+
+    buses = []
+    for b in range(spec.buses):
+        bus = root.add(_Node(f"axi@{b:x}", f"axi{b}"))
+        bus.props += [("compatible", "simple-bus"), ("#address-cells", [2]),
+                      ("#size-cells", [2]), ("ranges", None)]
+        buses.append(bus)
+
+    devices = []
+    for d in range(spec.devices):
+        kind, compatible = DEVICE_KINDS[d % len(DEVICE_KINDS)]
+        addr = DEVICE_BASE + d * DEVICE_STRIDE
+        dev = buses[d % len(buses)].add(_Node(f"{kind}@{addr:x}", f"dev{d}"))
+        dev.props += [("compatible", compatible), ("status", "okay"),
+                      ("reg", [addr >> 32, addr & 0xffffffff, 0, 0x1000]),
+                      ("interrupt-parent", [Ref("gic")]),
+                      ("interrupts", [0, 32 + d % 900, 4]),
+                      ("clocks", [Ref(clocks[d % len(clocks)])])]
+        devices.append(dev.label)
+
+    domains = root.add(_Node("domains"))
+    domains.props += [("#address-cells", [2]), ("#size-cells", [2])]
+    refs_left = spec.phandle_refs
+    for n in range(spec.domains):
+        domain = domains.add(_Node(f"domain{n}", f"domain{n}"))
+        count = refs_left // (spec.domains - n)
+        refs_left -= count
+        access = []
+        for dev in rng.sample(devices, min(count, len(devices))):
+            access += [Ref(dev), 0]
+        span = 0x80000000 // spec.domains
+        domain.props += [("compatible", "openamp,domain-v1"),
+                         ("cpus", [Ref(f"cluster{n % spec.clusters}"), 0x3, 0]),
+                         ("memory", [0, n * span, 0, span])]
+        if access:
+            domain.props.append(("access", access))
+
+    return root
+
+
+def node_count(root):
+    """Return the number of nodes in a generated tree."""
+    return sum(1 for _ in root.walk())
+
+
+def _dts_value(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return f'"{value}"'
+    if value and isinstance(value[0], str) and not isinstance(value[0], Ref):
+        return ", ".join(f'"{v}"' for v in value)
+    cells = " ".join(f"&{v}" if isinstance(v, Ref) else f"0x{v:x}" for v in value)
+    return f"<{cells}>"
+
+
+def to_dts(root):
+    """Render a generated tree as DTS.
+
+    Args:
+        root: the root _Node, from build()
+
+    Returns:
+        string: the DTS source
+    """
+    out = ["/dts-v1/;", ""]
+
+    def emit(node, depth):
+        indent = "\t" * depth
+        label = f"{node.label}: " if node.label else ""
+        out.append(f"{indent}{label}{node.name or '/'} {{")
+        for name, value in node.props:
+            v = _dts_value(value)
+            out.append(f"{indent}\t{name};" if v is None else f"{indent}\t{name} = {v};")
+        for c in node.children:
+            emit(c, depth + 1)
+        out.append(f"{indent}}};")
+
+    emit(root, 0)
+    out.append("")
+    return "\n".join(out)
+
+
+def to_fdt(root):
+    """Build a flattened tree of a generated tree with libfdt.
+
+    Labelled nodes are given phandles, and the labels are recorded in
+    __symbols__ (as dtc -@ does).
+
+    Args:
+        root: the root _Node, from build()
+
+    Returns:
+        libfdt.Fdt
+    """
+    import libfdt
+
+    phandles = {}
+    paths = {}
+    for path, node in root.walk():
+        if node.label:
+            phandles[node.label] = len(phandles) + 1
+            paths[node.label] = path
+
+    # sized up front, FdtSw otherwise grows (and copies) the blob in small
+    # steps
+    sw = libfdt.FdtSw(size_hint=256 * (len(paths) + 64))
+    sw.finish_reservemap()
+
+    def emit(node):
+        sw.begin_node(node.name)
+        for name, value in node.props:
+            if value is None:
+                sw.property(name, b"")
+            elif isinstance(value, str):
+                sw.property_string(name, value)
+            elif value and isinstance(value[0], str) and not isinstance(value[0], Ref):
+                sw.property(name, b"".join(v.encode() + b"\0" for v in value))
+            else:
+                cells = [phandles[v] if isinstance(v, Ref) else v for v in value]
+                sw.property(name, struct.pack(f">{len(cells)}I", *cells))
+        if node.label:
+            sw.property_u32("phandle", phandles[node.label])
+        for c in node.children:
+            emit(c)
+        if node is root:
+            sw.begin_node("__symbols__")
+            for label, path in paths.items():
+                sw.property_string(label, path)
+            sw.end_node()
+        sw.end_node()
+
+    emit(root)
+    return sw.as_fdt()
+
+
+def load_tree(fdt):
+    """Load a flattened tree, from to_fdt(), into a LopperTree.
+
+    Args:
+        fdt: libfdt.Fdt
+
+    Returns:
+        LopperTree
+    """
+    from lopper import Lopper
+    from lopper.tree import LopperTree
+
+    tree = LopperTree()
+    tree.load(Lopper.export(fdt))
+    return tree
+
+
+def to_tree(root):
+    """Load a generated tree into a LopperTree (see to_fdt()).
+
+    Args:
+        root: the root _Node, from build()
+
+    Returns:
+        LopperTree
+    """
+    return load_tree(to_fdt(root))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic system device tree")
+    parser.add_argument("--nodes", type=int, help="approximate node count (sets the other sizes)")
+    defaults = SdtSpec()
+    for field in ("buses", "devices", "clusters", "cpus_per_cluster", "domains",
+                  "reserved", "phandle_refs", "seed"):
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, dest=field,
+                            help=f"default {getattr(defaults, field)}")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file, .dtb writes a flattened tree (default: DTS to stdout)")
+    args = parser.parse_args()
+
+    spec = SdtSpec.for_nodes(args.nodes, args.seed or 1) if args.nodes else SdtSpec()
+    for field in spec.__dataclass_fields__:
+        if getattr(args, field, None) is not None:
+            setattr(spec, field, getattr(args, field))
+
+    root = build(spec)
+    if args.output.endswith(".dtb"):
+        with open(args.output, "wb") as f:
+            f.write(to_fdt(root).as_bytearray())
+    elif args.output == "-":
+        sys.stdout.write(to_dts(root))
+    else:
+        with open(args.output, "w") as f:
+            f.write(to_dts(root))
+
+    print(f"{args.output}: {node_count(root)} nodes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -418,6 +418,121 @@ class TestAccessibleByMultipleClusters:
         assert r5 in result
 
 
+class TestAccessibleByIndex:
+    """Test the cached address-map index behind accessible_by."""
+
+    def test_address_lookups(self, tree_with_address_map):
+        """Test address targets against the bisect index."""
+        tree = tree_with_address_map
+        a72 = tree['/cpus-a72']
+        r5 = tree['/cpus-r5']
+
+        assert tree.accessible_by(0xff000000) == [a72, r5]
+        assert tree.accessible_by(0xff000fff) == [a72, r5]
+        assert tree.accessible_by(0xff001000) == []
+        assert tree.accessible_by(0xff010004) == [a72]
+        assert tree.accessible_by(0xfeffffff) == []
+
+    def test_overlapping_entries(self, tree_with_address_map):
+        """An address covered by an earlier, larger entry is found."""
+        tree = tree_with_address_map
+        r5 = tree['/cpus-r5']
+        r5['address-map'] = [0xff000000, 10, 0xff000000, 0x100000,
+                             0xff001000, 20, 0xff001000, 0x10]
+
+        assert r5 in tree.accessible_by(0xff002000)
+        assert r5 not in tree.accessible_by(0xff100000)
+
+    def test_index_reused(self, tree_with_address_map, monkeypatch):
+        """The address-maps are parsed once for repeated lookups."""
+        import lopper.assists.lopper_lib as lopper_lib
+        tree = tree_with_address_map
+        tree.accessible_by(0xff000000)
+
+        def _no_parse(*args):
+            raise AssertionError("address-map parsed again")
+        monkeypatch.setattr(lopper_lib, "parse_address_map", _no_parse)
+
+        assert len(tree.accessible_by(tree['/uart'])) == 2
+        assert len(tree.accessible_by(0xff010000)) == 1
+
+    def test_invalidated_on_assignment(self, tree_with_address_map):
+        """Assigning an address-map rebuilds the index."""
+        tree = tree_with_address_map
+        spi = tree['/spi']
+        r5 = tree['/cpus-r5']
+        assert r5 not in tree.accessible_by(spi)
+
+        r5['address-map'] = [0xff010000, 20, 0xff010000, 0x1000]
+        assert r5 in tree.accessible_by(spi)
+        assert r5 not in tree.accessible_by('/uart')
+
+        r5['address-map'].value = [0xff000000, 10, 0xff000000, 0x1000]
+        assert r5 not in tree.accessible_by(spi)
+        assert r5 in tree.accessible_by(0xff000010)
+
+    def test_invalidated_on_delete(self, tree_with_address_map):
+        """Deleting an address-map drops the cluster."""
+        tree = tree_with_address_map
+        uart = tree['/uart']
+        a72 = tree['/cpus-a72']
+        assert a72 in tree.accessible_by(uart)
+
+        a72.delete('address-map')
+        assert tree.accessible_by(uart) == [tree['/cpus-r5']]
+        assert tree.accessible_by(0xff010000) == []
+
+    def test_invalidated_on_phandle_change(self, tree_with_address_map):
+        """A node given a phandle in the map becomes accessible."""
+        tree = tree_with_address_map
+        a72 = tree['/cpus-a72']
+        a72['address-map'] = a72['address-map'].value + [0xff020000, 30, 0xff020000, 0x1000]
+        assert tree.accessible_by(0xff020000) == [a72]
+
+        gpio = LopperNode(-1, "/gpio")
+        tree.add(gpio)
+        assert tree.accessible_by('/gpio') == []
+
+        tree['/gpio'].phandle = 30
+        assert tree.accessible_by('/gpio') == [a72]
+
+    def test_many_devices(self):
+        """All devices of a large map resolve, matching a parse and scan."""
+        num_devices = 2000
+        tree = LopperTree()
+        for i in range(num_devices):
+            tree.add(LopperNode(-1, f"/dev{i}"), dont_sync=True)
+        for c in range(2):
+            tree.add(LopperNode(-1, f"/cluster{c}"), dont_sync=True)
+        tree.sync()
+
+        for i in range(num_devices):
+            tree[f"/dev{i}"].phandle = 100 + i
+
+        for c in range(2):
+            cluster = tree[f"/cluster{c}"]
+            cluster['#ranges-address-cells'] = [2]
+            cluster['#ranges-size-cells'] = [2]
+            address_map = []
+            for i in range(c, num_devices, c + 1):
+                addr = 0x80000000 + i * 0x10000
+                address_map += [0, addr, 100 + i, 0, addr, 0, 0x1000]
+            cluster['address-map'] = address_map
+
+        clusters = [tree['/cluster0'], tree['/cluster1']]
+        entries = [parse_address_map(c['address-map'].value, 2, 2) for c in clusters]
+        for i in range(num_devices):
+            addr = 0x80000000 + i * 0x10000 + 0x800
+            expected = [c for c, e in zip(clusters, entries)
+                        if find_address_in_map(e, addr) is not None]
+            assert tree.accessible_by(addr) == expected
+            assert tree.accessible_by(addr + 0x1000) == []
+
+            expected = [c for c, e in zip(clusters, entries)
+                        if 100 + i in [x.phandle for x in e]]
+            assert tree.accessible_by(tree[f"/dev{i}"]) == expected
+
+
 class TestRenderCpuAccessMap:
     """Tests for the CPU access map visualization."""
 
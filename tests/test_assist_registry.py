@@ -0,0 +1,190 @@
+"""
+Tests for the assist registry (lopper/assist_registry.py).
+
+Covers the cached search directory index, assist module loading (once per
+process, reloaded on change), sys.path de-duplication and the lopper entry
+points that use the registry (input_find, find_any_matching_assists and
+lop,load).
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import os
+import sys
+import pytest
+
+import lopper.assist_registry
+from lopper import LopperSDT
+from lopper.assist_registry import AssistRegistry, sys_path_add
+from lopper.lop_program import prologue_text
+from lopper.tree import LopperTree, LopperNode
+
+
+def _touch_later(path, text):
+    """Rewrite a file, making sure its modification time moves forward."""
+    st = os.stat(path)
+    path.write_text(text)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestDirectoryIndex:
+
+    def test_listing_cached(self, tmp_path, monkeypatch):
+        (tmp_path / "a.dts").write_text("")
+        reg = AssistRegistry()
+        assert reg.listing(str(tmp_path)) == {"a.dts": os.path.join(str(tmp_path), "a.dts")}
+
+        def _no_listdir(*args):
+            raise AssertionError("directory listed twice")
+        monkeypatch.setattr(lopper.assist_registry.os, "listdir", _no_listdir)
+        assert "a.dts" in reg.listing(str(tmp_path))
+
+    def test_listing_refreshed_on_change(self, tmp_path):
+        reg = AssistRegistry()
+        assert reg.listing(str(tmp_path)) == {}
+        (tmp_path / "b.lop").write_text("")
+        st = os.stat(tmp_path)
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert "b.lop" in reg.listing(str(tmp_path))
+
+    def test_missing_directory(self, tmp_path):
+        assert AssistRegistry().listing(str(tmp_path / "nope")) == {}
+
+    def test_find_search_order(self, tmp_path):
+        first = tmp_path / "first"
+        second = tmp_path / "second"
+        first.mkdir()
+        second.mkdir()
+        (first / "assist.py").write_text("")
+        (second / "assist").write_text("")
+
+        reg = AssistRegistry()
+        # the first directory with a match wins, the exact name is tried
+        # before the extensions in each directory
+        assert reg.find("assist", [str(first), str(second)], [".py"]) == str(first / "assist.py")
+        assert reg.find("assist", [str(second), str(first)], [".py"]) == str(second / "assist")
+        assert reg.find("assist", [str(first)]) is None
+
+    def test_find_with_directory_component(self, tmp_path):
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "x.dts").write_text("")
+        reg = AssistRegistry()
+        assert reg.find("sub/x", [str(tmp_path)], [".dts"]) == os.path.join(str(tmp_path), "sub/x.dts")
+
+    def test_files(self, tmp_path):
+        for n in ("a.dts", "b.lop", "c.py"):
+            (tmp_path / n).write_text("")
+        found = AssistRegistry().files([str(tmp_path), str(tmp_path / "missing")], (".dts", ".lop"))
+        assert sorted(os.path.basename(f) for f in found) == ["a.dts", "b.lop"]
+
+
+class TestModuleLoading:
+
+    def test_loaded_once(self, tmp_path):
+        mod = tmp_path / "counting_assist.py"
+        mod.write_text("import builtins\n"
+                       "builtins._registry_loads = getattr(builtins, '_registry_loads', 0) + 1\n")
+        import builtins
+        builtins._registry_loads = 0
+
+        reg = AssistRegistry()
+        m1 = reg.load(mod)
+        m2 = reg.load(str(mod), "counting_assist.py")
+        assert m1 is m2
+        assert builtins._registry_loads == 1
+        assert reg.loaded(mod)
+        del builtins._registry_loads
+
+    def test_reloaded_on_change(self, tmp_path):
+        mod = tmp_path / "changing_assist.py"
+        mod.write_text("VALUE = 1\n")
+        reg = AssistRegistry()
+        assert reg.load(mod).VALUE == 1
+        _touch_later(mod, "VALUE = 22\n")
+        assert reg.load(mod).VALUE == 22
+
+    def test_load_error_propagates(self, tmp_path):
+        mod = tmp_path / "broken_assist.py"
+        mod.write_text("def broken(:\n")
+        reg = AssistRegistry()
+        with pytest.raises(SyntaxError):
+            reg.load(mod)
+        assert not reg.loaded(mod)
+
+
+class TestSysPath:
+
+    def test_sys_path_add_dedups(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(sys, "path", list(sys.path))
+        before = len(sys.path)
+        sys_path_add(tmp_path, str(tmp_path), tmp_path)
+        assert len(sys.path) == before + 1
+        assert sys.path[-1] == str(tmp_path)
+
+    def test_prologue_does_not_grow_sys_path(self, monkeypatch):
+        monkeypatch.setattr(sys, "path", list(sys.path))
+        prologue = prologue_text(["mod"], ["/some/load/path"])
+        ns = {"os": os, "sys": sys, "__file__": lopper.tree.__file__}
+        # only the sys.path handling, not the assist imports
+        setup = prologue.split("import importlib")[0]
+        exec(setup, ns)
+        after_first = list(sys.path)
+        exec(setup, ns)
+        assert sys.path == after_first
+        assert after_first.count("/some/load/path") == 1
+
+
+class TestLopperLookups:
+
+    def test_input_find_uses_index(self, tmp_path, monkeypatch):
+        (tmp_path / "my-lop.dts").write_text("")
+        sdt = LopperSDT(None)
+        found = sdt.input_find("my-lop", [".dts"], [str(tmp_path)])
+        assert found == (tmp_path / "my-lop.dts").resolve().as_posix()
+
+        def _no_listdir(*args):
+            raise AssertionError("search path listed again")
+        monkeypatch.setattr(lopper.assist_registry.os, "listdir", _no_listdir)
+        assert sdt.input_find("my-lop", [".dts"], [str(tmp_path)]) == found
+
+    def test_input_find_miss(self, tmp_path):
+        sdt = LopperSDT(None)
+        sdt.werror = False
+        assert sdt.input_find("not-a-real-assist-name", [".py"], [str(tmp_path)]) is None
+
+    def test_find_any_matching_assists(self, tmp_path):
+        (tmp_path / "domain%.yaml.lop").write_text("")
+        (tmp_path / "other.lop").write_text("")
+        sdt = LopperSDT(None)
+        found = sdt.find_any_matching_assists(["inputs/domain-a.yaml"], [str(tmp_path)])
+        assert os.path.join(str(tmp_path), "domain%.yaml.lop") in found
+        assert os.path.join(str(tmp_path), "other.lop") not in found
+
+    def test_load_lop_imports_once(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(sys, "path", list(sys.path))
+        mod = tmp_path / "once_assist.py"
+        mod.write_text("LOADS = []\nLOADS.append(1)\n"
+                       "def is_compat(node, id):\n    return None\n")
+
+        lt = LopperTree()
+        lt['/']['compatible'] = ['system-device-tree-v1']
+        lops = LopperNode()
+        lops.name = "lops"
+        lop = LopperNode()
+        lop.name = "lop_0"
+        lop['compatible'] = ['system-device-tree-v1,lop,load']
+        lop['load'] = ['once_assist.py']
+        lops = lops + lop
+        lt = lt + lops
+
+        sdt = LopperSDT(None)
+        sdt.tree = LopperTree()
+        sdt.load_paths = [str(tmp_path)]
+        assert sdt.exec_lop(lt['/lops/lop_0'], lt)
+        assert sdt.exec_lop(lt['/lops/lop_0'], lt)
+
+        assert len(sdt.assists) == 1
+        assert sdt.assists[0].module.LOADS == [1]
+        assert sys.path.count(str(tmp_path)) == 1
@@ -0,0 +1,192 @@
+"""
+Tests for the audit scheduler (lopper/audit/scheduler.py).
+
+Covers splitting a phase into units, running the units in a process pool
+and incremental (dirty node) runs. In each mode the findings must be the
+same as a serial, full run through the ValidatorRegistry.
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import pytest
+
+from lopper.tree import LopperTree, LopperNode, LopperProp
+from lopper.audit import (
+    AuditScheduler, ValidationPhase, ValidatorRegistry, Rule,
+    get_drc_registry, reset_drc_registry,
+)
+from lopper.audit.assertions import rule_selector
+from lopper.audit.scheduler import tree_fingerprint, dirty_paths
+
+
+WARNINGS = ["drc_all", "memory_all"]
+
+EXTRA_RULES = {"drc": [
+    {"id": "dev-has-status", "check": "required", "phase": "post-processing",
+     "select": ["/bus/.*"], "params": {"properties": ["status"]}},
+    {"id": "bus-count", "check": "count", "phase": "post-processing",
+     "select": ["/bus/dev.*"], "params": {"max": 3}},
+    {"id": "mem-no-overlap", "check": "no-overlap", "phase": "post-processing",
+     "group-by": "/mem/.*",
+     "collect": {"property": "reg", "kind": "range", "address-cells": 1, "size-cells": 1}},
+]}
+
+
+@pytest.fixture
+def drc_rules():
+    reset_drc_registry()
+    get_drc_registry().load_dict(EXTRA_RULES)
+    yield get_drc_registry()
+    reset_drc_registry()
+
+
+def _node(tree, path, **props):
+    n = LopperNode(-1, path)
+    for k, v in props.items():
+        n + LopperProp(name=k.replace("__", ","), value=v if isinstance(v, list) else [v])
+    tree.add(n)
+    return n
+
+
+def _audit_tree():
+    tree = LopperTree()
+    for d, (id_, os_type, access) in enumerate([(1, "linux", [100, 0]),
+                                                (1, "bad", [100, 0]),
+                                                (3, "linux", [200, 0])]):
+        _node(tree, f"/domains/d{d}", compatible="openamp,domain-v1",
+              id=id_, os__type=os_type, access=access)
+    _node(tree, "/bus")
+    _node(tree, "/bus/dev0", status="okay")
+    _node(tree, "/bus/dev1")
+    _node(tree, "/mem")
+    _node(tree, "/mem/a", reg=[0x1000, 0x1000])
+    _node(tree, "/mem/b", reg=[0x1800, 0x1000])
+    tree.sync()
+    return tree
+
+
+def _serial(tree, phase):
+    """Findings of a full, serial run through the ValidatorRegistry."""
+    findings = {}
+    for category, validator_class in ValidatorRegistry.get_all_validators().items():
+        validator = validator_class(warnings=WARNINGS)
+        if validator.is_enabled():
+            validator.run_phase(phase, tree)
+            findings[category] = _summary(validator.results)
+    return findings
+
+
+def _summary(results):
+    return [(r.check_name, r.passed, r.message, r.source_path) for r in results]
+
+
+def _scheduled(scheduler, tree, phase, **kwargs):
+    scheduler.run_phase(phase, tree, **kwargs)
+    return {c: _summary(r) for c, r in scheduler.results.items()}
+
+
+class TestUnits:
+
+    def test_drc_units_are_top_level_rules(self, drc_rules):
+        from lopper.audit import DRCValidator
+        units = DRCValidator(warnings=["drc"]).phase_units(ValidationPhase.POST_PROCESSING, None)
+        assert [u.id for u, _ in units] == \
+            [r.id for r in drc_rules.rules_for_phase(ValidationPhase.POST_PROCESSING)]
+
+    def test_check_registry_units(self):
+        from lopper.audit import MemoryValidator
+        units = MemoryValidator(warnings=["memory_all"]).phase_units(ValidationPhase.EARLY, None)
+        assert [u for u, _ in units] == ["memory_cells", "memory_reg"]
+
+    def test_rule_selector(self):
+        sel = rule_selector(Rule.from_dict({"id": "x", "check": "required",
+                                            "select": ["/bus/dev.*:status"]}))
+        assert sel("/bus/dev3")
+        assert not sel("/mem/a")
+
+    def test_non_local_rules_have_no_selector(self):
+        for d in ({"id": "x", "check": "ref-exists", "select": ["/domains/.*"]},
+                  {"id": "x", "check": "required", "select": ["some_label"]},
+                  {"id": "x", "check": "exclusive-across", "group-by": "/domains/.*",
+                   "collect": "cpu-cores"},
+                  {"id": "x", "select": ["/domains/.*"],
+                   "rules": [{"id": "y", "check": "required",
+                              "select": [{"relative": "parent-domain"}]}]}):
+            assert rule_selector(Rule.from_dict(d)) is None
+
+
+class TestParallel:
+
+    @pytest.mark.parametrize("phase", list(ValidationPhase))
+    def test_same_findings_as_serial(self, drc_rules, phase):
+        tree = _audit_tree()
+        expected = _serial(tree, phase)
+
+        assert _scheduled(AuditScheduler(WARNINGS), tree, phase) == expected
+        assert _scheduled(AuditScheduler(WARNINGS, jobs=3), tree, phase) == expected
+
+    def test_error_count(self, drc_rules):
+        tree = _audit_tree()
+        phase = ValidationPhase.POST_PROCESSING
+        expected = ValidatorRegistry.run_phase(phase, tree, WARNINGS)
+        assert expected > 0
+        assert AuditScheduler(WARNINGS, jobs=3).run_phase(phase, tree) == expected
+
+
+class TestIncremental:
+
+    def test_unchanged_tree_reuses_selected_units(self, drc_rules):
+        tree = _audit_tree()
+        phase = ValidationPhase.POST_PROCESSING
+        audit = AuditScheduler(WARNINGS, incremental=True)
+        first = _scheduled(audit, tree, phase)
+        assert audit.stats["reused"] == 0
+
+        assert _scheduled(audit, tree, phase) == first
+        assert audit.stats["reused"] > 0
+
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_changes_match_full_audit(self, drc_rules, jobs):
+        tree = _audit_tree()
+        phase = ValidationPhase.POST_PROCESSING
+        audit = AuditScheduler(WARNINGS, jobs=jobs, incremental=True)
+        _scheduled(audit, tree, phase)
+
+        # a property change in one selected node
+        tree['/bus/dev1']['status'] = ["okay"]
+        assert _scheduled(audit, tree, phase) == _serial(tree, phase)
+        reused = audit.stats["reused"]
+        assert reused > 0
+
+        # added nodes, and a change to a domain (reference following rules)
+        _node(tree, "/bus/dev2")
+        _node(tree, "/bus/dev3", status="okay")
+        tree['/domains/d1']['id'] = [2]
+        tree['/mem/b']['reg'] = [0x2000, 0x1000]
+        tree.sync()
+        assert _scheduled(audit, tree, phase) == _serial(tree, phase)
+
+        # a removed node
+        tree.delete(tree['/bus/dev3'])
+        tree.sync()
+        assert _scheduled(audit, tree, phase) == _serial(tree, phase)
+
+    def test_explicit_dirty_paths(self, drc_rules):
+        tree = _audit_tree()
+        phase = ValidationPhase.POST_PROCESSING
+        audit = AuditScheduler(WARNINGS, incremental=True)
+        first = _scheduled(audit, tree, phase)
+
+        units = audit.stats["units"]
+        _scheduled(audit, tree, phase, dirty={"/mem/a"})
+        # only mem-no-overlap (and the units without selectors) re-run
+        assert audit.stats["run"] < units
+        assert _scheduled(audit, tree, phase, dirty=set()) == first
+
+    def test_fingerprint(self):
+        tree = _audit_tree()
+        before = tree_fingerprint(tree)
+        tree['/bus/dev0']['status'].value.append("extra")
+        assert dirty_paths(before, tree_fingerprint(tree)) == {"/bus/dev0"}
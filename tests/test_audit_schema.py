@@ -941,3 +941,178 @@ class TestExternalSchemaLoading:
         failed = [r for r in check_required_properties(tree, constraints)
                   if not r.passed]
         assert any('custom-required-prop' in r.message for r in failed)
+
+
+class TestConstraintIndex:
+    """Tests for the compiled constraint index (ConstraintIndex) that
+    dispatches nodes to binding constraints by compatible."""
+
+    @staticmethod
+    def _write_schema(directory, filename, body):
+        path = os.path.join(directory, filename)
+        with open(path, 'w') as f:
+            f.write(textwrap.dedent(body))
+        return path
+
+    @staticmethod
+    def _binding(compatibles=None, patterns=None, required=('reg',), name='b'):
+        return NodeConstraints(
+            node_pattern=None,
+            constraints=[PropertyConstraint(
+                constraint_type=ConstraintType.REQUIRED,
+                properties=list(required),
+                message=f"required properties: {', '.join(required)}")],
+            schema_file=f"{name}.yaml",
+            compatibles=list(compatibles) if compatibles else None,
+            compatible_patterns=list(patterns) if patterns else None,
+        )
+
+    def test_binding_compatibles_parsed(self, tmp_path):
+        self._write_schema(str(tmp_path), 'xlnx,foo.yaml', """\
+            $id: http://devicetree.org/schemas/misc/xlnx,foo.yaml#
+            properties:
+              compatible:
+                oneOf:
+                  - const: xlnx,foo-1.0
+                  - items:
+                      - enum: ["xlnx,foo-2.0", "xlnx,foo-3.0"]
+                      - const: syscon
+              xlnx,mode:
+                enum: [1, 2]
+            required:
+              - compatible
+              - reg
+        """)
+        self._write_schema(str(tmp_path), 'acme,bar.yaml', """\
+            select:
+              properties:
+                compatible:
+                  contains:
+                    pattern: "^acme,bar-[0-9]+$"
+              required: [compatible]
+            required: [interrupts]
+        """)
+        self._write_schema(str(tmp_path), 'referenced.yaml', """\
+            select: false
+            properties:
+              compatible:
+                const: never,selected
+            required: [reg]
+        """)
+
+        constraints = load_constraints_from_schemas(schema_dir=str(tmp_path))
+        assert set(constraints) == {'xlnx,foo', 'acme,bar'}
+
+        foo = constraints['xlnx,foo']
+        assert foo.node_pattern is None
+        assert foo.compatibles == ['xlnx,foo-1.0', 'xlnx,foo-2.0', 'xlnx,foo-3.0']
+        # the compatible schema selects the binding, it isn't a value check
+        assert [c.properties for c in foo.constraints if c.constraint_type == ConstraintType.ENUM] == [['xlnx,mode']]
+        assert constraints['acme,bar'].compatible_patterns == ['^acme,bar-[0-9]+$']
+
+    def test_dispatch_by_compatible_and_path(self):
+        from lopper.audit.schema import ConstraintIndex
+        vendored = NODE_PROPERTY_CONSTRAINTS
+        constraints = dict(vendored)
+        constraints['foo'] = self._binding(['xlnx,foo-1.0'], name='foo')
+        constraints['bar'] = self._binding(patterns=['^acme,bar-[0-9]+$'], name='bar')
+        constraints['any'] = self._binding(patterns=['-uart$'], name='any')
+        index = ConstraintIndex(constraints)
+
+        assert index.has_compatibles
+        assert index.match('/axi/foo@0', ['xlnx,foo-1.0']) == [constraints['foo']]
+        assert index.match('/axi/bar@0', ['acme,bar-12']) == [constraints['bar']]
+        assert index.match('/axi/bar@0', ['acme,bar-x']) == []
+        assert index.match('/axi/u@0', ['vendor,x-uart', 'acme,bar-1', 'xlnx,foo-1.0']) == \
+            [constraints['foo'], constraints['bar'], constraints['any']]
+        # a binding matched by several compatibles is returned once
+        assert index.match('/axi/bar@0', ['acme,bar-1', 'acme,bar-2']) == [constraints['bar']]
+        # path matched constraints are unchanged
+        assert [c.node_pattern for c in index.match('/memory@0')] == ['/memory@*']
+
+    def test_literal_prefix(self):
+        from lopper.audit.schema import _literal_prefix
+        assert _literal_prefix('^acme,bar-[0-9]+$') == 'acme,bar-'
+        assert _literal_prefix('^xlnx,(foo|bar)$') == 'xlnx,'
+        assert _literal_prefix('^abc?d') == 'ab'
+        assert _literal_prefix('^abc|def') == ''
+        assert _literal_prefix('uart$') == ''
+
+    def test_checks_use_compatible_bindings(self):
+        from lopper.audit.schema import ConstraintIndex
+        index = ConstraintIndex({'foo': self._binding(['xlnx,foo-1.0'], required=('reg', 'clocks'))})
+        tree = MockTree([
+            MockNode('/axi/foo@0', {'compatible': ['xlnx,foo-1.0'], 'reg': [0]}),
+            MockNode('/axi/other@0', {'compatible': 'xlnx,other', 'reg': [0]}),
+        ])
+        failed = [r for r in check_required_properties(tree, index) if not r.passed]
+        assert len(failed) == 1
+        assert failed[0].source_path == '/axi/foo@0'
+        assert 'clocks' in failed[0].message
+
+    def test_compile_save_load(self, tmp_path):
+        from lopper.audit.schema import compile_constraint_index, load_constraint_index
+        schemas = tmp_path / 'bindings'
+        schemas.mkdir()
+        path = self._write_schema(str(schemas), 'xlnx,foo.yaml', """\
+            properties:
+              compatible:
+                const: xlnx,foo-1.0
+            required: [reg]
+        """)
+        index_file = str(tmp_path / 'bindings.idx')
+        compile_constraint_index([str(schemas)], index_file)
+
+        index = load_constraint_index(index_file)
+        assert not index.stale()
+        assert [c.schema_file for c in index.match('/x', ['xlnx,foo-1.0'])] == [path]
+
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert index.stale()
+
+    def test_load_rejects_other_files(self, tmp_path):
+        import pickle
+        from lopper.audit.schema import load_constraint_index
+        bad = tmp_path / 'bad.idx'
+        bad.write_bytes(pickle.dumps({'not': 'an index'}))
+        with pytest.raises(ValueError):
+            load_constraint_index(str(bad))
+
+    def test_index_from_environment(self, tmp_path, monkeypatch):
+        import lopper.audit.schema as schema
+        index = schema.ConstraintIndex({'foo': self._binding(['xlnx,foo-1.0'])})
+        index_file = str(tmp_path / 'env.idx')
+        index.save(index_file)
+
+        monkeypatch.setenv('LOPPER_DT_SCHEMA_INDEX', index_file)
+        monkeypatch.setattr(schema, '_constraint_index', None)
+        monkeypatch.setattr(schema, '_node_property_constraints', None)
+        assert list(schema.get_node_property_constraints()) == ['foo']
+        assert schema.get_constraint_index().match('/a', ['xlnx,foo-1.0'])
+
+    def test_scale(self):
+        """2000 nodes against 1500 bindings dispatch without scanning them."""
+        import time
+        from lopper.audit.schema import ConstraintIndex
+        constraints = {}
+        for i in range(1500):
+            if i % 10:
+                constraints[f'b{i}'] = self._binding([f'vendor{i % 50},dev{i}'], name=f'b{i}')
+            else:
+                constraints[f'b{i}'] = self._binding(patterns=[f'^vendor{i % 50},ip{i}-[0-9.]+$'],
+                                                     name=f'b{i}')
+        nodes = []
+        for n in range(2000):
+            i = n % 1500
+            compat = f'vendor{i % 50},dev{i}' if i % 10 else f'vendor{i % 50},ip{i}-1.0'
+            nodes.append(MockNode(f'/axi/dev@{n:x}', {'compatible': [compat, 'syscon']}))
+
+        start = time.perf_counter()
+        index = ConstraintIndex(constraints)
+        failed = check_required_properties(MockTree(nodes), index)
+        elapsed = time.perf_counter() - start
+
+        assert len(failed) == 2000
+        assert all(r.details['property'] == 'reg' for r in failed)
+        assert elapsed < 5
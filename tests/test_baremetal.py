@@ -0,0 +1,298 @@
+"""
+Tests for the processor view shared by the baremetal assists
+(baremetalconfig_xlnx.ProcessorView).
+
+Covers reusing the view until the tree changes (or an assist starts),
+the address-map and compatible matches against the scans the assists
+used to do per driver, the driver list assist that uses it, and the
+cache of parsed driver yaml (common_utils.load_yaml()).
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import os
+import types
+import pytest
+
+from tests.scale import gen_sdt
+
+
+def _tree(devices=64):
+    tree = gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=devices, clusters=2)))
+
+    # map every third device, and one of them twice, into cluster 0
+    mapped = [n for n in tree if "status" in n.__props__][::3]
+    mapped.append(mapped[0])
+    address_map = []
+    for n in mapped:
+        reg = n.propval("reg")
+        address_map += [reg[0], reg[1], n.phandle, reg[0], reg[1], reg[2], reg[3]]
+    tree["/cpus-cluster@0"]["address-map"] = address_map
+    tree.sync()
+    return tree, mapped
+
+
+def _sdt(tree, outdir=""):
+    return types.SimpleNamespace(tree=tree, outdir=outdir)
+
+
+def _scan_mapped(tree, node_list):
+    """get_mapped_nodes()'s original filter"""
+    cluster = tree["/cpus-cluster@0"]
+    address_map = cluster["address-map"].value
+    na = cluster["#ranges-address-cells"].value[0]
+    ns = cluster["#ranges-size-cells"].value[0]
+    all_phandles = []
+    tmp = na
+    while tmp < len(address_map):
+        all_phandles.append(address_map[tmp])
+        tmp = tmp + na + ns + na + 1
+    return [node for node in node_list for handle in all_phandles if handle == node.phandle]
+
+
+def _scan_driver(node_list, compatlist):
+    """xlnx_generate_bm_config()'s original compatible match"""
+    driver_nodes = []
+    for node in node_list:
+        for compat in compatlist:
+            for compa in node.propval("compatible"):
+                if compat in compa and node not in driver_nodes:
+                    driver_nodes.append(node)
+    return driver_nodes
+
+
+@pytest.fixture
+def bm(monkeypatch, tmp_path):
+    # as when lopper loads the assists, their directory is on the path
+    import lopper.assists
+    monkeypatch.syspath_prepend(list(lopper.assists.__path__)[0])
+    monkeypatch.setenv("LOPPER_CACHE_DIR", str(tmp_path / "cache"))
+    import baremetalconfig_xlnx
+    return baremetalconfig_xlnx
+
+
+class TestProcessorView:
+
+    def test_cpu_node(self, bm):
+        tree, _ = _tree()
+        view = bm.processor_view(_sdt(tree), {"args": ["cpu0_1"]})
+        assert view.cpu_node is tree["/cpus-cluster@0/cpu@1"]
+        assert bm.get_cpu_node(_sdt(tree), {"args": ["cpu1_0"]}) is tree["/cpus-cluster@1/cpu@0"]
+
+    def test_invalid_cpu(self, bm):
+        tree, _ = _tree()
+        with pytest.raises(SystemExit):
+            bm.get_cpu_node(_sdt(tree), {"args": ["cpu9_9"]})
+
+    def test_reused(self, bm):
+        tree, _ = _tree()
+        sdt = _sdt(tree)
+        options = {"args": ["cpu0_0"]}
+        view = bm.processor_view(sdt, options)
+        assert bm.processor_view(sdt, options) is view
+        assert bm.processor_view(sdt, {"args": ["cpu1_0"]}) is not view
+        # kept for the sdt it was built for, on the tree
+        assert bm.processor_view(_sdt(tree), options) is not view
+        assert "_processor_views" not in vars(bm)
+
+        # an assist's entry point starts from a new view
+        new = bm.processor_view(sdt, options, new=True)
+        assert new is not view
+        assert bm.processor_view(sdt, options) is new
+
+    def test_rebuilt_on_change(self, bm):
+        tree, _ = _tree()
+        options = {"args": ["cpu0_0"]}
+        sdt = _sdt(tree)
+        view = bm.processor_view(sdt, options)
+        assert len(view.okay_nodes(tree["/"])) == 64
+
+        tree["/axi@0/serial@a0000000"]["status"] = "disabled"
+        view = bm.processor_view(sdt, options)
+        assert len(view.okay_nodes(tree["/"])) == 63
+
+        # an in place edit isn't a tree change, it is seen by a new view
+        tree["/axi@0/gpio@a0040000"].propval("status", list)[0] = "disabled"
+        assert len(bm.processor_view(sdt, options).okay_nodes(tree["/"])) == 63
+        view = bm.processor_view(sdt, options, new=True)
+        assert len(view.okay_nodes(tree["/"])) == 62
+
+        other, _ = _tree()
+        assert bm.processor_view(_sdt(other), options) is not view
+
+    def test_target_nodes(self, bm):
+        tree, _ = _tree()
+        view = bm.processor_view(_sdt(tree), {"args": ["cpu0_0"]})
+        root = tree["/"]
+        assert view.okay_nodes(root) == [n for n in root.subnodes()
+                                         if "okay" in n.propval("status")]
+        assert view.memory_nodes(root) == [tree["/memory@0"]]
+        assert view.chosen_node(root) is tree["/chosen"]
+        assert view.symbol_node(root) is tree["/__symbols__"]
+        assert view.chosen_node(tree["/axi@0"]) == ""
+
+    def test_mapped_matches_scan(self, bm):
+        tree, mapped = _tree()
+        view = bm.processor_view(_sdt(tree), {"args": ["cpu0_0"]})
+        node_list = view.okay_nodes(tree["/"])
+        assert view.mapped_nodes(node_list) == _scan_mapped(tree, node_list)
+        # a node the address-map references twice is kept twice
+        assert view.mapped_nodes(node_list).count(mapped[0]) == 2
+
+    @pytest.mark.parametrize("compatlist", [["arm,pl011"], ["cdns"], ["gem", "i2c"], ["nothing"]])
+    def test_driver_matches_scan(self, bm, compatlist):
+        tree, _ = _tree()
+        view = bm.processor_view(_sdt(tree), {"args": ["cpu0_0"]})
+        node_list = view.okay_nodes(tree["/"])
+        assert view.driver_nodes(tree["/"], compatlist) == _scan_driver(node_list, compatlist)
+
+    def test_copies(self, bm):
+        tree, _ = _tree()
+        view = bm.processor_view(_sdt(tree), {"args": ["cpu0_0"]})
+        root = tree["/"]
+        for nodes in (lambda: view.okay_nodes(root), lambda: view.memory_nodes(root),
+                      lambda: view.driver_nodes(root, ["cdns"])):
+            found = nodes()
+            assert found
+            found.clear()
+            assert nodes()
+
+    def test_driver_exact(self, bm):
+        tree, _ = _tree()
+        view = bm.processor_view(_sdt(tree), {"args": ["cpu0_0"]})
+        assert view.driver_nodes(tree["/"], ["cdns"], exact=True) == []
+        assert view.driver_nodes(tree["/"], ["cdns,gem"], exact=True) == \
+            [n for n in view.okay_nodes(tree["/"]) if "cdns,gem" in n.propval("compatible")]
+
+
+class TestAssists:
+
+    def _repo(self, tmp_path):
+        drivers = {"uartps": ["arm,pl011"], "emacps": ["cdns,gem"]}
+        for drv, compats in drivers.items():
+            data = tmp_path / "XilinxProcessorIPLib" / "drivers" / drv / "data"
+            data.mkdir(parents=True)
+            (data / f"{drv}.yaml").write_text(
+                "properties:\n  compatible:\n    enum:\n" +
+                "".join(f"      - {c}\n" for c in compats))
+        return str(tmp_path)
+
+    def _drvlist(self, tree, tmp_path):
+        import baremetaldrvlist_xlnx
+
+        repo = self._repo(tmp_path / "repo")
+        outdir = tmp_path / "out"
+        outdir.mkdir()
+        baremetaldrvlist_xlnx.xlnx_generate_bm_drvlist(
+            tree["/"], _sdt(tree, str(outdir)), {"args": ["cpu0_0", repo]})
+        return (outdir / "DRVLISTConfig.cmake").read_text()
+
+    def _map_gems(self, tree):
+        # only the gem devices are mapped into the processor's cluster
+        address_map = []
+        for n in tree:
+            if "cdns,gem" in n.propval("compatible"):
+                reg = n.propval("reg")
+                address_map += [reg[0], reg[1], n.phandle, reg[0], reg[1], reg[2], reg[3]]
+        tree["/cpus-cluster@0"]["address-map"] = address_map
+
+    def test_drvlist_mapped(self, bm, tmp_path):
+        tree, _ = _tree()
+        self._map_gems(tree)
+        drvlist = self._drvlist(tree, tmp_path)
+        assert "uartps" not in drvlist
+        assert "emacps" in drvlist
+
+    def test_drvlist_pruned(self, bm, tmp_path):
+        tree, _ = _tree()
+        self._map_gems(tree)
+        # a pruned tree is not filtered by the address-map
+        tree["/"]["pruned-sdt"] = [1]
+        drvlist = self._drvlist(tree, tmp_path)
+        assert "uartps" in drvlist
+        assert "emacps" in drvlist
+
+
+class TestDriverYaml:
+
+    @pytest.fixture
+    def utils(self, bm, monkeypatch):
+        import common_utils
+        monkeypatch.setattr(common_utils, "_yaml_memo", {})
+        return common_utils
+
+    def _yaml(self, tmp_path, compats):
+        path = tmp_path / "uartps.yaml"
+        path.write_text("properties:\n  compatible:\n    enum:\n" +
+                        "".join(f"      - {c}\n" for c in compats) +
+                        "depends:\n  condition: always\n  common: []\n")
+        return str(path)
+
+    def _no_parse(self, utils, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("parsed again")
+        monkeypatch.setattr(utils.yaml, "safe_load", fail)
+
+    def test_memo(self, utils, tmp_path, monkeypatch):
+        path = self._yaml(tmp_path, ["arm,pl011"])
+        schema = utils.load_yaml(path)
+        assert schema["properties"]["compatible"]["enum"] == ["arm,pl011"]
+
+        self._no_parse(utils, monkeypatch)
+        assert utils.load_yaml(path) == schema
+
+    def test_copies(self, utils, tmp_path):
+        path = self._yaml(tmp_path, ["arm,pl011"])
+        # as the driver list assist does with each driver's yaml
+        utils.load_yaml(path)["depends"].pop("condition")
+        assert utils.load_yaml(path)["depends"]["condition"] == "always"
+
+    def test_on_disk(self, utils, tmp_path, monkeypatch):
+        path = self._yaml(tmp_path, ["arm,pl011"])
+        schema = utils.load_yaml(path)
+        assert len(list((tmp_path / "cache" / "yaml").glob("*.pickle"))) == 1
+
+        # a new process finds the parsed file by its content
+        monkeypatch.setattr(utils, "_yaml_memo", {})
+        self._no_parse(utils, monkeypatch)
+        assert utils.load_yaml(path) == schema
+
+    def test_evicted(self, utils, tmp_path, monkeypatch):
+        ydir = tmp_path / "cache" / "yaml"
+        ydir.mkdir(parents=True)
+        stale = ydir / "0123.pickle"
+        stale.write_bytes(b"")
+        os.utime(stale, (0, 0))
+
+        import lopper.lop_program
+        monkeypatch.setattr(lopper.lop_program, "_pruned", set())
+        utils.load_yaml(self._yaml(tmp_path, ["arm,pl011"]))
+        assert not stale.exists()
+        assert len(list(ydir.glob("*.pickle"))) == 1
+
+    def test_changed(self, utils, tmp_path):
+        path = self._yaml(tmp_path, ["arm,pl011"])
+        utils.load_yaml(path)
+        st = os.stat(path)
+
+        path = self._yaml(tmp_path, ["arm,pl011", "arm,sbsa-uart"])
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+        assert utils.load_yaml(path)["properties"]["compatible"]["enum"] == \
+            ["arm,pl011", "arm,sbsa-uart"]
+
+    def test_disabled(self, utils, tmp_path, monkeypatch):
+        monkeypatch.setenv("LOPPER_CACHE_DIR", "none")
+        path = self._yaml(tmp_path, ["arm,pl011"])
+        assert utils.load_yaml(path)["properties"]["compatible"]["enum"] == ["arm,pl011"]
+        assert not (tmp_path / "cache").exists()
+
+    def test_missing_and_invalid(self, utils, tmp_path):
+        assert utils.load_yaml(str(tmp_path / "missing.yaml")) == {}
+        assert utils.load_yaml(str(tmp_path)) == {}
+
+        bad = tmp_path / "bad.yaml"
+        bad.write_text("properties: [\n")
+        assert utils.load_yaml(str(bad)) == {}
+        assert not (tmp_path / "cache").exists()
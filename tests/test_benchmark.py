@@ -14,6 +14,10 @@ This way, a fast machine and slow machine will both pass as long as
 the relative performance is within expected bounds.
 """
 
+import gc
+import re
+import subprocess
+import sys
 import time
 import pytest
 from pathlib import Path
@@ -253,6 +257,543 @@ class TestNodeIterationPerformance:
         )
 
 
+class TestStartupPerformance:
+    """
+    Import-time tests for common lopper invocations.
+
+    These run ``python -X importtime`` in a fresh interpreter and check
+    that optional subsystems (yaml, rest, schema constraint loading) are
+    not pulled in by a plain import. What is imported is checked, rather
+    than how long it takes, which depends on the load of the machine.
+    """
+
+    # loaded on demand only, a plain "import lopper" must not load these
+    OPTIONAL_MODULES = ["lopper.yaml", "ruamel.yaml", "anytree", "yaml",
+                        "lopper.rest", "flask", "pandas", "unittest"]
+
+    @staticmethod
+    def importtime(*args):
+        """
+        Run the interpreter with -X importtime and the passed arguments.
+
+        Returns a dict of module name -> cumulative import time (seconds).
+        """
+        repo_root = Path(__file__).parent.parent
+        result = subprocess.run([sys.executable, "-X", "importtime", *args],
+                                cwd=repo_root, capture_output=True, text=True)
+        times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative_us, name = line.split("|")
+            times[name.strip()] = int(cumulative_us) / 1e6
+        return times
+
+    @pytest.mark.parametrize("args", [
+        ("-c", "import lopper"),
+        ("-m", "lopper", "--version"),
+        ("-m", "lopper", "--help"),
+    ])
+    def test_optional_subsystems_not_imported(self, args):
+        times = self.importtime(*args)
+        assert "lopper" in times
+
+        loaded = [m for m in self.OPTIONAL_MODULES if m in times]
+        assert loaded == [], f"{' '.join(args)} imported optional modules: {loaded}"
+
+    def test_schema_constraints_loaded_on_demand(self):
+        code = ("import lopper, lopper.audit.schema as s; "
+                "print(s._node_property_constraints is None); "
+                "import lopper.audit; print(len(lopper.audit.NODE_PROPERTY_CONSTRAINTS) > 0)")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=Path(__file__).parent.parent)
+        assert result.stdout.split() == ["True", "True"]
+
+    def test_yaml_loaded_on_first_use(self):
+        code = ("import sys, lopper; print('lopper.yaml' in sys.modules); "
+                "from lopper import LopperYAML; print('lopper.yaml' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=Path(__file__).parent.parent)
+        assert result.stdout.split() == ["False", "True"]
+
+    def test_startup_report(self):
+        from io import StringIO
+        from lopper.__main__ import startup_report
+
+        out = StringIO()
+        startup_report([("begin", 1.0), ("import lopper", 1.05), ("setup", 1.25)], out)
+        report = out.getvalue()
+        assert "import lopper" in report and "50.00 ms" in report
+        assert "total" in report and "250.00 ms" in report
+        assert "lopper.rest" in report
+
+
+class TestFirewallMatchingPerformance:
+    """
+    Tests for firewall table to module matching (xlnx protections assist).
+
+    Each firewall table entry is matched to its module through an indexed
+    (base, size) lookup, and memory regions to their parent xmpus through
+    a sorted region index, rather than a scan of every module. The results
+    must match the scan.
+    """
+
+    NUM_MODULES = 2000
+
+    @pytest.fixture
+    def protections(self, monkeypatch):
+        xlnx = Path(__file__).parent.parent / "lopper" / "assists" / "xlnx"
+        monkeypatch.syspath_prepend(str(xlnx))
+        import protections
+        return protections
+
+    def _prot_map(self, protections):
+        # the matching only reads properties, the nodes don't need a tree
+        prot_map = protections.FirewallToModuleMap()
+
+        xmpu = LopperNode(name="xmpu@f6080000")
+        xmpu["compatible"] = ["xlnx,xmpu"]
+        xmpu["status"] = ["okay"]
+        xmpu["reg"] = [0, 0xf6080000, 0, 0x1000]
+        xmpu.label = "test_xmpu"
+        prot_map.add_firewall(xmpu.name, xmpu, "xlnx,xmpu")
+        prot_map.ppu_to_mod_map["xppu@f1310000"] = []
+
+        for i in range(self.NUM_MODULES):
+            n = LopperNode(name=f"dev@{i:x}")
+            n.label = f"dev{i}"
+            n["reg"] = [0, 0xf0000000 + i * 0x10000, 0, 0x1000 * (1 + i % 3)]
+            prot_map.add_module(n.name, n, "xppu@f1310000")
+
+        # two modules at the same address, the first non-skipped one wins
+        n = LopperNode(name="dev-alias@0")
+        n["reg"] = [0, 0xf0000000, 0, 0x1000]
+        prot_map.add_module(n.name, n, "xppu@f1310000")
+
+        for i, (base, size) in enumerate([(0x0, 0x80000000), (0xfffc0000, 0x40000),
+                                          (0x40000000, 0x1000)]):
+            n = LopperNode(name=f"mem@{i}")
+            n["compatible"] = ["xlnx,psv-ocm-ram"]
+            n["reg"] = [0, base, 0, size]
+            prot_map.add_module(n.name, n, xmpu.name)
+
+        return prot_map
+
+    def _firewall_table(self, protections):
+        table = protections.ftb.FirewallTable()
+        table.tokens = []
+        for i in range(0, self.NUM_MODULES, 2):
+            table.tokens.append(["0x1c000000", hex(0xf0000000 + i * 0x10000),
+                                 hex(0x1000 * (1 + i % 3)), "1", "1", "10", "0x260/0x3ff"])
+        # no matching module
+        table.tokens.append(["0x1c000000", "0x12345000", "0x1000", "1", "1", "10", "0x260/0x3ff"])
+        return table
+
+    @staticmethod
+    def _scan_match(protections, prot_map, baddr, size):
+        """the module selection, by scanning every module"""
+        match = [inst for mod, inst in prot_map.modules.items()
+                 for addr, sz in inst.get_base_and_size()
+                 if addr == baddr and sz == size]
+        mod_inst = None
+        if len(match) == 1:
+            mod_inst = match[0]
+        else:
+            for m in match:
+                if m.name not in protections.SKIP_MODULES:
+                    mod_inst = m
+        return mod_inst
+
+    @staticmethod
+    def _count_regions(prot_map, monkeypatch):
+        """count the module region lookups, the unit of work of a match"""
+        calls = [0]
+        for inst in prot_map.modules.values():
+            def counted(prop='reg', _get=inst.get_base_and_size):
+                calls[0] += 1
+                return _get(prop)
+            monkeypatch.setattr(inst, "get_base_and_size", counted, raising=False)
+        return calls
+
+    def test_ftb_setup_matches_scan(self, protections, monkeypatch):
+        prot_map = self._prot_map(protections)
+        table = self._firewall_table(protections)
+        monkeypatch.setattr(protections, "prot_map", prot_map)
+        monkeypatch.setattr(protections, "firewall_table", table)
+        calls = self._count_regions(prot_map, monkeypatch)
+
+        protections.ftb_setup_modules()
+        indexed_calls = calls[0]
+
+        # the same selection by scanning every module
+        calls[0] = 0
+        expected = {}
+        for tline in table.tokens:
+            inst = self._scan_match(protections, prot_map, int(tline[1], 16), int(tline[2], 16))
+            if inst is not None:
+                expected.setdefault(inst.name, []).append(int(tline[1], 16))
+        scan_calls = calls[0]
+
+        actual = {name: [e.base_addr for e in mod.ftb_entries_in[0x1c000000]]
+                  for name, mod in prot_map.modules.items() if mod.ftb_entries_in}
+        assert actual == expected
+        assert "dev-alias@0" in actual and "dev@0" not in actual
+
+        # the indexed setup looks each module's regions up once, to build
+        # the index, where the scan looks them all up for every entry.
+        # Counted rather than timed, so the check is not sensitive to load.
+        assert indexed_calls == len(prot_map.modules)
+        assert scan_calls == len(table.tokens) * len(prot_map.modules)
+
+    def test_parent_xmpus_match_scan(self, protections):
+        prot_map = self._prot_map(protections)
+        regions = [(m_addr, m_addr + m_size)
+                   for mod_name in prot_map.ppu_to_mod_map["xmpu@f6080000"]
+                   for m_addr, m_size in prot_map.modules[mod_name].get_base_and_size()]
+
+        for addr, size in [(0x0, 0x1000), (0x7ffff000, 0x1000), (0x7ffff000, 0x2000),
+                           (0x40000000, 0x1000), (0x40000800, 0x1000), (0xfffc0000, 0x40000),
+                           (0x90000000, 0x1000)]:
+            expected = ["xmpu@f6080000" for start, end in regions
+                        if addr >= start and addr + size <= end]
+            assert prot_map.get_parent_xmpus(addr, size) == expected
+
+
+class TestIsospecMemoryPerformance:
+    """
+    Tests for memory region classification (isospec assist).
+
+    Every memory region of every subsystem and domain is classified by
+    memory name. The patterns are compiled once and the result memoized
+    per name, rather than each pattern being searched on every call. The
+    results must match the search.
+    """
+
+    NUM_SUBSYSTEMS = 40
+
+    @pytest.fixture
+    def isospec(self, monkeypatch):
+        assists = Path(__file__).parent.parent / "lopper" / "assists"
+        monkeypatch.syspath_prepend(str(assists))
+        import isospec
+        return isospec.isospec
+
+    def _regions(self):
+        # the memory regions of a design, repeated for each subsystem
+        names = ["DDR0", "DDR1_HIGH", "OCM", "OCM_BANK_1", "RPU0_ATCM", "RPU1_BTCM_GLOBAL",
+                 "PL_BRAM_0", "LPDDR4_0", "XRAM"]
+        names += [f"PL_RAM_{i}" for i in range(40)] + [f"OCM_{i}" for i in range(20)]
+        return [name for _ in range(self.NUM_SUBSYSTEMS) for name in names]
+
+    @staticmethod
+    def _search(isospec, name):
+        """the classification, by searching every pattern"""
+        mem_found = None
+        for n, v in isospec.iso_memory_device_map.items():
+            if re.search(n, name):
+                mem_found = v
+        return mem_found
+
+    def test_classification_matches_search(self, isospec, monkeypatch):
+        regions = self._regions()
+
+        # count the pattern searches, the unit of work of a classification
+        searches = [0]
+        def search(pattern, string, flags=0, _search=re.search):
+            searches[0] += 1
+            return _search(pattern, string, flags)
+
+        class Counted:
+            def __init__(self, pattern):
+                self.pattern = pattern
+            def search(self, string):
+                searches[0] += 1
+                return self.pattern.search(string)
+
+        def compile(pattern, flags=0, _compile=re.compile):
+            return Counted(_compile(pattern, flags))
+
+        monkeypatch.setattr(re, "search", search)
+        monkeypatch.setattr(re, "compile", compile)
+        # rebuild the compiled map, with counted patterns
+        monkeypatch.setattr(isospec, "_memory_map_source", None)
+        monkeypatch.setattr(isospec, "_memory_map_compiled", [])
+        monkeypatch.setattr(isospec, "_memory_entries", {})
+
+        # memory_add() looks each region up twice, for its type and its
+        # destination
+        actual = [(isospec.memory_type(name), isospec.memory_dest(name),
+                   isospec.memory_type(name), isospec.memory_dest(name)) for name in regions]
+        indexed_count = searches[0]
+
+        searches[0] = 0
+        expected = []
+        for name in regions:
+            entries = [self._search(isospec, name) for _ in range(4)]
+            types = [e[0] if e else "memory" for e in entries]
+            dests = [e[1] if e else "" for e in entries]
+            expected.append((types[0], dests[1], types[2], dests[3]))
+        search_count = searches[0]
+
+        assert actual == expected
+        assert isospec.memory_type("RPU0_ATCM") == "sram"
+        assert isospec.memory_dest("DDR0") == "memory@.*"
+        assert isospec.memory_type("XRAM") == "memory"
+        assert isospec.memory_dest("XRAM") == ""
+
+        # every pattern is searched once per distinct name, where the
+        # search runs every pattern for every lookup. Counted rather than
+        # timed, so the check is not sensitive to load.
+        patterns = len(isospec.iso_memory_device_map)
+        assert indexed_count == len(set(regions)) * patterns
+        assert search_count == 4 * len(regions) * patterns
+
+    def test_map_change_seen(self, isospec, monkeypatch):
+        assert isospec.memory_type("PL_BRAM_0") == "memory"
+        default_map = isospec.iso_memory_device_map
+        monkeypatch.setattr(isospec, "iso_memory_device_map",
+                            dict(default_map, **{"PL_BRAM.*": ["sram", None]}))
+        assert isospec.memory_type("PL_BRAM_0") == "sram"
+        monkeypatch.setattr(isospec, "iso_memory_device_map", default_map)
+        assert isospec.memory_type("PL_BRAM_0") == "memory"
+
+
+class TestRenamePerformance:
+    """
+    Tests for following path references through a rename.
+
+    The properties that reference a renamed node (or its descendants) are
+    found through the path-ref index, rather than by scanning every
+    property of the tree, and the index is moved along with the rename
+    rather than rebuilt. The rewrites must match the scan.
+    """
+
+    BUS_CHILDREN = 1000
+
+    @pytest.fixture
+    def machine_factor(self):
+        return PerformanceBaseline.get_machine_factor()
+
+    @pytest.fixture
+    def tree(self):
+        from tests.scale import gen_sdt
+
+        tree = gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=2000)))
+
+        tree.add(LopperNode(-1, "/bus@f0000000"), dont_sync=True)
+        aliases = LopperNode(-1, "/aliases")
+        tree.add(aliases, dont_sync=True)
+        for i in range(self.BUS_CHILDREN):
+            n = LopperNode(-1, f"/bus@f0000000/serial@{0xf0000000 + i * 0x1000:x}")
+            n["reg"] = [0xf0000000 + i * 0x1000, 0x1000]
+            n["compatible"] = ["arm,pl011"]
+            tree.add(n, dont_sync=True)
+            aliases[f"serial{i}"] = [n.abs_path]
+        tree.sync()
+        return tree
+
+    @staticmethod
+    def _scan(tree, old_path, new_path):
+        """update_path_refs(), as it was: by scanning every property"""
+        names = tree._non_path_ref_names()
+        prefix = old_path + "/"
+        for n in tree:
+            if n.abs_path == "/__symbols__":
+                continue
+            for p in n:
+                raw = tree._prop_path_ref_value(p.name, p.value, names)
+                if raw is None:
+                    continue
+                if raw == old_path:
+                    new_raw = new_path
+                elif raw.startswith(prefix):
+                    new_raw = new_path + raw[len(old_path):]
+                else:
+                    continue
+                p.value = [p.value[0].replace(raw, new_raw, 1)]
+                p.resolve()
+
+    def test_bus_rename(self, tree, monkeypatch, machine_factor):
+        aliases = tree["/aliases"]
+        index = tree._path_ref_index()
+
+        follow = tree._follow_renames
+        elapsed = []
+
+        def timed(*args):
+            start = time.perf_counter()
+            follow(*args)
+            elapsed.append(time.perf_counter() - start)
+
+        monkeypatch.setattr(tree, "_follow_renames", timed)
+        tree.rename(tree["/bus@f0000000"], "soc@f0000000")
+
+        assert [aliases.propval(f"serial{i}")[0] for i in range(self.BUS_CHILDREN)] == \
+            [f"/soc@f0000000/serial@{0xf0000000 + i * 0x1000:x}" for i in range(self.BUS_CHILDREN)]
+        assert tree._path_ref_index(build=False) is index
+
+        # and back, by scanning
+        tree["/soc@f0000000"].name = "bus@f0000000"
+        tree.sync()
+        start = time.perf_counter()
+        self._scan(tree, "/soc@f0000000", "/bus@f0000000")
+        scan_elapsed = time.perf_counter() - start
+        assert aliases.propval("serial7") == ["/bus@f0000000/serial@f0007000"]
+
+        normalized_time = elapsed[0] / machine_factor
+        assert elapsed[0] * 2 < scan_elapsed, (
+            f"following the rename too slow: {elapsed[0]:.3f}s actual, "
+            f"{normalized_time:.3f}s normalized, scan {scan_elapsed:.3f}s."
+        )
+
+
+class TestScaling:
+    """
+    Growth tests on synthetic trees (tests/scale/gen_sdt.py).
+
+    The shipped SDTs are too small for quadratic behaviour to show up, so
+    trees of increasing size are generated, and load, sync, lop execution,
+    audit and write are timed (CPU time, best of two runs) at each size. A
+    growth exponent is fitted to each phase (time ~ nodes ** k), and a
+    phase fails if it grows super-linearly beyond the threshold.
+
+    The defaults keep the run short. Larger sizes can be requested with
+    LOPPER_SCALE_SIZES (e.g. "1000,10000,100000"), the threshold changed
+    with LOPPER_SCALE_MAX_EXPONENT, and the timings written to a JSON
+    file named by LOPPER_SCALE_REPORT.
+    """
+
+    SIZES = (500, 1000, 2000)
+    REPEATS = 2
+    MAX_EXPONENT = 1.4
+    PHASES = ("load", "sync", "lops", "audit", "write")
+
+    @staticmethod
+    def _lops():
+        lt = LopperTree()
+        lt['/']['compatible'] = ['system-device-tree-v1']
+        lops = LopperNode()
+        lops.name = "lops"
+        select = LopperNode()
+        select.name = "lop_0"
+        select['compatible'] = ['system-device-tree-v1,lop,select-v1']
+        select['select_1'] = ''
+        select['select_2'] = ['/axi.*:compatible:arm,pl011']
+        modify = LopperNode()
+        modify.name = "lop_1"
+        modify['compatible'] = ['system-device-tree-v1,lop,modify']
+        modify['modify'] = [':status:disabled']
+        lops = lops + select
+        lops = lops + modify
+        return lt + lops
+
+    @staticmethod
+    def _growth_exponent(points):
+        """Least squares slope of log(time) against log(nodes)."""
+        import math
+        xs = [math.log(n) for n, _ in points]
+        ys = [math.log(max(t, 1e-6)) for _, t in points]
+        mx = sum(xs) / len(xs)
+        my = sum(ys) / len(ys)
+        return (sum((x - mx) * (y - my) for x, y in zip(xs, ys)) /
+                sum((x - mx) ** 2 for x in xs))
+
+    def _run(self, nodes, outdir):
+        from lopper.audit.base import ValidationPhase
+        from lopper.audit.scheduler import AuditScheduler
+        from tests.scale import gen_sdt
+
+        root = gen_sdt.build(gen_sdt.SdtSpec.for_nodes(nodes))
+        fdt = gen_sdt.to_fdt(root)
+        times = {}
+
+        def timed(phase, func):
+            gc.collect()
+            start = time.process_time()
+            result = func()
+            times[phase] = time.process_time() - start
+            return result
+
+        tree = timed("load", lambda: gen_sdt.load_tree(fdt))
+        timed("sync", lambda: tree.sync(Lopper.fdt()))
+
+        sdt = LopperSDT(None)
+        sdt.tree = tree
+        lops = self._lops()
+        timed("lops", lambda: [sdt.exec_lop(lop, lops)
+                               for lop in lops['/lops'].subnodes(children_only=True)])
+
+        def audit():
+            scheduler = AuditScheduler(['all'])
+            for phase in (ValidationPhase.EARLY, ValidationPhase.POST_YAML,
+                          ValidationPhase.POST_PROCESSING):
+                scheduler.run_phase(phase, tree)
+        timed("audit", audit)
+
+        timed("write", lambda: sdt.write(tree, str(outdir / f"scale-{nodes}.dts"), True, True))
+
+        disabled = [n for n in tree if n.propval('status') == ['disabled']]
+        assert len(disabled) == len([d for d in range(gen_sdt.SdtSpec.for_nodes(nodes).devices)
+                                     if d % len(gen_sdt.DEVICE_KINDS) == 0])
+
+        return gen_sdt.node_count(root), times
+
+    @pytest.fixture(scope="class")
+    def timings(self, tmp_path_factory):
+        import os
+        sizes = self.SIZES
+        if os.environ.get("LOPPER_SCALE_SIZES"):
+            sizes = [int(s) for s in os.environ["LOPPER_SCALE_SIZES"].split(",")]
+        outdir = tmp_path_factory.mktemp("scale")
+
+        # the best of a few runs, to keep scheduling noise out of the fit
+        results = {phase: [] for phase in self.PHASES}
+        for size in sizes:
+            runs = [self._run(size, outdir) for _ in range(self.REPEATS)]
+            nodes = runs[0][0]
+            for phase in self.PHASES:
+                results[phase].append((nodes, min(times[phase] for _, times in runs)))
+
+        report = os.environ.get("LOPPER_SCALE_REPORT")
+        if report:
+            import json
+            with open(report, "w") as f:
+                json.dump({phase: {"points": points,
+                                   "exponent": self._growth_exponent(points)}
+                           for phase, points in results.items()}, f, indent=1)
+        return results
+
+    @pytest.mark.parametrize("phase", PHASES)
+    def test_phase_growth(self, timings, phase):
+        import os
+        limit = float(os.environ.get("LOPPER_SCALE_MAX_EXPONENT", self.MAX_EXPONENT))
+        points = timings[phase]
+        exponent = self._growth_exponent(points)
+        assert exponent < limit, (
+            f"{phase} grows super-linearly: exponent {exponent:.2f} "
+            f"(limit {limit}), cpu seconds by node count: "
+            + ", ".join(f"{n}: {t:.3f}" for n, t in points)
+        )
+
+    def test_generator_deterministic(self):
+        from tests.scale import gen_sdt
+        spec = gen_sdt.SdtSpec.for_nodes(1000, seed=7)
+        assert gen_sdt.to_dts(gen_sdt.build(spec)) == gen_sdt.to_dts(gen_sdt.build(spec))
+        assert 800 <= gen_sdt.node_count(gen_sdt.build(spec)) <= 1200
+
+    def test_generator_fdt_matches_dts(self):
+        from tests.scale import gen_sdt
+        root = gen_sdt.build(gen_sdt.SdtSpec(devices=16, phandle_refs=8))
+        tree = gen_sdt.to_tree(root)
+
+        paths = [path for path, _ in gen_sdt.build(gen_sdt.SdtSpec(devices=16, phandle_refs=8)).walk()]
+        assert set(paths) <= set(n.abs_path for n in tree)
+        dev = tree["/axi@0/serial@a0000000"]
+        assert tree.pnode(dev['interrupt-parent'].value[0]).abs_path == "/interrupt-controller@f9000000"
+        assert tree['/__symbols__']['dev0'].value == ["/axi@0/serial@a0000000"]
+        assert sum(len(d['access'].value) // 2 for d in tree['/domains'].subnodes(children_only=True)) == 8
+
+
 # Performance baseline data for tracking over time
 # This can be extended to store historical data
 PERFORMANCE_BASELINES = {
@@ -270,5 +811,17 @@ PERFORMANCE_BASELINES = {
         "description": "Full tree iteration with property access",
         "max_normalized_seconds": 0.5,
         "notes": "Basic iteration performance"
+    },
+    "firewall_matching": {
+        "description": "Match 1000 firewall table entries to 2000 modules",
+        "max_normalized_seconds": 0.5,
+        "notes": "Indexed (base, size) and xmpu region lookups, checked "
+                 "by counting module region lookups against a scan"
+    },
+    "scaling": {
+        "description": "load, sync, lops, audit and write of 500 to 2000 node "
+                       "synthetic SDTs",
+        "max_growth_exponent": 1.4,
+        "notes": "tests/scale/gen_sdt.py trees, time ~ nodes ** k fitted per phase"
     }
 }
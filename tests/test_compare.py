@@ -663,3 +663,210 @@ def test_unsupported_key_raises(tmp_path):
     b = _tree_from_dts(BASE, tmp_path, "b")
     with pytest.raises(NotImplementedError):
         a.compare(b, key="compatible")
+
+
+# --- scale: exclusion, phandle short-circuit, streaming renderers -------
+
+def _gen_tree(devices=256):
+    """A generated tree (no dtc needed), the same for every call."""
+    from tests.scale import gen_sdt
+    return gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=devices)))
+
+
+def test_excluded_paths():
+    excluded = lopper.tree_compare._excluded
+    assert excluded("/aliases")
+    assert excluded("/__symbols__/x")
+    assert excluded("/__lopper-phandles__/a/b")
+    assert not excluded("/aliases-not")
+    assert not excluded("/axi/__symbols__")
+    assert not excluded("/")
+
+
+def test_raw_equal_values_are_not_normalized(monkeypatch):
+    a = _gen_tree()
+    b = _gen_tree()
+    b["/axi@0/serial@a0000000"]["status"] = "disabled"
+
+    normalized = []
+    real = lopper.tree_compare._normalized_value
+
+    def _normalize(prop):
+        normalized.append(prop.name)
+        return real(prop)
+    monkeypatch.setattr(lopper.tree_compare, "_normalized_value", _normalize)
+
+    delta = a.compare(b)
+    assert [nd.path for nd in delta.changed_nodes] == ["/axi@0/serial@a0000000"]
+    # only the changed property (on each side)
+    assert normalized == ["status", "status"]
+
+
+def test_raw_equal_phandle_retarget_is_a_change():
+    # swap the phandles of two clocks: every clocks value is raw-equal,
+    # but references the other clock
+    a = _gen_tree()
+    b = _gen_tree()
+    clk0, clk1 = b["/clk0"], b["/clk1"]
+    p0, p1 = clk0.phandle, clk1.phandle
+    clk0.phandle = 0x7fff
+    clk1.phandle = p0
+    clk0.phandle = p1
+
+    delta = a.compare(b)
+    changed = _changed_by_path(delta)
+    assert len(changed) == 128
+    for nd in changed.values():
+        assert [name for (name, va, vb) in nd.changed_props] == ["clocks"]
+        assert nd.changed_props[0][1] == nd.changed_props[0][2]
+
+
+@pytest.mark.parametrize("fmt", ["equivalence", "unified", "compact", "fragment"])
+def test_streamed_output_matches_string(tmp_path, fmt):
+    a = _gen_tree()
+    b = _gen_tree()
+    b["/axi@0/serial@a0000000"]["status"] = "disabled"
+    b.delete(b["/axi@1/ethernet@a0010000"])
+    delta = a.compare(b)
+
+    out = tmp_path / f"{fmt}.txt"
+    assert delta.emit(fmt, output=str(out)) == str(out)
+    assert out.read_text() == delta.emit(fmt)
+
+
+def test_renderers_are_generators():
+    import inspect
+    a = _gen_tree()
+    b = _gen_tree()
+    delta = a.compare(b)
+    for render in (lopper.tree_compare._render_unified,
+                   lopper.tree_compare._render_compact,
+                   lopper.tree_compare._render_fragment):
+        assert inspect.isgenerator(render(delta))
+
+
+# --- pruned matching ------------------------------------------------------
+
+def _delta_signature(delta):
+    """Everything a renderer reads from a delta, in order."""
+    def props(plist):
+        return [(p.name, p.value) for p in plist]
+    return ([n.abs_path for n in delta.added_nodes],
+            [n.abs_path for n in delta.removed_nodes],
+            [(nd.path, nd.moved, props(nd.added_props), props(nd.removed_props),
+              nd.changed_props) for nd in delta.changed_nodes])
+
+
+def _mutate(tree, rng, count):
+    """Random edits: property changes, adds and deletes, node deletes,
+    renames and new subtrees."""
+    from lopper.tree import LopperNode
+    for i in range(count):
+        nodes = [n for n in tree if n.abs_path != "/"
+                 and not lopper.tree_compare._excluded(n.abs_path)]
+        node = rng.choice(nodes)
+        op = rng.randrange(6)
+        if op == 0:
+            node["status"] = rng.choice(["okay", "disabled"])
+        elif op == 1:
+            node[f"lopper,test-{i}"] = [rng.randrange(1 << 16)]
+        elif op == 2 and node.__props__:
+            node.delete(rng.choice(list(node.__props__)))
+        elif op == 3:
+            tree.delete(node)
+        elif op == 4:
+            tree.rename(node, f"{node.name}-{i}")
+        else:
+            parent = LopperNode(-1, f"{node.abs_path}/new{i}")
+            tree.add(parent)
+            parent["compatible"] = "lopper,test"
+            child = LopperNode(-1, f"{node.abs_path}/new{i}/child")
+            tree.add(child)
+            child["clocks"] = [tree["/clk0"].phandle]
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_pruned_matches_exhaustive(seed):
+    import random
+    rng = random.Random(seed)
+    a = _gen_tree()
+    b = _gen_tree()
+    _mutate(b, rng, rng.choice([1, 5, 40]))
+    if seed % 2:
+        _mutate(a, rng, 5)
+
+    pruned = lopper.tree_compare.compare(a, b)
+    exhaustive = lopper.tree_compare.compare(a, b, prune=False)
+    assert _delta_signature(pruned) == _delta_signature(exhaustive)
+    assert pruned.emit("unified") == exhaustive.emit("unified")
+
+
+def test_pruned_matches_exhaustive_phandle_churn():
+    # an extra cpu cluster renumbers every phandle after it: phandle
+    # cells then only compare equal by their target paths
+    from tests.scale import gen_sdt
+    a = _gen_tree()
+    b = gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=256, clusters=3)))
+    b["/axi@1/dma@a0050000"]["clocks"] = [b["/clk3"].phandle]
+
+    pruned = lopper.tree_compare.compare(a, b)
+    exhaustive = lopper.tree_compare.compare(a, b, prune=False)
+    assert _delta_signature(pruned) == _delta_signature(exhaustive)
+    assert [n.abs_path for n in pruned.added_nodes] == ["/cpus-cluster@2",
+                                                         "/cpus-cluster@2/cpu@0",
+                                                         "/cpus-cluster@2/cpu@1"]
+    assert "/axi@1/dma@a0050000" in _changed_by_path(pruned)
+
+
+def test_pruned_matches_exhaustive_phandle_swap():
+    a = _gen_tree()
+    b = _gen_tree()
+    clk0, clk1 = b["/clk0"], b["/clk1"]
+    p0, p1 = clk0.phandle, clk1.phandle
+    clk0.phandle = 0x7fff
+    clk1.phandle = p0
+    clk0.phandle = p1
+
+    pruned = lopper.tree_compare.compare(a, b)
+    assert len(pruned.changed_nodes) == 128
+    assert _delta_signature(pruned) == \
+        _delta_signature(lopper.tree_compare.compare(a, b, prune=False))
+
+
+def test_pruned_skips_unchanged_subtrees(monkeypatch):
+    a = _gen_tree()
+    b = _gen_tree()
+    b["/axi@0/serial@a0000000"]["status"] = "disabled"
+
+    compared = []
+    real = lopper.tree_compare._compare_node
+
+    def _compare(node_a, node_b, phandles=None):
+        compared.append(node_b.abs_path)
+        return real(node_a, node_b, phandles)
+    monkeypatch.setattr(lopper.tree_compare, "_compare_node", _compare)
+
+    assert not a.compare(a)
+    assert compared == []
+    a.compare(b)
+    assert compared == ["/axi@0/serial@a0000000"]
+
+
+def test_pruned_sees_in_place_edits():
+    a = _gen_tree()
+    b = _gen_tree()
+    assert not a.compare(b)
+
+    # an edit that doesn't change the tree's generation, as the assists make
+    gen = b.generation("*")
+    b["/axi@0/serial@a0000000"].propval("status", list)[0] = "disabled"
+    assert b.generation("*") == gen
+    assert list(_changed_by_path(a.compare(b))) == ["/axi@0/serial@a0000000"]
+
+    a["/axi@0/serial@a0000000"].propval("status", list)[0] = "disabled"
+    assert not a.compare(b)
+
+    b.rename(b["/axi@0/serial@a0000000"], "uart@a0000000")
+    delta = a.compare(b)
+    assert [n.abs_path for n in delta.added_nodes] == ["/axi@0/uart@a0000000"]
+    assert [n.abs_path for n in delta.removed_nodes] == ["/axi@0/serial@a0000000"]
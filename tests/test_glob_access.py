@@ -15,11 +15,12 @@ Author:
 """
 
 import os
+import re
 import json
 import pytest
 from lopper.assists.yaml_to_dts_expansion import (
     is_glob_pattern, glob_to_regex, domain_parent, infer_parent_domain,
-    domain_access, access_expand
+    domain_access, access_expand, glob_matcher, match_globs, wildcard_devices
 )
 
 
@@ -75,6 +76,65 @@ class TestGlobToRegex:
         assert regex == "^serial@.*$"
 
 
+class TestGlobMatcher:
+    """Test matching a domain's globs against a device pool in one pass."""
+
+    POOL = [{"dev": d} for d in ("serial@ff000000", "serial@ff010000", "can@ff060000",
+                                 "ethernet@ff0e0000", "serial1", "i2c@ff020000")]
+
+    def test_first_matching_glob_wins(self):
+        """A device is claimed by the first glob that matches it."""
+        m = glob_matcher(["serial*", "*@ff0*", "*"])
+        assert m.match("serial@ff000000").lastgroup == "g0"
+        assert m.match("can@ff060000").lastgroup == "g1"
+        assert m.match("foo").lastgroup == "g2"
+        assert glob_matcher(["serial?"]).match("serial@ff000000") is None
+
+    def test_same_as_sequential(self):
+        """One pass gives what applying the globs one at a time does."""
+        globs = ["serial?", "*@ff0?0000", "*", "can*"]
+
+        pool = list(self.POOL)
+        expected = []
+        for g in globs:
+            regex = glob_to_regex(g)
+            expected.append([d for d in pool if re.match(regex, d["dev"])])
+            pool = [d for d in pool if not re.match(regex, d["dev"])]
+
+        matched, remaining = match_globs(self.POOL, globs)
+        assert matched == expected
+        assert remaining == pool == []
+        assert [d["dev"] for d in matched[0]] == ["serial1"]
+
+    def test_wildcard_devices(self):
+        """Globs are replaced in place by the devices they claim from the parent."""
+        from lopper.tree import LopperTree, LopperNode, LopperProp
+
+        def domain(name, access, compatible="openamp,domain-v1"):
+            node = LopperNode(-1, f"/domains/{name}")
+            node["compatible"] = compatible
+            node + LopperProp("access", -1, node, json.dumps(access), pclass="json")
+            return node
+
+        tree = LopperTree()
+        domains = LopperNode(-1, "/domains")
+        tree = tree + domains
+        tree = tree + domain("pool", self.POOL, "openamp,domain-v1,devices")
+        tree = tree + domain("a", [{"dev": "i2c@ff020000"}, {"dev": "serial*"},
+                                   {"dev": "mmc", "flags": 1}, {"dev": "*"}])
+        tree = tree + domain("b", [{"dev": "*"}])
+
+        wildcard_devices(tree, tree["/domains"])
+
+        a = [d["dev"] for d in domain_access(tree["/domains/a"])]
+        # the explicit i2c reference is removed from the pool (peer exclusion)
+        assert a == ["i2c@ff020000", "serial@ff000000", "serial@ff010000", "serial1",
+                     "mmc", "can@ff060000", "ethernet@ff0e0000"]
+        assert domain_access(tree["/domains/pool"]) == []
+        # nothing left for b: it is marked keep-all
+        assert tree["/domains/b"]["lopper,access-keep-all"].value == [1]
+
+
 class TestDomainParent:
     """Test domain parent property lookup."""
 
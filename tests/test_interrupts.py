@@ -0,0 +1,146 @@
+"""
+Tests for the interrupt topology index (LopperTree.interrupt_parents() and
+LopperTree.interrupt_consumers()).
+
+Covers inherited interrupt-parent, interrupts-extended and interrupt-map
+routing against a walk of each node's parent chain, and rebuilding the
+index only when an interrupt property changes.
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import pytest
+
+from lopper.tree import LopperNode
+from tests.scale import gen_sdt
+
+INTC_PHANDLE = 0x8000
+NEXUS_PHANDLE = 0x8001
+
+
+def _add(tree, path, props, phandle=None):
+    node = LopperNode(-1, path)
+    tree.add(node, dont_sync=True)
+    if phandle:
+        node.phandle = phandle
+    # set once the node is in the tree, so phandles can be resolved
+    for name, value in props.items():
+        node[name] = value
+    return node
+
+
+@pytest.fixture
+def tree():
+    tree = gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=200)))
+    gic = tree.deref("gic")
+
+    # inherited by the PL devices without their own interrupt-parent
+    _add(tree, "/amba_pl", {})
+    _add(tree, "/amba_pl/interrupt-controller@80000000",
+         {"#interrupt-cells": [2], "interrupt-controller": None,
+          "interrupt-parent": [gic.phandle], "interrupts": [0, 89, 4]},
+         phandle=INTC_PHANDLE)
+    tree["/amba_pl"]["interrupt-parent"] = [INTC_PHANDLE]
+    for i in range(8):
+        _add(tree, f"/amba_pl/gpio@{0x80010000 + i * 0x1000:x}", {"interrupts": [i, 2]})
+    _add(tree, "/amba_pl/both@80100000",
+         {"interrupts-extended": [INTC_PHANDLE, 9, 2, gic.phandle, 0, 90, 4]})
+    _add(tree, "/pcie@90000000",
+         {"#address-cells": [3], "#interrupt-cells": [1],
+          "interrupt-map": [0, 0, 0, 1, gic.phandle, 0, 100, 4,
+                            0, 0, 0, 2, INTC_PHANDLE, 10, 2]},
+         phandle=NEXUS_PHANDLE)
+    tree.sync()
+    return tree
+
+
+def _walk_consumers(tree, intc):
+    """consumers of interrupts/interrupt-parent, found as gen_domain_dts did"""
+    found = []
+    for node in tree:
+        if "interrupts" not in node.__props__ or "interrupts-extended" in node.__props__:
+            continue
+        prop, _ = node.property_find("interrupt-parent")
+        if prop and tree.deref(prop.value[0]) is intc:
+            found.append(node)
+    return found
+
+
+class TestTopology:
+
+    def test_consumers_match_walk(self, tree):
+        gic = tree.deref("gic")
+        intc = tree.pnode(INTC_PHANDLE)
+
+        gic_consumers = tree.interrupt_consumers(gic)
+        assert [n for n in gic_consumers if "interrupts" in n.__props__
+                and "interrupts-extended" not in n.__props__] == _walk_consumers(tree, gic)
+        assert tree["/amba_pl/both@80100000"] in gic_consumers
+        assert tree["/pcie@90000000"] in gic_consumers
+
+        intc_consumers = tree.interrupt_consumers(intc)
+        assert intc_consumers[:8] == _walk_consumers(tree, intc)
+        assert [n.name for n in intc_consumers[8:]] == ["both@80100000", "pcie@90000000"]
+
+    def test_consumers_by_label(self, tree):
+        assert tree.interrupt_consumers("gic") == tree.interrupt_consumers(tree.deref("gic"))
+        assert tree.interrupt_consumers("no-such-label") == []
+        assert tree.interrupt_consumers(tree["/chosen"]) == []
+
+    def test_parents(self, tree):
+        gic = tree.deref("gic")
+        intc = tree.pnode(INTC_PHANDLE)
+
+        assert tree.interrupt_parents(tree["/axi@0/serial@a0000000"]) == \
+            [(gic, 3, [(0, 32, 4)])]
+        # inherited from /amba_pl
+        assert tree.interrupt_parents(tree["/amba_pl/gpio@80013000"]) == \
+            [(intc, 2, [(3, 2)])]
+        assert tree.interrupt_parents(tree["/amba_pl/both@80100000"]) == \
+            [(intc, 2, [(9, 2)]), (gic, 3, [(0, 90, 4)])]
+        assert tree.interrupt_parents(tree["/chosen"]) == []
+
+    def test_interrupt_map(self, tree):
+        _, _, maps = tree._interrupt_index()
+        gic = tree.deref("gic")
+        intc = tree.pnode(INTC_PHANDLE)
+        assert maps["/pcie@90000000"] == [
+            ((0, 0, 0), (1,), gic, (), (0, 100, 4)),
+            ((0, 0, 0), (2,), intc, (), (10, 2)),
+        ]
+
+
+class TestInvalidation:
+
+    def test_reused(self, tree):
+        index = tree._interrupt_index()
+        tree["/axi@0/serial@a0000000"]["status"] = "disabled"
+        tree["/chosen"]["bootargs"] = "console=ttyAMA0"
+        assert tree._interrupt_index() is index
+
+    def test_interrupt_parent_change(self, tree):
+        gic = tree.deref("gic")
+        intc = tree.pnode(INTC_PHANDLE)
+        serial = tree["/axi@0/serial@a0000000"]
+        assert serial in tree.interrupt_consumers(gic)
+
+        serial["interrupt-parent"] = [INTC_PHANDLE]
+        serial["interrupts"] = [12, 2]
+        assert serial not in tree.interrupt_consumers(gic)
+        assert serial in tree.interrupt_consumers(intc)
+        assert tree.interrupt_parents(serial) == [(intc, 2, [(12, 2)])]
+
+    def test_inherited_change(self, tree):
+        gic = tree.deref("gic")
+        gpio = tree["/amba_pl/gpio@80010000"]
+        tree["/amba_pl"]["interrupt-parent"] = [gic.phandle]
+        assert tree.interrupt_parents(gpio)[0][0] is gic
+
+    def test_consumer_deleted(self, tree):
+        intc = tree.pnode(INTC_PHANDLE)
+        gpio = tree["/amba_pl/gpio@80010000"]
+        tree.delete(gpio)
+        assert gpio not in tree.interrupt_consumers(intc)
+        assert len(tree.interrupt_consumers(intc)) == 9
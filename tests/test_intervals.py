@@ -0,0 +1,206 @@
+"""
+Tests for the interval set (lopper/intervals.py) and its users.
+
+Covers overlap, containment and exact range queries against a scan of
+every interval, first and best fit allocation, and the carveout and SRAM
+range checks of the openamp and zephyr assists with thousands of synthetic
+carveouts.
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import random
+import pytest
+
+from lopper.intervals import IntervalSet
+from lopper.tree import LopperTree, LopperNode
+
+
+def _random_intervals(rng, count, span=1 << 20):
+    intervals = []
+    for i in range(count):
+        start = rng.randrange(span)
+        size = rng.choice([0, 1, rng.randrange(1, 64), rng.randrange(1, 4096)])
+        intervals.append((start, size, i))
+    return intervals
+
+
+class TestQueries:
+
+    @pytest.fixture
+    def intervals(self):
+        return _random_intervals(random.Random(7), 3000)
+
+    def test_overlaps_match_scan(self, intervals):
+        index = IntervalSet(intervals)
+        rng = random.Random(8)
+        for _ in range(500):
+            start = rng.randrange(1 << 20)
+            size = rng.choice([0, 1, 100, 5000])
+            expected = sorted((s, i) for s, sz, i in intervals
+                              if s < start + size and start < s + sz)
+            assert index.overlaps(start, size) == [i for _, i in expected]
+
+    def test_containing_match_scan(self, intervals):
+        index = IntervalSet(intervals)
+        rng = random.Random(9)
+        for _ in range(500):
+            address = rng.randrange(1 << 20)
+            expected = sorted((s, i) for s, sz, i in intervals if s <= address < s + sz)
+            assert index.containing(address) == [i for _, i in expected]
+
+    def test_matching(self, intervals):
+        index = IntervalSet(intervals + [(0x1000, 0x100, "a"), (0x1000, 0x100, "b"),
+                                         (0x1000, 0x200, "c")])
+        assert index.matching(0x1000, 0x100)[-2:] == ["a", "b"]
+        assert "c" not in index.matching(0x1000, 0x100)
+        assert index.matching(1 << 30, 1) == []
+
+    def test_zero_sized(self):
+        index = IntervalSet([(0x100, 0x100, "region")])
+        assert index.overlaps(0x180, 0) == ["region"]
+        assert index.overlaps(0x100, 0) == []
+        assert IntervalSet([(0x180, 0)]).overlaps(0x100, 0x100) == [None]
+
+    def test_add(self, intervals):
+        rng = random.Random(10)
+        index = IntervalSet(intervals[:1000])
+        for i in intervals[1000:]:
+            index.add(*i)
+        assert len(index) == len(intervals)
+        assert [s for s, _, _ in index] == sorted(s for s, _, _ in intervals)
+        for _ in range(200):
+            start = rng.randrange(1 << 20)
+            expected = sorted((s, i) for s, sz, i in intervals
+                              if s < start + 64 and start < s + sz)
+            assert sorted(index.overlaps(start, 64)) == sorted(i for _, i in expected)
+
+
+class TestAllocate:
+
+    def test_first_fit(self):
+        index = IntervalSet([(0x0, 0x1000), (0x1800, 0x800), (0x4000, 0x1000)])
+        assert index.allocate(0x400, start=0) == 0x1000
+        # the gap at 0x1400 is too small for an aligned 0x1000
+        assert index.allocate(0x1000, align=0x1000) == 0x2000
+        assert index.allocate(0x1000) == 0x3000
+        assert index.allocate(0x1000) == 0x5000
+
+    def test_best_fit(self):
+        index = IntervalSet([(0x0, 0x1000), (0x3000, 0x100), (0x3200, 0x1000)])
+        # gaps: 0x1000-0x3000 and 0x3100-0x3200, the smaller one fits
+        assert index.allocate(0x100, fit="best") == 0x3100
+        assert index.allocate(0x100, fit="best") == 0x1000
+        assert index.allocate(0x100, fit="first") == 0x1100
+
+    def test_window(self):
+        index = IntervalSet([(0x1000, 0x1000)])
+        assert index.allocate(0x1000, start=0x800, end=0x2000) is None
+        assert index.allocate(0x800, start=0x800, end=0x2000) == 0x800
+        assert index.allocate(0x1000, start=0x800, end=0x3000) == 0x2000
+        assert index.allocate(1, start=0x800, end=0x3000) is None
+        with pytest.raises(ValueError):
+            index.allocate(1, fit="worst")
+
+    def test_allocations_never_overlap(self):
+        rng = random.Random(11)
+        index = IntervalSet(_random_intervals(rng, 2000))
+        for fit in ("first", "best"):
+            for _ in range(200):
+                size = rng.randrange(1, 2048)
+                start = index.allocate(size, align=16, fit=fit, item="new")
+                assert start is not None and start % 16 == 0
+                # only the interval just added, zero sized ones don't occupy
+                assert [i for i in index.overlaps(start, size)
+                        if i == "new"] == ["new"]
+                others = [i for i in index.overlaps(start, size) if i != "new"]
+                assert all(sz == 0 for s, sz, i in index if i in others)
+
+
+class TestCarveouts:
+    """Thousands of carveouts through the assists' range checks."""
+
+    COUNT = 3000
+
+    @staticmethod
+    def _pairwise(regions, carveout_pairs):
+        """the carveout check, by comparing every pair of regions"""
+        for i, (base1, size1) in enumerate(regions):
+            for base2, size2 in regions[i + 1:]:
+                if (base1, size1) not in carveout_pairs:
+                    continue
+                if base1 < base2 + size2 and base2 < base1 + size1:
+                    return False
+        return True
+
+    def _tree(self, regions):
+        tree = LopperTree()
+        res = LopperNode(-1, "/reserved-memory")
+        res["#address-cells"] = [2]
+        res["#size-cells"] = [2]
+        tree.add(res, dont_sync=True)
+        carveouts = []
+        for i, (base, size) in enumerate(regions):
+            n = LopperNode(-1, f"/reserved-memory/carveout{i}@{base:x}")
+            n["reg"] = [0, base, 0, size]
+            tree.add(n, dont_sync=True)
+            carveouts.append(n)
+        tree.sync()
+        return tree, carveouts
+
+    def test_validate_carveouts(self):
+        from lopper.assists import openamp_xlnx
+
+        regions = [(0x10000000 + i * 0x10000, 0x8000) for i in range(self.COUNT)]
+        tree, carveouts = self._tree(regions)
+        assert openamp_xlnx.xlnx_validate_carveouts(tree, carveouts)
+
+        # a later region overlapping the first carveout
+        regions.append((0x10004000, 0x1000))
+        tree, carveouts = self._tree(regions)
+        assert not openamp_xlnx.xlnx_validate_carveouts(tree, carveouts[:1])
+
+        # the check only looks forward from each carveout
+        assert openamp_xlnx.xlnx_validate_carveouts(tree, carveouts[-1:])
+
+    def test_validate_carveouts_matches_pairwise(self):
+        from lopper.assists import openamp_xlnx
+
+        rng = random.Random(12)
+        for _ in range(20):
+            regions = [(rng.randrange(0, 1 << 24, 0x100), rng.randrange(0x100, 0x8000, 0x100))
+                       for _ in range(40)]
+            tree, carveouts = self._tree(regions)
+            chosen = rng.sample(carveouts, 10)
+            pairs = {(c.propval("reg")[1], c.propval("reg")[3]) for c in chosen}
+            assert (openamp_xlnx.xlnx_validate_carveouts(tree, chosen) ==
+                    self._pairwise(regions, pairs))
+
+    def test_zephyr_sram_ranges(self):
+        from lopper.assists.zephyr_memory import _domain_memory_nodes
+
+        tree = LopperTree()
+        tree["/"]["#address-cells"] = [2]
+        tree["/"]["#size-cells"] = [2]
+        axi = LopperNode(-1, "/axi")
+        axi["#address-cells"] = [2]
+        axi["#size-cells"] = [2]
+        tree.add(axi, dont_sync=True)
+        tree.add(LopperNode(-1, "/domains"), dont_sync=True)
+        banks = []
+        for i in range(self.COUNT):
+            bank = LopperNode(-1, f"/axi/sram@{0x80000000 + i * 0x1000:x}")
+            bank["reg"] = [0, 0x80000000 + i * 0x1000, 0, 0x1000]
+            tree.add(bank, dont_sync=True)
+            banks.append(bank)
+        domain = LopperNode(-1, "/domains/zephyr")
+        sram = []
+        for i in range(0, self.COUNT, 3):
+            sram += [0, 0x80000000 + i * 0x1000, 0, 0x1000]
+        domain["sram"] = sram
+        tree.add(domain, dont_sync=True)
+        tree.sync()
+
+        assert _domain_memory_nodes(tree, domain) == tuple(banks[::3])
@@ -0,0 +1,376 @@
+"""
+Tests for compiled lop programs (lopper/lop_program.py).
+
+Covers handler dispatch, code block memoization, the on-disk program
+cache and exec_lop() running from pre-dispatched ops.
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import os
+import shutil
+import time
+import pytest
+
+import lopper.lop_program
+from lopper import LopperSDT
+from lopper.lop_program import LopProgram, LopOp, lop_kind, code_block, program_key
+from lopper.tree import LopperTree, LopperNode
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the lop program cache at a private directory."""
+    monkeypatch.setenv("LOPPER_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def _lops_tree(*lops):
+    """Build a lops tree from (name, {prop: value}) tuples."""
+    lt = LopperTree()
+    lt['/']['compatible'] = ['system-device-tree-v1']
+    lt['/']['priority'] = [3]
+
+    ln = LopperNode()
+    ln.name = "lops"
+    for name, props in lops:
+        lop_node = LopperNode()
+        lop_node.name = name
+        for k, v in props.items():
+            lop_node[k] = v
+        ln = ln + lop_node
+
+    lt = lt + ln
+    return lt
+
+
+def _system_tree():
+    tree = LopperTree()
+    for name, compat in (("cpu@0", "arm,cortex-a72"), ("cpu@1", "arm,cortex-a72"),
+                         ("cpu@2", "arm,cortex-r5")):
+        n = LopperNode(abspath=f"/cpus/{name}")
+        n['compatible'] = [compat]
+        tree + n
+    return tree
+
+
+class TestLopDispatch:
+
+    @pytest.mark.parametrize("lop_type,kind", [
+        ("system-device-tree-v1,lop,exec", "exec"),
+        ("system-device-tree-v1,lop,print-v1", "print"),
+        ("system-device-tree-v1,lop,select-v1", "select"),
+        ("system-device-tree-v1,lop,meta-v1", "meta"),
+        ("system-device-tree-v1,lop,output", "output"),
+        ("system-device-tree-v1,lop,tree", "tree"),
+        ("system-device-tree-v1,lop,assist-v1", "assist"),
+        ("system-device-tree-v1,lop,load", "load"),
+        ("system-device-tree-v1,lop,add", "add"),
+        ("system-device-tree-v1,lop,conditional-v1", "conditional"),
+        ("system-device-tree-v1,lop,code-v1", "code"),
+        ("system-device-tree-v1,lop,xlate-v1", "xlate"),
+        ("system-device-tree-v1,lop,modify", "modify"),
+        ("system-device-tree-v1,lop,unknown", ""),
+    ])
+    def test_lop_kind(self, lop_type, kind):
+        assert lop_kind(lop_type) == kind
+
+    def test_dispatch_order_matches_exec_lop(self):
+        # an output lop whose compatible also mentions "select" has always
+        # been handled by the select branch, since it is tested first
+        assert lop_kind("vendor,select-and,output") == "select"
+
+    def test_options_and_selects_parsed(self):
+        lt = _lops_tree(("lop_0", {
+            'compatible': ['system-device-tree-v1,lop,select-v1'],
+            'select_1': ['/cpus/.*:compatible:arm,cortex-a72', 'label'],
+            'options': ['a:1', 'b:2'],
+        }))
+        op = LopProgram.for_tree(lt).op(lt['/lops/lop_0'])
+
+        assert op.kind == "select"
+        assert op.options == [('a', '1'), ('b', '2')]
+        assert op.options is op.options
+        (sel, specs), = op.selects
+        assert sel.name == "select_1"
+        assert specs == [('/cpus/.*', 'compatible', 'arm,cortex-a72'), ('label', '', '')]
+
+    def test_op_is_memoized(self):
+        lt = _lops_tree(("lop_0", {'compatible': ['system-device-tree-v1,lop,code-v1'],
+                                   'code': ['return True']}))
+        program = LopProgram.for_tree(lt)
+        node = lt['/lops/lop_0']
+        assert program.op(node) is program.op(node)
+        assert LopProgram.for_tree(lt) is program
+
+    def test_malformed_option_raises(self):
+        lt = _lops_tree(("lop_0", {'compatible': ['system-device-tree-v1,lop,code-v1'],
+                                   'options': ['no-separator']}))
+        op = LopOp(lt['/lops/lop_0'])
+        with pytest.raises(ValueError):
+            op.options
+
+
+class TestCodeBlocks:
+
+    def test_code_block_compiled_once(self):
+        cmd = "x = 1\nreturn x + 1"
+        assert code_block(cmd) is code_block(cmd)
+
+    def test_code_block_returns_value(self):
+        ns = {}
+        eval(code_block("return 41 + 1"), ns, ns)
+        assert ns['__nret'] == 42
+
+    def test_exec_cmd_runs_memoized_block(self):
+        tree = _system_tree()
+        seen = []
+        cmd = "seen.append(node.abs_path)\nreturn True"
+        for n in tree.nodes('/cpus/.*'):
+            assert tree.exec_cmd(n, cmd, {'seen': seen})
+        assert seen == ['/cpus/cpu@0', '/cpus/cpu@1', '/cpus/cpu@2']
+        assert cmd in lopper.lop_program._code_memo
+
+
+class TestProgramCache:
+
+    def test_store_and_load_roundtrip(self, cache_dir):
+        cmd = "print('from the cache')\nreturn True"
+        lt = _lops_tree(("lop_0", {'compatible': ['system-device-tree-v1,lop,code-v1'],
+                                   'code': [cmd]}))
+        program = LopProgram("abc123", lt.export())
+        program.compile_code()
+        assert cmd in program.code
+        assert program.store()
+        assert (cache_dir / "lops" / "abc123.pickle").exists()
+
+        lopper.lop_program._code_memo.pop(cmd, None)
+        loaded = LopProgram.load("abc123")
+        assert loaded is not None
+        assert loaded.code[cmd].co_code == program.code[cmd].co_code
+        # loading seeds the process memo, nothing is compiled at exec time
+        assert lopper.lop_program._code_memo[cmd] is loaded.code[cmd]
+
+        tree = loaded.tree()
+        assert tree['/lops/lop_0']['code'].value == [cmd]
+        assert LopProgram.for_tree(tree) is loaded
+
+    def test_load_miss(self, cache_dir):
+        assert LopProgram.load("not-there") is None
+
+    def test_cache_disabled(self, monkeypatch):
+        monkeypatch.setenv("LOPPER_CACHE_DIR", "none")
+        assert lopper.lop_program.cache_dir() is None
+        assert not LopProgram("abc", {}).store()
+        assert LopProgram.load("abc") is None
+
+    def test_prune_cache(self, tmp_path):
+        cdir = tmp_path / "lops"
+        cdir.mkdir()
+        now = time.time()
+        for name, age, size in (("new.pickle", 0, 10), ("older.pickle", 60, 10),
+                                ("stale.pickle", 100 * 86400, 1), ("dead.tmp", 100 * 86400, 1),
+                                ("keep.txt", 100 * 86400, 1)):
+            (cdir / name).write_bytes(b"x" * size)
+            os.utime(cdir / name, (now - age, now - age))
+
+        assert lopper.lop_program.prune_cache(cdir, max_size=15) == 3
+        assert sorted(p.name for p in cdir.iterdir()) == ["keep.txt", "new.pickle"]
+        # once per process
+        (cdir / "other.tmp").write_bytes(b"")
+        os.utime(cdir / "other.tmp", (0, 0))
+        assert lopper.lop_program.prune_cache(cdir) == 0
+
+    def test_load_marks_entry_used(self, cache_dir):
+        assert LopProgram("abc123", {}).store()
+        entry = cache_dir / "lops" / "abc123.pickle"
+        os.utime(entry, (0, 0))
+        assert LopProgram.load("abc123") is not None
+        assert entry.stat().st_mtime > 0
+
+    def test_program_key_tracks_content(self, tmp_path):
+        inc = tmp_path / "common.dtsi"
+        inc.write_text("/ { };\n")
+        lop = tmp_path / "lop-test.dts"
+        lop.write_text('#include "common.dtsi"\n/dts-v1/;\n/ { compatible = "system-device-tree-v1"; };\n')
+
+        key = program_key(str(lop))
+        assert key and key == program_key(str(lop))
+        assert key != program_key(str(lop), libfdt=False)
+
+        # a change to an included file is a change to the program
+        inc.write_text("/ { x; };\n")
+        key2 = program_key(str(lop))
+        assert key2 != key
+
+        lop.write_text(lop.read_text() + "\n")
+        assert program_key(str(lop)) != key2
+
+    def test_program_key_nested_includes(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        incdir = tmp_path / "inc"
+        incdir.mkdir()
+        leaf = incdir / "leaf.h"
+        leaf.write_text("#define X 1\n")
+        dtsi = incdir / "common.dtsi"
+        dtsi.write_text('#include <leaf.h>\n/include/ "data.dtsi"\n')
+        data = incdir / "data.dtsi"
+        data.write_text("/ { };\n")
+        lop = tmp_path / "lop-test.dts"
+        lop.write_text('#include "inc/common.dtsi"\n/dts-v1/;\n/ { };\n')
+
+        key = program_key(str(lop), str(incdir))
+        assert key
+
+        # an include of an include, cpp's and dtc's
+        leaf.write_text("#define X 2\n")
+        key2 = program_key(str(lop), str(incdir))
+        assert key2 != key
+        data.write_text("/ { y; };\n")
+        key3 = program_key(str(lop), str(incdir))
+        assert key3 != key2
+
+        # a file that an include now finds first
+        (tmp_path / "leaf.h").write_text("#define X 3\n")
+        assert program_key(str(lop), str(incdir)) != key3
+
+    def test_program_key_computed_include(self, tmp_path):
+        lop = tmp_path / "lop-test.dts"
+        lop.write_text('#define INC "common.dtsi"\n#include INC\n/dts-v1/;\n/ { };\n')
+        assert program_key(str(lop)) == ""
+
+    def test_program_key_missing_file(self, tmp_path):
+        assert program_key(str(tmp_path / "missing.dts")) == ""
+
+
+class TestExecLopFromProgram:
+
+    def test_select_then_code(self, cache_dir):
+        sdt = LopperSDT(None)
+        sdt.tree = _system_tree()
+
+        lt = _lops_tree(
+            ("lop_0", {'compatible': ['system-device-tree-v1,lop,select-v1'],
+                       'select_1': ['/cpus/.*:compatible:arm,cortex-a72']}),
+            ("lop_1", {'compatible': ['system-device-tree-v1,lop,code-v1'],
+                       'code': ['hits.append(node.abs_path)\nreturn True'],
+                       'options': ['tag:a72']}),
+        )
+        hits = []
+        assert sdt.exec_lop(lt['/lops/lop_0'], lt)
+        assert [n.abs_path for n in sdt.tree.__selected__] == ['/cpus/cpu@0', '/cpus/cpu@1']
+
+        assert sdt.exec_lop(lt['/lops/lop_1'], lt, {'hits': hits})
+        assert hits == ['/cpus/cpu@0']
+
+    def test_unknown_lop_returns_false(self):
+        sdt = LopperSDT(None)
+        sdt.tree = _system_tree()
+        lt = _lops_tree(("lop_0", {'compatible': ['system-device-tree-v1,lop,bogus']}))
+        assert sdt.exec_lop(lt['/lops/lop_0'], lt) is False
+
+    @pytest.mark.skipif(shutil.which("dtc") is None, reason="dtc not available")
+    def test_lop_file_compiled_once(self, cache_dir, tmp_path, monkeypatch):
+        lop = tmp_path / "lop-cache.dts"
+        lop.write_text('/dts-v1/;\n/ {\n  compatible = "system-device-tree-v1";\n'
+                       '  lops {\n    lop_0 {\n'
+                       '      compatible = "system-device-tree-v1,lop,code-v1";\n'
+                       '      code = "return True";\n    };\n  };\n};\n')
+
+        sdt = LopperSDT(None)
+        sdt.use_libfdt = True
+        first = sdt.lop_program(str(lop))
+        assert first.key and (cache_dir / "lops" / f"{first.key}.pickle").exists()
+
+        # a warm run never calls dtc
+        def _no_compile(*args, **kwargs):
+            raise AssertionError("lop file recompiled on a warm cache")
+        monkeypatch.setattr(lopper.Lopper, "dt_compile", _no_compile)
+        second = sdt.lop_program(str(lop))
+        assert second.dct == first.dct
+
+
+class TestExecCmdBatch:
+
+    def test_sync_once_per_batch(self, monkeypatch):
+        tree = _system_tree()
+        syncs = []
+        real_sync = tree.sync
+        monkeypatch.setattr(tree, "sync", lambda *a, **kw: (syncs.append(a), real_sync(*a, **kw)))
+
+        seen = []
+        nodes = list(tree.nodes('/cpus/cpu@.*'))
+        ret = tree.exec_cmd_batch(nodes, "seen.append((node_name, node_number))\nreturn node.name",
+                                  {'seen': seen})
+        assert ret == "cpu@2"
+        assert [s[0] for s in seen] == ['/cpus/cpu@0', '/cpus/cpu@1', '/cpus/cpu@2']
+        # the leading "only if required" check, and one real sync at the end
+        assert syncs == [(None, True), ()]
+
+    def test_rename_mid_batch(self):
+        tree = _system_tree()
+        cmd = ("if node.name == 'cpu@0':\n"
+               "    tree['/cpus/cpu@1'].name = 'core@1'\n"
+               "seen.append(node.abs_path)\n"
+               "return True")
+        seen = []
+        assert tree.exec_cmd_batch(['/cpus/cpu@0', '/cpus/core@1', '/cpus/cpu@2'], cmd, {'seen': seen})
+        assert seen == ['/cpus/cpu@0', '/cpus/core@1', '/cpus/cpu@2']
+        assert tree['/cpus/core@1'].name == 'core@1'
+
+    def test_move_mid_batch(self):
+        tree = _system_tree()
+        tree + LopperNode(abspath="/cluster")
+        tree.sync()
+        # move() updates the paths as it goes, no rename is involved
+        cmd = ("if node.abs_path == '/cpus/cpu@0':\n"
+               "    tree.move(node, node.abs_path, '/cluster/cpu@0', dont_sync=True)\n"
+               "seen.append(node_name)\n"
+               "return True")
+        cpu0 = tree['/cpus/cpu@0']
+        seen = []
+        assert tree.exec_cmd_batch([cpu0, cpu0, '/cluster/cpu@0'], cmd, {'seen': seen})
+        assert seen == ['/cpus/cpu@0', '/cluster/cpu@0', '/cluster/cpu@0']
+
+    def test_env_overrides_node_variables(self):
+        tree = _system_tree()
+        seen = []
+        tree.exec_cmd_batch(list(tree.nodes('/cpus/cpu@.*')), "seen.append(node_name)",
+                            {'seen': seen, 'node_name': 'fixed'})
+        assert seen == ['fixed'] * 3
+
+        seen = []
+        tree.exec_cmd(tree['/cpus/cpu@0'], "seen.append(node_name)",
+                      {'seen': seen, 'node_name': 'fixed'})
+        assert seen == ['fixed']
+
+    def test_added_and_deleted_nodes(self):
+        tree = _system_tree()
+        cmd = ("if node.name == 'cpu@0':\n"
+               "    tree.delete(tree['/cpus/cpu@1'])\n"
+               "    nn = LopperNode(abspath='/cpus/cpu@3')\n"
+               "    tree.add(nn)\n"
+               "seen.append(node.abs_path)\n"
+               "return True")
+        seen = []
+        nodes = list(tree.nodes('/cpus/cpu@.*')) + ['/cpus/cpu@3']
+        tree.exec_cmd_batch(nodes, cmd, {'seen': seen, 'LopperNode': LopperNode})
+        assert seen == ['/cpus/cpu@0', '/cpus/cpu@2', '/cpus/cpu@3']
+
+    def test_xlate_lop_runs_batch(self, monkeypatch):
+        sdt = LopperSDT(None)
+        sdt.tree = _system_tree()
+        sdt.tree.__selected__ = list(sdt.tree.nodes('/cpus/cpu@.*'))
+
+        calls = []
+        monkeypatch.setattr(sdt.tree, "exec_cmd",
+                            lambda *a, **kw: calls.append(a) or True)
+
+        lt = _lops_tree(("lop_0", {'compatible': ['system-device-tree-v1,lop,xlate-v1'],
+                                   'code': ['node["xlated"] = 1\nreturn True']}))
+        assert sdt.exec_lop(lt['/lops/lop_0'], lt)
+        # per-node exec_cmd() is not used for xlate
+        assert calls == []
+        assert [n['xlated'].value for n in sdt.tree.nodes('/cpus/cpu@.*')] == [1, 1, 1]
@@ -0,0 +1,218 @@
+"""
+Tests for the path reference index (LopperTree._path_ref_index()).
+
+Covers following renames through the index against a scan of every
+property, references to descendants and from inside the renamed subtree,
+moving the index along with followed renames, and rebuilding it when the
+tree changes in other ways.
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import os
+import random
+
+from lopper.tree import LopperNode
+from tests.scale import gen_sdt
+
+
+def _tree(devices=64):
+    tree = gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=devices)))
+    tree.add(LopperNode(-1, "/aliases"))
+    return tree
+
+
+def _scan_refs(tree):
+    """every path-ref, found by scanning each property"""
+    names = tree._non_path_ref_names()
+    refs = {}
+    for path, node in tree.__nodes__.items():
+        if path == "/__symbols__":
+            continue
+        for name, p in node.__props__.items():
+            raw = tree._prop_path_ref_value(name, p.value, names)
+            if raw is not None:
+                refs[(path, name)] = raw
+    return refs
+
+
+def _index_refs(index):
+    """every path-ref held by the index"""
+    return {(owner.path(), name): t.path() for t in index.walk()
+            for owner, name in t.refs}
+
+
+def _scan_rename(refs, old, new):
+    """the references after old is renamed to new, as the scan rewrote them"""
+    def moved(path):
+        if path == old or path.startswith(old + "/"):
+            return new + path[len(old):]
+        return path
+    return {(moved(owner), name): moved(raw) for (owner, name), raw in refs.items()}
+
+
+class TestIndex:
+
+    def test_matches_scan(self):
+        tree = _tree()
+        tree["/aliases"]["serial9"] = ["/axi@0/serial@a0000000"]
+        tree["/chosen"]["stdout-path"] = ["serial9:115200n8"]
+        assert _index_refs(tree._path_ref_index()) == _scan_refs(tree)
+        assert _scan_refs(tree)[("/aliases", "serial9")] == "/axi@0/serial@a0000000"
+
+    def test_symbols_not_indexed(self):
+        tree = _tree()
+        index = tree._path_ref_index()
+        assert not any(owner == "/__symbols__" for owner, _ in _index_refs(index))
+
+    def test_reused(self):
+        tree = _tree()
+        index = tree._path_ref_index()
+        tree["/axi@0/serial@a0000000"].name = "uart@a0000000"
+        assert tree._path_ref_index() is index
+
+    def test_rebuilt_on_change(self):
+        tree = _tree()
+        index = tree._path_ref_index()
+        tree["/aliases"]["serial9"] = ["/axi@0/serial@a0000000"]
+        assert tree._path_ref_index(build=False) is None
+        index = tree._path_ref_index()
+        assert ("/aliases", "serial9") in _index_refs(index)
+
+        tree.delete(tree["/axi@0/serial@a0000000"])
+        assert tree._path_ref_index() is not index
+
+    def test_rebuilt_on_change_in_place(self):
+        tree = _tree()
+        tree["/aliases"]["serial9"] = ["/axi@0/serial@a0000000"]
+        index = tree._path_ref_index()
+        # not seen by generation()
+        tree["/aliases"]["serial9"].value[0] = "/axi@1"
+        assert tree._path_ref_index(build=False) is None
+        assert _index_refs(tree._path_ref_index()) == _scan_refs(tree)
+
+
+class TestRename:
+
+    def test_follows_descendants(self):
+        tree = _tree()
+        aliases = tree["/aliases"]
+        aliases["bus"] = ["/axi@0"]
+        aliases["serial9"] = ["/axi@0/serial@a0000000"]
+        aliases["other"] = ["/axi@1"]
+        tree.rename(tree["/axi@0"], "bus@0")
+
+        assert aliases.propval("bus") == ["/bus@0"]
+        assert aliases.propval("serial9") == ["/bus@0/serial@a0000000"]
+        assert aliases.propval("other") == ["/axi@1"]
+
+    def test_refs_from_the_renamed_subtree(self):
+        tree = _tree()
+        serial = tree["/axi@0/serial@a0000000"]
+        serial["self-ref"] = ["/axi@0/serial@a0000000"]
+        serial["bus-ref"] = ["/axi@1"]
+        tree.rename(tree["/axi@0"], "bus@0")
+
+        serial = tree["/bus@0/serial@a0000000"]
+        assert serial.propval("self-ref") == ["/bus@0/serial@a0000000"]
+        assert serial.propval("bus-ref") == ["/axi@1"]
+
+        # the index followed the owner, a later rename still finds it
+        tree.rename(tree["/axi@1"], "bus@1")
+        assert tree["/bus@0/serial@a0000000"].propval("bus-ref") == ["/bus@1"]
+
+    def test_index_moved_not_rebuilt(self):
+        tree = _tree()
+        aliases = tree["/aliases"]
+        aliases["serial9"] = ["/axi@0/serial@a0000000"]
+        index = tree._path_ref_index()
+
+        tree.rename(tree["/axi@0/serial@a0000000"], "uart@a0000000")
+        assert tree._path_ref_index(build=False) is index
+        assert _index_refs(index) == _scan_refs(tree)
+
+        tree.rename(tree["/axi@0"], "bus@0")
+        assert tree._path_ref_index(build=False) is index
+        assert _index_refs(index) == _scan_refs(tree)
+        assert aliases.propval("serial9") == ["/bus@0/uart@a0000000"]
+
+    def test_onto_a_referenced_path(self):
+        tree = _tree()
+        aliases = tree["/aliases"]
+        # a dangling reference to the path the node is renamed to
+        aliases["dangling"] = ["/axi@0/uart@a0000000/port"]
+        aliases["serial9"] = ["/axi@0/serial@a0000000"]
+        index = tree._path_ref_index()
+
+        tree.rename(tree["/axi@0/serial@a0000000"], "uart@a0000000")
+        assert aliases.propval("serial9") == ["/axi@0/uart@a0000000"]
+        assert tree._path_ref_index(build=False) is index
+        assert _index_refs(index) == _scan_refs(tree)
+
+        tree.rename(tree["/axi@0/uart@a0000000"], "serial@a0000000")
+        assert aliases.propval("serial9") == ["/axi@0/serial@a0000000"]
+        assert aliases.propval("dangling") == ["/axi@0/serial@a0000000/port"]
+
+    def test_alias_changed_in_place(self):
+        tree = _tree()
+        aliases = tree["/aliases"]
+        aliases["serial0"] = ["/axi@0/serial@a0000000"]
+        tree.rename(tree["/axi@0"], "bus@0")
+        assert aliases.propval("serial0") == ["/bus@0/serial@a0000000"]
+
+        # retargeted in place, the index has to notice
+        aliases["serial0"].value[0] = "/bus@0/gpio@a0040000"
+        tree.rename(tree["/bus@0/gpio@a0040000"], "gpio")
+        assert aliases.propval("serial0") == ["/bus@0/gpio"]
+        assert _index_refs(tree._path_ref_index()) == _scan_refs(tree)
+
+    def test_pending_rename_not_followed(self):
+        tree = _tree()
+        aliases = tree["/aliases"]
+        aliases["serial0"] = ["/axi@0/serial@a0000000"]
+        aliases["dma"] = ["/axi@1/dma@a0050000"]
+
+        # renamed, but not followed by this rename()'s sync
+        tree["/axi@1/dma@a0050000"].name = "dma-controller@a0050000"
+        tree.rename(tree["/axi@0/serial@a0000000"], "uart@a0000000")
+        assert aliases.propval("serial0") == ["/axi@0/uart@a0000000"]
+        assert aliases.propval("dma") == ["/axi@1/dma@a0050000"]
+        assert _index_refs(tree._path_ref_index()) == _scan_refs(tree)
+
+    def test_sync_follows_renames(self):
+        tree = _tree()
+        aliases = tree["/aliases"]
+        aliases["serial0"] = ["/axi@0/serial@a0000000"]
+        aliases["dma"] = ["/axi@1/dma@a0050000"]
+        index = tree._path_ref_index()
+
+        tree["/axi@0/serial@a0000000"].name = "uart@a0000000"
+        tree["/axi@1/dma@a0050000"].name = "dma-controller@a0050000"
+        tree.sync(follow_renames=True)
+        assert aliases.propval("serial0") == ["/axi@0/uart@a0000000"]
+        assert aliases.propval("dma") == ["/axi@1/dma-controller@a0050000"]
+        assert tree._path_ref_index(build=False) is index
+
+    def test_matches_scan(self):
+        tree = _tree(devices=120)
+        rng = random.Random(48)
+        aliases = tree["/aliases"]
+        nodes = [p for p in tree.__nodes__ if p not in ("/", "/__symbols__", "/aliases")]
+        for i in range(200):
+            target = rng.choice(nodes)
+            if rng.random() < 0.3:
+                target += "/port@0"
+            owner = tree[rng.choice(nodes)] if rng.random() < 0.3 else aliases
+            owner[f"ref{i}"] = [target]
+
+        for step in range(40):
+            refs = _scan_refs(tree)
+            node = tree[rng.choice([p for p in tree.__nodes__
+                                    if p not in ("/", "/__symbols__", "/aliases")])]
+            old = node.abs_path
+            new = os.path.dirname(old).rstrip("/") + f"/renamed{step}"
+            tree.rename(node, f"renamed{step}")
+            assert _scan_refs(tree) == _scan_rename(refs, old, new)
+            assert _index_refs(tree._path_ref_index()) == _scan_refs(tree)
@@ -0,0 +1,167 @@
+"""
+Tests for the lopper REST server (lopper/rest.py), with the Flask test
+client.
+
+Covers cursor pagination of /nodes against the unpaged match, the
+streamed /tree dump, and ETag / If-None-Match responses that follow the
+tree's generation count and its values.
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import json
+import types
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+pytest.importorskip("flask_restful")
+
+from tests.scale import gen_sdt
+
+
+@pytest.fixture
+def tree():
+    return gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=300, domains=3)))
+
+
+@pytest.fixture
+def client(tree, monkeypatch):
+    import lopper.rest
+    monkeypatch.setattr(lopper.rest, "sdt", types.SimpleNamespace(tree=tree))
+    lopper.rest.app.config["TESTING"] = True
+    return lopper.rest.app.test_client()
+
+
+def _next(response):
+    """the query of a response's rel="next" link, or None"""
+    link = response.headers.get("Link")
+    if not link:
+        return None
+    url = link.split(";")[0].strip("<>")
+    return {k: v[0] for k, v in parse_qs(urlparse(url).query).items()}
+
+
+class TestNodes:
+
+    def test_pages_cover_match(self, client, tree):
+        expected = [n.abs_path for n in tree.nodes("/axi@.*")]
+        assert len(expected) > 250
+
+        query = {"path": "/axi@.*", "limit": "100"}
+        pages = []
+        while query:
+            response = client.get("/nodes", query_string=query)
+            assert response.status_code == 200
+            pages.append(list(response.get_json()))
+            query = _next(response)
+
+        assert [len(p) for p in pages] == [100, 100, 100, len(expected) - 300]
+        assert [path for p in pages for path in p] == expected
+
+    def test_default_page_size(self, client, tree, monkeypatch):
+        import lopper.rest
+        monkeypatch.setattr(lopper.rest, "NODES_PAGE_SIZE", 50)
+        response = client.get("/nodes", query_string={"path": "/.*"})
+        assert len(response.get_json()) == 50
+        assert _next(response)["cursor"] == tree.nodes("/.*")[49].abs_path
+
+    def test_details(self, client):
+        response = client.get("/nodes", query_string={"path": "/axi@0/serial@a0000000",
+                                                      "details": "True"})
+        props = response.get_json()["/axi@0/serial@a0000000"]
+        assert props["status"] == 'status = "okay";'
+        assert _next(response) is None
+
+    def test_bad_cursor_and_limit(self, client):
+        response = client.get("/nodes", query_string={"path": "/.*", "cursor": "/nope"})
+        assert response.status_code == 400
+        response = client.get("/nodes", query_string={"path": "/.*", "limit": "0"})
+        assert response.status_code == 400
+
+    def test_match_reused(self, client, tree):
+        import lopper.rest
+        client.get("/nodes", query_string={"path": "/axi@.*", "limit": "10"})
+        nodes = lopper.rest._matches["/axi@.*"][1]
+        client.get("/nodes", query_string={"path": "/axi@.*", "limit": "10"})
+        assert lopper.rest._matches["/axi@.*"][1] is nodes
+
+        tree.delete(tree["/axi@0/serial@a0000000"])
+        client.get("/nodes", query_string={"path": "/axi@.*", "limit": "10"})
+        assert lopper.rest._matches["/axi@.*"][1] is not nodes
+
+
+class TestTree:
+
+    def test_dump(self, client, tree):
+        from io import StringIO
+        expected = StringIO()
+        tree["/"].print(expected)
+
+        response = client.get("/tree")
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert json.loads(response.get_data(as_text=True)) == expected.getvalue()
+
+    def test_chunked(self, client, tree, monkeypatch):
+        import lopper.rest
+        monkeypatch.setattr(lopper.rest, "TREE_CHUNK_SIZE", 100)
+        whole = client.get("/tree").get_data(as_text=True)
+        response = client.get("/tree", buffered=False)
+        chunks = list(response.response)
+        assert len(chunks) > 10
+        assert json.loads(b"".join(chunks)) == json.loads(whole)
+
+    def test_no_tree(self, client, monkeypatch):
+        import lopper.rest
+        monkeypatch.setattr(lopper.rest, "sdt", None)
+        assert client.get("/tree").status_code == 204
+
+
+class TestETag:
+
+    @pytest.mark.parametrize("url", ["/tree", "/domains", "/nodes?path=/domains/.*"])
+    def test_not_modified(self, client, tree, url):
+        response = client.get(url)
+        etag = response.headers["ETag"]
+        assert response.status_code == 200
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.get_data() == b""
+
+        tree["/chosen"]["bootargs"] = "console=ttyAMA0"
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_tree_dump_follows_changes(self, client, tree):
+        before = json.loads(client.get("/tree").get_data(as_text=True))
+        tree["/chosen"]["bootargs"] = "console=ttyAMA0"
+        after = json.loads(client.get("/tree").get_data(as_text=True))
+        assert "bootargs" not in before and "bootargs" in after
+
+    @pytest.mark.parametrize("url", ["/tree", "/nodes?path=/chosen&details=True"])
+    def test_in_place_edit(self, client, tree, url):
+        etag = client.get(url).headers["ETag"]
+        # not seen by the tree's generation count
+        tree["/chosen"]["stdout-path"].value[0] = "serial1:115200n8"
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_dump_replaced_while_streaming(self, client, tree, monkeypatch):
+        import lopper.rest
+        monkeypatch.setattr(lopper.rest, "TREE_CHUNK_SIZE", 100)
+        response = client.get("/tree", buffered=False)
+        # a newer dump replaces (and removes) the file before it is read
+        tree["/chosen"]["bootargs"] = "console=ttyAMA0"
+        assert "bootargs" in json.loads(client.get("/tree").get_data(as_text=True))
+        before = json.loads(b"".join(response.response))
+        assert "bootargs" not in before and "stdout-path" in before
+
+    def test_domains(self, client):
+        response = client.get("/domains")
+        assert response.get_json() == "/domains/domain0,/domains/domain1,/domains/domain2"
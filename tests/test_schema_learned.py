@@ -15,6 +15,7 @@ Author:
 import pytest
 from lopper.fmt import LopperFmt
 import lopper.schema
+from lopper.base import lopper_base
 from lopper.schema import (
     PROPERTY_NAME_HEURISTICS,
     PROPERTY_TYPE_HINTS,
@@ -755,3 +756,91 @@ class TestResolvePropertySpec:
             spec_lopper_fmt = spec.type_def.property_type.to_lopper_fmt()
             assert spec_lopper_fmt == lopper_fmt, \
                 f"{prop}: PropertySpec gives {spec_lopper_fmt}, get_property_type gives {lopper_fmt}"
+
+
+SCAN_DTS = '''
+# 1 "system-top.dts"
+/dts-v1/;
+/* a block comment with a { brace */
+/ {
+    compatible = "xlnx,test";  // trailing comment }
+    interrupt-parent = <&gic>;
+    amba: axi {
+        gic: interrupt-controller@f9000000 {
+            #interrupt-cells = <3>;
+            interrupt-controller;
+        };
+        serial0: serial@ff000000 {
+            status = "okay; {not a node}";
+            interrupts = <0 21 4>,
+                         <0 22 4>;
+            clocks = <&clk 56>, <&clk 31>;
+            reg = /bits/ 64 <0xff000000 0x1000>;
+        };
+        usb@ff9d0000,0 { phys = <&psgtr 2 4 0 2>; };
+    };
+};
+
+&serial0 {
+    pinctrl-0 = <&pinctrl_uart0>;
+};
+'''
+
+
+class TestDTSScan:
+    """Test the single pass DTS tokenizer used for phandle learning."""
+
+    def test_paths_and_values(self):
+        props = lopper_base.dts_property_table(SCAN_DTS)
+        assert props[('/', 'compatible')] == '"xlnx,test"'
+        assert props[('/axi/interrupt-controller@f9000000', '#interrupt-cells')] == '<3>'
+        assert props[('/axi/interrupt-controller@f9000000', 'interrupt-controller')] is None
+        # strings can contain delimiters, multi-line values are joined
+        assert props[('/axi/serial@ff000000', 'status')] == '"okay; {not a node}"'
+        assert props[('/axi/serial@ff000000', 'interrupts')] == '<0 21 4>, <0 22 4>'
+        assert props[('/axi/usb@ff9d0000,0', 'phys')] == '<&psgtr 2 4 0 2>'
+        # reference blocks are attributed to the labeled node
+        assert props[('/axi/serial@ff000000', 'pinctrl-0')] == '<&pinctrl_uart0>'
+
+    def test_labels_and_events(self):
+        scan = lopper_base.dts_scan(SCAN_DTS)
+        assert scan['labels']['amba'] == '/axi'
+        assert scan['labels']['serial0'] == '/axi/serial@ff000000'
+        nodes = [e[1] for e in scan['events'] if e[0] == 'node']
+        assert nodes == ['/axi', '/axi/interrupt-controller@f9000000',
+                         '/axi/serial@ff000000', '/axi/usb@ff9d0000,0']
+
+    def test_scan_is_shared(self):
+        assert lopper_base.dts_scan(SCAN_DTS) is lopper_base.dts_scan(SCAN_DTS)
+
+    def test_parse_dts_phandles(self):
+        phandles = lopper_base.parse_dts_phandles(SCAN_DTS)
+        assert phandles['/'] == {'interrupt-parent': [(0, '&gic', -1)]}
+        assert phandles['/axi/serial@ff000000']['clocks'] == [(0, '&clk', -1), (2, '&clk', -1)]
+        assert phandles['/axi/serial@ff000000']['pinctrl-0'] == [(0, '&pinctrl_uart0', -1)]
+        assert 'interrupts' not in phandles['/axi/serial@ff000000']
+
+    def test_extract_property_value(self):
+        assert lopper_base._extract_property_value(SCAN_DTS, '/axi/serial@ff000000', 'clocks') == \
+            '<&clk 56>, <&clk 31>'
+        assert lopper_base._extract_property_value(SCAN_DTS, '/axi', 'clocks') is None
+
+    def test_analyze_phandle_patterns(self):
+        descriptions, _ = lopper_base.analyze_phandle_patterns(SCAN_DTS)
+        assert descriptions['clocks'] == ['phandle field', 0]
+
+    def test_scan_dts_file(self, monkeypatch):
+        monkeypatch.setattr(lopper_base, 'phandle_possible_prop_dict',
+                            dict(lopper_base.phandle_possible_properties()))
+        generator = DTSSchemaGenerator()
+        generator.scan_dts_file(SCAN_DTS)
+
+        assert generator.label_to_path['serial0'] == 'axi/serial@ff000000'
+        assert [n['path'] for n in generator.nodes] == [
+            'axi', 'axi/interrupt-controller@f9000000', 'axi/serial@ff000000', 'axi/usb@ff9d0000,0']
+        assert generator.nodes[2]['compatible'] is None
+        assert generator.bit_width_hints == {'reg': 64}
+        assert generator.properties['reg'][0]['value'] == '<0xff000000 0x1000>'
+        assert generator.properties['interrupt-controller'][0]['type'] == 'boolean'
+        assert {'gic', 'clk', 'psgtr', 'pinctrl_uart0'} <= generator.phandle_refs
+        assert generator.properties['pinctrl-0'][0]['path'] == '/axi/serial@ff000000'
@@ -0,0 +1,118 @@
+"""
+Tests for the reverse __symbols__ index (LopperNode.symbols).
+
+Covers the index against a scan of /__symbols__, following nodes through
+renames, moves and deletes, rebuilding when symbols change, and the
+get_label() lookups of the baremetal and PL overlay assists that use it.
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import re
+import pytest
+
+from lopper.tree import LopperNode
+from tests.scale import gen_sdt
+
+
+def _tree(devices=64):
+    return gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=devices)))
+
+
+def _scan(tree, node):
+    """get_label()'s original lookup: every symbol whose value is the path"""
+    symbols = tree["/__symbols__"]
+    return [label for label, node_abs in symbols.__props__.items()
+            if re.match(node_abs[0], node.abs_path) and len(node_abs[0]) == len(node.abs_path)]
+
+
+class TestSymbolIndex:
+
+    def test_matches_scan(self):
+        tree = _tree()
+        for node in tree:
+            assert node.symbols == _scan(tree, node)
+        assert tree["/axi@0/serial@a0000000"].symbols == ["dev0"]
+        assert tree["/chosen"].symbols == []
+
+    def test_not_in_tree(self):
+        assert LopperNode(-1, "/detached").symbols == []
+
+    def test_reused(self):
+        tree = _tree()
+        index = tree._symbol_index()
+        for node in tree:
+            node.symbols
+        assert tree._symbol_index() is index
+
+    def test_rebuilt_on_symbol_change(self):
+        tree = _tree()
+        chosen = tree["/chosen"]
+        assert chosen.symbols == []
+
+        tree["/__symbols__"]["console"] = "/chosen"
+        assert chosen.symbols == ["console"]
+
+        tree["/__symbols__"]["console"] = "/memory@0"
+        assert chosen.symbols == []
+        assert tree["/memory@0"].symbols == ["memory", "console"]
+
+        tree["/__symbols__"].delete("console")
+        assert tree["/memory@0"].symbols == ["memory"]
+
+    def test_follows_rename(self):
+        tree = _tree()
+        assert tree["/axi@0/serial@a0000000"].symbols == ["dev0"]
+
+        tree.rename(tree["/axi@0/serial@a0000000"], "uart@a0000000")
+        assert tree["/axi@0/uart@a0000000"].symbols == ["dev0"]
+        # /__symbols__ itself is only rewritten when the tree is resolved
+        assert tree["/__symbols__"]["dev0"].value == ["/axi@0/serial@a0000000"]
+
+    def test_follows_move(self):
+        tree = _tree()
+        node = tree["/axi@0/serial@a0000000"]
+        assert node.symbols == ["dev0"]
+
+        tree.move(node, node.abs_path, "/axi@1/serial@a0000000")
+        assert tree["/axi@1/serial@a0000000"].symbols == ["dev0"]
+
+    def test_dropped_on_delete(self):
+        tree = _tree()
+        node = tree["/axi@0/serial@a0000000"]
+        assert node.symbols == ["dev0"]
+
+        tree.delete(node)
+        assert "dev0" in tree["/__symbols__"].__props__
+        assert "/axi@0/serial@a0000000" not in tree._symbol_index()
+        assert sum(len(v) for v in tree._symbol_index().values()) == \
+            len(tree["/__symbols__"].__props__) - 1
+
+
+class TestGetLabel:
+
+    @pytest.fixture(autouse=True)
+    def assist_path(self, monkeypatch):
+        # as when lopper loads the assists, their directory is on the path
+        import lopper.assists
+        monkeypatch.syspath_prepend(list(lopper.assists.__path__)[0])
+
+    @pytest.mark.parametrize("module", ["baremetalconfig_xlnx", "xlnx_overlay_pl_dt"])
+    def test_matches_scan(self, module):
+        import importlib
+        assist = importlib.import_module(f"lopper.assists.{module}")
+        tree = _tree()
+        symbols = tree["/__symbols__"]
+        for node in tree.subnodes(tree["/axi@0"])[1:]:
+            assert assist.get_label(None, symbols, node) == _scan(tree, node)[0]
+
+    def test_other_node(self):
+        from lopper.assists.baremetalconfig_xlnx import get_label
+
+        tree = _tree()
+        aliases = LopperNode(-1, "/aliases")
+        aliases["serial0"] = "/axi@0/serial@a0000000"
+        tree.add(aliases)
+        assert get_label(None, tree["/aliases"], tree["/axi@0/serial@a0000000"]) == "serial0"
@@ -0,0 +1,168 @@
+"""
+Tests for the timing instrumentation (lopper/timings.py).
+
+Covers the disabled fast path, span and counter recording, the JSON and
+Chrome trace output, and the per-lop spans recorded by perform_lops().
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import json
+import pytest
+
+import lopper.timings
+from lopper import LopperSDT, LopperFile
+from lopper.tree import LopperTree, LopperNode
+
+
+@pytest.fixture
+def recorder():
+    rec = lopper.timings.enable()
+    yield rec
+    lopper.timings.disable()
+
+
+class TestDisabled:
+
+    def test_span_is_shared_noop(self):
+        assert lopper.timings.recorder() is None
+        s1 = lopper.timings.span("a", "phase", file="x")
+        s2 = lopper.timings.span("b")
+        assert s1 is s2
+        with s1:
+            pass
+
+    def test_count_and_timed_are_passthrough(self):
+        lopper.timings.count("sync")
+
+        @lopper.timings.timed("f")
+        def f(x):
+            return x + 1
+
+        assert f(1) == 2
+        assert lopper.timings.recorder() is None
+
+
+class TestRecorder:
+
+    def test_spans_and_counters(self, recorder):
+        with lopper.timings.span("outer", "phase", file="a.dts"):
+            with lopper.timings.span("inner", "tree"):
+                lopper.timings.count("sync")
+            lopper.timings.count("sync", 2)
+
+        names = [e[0] for e in recorder.events]
+        # spans are recorded as they complete
+        assert names == ["inner", "outer"]
+        assert recorder.counters == {"sync": 3}
+
+        outer = recorder.events[1]
+        assert outer[1] == "phase"
+        assert outer[6] == {"file": "a.dts"}
+        assert outer[3] >= recorder.events[0][3] >= 0
+
+    def test_summary_aggregates(self, recorder):
+        for _ in range(3):
+            with lopper.timings.span("/lops/lop_0", "lop", type="code"):
+                pass
+        with lopper.timings.span("write"):
+            pass
+
+        summary = {(t["category"], t["name"]): t for t in recorder.summary()}
+        assert summary[("lop", "/lops/lop_0")]["count"] == 3
+        assert summary[("phase", "write")]["count"] == 1
+
+    def test_timed_records_outermost_call(self, recorder):
+        @lopper.timings.timed("walk", "tree")
+        def walk(n):
+            return 0 if n == 0 else 1 + walk(n - 1)
+
+        assert walk(5) == 5
+        assert [e[0] for e in recorder.events] == ["walk"]
+
+    def test_write_report_and_trace(self, recorder, tmp_path):
+        with lopper.timings.span("dtc", "phase", file="system.dts"):
+            pass
+        lopper.timings.count("resolve")
+
+        trace_file = recorder.write(tmp_path / "timings.json")
+        assert trace_file == str(tmp_path / "timings.trace.json")
+
+        report = json.loads((tmp_path / "timings.json").read_text())
+        assert report["format"] == lopper.timings.REPORT_FORMAT
+        assert report["phases"][0]["name"] == "dtc"
+        assert report["counters"] == {"resolve": 1}
+        assert report["events"][0]["args"] == {"file": "system.dts"}
+
+        trace = json.loads((tmp_path / "timings.trace.json").read_text())
+        x_events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        assert x_events[0]["name"] == "dtc"
+        assert x_events[0]["args"]["file"] == "system.dts"
+        assert {"ts", "dur", "pid", "tid"} <= set(x_events[0])
+        assert [e["args"] for e in trace["traceEvents"] if e["ph"] == "C"] == [{"resolve": 1}]
+
+    def test_print_summary(self, recorder, capsys):
+        with lopper.timings.span("write"):
+            pass
+        recorder.print_summary()
+        err = capsys.readouterr().err
+        assert "write" in err and "wall ms" in err
+
+
+class TestLopTimings:
+
+    def _sdt(self):
+        sdt = LopperSDT(None)
+        tree = LopperTree()
+        n = LopperNode(abspath="/cpus/cpu@0")
+        tree + n
+        sdt.tree = tree
+
+        lt = LopperTree()
+        lt['/']['compatible'] = ['system-device-tree-v1']
+        ln = LopperNode()
+        ln.name = "lops"
+        lop_node = LopperNode()
+        lop_node.name = "lop_0"
+        lop_node['compatible'] = ['system-device-tree-v1,lop,code-v1']
+        lop_node['code'] = ['node_count = len(list(tree))\nreturn True']
+        ln = ln + lop_node
+        lt = lt + ln
+
+        lop = LopperFile("lop-timed.dts")
+        lop.tree = lt
+        sdt.lops = [lop]
+        return sdt
+
+    def test_perform_lops_records_each_lop(self, recorder):
+        self._sdt().perform_lops()
+
+        lops = [e for e in recorder.events if e[1] == "lop"]
+        assert [e[0] for e in lops] == ["/lops/lop_0"]
+        assert lops[0][6] == {"type": "code", "file": "lop-timed.dts"}
+        assert recorder.counters.get("sync", 0) >= 1
+
+    def test_lop_type_only_looked_up_when_recording(self, monkeypatch):
+        from lopper.lop_program import LopProgram
+
+        def lookups():
+            calls = []
+            for_tree = LopProgram.for_tree
+            def counting(tree):
+                calls.append(tree)
+                return for_tree(tree)
+            monkeypatch.setattr(LopProgram, "for_tree", staticmethod(counting))
+            self._sdt().perform_lops()
+            monkeypatch.undo()
+            return len(calls)
+
+        disabled = lookups()
+        lopper.timings.enable()
+        try:
+            enabled = lookups()
+        finally:
+            lopper.timings.disable()
+        # one more for the span of the lop
+        assert enabled == disabled + 1
@@ -4,6 +4,7 @@ Tests for lopper tree walking and manipulation.
 Complete migration of tree_sanity_test() from lopper_sanity.py (lines 1260-1985).
 """
 
+import random
 import re
 import tempfile
 import filecmp
@@ -640,6 +641,23 @@ class TestPropertyManipulation:
             assert bruce_count >= 1, "bruce not found in new tree"
             assert prop_count >= 1, "newproperty_existingnode not found in new tree"
 
+    def test_property_iteration_sees_changes(self):
+        """Properties changed while iterating a node are seen by the iteration."""
+        node = LopperNode(-1, "/iter")
+        for name in ("a", "b", "c", "d"):
+            node[name] = [1]
+
+        seen = []
+        for p in node:
+            seen.append(p.name)
+            if p.name == "a":
+                node.delete("c")
+                node["e"] = [2]
+        assert seen == ["a", "b", "d", "e"]
+
+        # a new iteration starts from the first property again
+        assert [p.name for p in node] == ["a", "b", "d", "e"]
+
 
 class TestPropertyAccess:
     """Tests for property access methods (lopper_sanity.py:1942-1973)."""
@@ -992,3 +1010,60 @@ class TestPropertyFind:
                 assert target is not None, "deref should resolve the phandle"
                 assert hasattr(target, 'abs_path'), "Should be a LopperNode"
                 break
+
+
+class TestPropertyFindCache:
+    """property_find()'s memo against the uncached walk, under random edits."""
+
+    PROPS = ('#address-cells', '#size-cells', 'interrupt-parent')
+
+    @staticmethod
+    def _walk(node, prop_name):
+        search = node
+        while search:
+            if prop_name in search.__props__:
+                return search[prop_name], search
+            search = search.parent
+        return None, None
+
+    def _check(self, tree, rng):
+        nodes = list(tree)
+        for node in rng.sample(nodes, min(40, len(nodes))):
+            for name in self.PROPS:
+                prop, owner = node.property_find(name)
+                expected_prop, expected_owner = self._walk(node, name)
+                assert prop is expected_prop, (node.abs_path, name)
+                assert owner is expected_owner, (node.abs_path, name)
+
+    def test_random_mutations(self):
+        from tests.scale import gen_sdt
+
+        tree = gen_sdt.to_tree(gen_sdt.build(gen_sdt.SdtSpec(devices=120)))
+        rng = random.Random(43)
+        added = 0
+
+        self._check(tree, rng)
+        for step in range(150):
+            nodes = [n for n in tree if n.abs_path not in ('/', '/__symbols__')]
+            node = rng.choice(nodes)
+            name = rng.choice(self.PROPS)
+            op = rng.randrange(6)
+            if op == 0:
+                node[name] = [rng.randrange(1, 3)]
+            elif op == 1 and name in node.__props__:
+                node.delete(name)
+            elif op == 2:
+                if name in node.__props__:
+                    # a new value for the same property object
+                    node[name].value = [rng.randrange(1, 3)]
+            elif op == 3:
+                added += 1
+                child = LopperNode(-1, f"{node.abs_path}/added{added}")
+                if rng.random() < 0.5:
+                    child['#address-cells'] = [1]
+                tree.add(child)
+            elif op == 4 and not node.child_nodes:
+                tree.delete(node)
+            elif op == 5:
+                tree.rename(node, f"renamed{step}")
+            self._check(tree, rng)
@@ -0,0 +1,177 @@
+"""
+Tests for the in-process dtb to dts writer (lopper/treesource.py).
+
+Covers dtc's guess of each property's type (strings, string lists, cells
+and bytes) and its escaping, memory reservations and node layout, golden
+comparisons against "dtc -I dtb -O dts" for the shipped device trees (when
+a dtc of 1.5 or later is installed, set LOPPER_REQUIRE_DTC to fail rather
+than skip them without one, as CI does), and the dtc opt-in of
+write_fdt().
+
+Copyright (C) 2026 Advanced Micro Devices, Inc. All rights reserved.
+
+SPDX-License-Identifier: BSD-3-Clause
+"""
+
+import os
+import re
+import shutil
+import struct
+import subprocess
+from pathlib import Path
+
+import libfdt
+import pytest
+
+from lopper import Lopper
+from lopper.treesource import source
+
+DEVICE_TREES = sorted((Path(__file__).parent.parent / "device-trees").glob("*.dts"))
+
+
+def _blob(props, children=(), reserved=()):
+    sw = libfdt.FdtSw()
+    for address, size in reserved:
+        sw.add_reservemap_entry(address, size)
+    sw.finish_reservemap()
+
+    def emit(name, props, children):
+        sw.begin_node(name)
+        for pname, value in props:
+            sw.property(pname, value)
+        for child in children:
+            emit(*child)
+        sw.end_node()
+
+    emit("", props, children)
+    return sw.as_fdt().as_bytearray()
+
+
+def _value(value):
+    """the source line of a property named "p" of the value"""
+    lines = source(_blob([("p", value)])).splitlines()
+    return lines[3]
+
+
+class TestValues:
+
+    @pytest.mark.parametrize("value, expected", [
+        (b"", "\tp;"),
+        (b"okay\0", '\tp = "okay";'),
+        (b"a\0bc\0", '\tp = "a", "bc";'),
+        (b"tab\there\0", '\tp = "tab\\there";'),
+        (b"\a\b\v\f\r\0", '\tp = "\\a\\b\\v\\f\\r";'),
+        (b'q"uote\\d\nline\0', '\tp = "q\\"uote\\\\d\\nline";'),
+        (b"\0", "\tp = [00];"),
+        # more NULs than characters: not a string list
+        (b"a\0\0\0", "\tp = <0x61000000>;"),
+        (b"\0\0\0\0\0", "\tp = [00 00 00 00 00];"),
+        (struct.pack(">3I", 0, 0x2, 0xf9000000), "\tp = <0x00 0x02 0xf9000000>;"),
+        (bytes([1, 2, 0xff]), "\tp = [01 02 ff];"),
+        # not NUL terminated
+        (b"abcd", "\tp = <0x61626364>;"),
+        (b"\x80ab\0", "\tp = <0x80616200>;"),
+    ])
+    def test_guessed_types(self, value, expected):
+        assert _value(value) == expected
+
+    def test_layout(self):
+        blob = _blob([("#address-cells", struct.pack(">I", 2)), ("model", b"m\0")],
+                     [("cpus", [("x", b"")], [("cpu@0", [("reg", struct.pack(">I", 0))], [])]),
+                      ("chosen", [], [])],
+                     reserved=[(0x1000, 0x2000)])
+        assert source(blob) == (
+            "/dts-v1/;\n"
+            "\n"
+            "/memreserve/\t0x0000000000001000 0x0000000000002000;\n"
+            "/ {\n"
+            "\t#address-cells = <0x02>;\n"
+            '\tmodel = "m";\n'
+            "\n"
+            "\tcpus {\n"
+            "\t\tx;\n"
+            "\n"
+            "\t\tcpu@0 {\n"
+            "\t\t\treg = <0x00>;\n"
+            "\t\t};\n"
+            "\t};\n"
+            "\n"
+            "\tchosen {\n"
+            "\t};\n"
+            "};\n")
+
+    def test_not_a_dtb(self):
+        with pytest.raises(ValueError):
+            source(b"\0" * 64)
+
+
+def _dtc_version():
+    dtc = shutil.which("dtc")
+    if not dtc:
+        return None
+    out = subprocess.run([dtc, "--version"], capture_output=True, text=True).stdout
+    m = re.search(r"(\d+)\.(\d+)", out)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+DTC_VERSION = _dtc_version()
+
+
+class TestGolden:
+
+    @pytest.fixture(autouse=True)
+    def dtc(self):
+        if (DTC_VERSION or (0, 0)) < (1, 5):
+            if os.environ.get("LOPPER_REQUIRE_DTC"):
+                pytest.fail("dtc 1.5 or later not available, and LOPPER_REQUIRE_DTC is set")
+            pytest.skip("dtc 1.5 or later not available")
+
+    @pytest.mark.parametrize("dts", DEVICE_TREES, ids=lambda p: p.name)
+    def test_matches_dtc(self, dts, tmp_path):
+        dtb, _ = Lopper.dt_compile(str(dts), "", "", True, str(tmp_path))
+        expected = subprocess.run(["dtc", "-I", "dtb", "-O", "dts", dtb],
+                                  capture_output=True, text=True, check=True).stdout
+        with open(dtb, "rb") as f:
+            assert source(f.read()) == expected
+
+    def test_write_fdt_matches_dtc(self, lopper_sdt, tmp_path, monkeypatch):
+        Lopper.write_fdt(lopper_sdt.FDT, str(tmp_path / "inprocess.dts"))
+        monkeypatch.setenv("LOPPER_DTS_EXPORT", "dtc")
+        Lopper.write_fdt(lopper_sdt.FDT, str(tmp_path / "dtc.dts"))
+        assert (tmp_path / "inprocess.dts").read_text() == (tmp_path / "dtc.dts").read_text()
+
+
+class TestWriteFdt:
+
+    @pytest.fixture
+    def fdt(self):
+        blob = _blob([("compatible", b"a\0b\0")], [("chosen", [("bootargs", b"x\0")], [])])
+        return libfdt.Fdt(blob)
+
+    @pytest.fixture
+    def exports(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(Lopper, "dtb_dts_export",
+                            lambda dtb, out="", verbose=0: calls.append(out))
+        return calls
+
+    def test_in_process(self, fdt, tmp_path, exports):
+        out = tmp_path / "out.dts"
+        Lopper.write_fdt(fdt, str(out))
+        assert exports == []
+        assert out.read_text() == source(fdt.as_bytearray())
+        assert 'compatible = "a", "b";' in out.read_text()
+
+    def test_dtc_opt_in(self, fdt, tmp_path, exports, monkeypatch):
+        monkeypatch.setenv("LOPPER_DTS_EXPORT", "dtc")
+        out = tmp_path / "out.dts"
+        Lopper.write_fdt(fdt, str(out))
+        assert exports == [str(out)]
+
+    def test_dtc_fallback(self, fdt, tmp_path, exports, monkeypatch):
+        import lopper.treesource
+        monkeypatch.setattr(lopper.treesource, "source",
+                            lambda dtb: (_ for _ in ()).throw(ValueError("bad")))
+        out = tmp_path / "out.dts"
+        Lopper.write_fdt(fdt, str(out))
+        assert exports == [str(out)]
@@ -14,6 +14,7 @@ Author:
 """
 
 import os
+from pathlib import Path
 import pytest
 from lopper.yaml import LopperYAML
 from lopper import LopperSDT
@@ -201,3 +202,227 @@ class TestComplexPropertyAccess:
         # Access compatible string within the referenced structure
         assert gpio_prop[0]['compatible'] == "ti,omap4-gpio", \
             f"Expected 'ti,omap4-gpio', got {gpio_prop[0].get('compatible', 'NOT FOUND')}"
+
+
+class TestYAMLBuilder:
+    """Test the tree yaml input is loaded into, and the direct export."""
+
+    DOMAINS = """\
+domains:
+  APU:
+    compatible: openamp,domain-v1
+    cpus:
+      - cluster: cpus_a72
+        cpumask: 0x3
+    access:
+{access}
+    sub:
+      parent: /domains/RPU
+      reg: [0x1, 0x100]
+  RPU:
+    compatible: openamp,domain-v1
+    flag: true
+"""
+
+    def _write(self, tmp_path, entries=3):
+        access = "\n".join(f"      - dev: dev_{i}\n        flags:\n          requested: true"
+                           for i in range(entries))
+        f = tmp_path / "domains.yaml"
+        f.write_text(self.DOMAINS.format(access=access))
+        return str(f)
+
+    def test_import_dict(self):
+        from lopper.yaml import import_dict
+
+        root = import_dict({"a": 1, "b": {"c": [1, 2], "d": {"e": "x"}},
+                            "children": [{"n": "named-by-value", "v": 3}]})
+        assert root.name == "root"
+        assert root.attrs == {"a": 1}
+        assert [n.name for n in root.iter()] == ["root", "b", "d"]
+        b = root.children[0]
+        assert b.attrs == {"c": [1, 2], "fdt_name": "b"}
+
+        # without dictionary children, the "children" list is used, and
+        # nodes without a name are named by their first value
+        root = import_dict({"children": [{"n": "named-by-value", "v": 3}]})
+        assert root.children[0].name == "named-by-value"
+
+    def test_import_dict_values_copied(self):
+        from lopper.yaml import import_dict
+
+        shared = [1, 2]
+        root = import_dict({"a": {"x": shared}, "b": {"x": shared}})
+        a, b = root.children
+        assert a.attrs["x"] == b.attrs["x"] == shared
+        assert a.attrs["x"] is not b.attrs["x"]
+
+    def test_lists_as_nodes(self):
+        from lopper.yaml import import_dict
+
+        root = import_dict({"fw": [{"block": True}, {"inner": {"domain": 1}}]},
+                           lists_as_nodes=True)
+        fw = root.children[0]
+        assert fw.name == "fw"
+        assert [c.name for c in fw.children] == ["fw@0", "fw@1"]
+        # a single dictionary entry is popped out
+        assert fw.children[1].attrs == {"domain": 1, "fdt_name": "fw@1"}
+
+    def test_reparent(self, tmp_path):
+        yaml_obj = LopperYAML(self._write(tmp_path))
+        tree = yaml_obj.to_tree()
+        assert tree["/domains/RPU/sub"]["reg"].value == [0x1, 0x100]
+        assert tree["/domains/RPU/sub"]["parent"].value == "/domains/RPU"
+
+    def test_tree_round_trip(self, tmp_path):
+        tree = LopperYAML(self._write(tmp_path)).to_tree()
+
+        out = tmp_path / "out.yaml"
+        LopperYAML(None, tree).to_yaml(str(out))
+        tree2 = LopperYAML(str(out)).to_tree()
+
+        def dump(t):
+            return [(n.abs_path, sorted((p.name, str(p.value)) for p in n)) for n in t]
+        assert dump(tree2) == dump(tree)
+
+        # the json export is the same document, other than the parent
+        # property's name
+        import json
+        from ruamel.yaml import YAML
+        jout = tmp_path / "out.json"
+        LopperYAML(None, tree).to_json(str(jout))
+        jdct = json.loads(jout.read_text())
+        sub = jdct["domains"]["RPU"]["sub"]
+        sub["parent"] = sub.pop("custom_parent_value")
+        with open(out) as f:
+            assert jdct == YAML(typ="safe").load(f)
+
+    def test_json_properties_not_phandle_guessed(self, tmp_path):
+        from lopper.fmt import LopperFmt
+
+        tree = LopperYAML(self._write(tmp_path)).to_tree()
+        access = tree["/domains/APU"]["access"]
+        assert access.pclass == "json"
+        assert access.ptype == LopperFmt.STRING
+        assert access[2] == {"dev": "dev_2", "flags": {"requested": True}}
+
+    def test_tree_synced_once(self, tmp_path, monkeypatch):
+        from lopper.tree import LopperTree
+
+        def syncs(entries):
+            calls = []
+            orig = LopperTree.sync
+            def counting(self, *args, **kwargs):
+                calls.append(1)
+                return orig(self, *args, **kwargs)
+            monkeypatch.setattr(LopperTree, "sync", counting)
+            LopperYAML(self._write(tmp_path, entries)).to_tree()
+            monkeypatch.setattr(LopperTree, "sync", orig)
+            return len(calls)
+
+        # adding the nodes doesn't sync the tree each time
+        assert syncs(2) == syncs(50)
+
+    RICH = """\
+base: &base {x: 1, y: [1, 2], z: 0x10}
+other: &other {y: 3, w: !!str 5}
+merged: {<<: *base, x: 2}
+merged_list: {<<: [*base, *other], q: null}
+seq: &seq [a, b, *base]
+seq_alias: *seq
+keys: {[1, 2]: v, 3.5: f, true: t, ~: n, 2001-12-14: d}
+binary: !!binary aGVsbG8=
+text: |
+  multi
+  line
+"""
+
+    def test_event_load(self, tmp_path):
+        from ruamel.yaml import YAML
+        from lopper.yaml import yaml_load
+
+        f = tmp_path / "rich.yaml"
+        f.write_text(self.RICH)
+        dct = yaml_load(str(f))
+        with open(f) as fp:
+            assert repr(dct) == repr(YAML(typ="safe").load(fp))
+        # an alias is the anchored object, as ruamel loads it
+        assert dct["seq_alias"] is dct["seq"]
+        assert dct["seq"][2] is dct["base"]
+
+        # what isn't built from the events is left to ruamel
+        f.write_text("a: 1\n---\nb: 2\n")
+        with pytest.raises(Exception, match="expected a single document"):
+            yaml_load(str(f))
+        f.write_text("a: 1\na: 2\n")
+        with pytest.raises(Exception, match="duplicate key"):
+            yaml_load(str(f))
+        f.write_text("")
+        assert yaml_load(str(f)) is None
+
+    def test_streamed_output(self, tmp_path, capsys):
+        import io
+        import json
+        from ruamel.yaml import YAML
+        from ruamel.yaml.scalarint import HexInt
+
+        tree = LopperYAML(self._write(tmp_path)).to_tree()
+        tree["/domains/APU"]["description"] = "a long description " * 8
+        out = LopperYAML(None, tree)
+
+        # the streamed output is what dumping the whole dictionary writes
+        yaml_obj = YAML(typ="safe")
+        yaml_obj.default_flow_style = False
+        yaml_obj.representer.add_representer(
+            HexInt, lambda dumper, data: dumper.represent_scalar("tag:yaml.org,2002:int", hex(data)))
+        expected = io.StringIO()
+        yaml_obj.dump(out.export(parent_attr=True), expected)
+        out.to_yaml(str(tmp_path / "out.yaml"))
+        assert (tmp_path / "out.yaml").read_text() == expected.getvalue()
+
+        dct = out.export()
+        out.to_json(str(tmp_path / "out.json"))
+        assert (tmp_path / "out.json").read_text() == \
+            json.dumps(dct, indent=4, separators=(',', ': '))
+
+        capsys.readouterr()
+        out.to_yaml()
+        out.to_json()
+        assert capsys.readouterr().out == expected.getvalue() + "\n" + json.dumps(dct) + "\n"
+
+
+SELFTEST_YAML = sorted((Path(__file__).parent.parent / "lopper" / "selftest" / "domains").glob("*.yaml"))
+GOLDEN = Path(__file__).parent / "fixtures" / "yaml-roundtrip"
+
+
+class TestGoldenRoundTrip:
+    """yaml and json written for the selftest inputs, against committed output.
+
+    Each input is written directly (from the loaded yaml) and through a
+    LopperTree, so both export paths and the event driven load are
+    pinned. The expected files were written by the dictionary based
+    loader and dumpers the streaming ones replaced. After an intended
+    change to the output, run with LOPPER_UPDATE_GOLDEN set to rewrite
+    them.
+    """
+
+    @staticmethod
+    def _check(path, expected):
+        if os.environ.get("LOPPER_UPDATE_GOLDEN"):
+            expected.write_text(path.read_text())
+        assert path.read_text() == expected.read_text()
+
+    @pytest.mark.parametrize("source", SELFTEST_YAML, ids=lambda p: p.stem)
+    @pytest.mark.parametrize("via", ["direct", "tree"])
+    @pytest.mark.parametrize("fmt", ["yaml", "json"])
+    def test_matches_golden(self, source, via, fmt, tmp_path):
+        if via == "tree":
+            out = LopperYAML(None, LopperYAML(str(source)).to_tree())
+        else:
+            out = LopperYAML(str(source))
+
+        path = tmp_path / f"out.{fmt}"
+        if fmt == "yaml":
+            out.to_yaml(str(path))
+        else:
+            out.to_json(str(path))
+        self._check(path, GOLDEN / f"{source.stem}.{via}.{fmt}")